@@ -14,6 +14,9 @@ class Worker(Document):
 
     rate_limit = DictField()
 
+    # throttle applied by disk alerts, used to restore the worker
+    throttle = DictField()
+
     updated_at = DateTimeField()
 
     meta = {'collection': WORKER_COLLECTION}
@@ -0,0 +1,160 @@
+# Measure the parse and extraction time per page of the scrapers, before and after the extraction layer of
+# module/leech/utils/html.py, and with its pure python fallback when lxml is not installed.
+#
+# Usage: python -m benchmarks.html_extraction [--items 1000] [--repeat 5] [--bunkr-album saved.html]
+#
+# Pages are generated with the markup of the sites, including the navigation, icons, scripts and styles
+# that make real pages big, a page saved from bunkr can be given instead with --bunkr-album.
+# "before" builds a full html.parser tree and probes it with find before select, as the scrapers did.
+import time
+import random
+import argparse
+from unittest.mock import patch
+
+from bs4 import BeautifulSoup
+
+from tool.utils import parse_bytes
+from module.leech.utils import html
+from module.leech.utils.bunkr import get_folder_name, get_video_links, get_video_sizes, ALBUM_ONLY
+from module.leech.utils.cyberfile import FILE_ITEM, TOTAL_PAGES
+
+ICON = '<svg viewBox="0 0 24 24" fill="none"><path d="M12 4v16m8-8H4" stroke-width="2"/></svg>'
+
+
+def generate_chrome(rng: random.Random) -> tuple[str, str]:
+    head = ''.join([
+        '<head><meta charset="utf-8"><title>page</title>',
+        f'<script>{"window.a=function(b){return b+1};" * 500}</script>',
+        f'<style>{".c{margin:0;padding:0}" * 500}</style></head>',
+    ])
+    navigation = '<nav class="flex items-center"><ul>' + ''.join(
+        f'<li class="px-2"><a class="link" href="/p/{rng.getrandbits(32)}">{ICON}Link {index}</a></li>'
+        for index in range(40)
+    ) + '</ul></nav>'
+
+    return head, navigation
+
+
+def generate_bunkr_album(items: int, rng: random.Random) -> str:
+    head, navigation = generate_chrome(rng)
+    files = ''.join(
+        '<div class="relative group/item theItem" title="file.mp4">'
+        f'<a href="/f/{rng.getrandbits(40):x}" class="after:absolute after:z-10 after:inset-0"></a>'
+        f'<img src="https://i-burger.bunkr.ru/thumbs/{index}.png" class="grid-images_box-img" loading="lazy">'
+        f'<div class="flex flex-col gap-1"><p class="theName truncate">file {index}.mp4</p>'
+        f'<p class="theSize">{rng.uniform(1, 900):.2f} MB</p><span class="theDate">12:00:00 01/01/2024</span></div>'
+        f'<div class="flex gap-2"><button class="btn">{ICON}</button><button class="btn">{ICON}</button></div>'
+        '</div>'
+        for index in range(items)
+    )
+
+    return f'<html>{head}<body>{navigation}<h1 class="truncate">album</h1><div class="grid">{files}</div></body></html>'
+
+
+def generate_cyberfile_listing(items: int, rng: random.Random) -> str:
+    files = ''.join(
+        f'<div class="fileItem fileIconLi owned" fileid="{index}" dtfullurl="https://cyberfile.me/{rng.getrandbits(24):x}"'
+        f' dtfilename="file {index}.mp4"><div class="thumbIcon"><img src="/icons/mp4.png"></div>'
+        f'<span class="filesize">{rng.uniform(1, 900):.1f} MB</span>'
+        f'<div class="fileOptions">{ICON}{ICON}</div></div>'
+        for index in range(items)
+    )
+
+    return f'<div class="fileListing">{files}</div><input type="hidden" id="rspTotalPages" value="1">'
+
+
+def extract_bunkr_album_before(text: str):
+    soup = BeautifulSoup(text, 'html.parser')
+    folder_name = soup.css.select_one('h1.truncate').text if soup.find('h1', {'class': 'truncate'}) else ''
+    links, sizes = [], []
+
+    if soup.find('div', 'relative group/item theItem') is not None:
+        links = list(map(lambda x: x['href'], soup.css.select('div.theItem a')))
+        sizes = list(map(
+            lambda x: parse_bytes(getattr(x.css.select_one('.theSize'), 'text', None)),
+            soup.css.select('div.theItem')
+        ))
+
+    return folder_name, links, sizes
+
+
+def extract_bunkr_album_after(text: str):
+    soup = html.parse_html(text, ALBUM_ONLY)
+
+    return get_folder_name(soup), get_video_links(soup), get_video_sizes(soup)
+
+
+def extract_cyberfile_listing_before(text: str):
+    soup = BeautifulSoup(text, 'html.parser')
+    items = [item.get('dtfullurl') for item in soup.select('div[class=fileListing] div[class*=fileItem]')]
+
+    return items, soup.select_one('input#rspTotalPages').get('value', '0')
+
+
+def extract_cyberfile_listing_after(text: str):
+    soup = html.parse_html(text)
+    items = [html.get_attribute(item, 'dtfullurl') for item in FILE_ITEM.select(soup)]
+
+    return items, html.get_attribute(TOTAL_PAGES.select_one(soup), 'value', '0')
+
+
+def measure(extract, text: str, repeat: int) -> tuple[float, object]:
+    result = extract(text)
+    started_at = time.perf_counter()
+
+    for _ in range(repeat):
+        extract(text)
+
+    return (time.perf_counter() - started_at) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure parse and extraction time per page.')
+    parser.add_argument('--items', type=int, default=1000, help='files per page')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--bunkr-album', help='a saved bunkr album page')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    if args.bunkr_album:
+        with open(args.bunkr_album, encoding='utf-8') as file:
+            bunkr_album = file.read()
+    else:
+        bunkr_album = generate_bunkr_album(args.items, rng)
+
+    cases = [
+        ('bunkr album', bunkr_album, extract_bunkr_album_before, extract_bunkr_album_after),
+        ('cyberfile list', generate_cyberfile_listing(args.items, rng), extract_cyberfile_listing_before,
+         extract_cyberfile_listing_after),
+    ]
+
+    print(f'{"page":<16}{"KiB":>8}{"before (ms)":>14}{"fallback (ms)":>15}{"lxml (ms)":>12}{"speedup":>10}')
+
+    for name, text, before, after in cases:
+        before_seconds, expected = measure(before, text, args.repeat)
+
+        with patch.object(html, 'lxml', None):
+            fallback_seconds, fallback_result = measure(after, text, args.repeat)
+
+        after_seconds, result = measure(after, text, args.repeat) if html.lxml is not None else (None, None)
+
+        # the extraction layer must find exactly what the scrapers found before
+        for extracted in [fallback_result, result]:
+            if extracted is not None and extracted != expected:
+                raise AssertionError(f'{name}: extracted {str(extracted)[:200]}, expected {str(expected)[:200]}')
+
+        best_seconds = after_seconds or fallback_seconds
+        print(''.join([
+            f'{name:<16}',
+            f'{len(text.encode()) / 1024:>8.0f}',
+            f'{before_seconds * 1000:>14.1f}',
+            f'{fallback_seconds * 1000:>15.1f}',
+            f'{after_seconds * 1000:>12.1f}' if after_seconds else f'{"-":>12}',
+            f'{before_seconds / best_seconds:>9.1f}x',
+        ]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Measure translate calls per second of the flat translation table against walking the nested locale dicts,
+# and against loading the locale files on every call like handlers constructing a fresh I18nManager did.
+#
+# Usage: python -m benchmarks.i18n_translate [--calls 200000] [--locale en_US]
+#
+# Every key of the locale file is translated in turn, keys whose template has placeholders get every
+# placeholder as a keyword argument, the same way the handlers call translate with their values.
+import time
+import argparse
+from unittest.mock import patch
+
+from loguru import logger
+
+from module.i18n import get_i18n_manager
+from module.i18n.services.i18n_manager import compile_translations
+
+# loading the locale files is a lot slower than a lookup
+RELOAD_CALLS_DIVISOR = 1000
+
+
+def walk_nested(translations: dict, key: str, locale: str):
+    # how translate looked up keys before the flat table
+    value = translations.get(locale)
+
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+
+    return value
+
+
+def get_calls(locale: str) -> list[tuple[str, dict]]:
+    i18n_manager = get_i18n_manager()
+    calls = []
+
+    for key, template in compile_translations(i18n_manager.translations[locale]).items():
+        if isinstance(template, str):
+            calls.append((key, {field: 1 for field in template.fields}))
+
+    return calls
+
+
+def measure(translate, calls: list[tuple[str, dict]], number_of_calls: int) -> float:
+    started_at = time.perf_counter()
+
+    for index in range(number_of_calls):
+        key, kwargs = calls[index % len(calls)]
+        translate(key, **kwargs)
+
+    return number_of_calls / (time.perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure translate calls per second.')
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--locale', default='en_US')
+    args = parser.parse_args()
+
+    logger.remove()
+    i18n_manager = get_i18n_manager()
+    calls = get_calls(args.locale)
+
+    def translate(key: str, **kwargs):
+        return i18n_manager.translate(key, args.locale, **kwargs)
+
+    def reload_and_translate(key: str, **kwargs):
+        i18n_manager._load_translations()
+        return translate(key, **kwargs)
+
+    print(f'{len(calls)} keys, {sum(1 for _, kwargs in calls if kwargs)} with placeholders')
+    print(f'{"lookup":<10}{"calls/s":>14}')
+    print(f'{"reload":<10}{measure(reload_and_translate, calls, max(args.calls // RELOAD_CALLS_DIVISOR, 1)):>14,.0f}')
+
+    with patch.object(i18n_manager, '_get_translation', lambda key, locale: walk_nested(
+        i18n_manager.translations, key, locale
+    )):
+        print(f'{"nested":<10}{measure(translate, calls, args.calls):>14,.0f}')
+
+    print(f'{"flat":<10}{measure(translate, calls, args.calls):>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
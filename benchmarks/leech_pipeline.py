@@ -0,0 +1,234 @@
+# End to end benchmark of the leech pipeline against local stand-ins, see benchmarks/standins.py.
+#
+# Usage: python -m benchmarks.leech_pipeline [--sites pixeldrain,gofile,bunkr] [--files 4] [--size 64] [--profile range]
+#                                            [--json result.json] [--baseline result.json] [--tolerance 0.15]
+#
+# redis-server and mongod have to be installed, they are started on free ports with temporary data directories.
+# For every site a folder link is parsed with execute_parse_link, then each file is downloaded with process_download
+# and uploaded to the AList stand-in with process_upload, the tasks run eagerly in this process one after another
+# like a solo pool worker does. Throughput, p95 latency, peak RSS and cpu seconds per GB are reported per stage,
+# with --baseline the run fails when a stage regresses by more than the tolerance.
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+
+import psutil
+
+from benchmarks.standins import Catalogue, StandInServer, PROFILES, Profile, route_to_stand_in, redis_server, \
+    mongod, clear_proxy_environment
+
+REDIS_PASSWORD = 'standin'
+SITES = {
+    'pixeldrain': 'https://pixeldrain.com/l/{folder_id}',
+    'gofile': 'https://gofile.io/d/{folder_id}',
+    'bunkr': 'https://bunkr.standin/a/{folder_id}',
+}
+STAGES = ['parse', 'download', 'upload']
+# interval of sampling the resident memory
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+class Stage:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.cpu = 0.0
+        self.peak_rss = 0
+        self.failures = 0
+
+    def measure(self, func, *args, **kwargs):
+        process = psutil.Process()
+        cpu_times = process.cpu_times()
+        started_at = time.perf_counter()
+        stopped = threading.Event()
+
+        def sample_rss():
+            while not stopped.wait(RSS_SAMPLE_INTERVAL):
+                self.peak_rss = max(self.peak_rss, process.memory_info().rss)
+
+        sampler = threading.Thread(target=sample_rss, daemon=True)
+        sampler.start()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stopped.set()
+            sampler.join()
+            latency = time.perf_counter() - started_at
+            self.latencies.append(latency)
+            self.elapsed += latency
+            self.cpu += sum(process.cpu_times()[:2]) - sum(cpu_times[:2])
+            self.peak_rss = max(self.peak_rss, process.memory_info().rss)
+
+    def get_result(self) -> dict:
+        latencies = sorted(self.latencies)
+        gigabytes = self.bytes / 1024 ** 3
+
+        return {
+            'count': len(latencies),
+            'failures': self.failures,
+            'throughput': self.bytes / self.elapsed if self.elapsed else 0,
+            'operations_per_second': len(latencies) / self.elapsed if self.elapsed else 0,
+            'p50': statistics.median(latencies) if latencies else 0,
+            'p95': latencies[max(int(len(latencies) * 0.95) - 1, 0)] if latencies else 0,
+            'peak_rss': self.peak_rss,
+            'cpu_per_gb': self.cpu / gigabytes if gigabytes else 0,
+        }
+
+
+def set_environment(redis_port: int, mongo_port: int, download_location: str):
+    # read by config/config.py, so it must happen before the pipeline is imported
+    os.environ.update({
+        'REDIS_HOST': '127.0.0.1',
+        'REDIS_PORT': str(redis_port),
+        'REDIS_PASSWORD': REDIS_PASSWORD,
+        'MONGO_HOST': '127.0.0.1',
+        'MONGO_PORT': str(mongo_port),
+        'MONGO_USERNAME': '',
+        'MONGO_PASSWORD': '',
+        'MONGO_DATABASE_NAME': 'benchmark',
+        'BOT_DOWNLOAD_LOCATION': download_location,
+        'BUNKR_DOMAIN': 'bunkr.standin',
+        'ALIST_HOST': 'https://alist.standin',
+        'ALIST_TOKEN': 'standin',
+        'SHOULD_USE_DATETIME_CATEGORY': '',
+        'SKIP_DUPLICATE_LINK_WITHIN_DAYS': '0',
+    })
+
+
+def run_pipeline(sites: list[str], stages: dict[str, Stage]):
+    from module.leech.adaptors.parser import execute_parse_link
+    from module.leech.adaptors.uploader import process_upload
+    from module.leech.adaptors.downloader import process_download
+    from module.leech.constants.leech_file_status import LeechFileStatus
+    from module.leech.constants.leech_file_tool import LeechFileSyncTool
+
+    for site in sites:
+        leech_files = stages['parse'].measure(
+            execute_parse_link,
+            SITES[site].format(folder_id=site),
+            sync_tool=LeechFileSyncTool.ALIST,
+            sync_path='/benchmark',
+            batch=site
+        )
+
+        for leech_file in leech_files:
+            leech_file = stages['download'].measure(process_download.apply, args=(leech_file,)).get()
+
+            if leech_file.status != LeechFileStatus.DOWNLOAD_SUCCESS:
+                stages['download'].failures += 1
+                print(f'{site}: download of {leech_file.name} failed: {leech_file.reason}', file=sys.stderr)
+                continue
+
+            stages['download'].bytes += leech_file.size
+            size = leech_file.size
+            leech_file.upload_status = LeechFileStatus.UPLOADING
+            leech_file = stages['upload'].measure(process_upload.apply, args=(leech_file,)).get()
+
+            if leech_file.upload_status != LeechFileStatus.UPLOAD_SUCCESS:
+                stages['upload'].failures += 1
+                print(f'{site}: upload of {leech_file.name} failed: {leech_file.upload_reason}', file=sys.stderr)
+                continue
+
+            stages['upload'].bytes += size
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+
+    for stage, result in results.items():
+        expected = baseline.get(stage)
+
+        if not expected:
+            continue
+
+        # throughput should not drop, latency, cpu time and memory should not grow
+        for metric, higher_is_better in [
+            ('throughput', True),
+            ('operations_per_second', True),
+            ('p95', False),
+            ('cpu_per_gb', False),
+            ('peak_rss', False),
+        ]:
+            if not expected.get(metric):
+                continue
+
+            ratio = result[metric] / expected[metric]
+
+            if (higher_is_better and ratio < 1 - tolerance) or (not higher_is_better and ratio > 1 + tolerance):
+                regressions.append(f'{stage} {metric}: {expected[metric]:.4g} -> {result[metric]:.4g}')
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the leech pipeline against local stand-ins.')
+    parser.add_argument('--sites', default=','.join(SITES.keys()))
+    parser.add_argument('--files', type=int, default=4, help='files per site')
+    parser.add_argument('--size', type=int, default=64, help='MiB per file')
+    parser.add_argument('--profile', choices=PROFILES, default=Profile.RANGE)
+    parser.add_argument('--slow-rate', type=float, default=20, help='MiB/s of the slow profile')
+    parser.add_argument('--json', help='write the results to a file')
+    parser.add_argument('--baseline', help='results of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args()
+
+    sites = args.sites.split(',')
+    catalogue = Catalogue()
+
+    for site in sites:
+        catalogue.add_folder(site, args.files, args.size * 1024 ** 2, args.profile)
+
+    clear_proxy_environment()
+    stages = {name: Stage(name) for name in STAGES}
+
+    with StandInServer(catalogue, slow_rate=args.slow_rate * 1024 ** 2) as server, \
+            redis_server(REDIS_PASSWORD) as redis, mongod() as mongo, \
+            tempfile.TemporaryDirectory(prefix='leech-benchmark-') as download_location, \
+            route_to_stand_in(server.port):
+        set_environment(redis.port, mongo.port, download_location)
+        run_pipeline(sites, stages)
+
+    results = {name: stage.get_result() for name, stage in stages.items()}
+
+    print(f'{args.files} files of {args.size} MiB per site, profile {args.profile}, sites {", ".join(sites)}')
+    print(f'{"stage":<10}{"count":>7}{"failed":>8}{"MiB/s":>10}{"ops/s":>10}{"p50 (s)":>10}{"p95 (s)":>10}'
+          f'{"RSS (MiB)":>11}{"cpu s/GB":>10}')
+
+    for name, result in results.items():
+        print(''.join([
+            f'{name:<10}',
+            f'{result["count"]:>7}',
+            f'{result["failures"]:>8}',
+            f'{result["throughput"] / 1024 ** 2:>10.1f}',
+            f'{result["operations_per_second"]:>10.2f}',
+            f'{result["p50"]:>10.3f}',
+            f'{result["p95"]:>10.3f}',
+            f'{result["peak_rss"] / 1024 ** 2:>11.1f}',
+            f'{result["cpu_per_gb"]:>10.2f}',
+        ]))
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Compare the mean turnaround of FIFO and shortest-job-first scheduling.
+#
+# Usage: python -m benchmarks.scheduler_turnaround [--files 200] [--batches 5] [--workers 2] [--seed 1]
+#
+# Batches of files with heavy tailed sizes are submitted to a simulated broker at random times,
+# workers always take the pending message with the highest priority (lowest number) first,
+# the same way the redis transport does when priority_steps are configured.
+import heapq
+import random
+import argparse
+import statistics
+from unittest.mock import patch
+
+from module.leech.utils import scheduler
+from module.leech.beans.leech_file import LeechFile
+from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.constants.schedule_strategy import ScheduleStrategy
+
+# bytes per second of every host
+HOST_BANDWIDTHS = {
+    'pixeldrain.com': 40 * 1024 ** 2,
+    'gofile.io': 20 * 1024 ** 2,
+    'bunkr.si': 8 * 1024 ** 2,
+}
+
+
+def generate_batches(number_of_files: int, number_of_batches: int, rng: random.Random):
+    batches = []
+
+    for batch_index in range(number_of_batches):
+        submitted_at = rng.uniform(0, 600) if batch_index else 0
+        leech_files = []
+
+        for file_index in range(number_of_files // number_of_batches):
+            host = rng.choice(list(HOST_BANDWIDTHS.keys()))
+            leech_files.append(LeechFile(
+                link=f'https://{host}/{batch_index}/{file_index}',
+                name=f'{batch_index}-{file_index}',
+                tool=LeechFileTool.PIXELDRAIN,
+                # log-normal sizes, most files are small and a few are huge
+                size_hint=int(min(rng.lognormvariate(17.5, 2.0), 20 * 1024 ** 3))
+            ))
+
+        batches.append((submitted_at, leech_files))
+
+    return sorted(batches, key=lambda x: x[0])
+
+
+def simulate(batches, number_of_workers: int, strategy: ScheduleStrategy) -> list[float]:
+    events = []
+    sequence = 0
+
+    with patch.object(scheduler, 'TASK_SCHEDULE_STRATEGY', strategy):
+        for submitted_at, leech_files in batches:
+            for leech_file, priority in scheduler.order_leech_files(leech_files, free_space=1024 ** 5):
+                events.append((submitted_at, priority, sequence, leech_file))
+                sequence += 1
+
+    pending = []
+    workers = [0.0] * number_of_workers
+    turnarounds = []
+    index = 0
+
+    while index < len(events) or pending:
+        now = heapq.heappop(workers)
+
+        # nothing is pending, the worker sleeps until the next batch arrives
+        if not pending and events[index][0] > now:
+            heapq.heappush(workers, events[index][0])
+            continue
+
+        while index < len(events) and events[index][0] <= now:
+            submitted_at, priority, sequence, leech_file = events[index]
+            heapq.heappush(pending, (priority, sequence, submitted_at, leech_file))
+            index += 1
+
+        _, _, submitted_at, leech_file = heapq.heappop(pending)
+        finished_at = now + leech_file.size_hint / HOST_BANDWIDTHS[scheduler.get_host(leech_file)]
+        turnarounds.append(finished_at - submitted_at)
+        heapq.heappush(workers, finished_at)
+
+    return turnarounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare FIFO and SJF turnaround.')
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--batches', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    batches = generate_batches(args.files, args.batches, random.Random(args.seed))
+
+    print(f'{"strategy":<10}{"mean (s)":>12}{"median (s)":>12}{"p95 (s)":>12}{"max (s)":>12}')
+
+    for strategy in (ScheduleStrategy.FIFO, ScheduleStrategy.SJF):
+        turnarounds = sorted(simulate(batches, args.workers, strategy))
+
+        print(''.join([
+            f'{strategy:<10}',
+            f'{statistics.mean(turnarounds):>12.1f}',
+            f'{statistics.median(turnarounds):>12.1f}',
+            f'{turnarounds[int(len(turnarounds) * 0.95) - 1]:>12.1f}',
+            f'{max(turnarounds):>12.1f}',
+        ]))
+
+
+if __name__ == '__main__':
+    main()
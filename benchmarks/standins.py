@@ -0,0 +1,343 @@
+# Local stand-ins of the services the leech pipeline talks to, used by benchmarks/leech_pipeline.py.
+#
+# StandInServer answers every http(s) request of the pipeline: the Pixeldrain, Gofile and Bunkr APIs and pages,
+# the file downloads and the AList upload endpoint. It runs in its own process so that its cpu time and memory
+# are not counted as the pipeline's, route_to_stand_in sends every httpx request to it and keeps the original
+# host in the Host header. LocalProcess runs redis-server or mongod on a free port with a temporary data directory.
+import os
+import re
+import json
+import time
+import random
+import socket
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+CHUNK_SIZE = 64 * 1024
+# served files repeat the same random block
+BLOCK = random.Random(0).randbytes(1024 * 1024)
+
+
+class Profile:
+    # Accept-Ranges and 206 responses
+    RANGE = 'range'
+    # ignores Range and always sends the whole file
+    PLAIN = 'plain'
+    # bandwidth limited
+    SLOW = 'slow'
+    # random delay before the first byte and between chunks
+    JITTER = 'jitter'
+
+
+PROFILES = [Profile.RANGE, Profile.PLAIN, Profile.SLOW, Profile.JITTER]
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+    raise TimeoutError(f'Nothing is listening on port {port} after {timeout} seconds.')
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    matched = re.match(r'^bytes=(\d*)-(\d*)$', header or '')
+
+    if matched is None or not any(matched.groups()):
+        return None
+
+    start, end = matched.groups()
+
+    # suffix range, the last n bytes
+    if not start:
+        return max(size - int(end), 0), size - 1
+
+    return int(start), min(int(end), size - 1) if end else size - 1
+
+
+def format_size(size: int) -> str:
+    return f'{size / 1024 ** 2:.2f} MB'
+
+
+class Catalogue:
+    def __init__(self):
+        # file id: (size, profile)
+        self.files: dict[str, tuple[int, str]] = {}
+        # folder id: file ids
+        self.folders: dict[str, list[str]] = {}
+
+    def add_folder(self, folder_id: str, number_of_files: int, size: int, profile: str) -> list[str]:
+        file_ids = [f'{folder_id}-{index}' for index in range(number_of_files)]
+
+        for file_id in file_ids:
+            self.files[file_id] = (size, profile)
+
+        self.folders[folder_id] = file_ids
+
+        return file_ids
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'StandInHTTPServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body: str | bytes, content_type: str = 'application/json', status: int = 200):
+        body = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data: dict):
+        self.send_body(json.dumps(data))
+
+    def send_not_found(self):
+        self.send_body('not found', 'text/plain', 404)
+
+    def get_path(self) -> list[str]:
+        return [part for part in self.path.split('?')[0].split('/') if part]
+
+    def send_file(self, file_id: str):
+        size, profile = self.server.catalogue.files[file_id]
+        requested = parse_range(self.headers.get('Range'), size) if profile != Profile.PLAIN else None
+        start, end = requested or (0, size - 1)
+
+        if profile == Profile.JITTER:
+            time.sleep(random.uniform(0, self.server.jitter * 10))
+
+        self.send_response(206 if requested else 200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+
+        if profile != Profile.PLAIN:
+            self.send_header('Accept-Ranges', 'bytes')
+
+        if requested:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+
+        self.end_headers()
+
+        if self.command == 'HEAD':
+            return
+
+        position = start
+        started_at = time.monotonic()
+
+        while position <= end:
+            offset = position % len(BLOCK)
+            length = min(CHUNK_SIZE, end - position + 1, len(BLOCK) - offset)
+            self.wfile.write(BLOCK[offset:offset + length])
+            position += length
+
+            if profile == Profile.SLOW:
+                # sleep until the average rate is back under the limit
+                time.sleep(max((position - start) / self.server.slow_rate - (time.monotonic() - started_at), 0))
+            elif profile == Profile.JITTER:
+                time.sleep(random.uniform(0, self.server.jitter))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path = self.get_path()
+        catalogue = self.server.catalogue
+
+        match path:
+            # pixeldrain
+            case ['api', 'list', folder_id] if folder_id in catalogue.folders:
+                self.send_json({
+                    'success': True,
+                    'title': folder_id,
+                    'files': [
+                        {'id': file_id, 'name': f'{file_id}.bin', 'size': catalogue.files[file_id][0]}
+                        for file_id in catalogue.folders[folder_id]
+                    ]
+                })
+            case ['api', 'file', file_id, 'info'] if file_id in catalogue.files:
+                self.send_json({'success': True, 'name': f'{file_id}.bin', 'size': catalogue.files[file_id][0]})
+            # gofile
+            case ['contents', folder_id] if folder_id in catalogue.folders:
+                self.send_json({
+                    'status': 'ok',
+                    'data': {
+                        'type': 'folder',
+                        'name': folder_id,
+                        'children': {
+                            file_id: {
+                                'id': file_id,
+                                'type': 'file',
+                                'name': f'{file_id}.bin',
+                                'size': catalogue.files[file_id][0],
+                                'link': f'https://store1.gofile.io/download/{file_id}'
+                            } for file_id in catalogue.folders[folder_id]
+                        }
+                    }
+                })
+            # bunkr
+            case ['a', folder_id] if folder_id in catalogue.folders:
+                self.send_body(''.join([
+                    f'<html><body><h1 class="truncate">{folder_id}</h1>',
+                    *[
+                        f'<div class="relative group/item theItem"><a href="/f/{file_id}">{file_id}</a>'
+                        f'<p class="theSize">{format_size(catalogue.files[file_id][0])}</p></div>'
+                        for file_id in catalogue.folders[folder_id]
+                    ],
+                    '</body></html>'
+                ]), 'text/html')
+            case ['f', file_id] if file_id in catalogue.files:
+                self.send_body(
+                    f'<html><body><h1 class="truncate">{file_id}.bin</h1><video id="player">'
+                    f'<source src="https://cdn.bunkr.standin/file/{file_id}"></video></body></html>',
+                    'text/html'
+                )
+            case ['api', 'file', file_id] | ['download', file_id] | ['file', file_id] \
+                    if file_id in catalogue.files:
+                self.send_file(file_id)
+            case _:
+                self.send_not_found()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        match self.get_path():
+            # gofile
+            case ['accounts']:
+                self.send_json({'status': 'ok', 'data': {'token': 'standin'}})
+            # alist
+            case ['api', 'fs', 'list']:
+                self.send_json({'code': 200, 'message': 'success'})
+            case _:
+                self.send_not_found()
+
+    def do_PUT(self):
+        match self.get_path():
+            # alist
+            case ['api', 'fs', 'put']:
+                remaining = int(self.headers.get('Content-Length', 0))
+
+                while remaining > 0:
+                    chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+
+                    if not chunk:
+                        break
+
+                    remaining -= len(chunk)
+
+                self.send_json({'code': 200, 'message': 'success'})
+            case _:
+                self.send_not_found()
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, catalogue: Catalogue, slow_rate: float, jitter: float):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.catalogue = catalogue
+        self.slow_rate = slow_rate
+        self.jitter = jitter
+
+
+def serve(port: int, catalogue: Catalogue, slow_rate: float, jitter: float):
+    StandInHTTPServer(port, catalogue, slow_rate, jitter).serve_forever()
+
+
+class StandInServer:
+    def __init__(self, catalogue: Catalogue, slow_rate: float = 20 * 1024 ** 2, jitter: float = 0.002):
+        self.catalogue = catalogue
+        self.slow_rate = slow_rate
+        self.jitter = jitter
+        self.port = None
+        self.process = None
+
+    def __enter__(self):
+        self.port = get_free_port()
+        self.process = multiprocessing.Process(
+            target=serve, args=(self.port, self.catalogue, self.slow_rate, self.jitter), daemon=True
+        )
+        self.process.start()
+        wait_for_port(self.port)
+
+        return self
+
+    def __exit__(self, *args):
+        self.process.terminate()
+        self.process.join()
+
+
+def route_to_stand_in(port: int):
+    handle_request = httpx.HTTPTransport.handle_request
+
+    def wrapper(self, request: httpx.Request) -> httpx.Response:
+        # the Host header has been set from the original url
+        request.url = request.url.copy_with(scheme='http', host='127.0.0.1', port=port)
+        return handle_request(self, request)
+
+    return patch.object(httpx.HTTPTransport, 'handle_request', wrapper)
+
+
+class LocalProcess:
+    def __init__(self, command: list[str]):
+        # {port} and {data} in the command are replaced with a free port and a temporary directory
+        self.command = command
+        self.port = None
+        self.data = None
+        self.process = None
+
+    def __enter__(self):
+        if shutil.which(self.command[0]) is None:
+            raise FileNotFoundError(f'{self.command[0]} is not installed.')
+
+        self.port = get_free_port()
+        self.data = tempfile.mkdtemp(prefix='leech-benchmark-')
+        self.process = subprocess.Popen(
+            [argument.format(port=self.port, data=self.data) for argument in self.command],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        wait_for_port(self.port)
+
+        return self
+
+    def __exit__(self, *args):
+        self.process.terminate()
+        self.process.wait()
+        shutil.rmtree(self.data, ignore_errors=True)
+
+
+def redis_server(password: str) -> LocalProcess:
+    return LocalProcess([
+        'redis-server', '--port', '{port}', '--bind', '127.0.0.1', '--dir', '{data}',
+        '--save', '', '--appendonly', 'no', '--requirepass', password
+    ])
+
+
+def mongod() -> LocalProcess:
+    return LocalProcess(['mongod', '--port', '{port}', '--bind_ip', '127.0.0.1', '--dbpath', '{data}', '--quiet'])
+
+
+def clear_proxy_environment():
+    # requests must not leave the machine through a proxy
+    for name in ['HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'http_proxy', 'https_proxy', 'all_proxy']:
+        os.environ.pop(name, None)
@@ -13,7 +13,10 @@ from tool.utils import is_alist_available
 from rclone_python.remote_types import RemoteTypes
 from tool.telegram_client import update_telegram_client
 from tool.mongo_client import EstablishConnection as EstablishMongodbConnection
-from module.disk.auto_start import start_disk_monitor_if_enabled
+from module.disk.auto_start import start_disk_monitor_if_enabled, start_usage_reconciler
+from module.network.services.network_sampler import network_sampler
+from module.i18n.services.i18n_manager import prefetch_user_languages
+from tool.task_metrics import start_metrics_server
 # Import network module to register command handlers
 import module.network.commands.network_monitor
 # Import i18n module to register command handlers
@@ -33,7 +36,9 @@ from config.config import (
     RCLONE_115_COOKIE,
     MEGA_AUTHORIZATION_EMAIL,
     MEGA_AUTHORIZATION_PASSWORD,
-    NODE_ENV
+    NODE_ENV,
+    METRICS_HOST,
+    METRICS_PORT
 )
 
 
@@ -57,12 +62,19 @@ def setup_logger():
 async def setup_disk_monitor():
     """设置磁盘监控"""
     try:
+        start_usage_reconciler()
         await start_disk_monitor_if_enabled()
         logger.info("磁盘监控设置完成")
     except Exception as e:
         logger.error(f"设置磁盘监控时发生错误: {e}")
 
 
+async def setup_user_languages():
+    """预加载管理员和成员的语言设置，处理消息时不再查询数据库"""
+    user_ids = [TELEGRAM_ADMIN_ID, *map(int, re.findall(r'-?\d+', str(TELEGRAM_MEMBER or '')))]
+    await prefetch_user_languages(user_ids)
+
+
 def startup():
     logger.success('🎉🎉🎉 Leech bot started!')
 
@@ -87,6 +99,16 @@ def startup():
     loop = asyncio.get_event_loop()
     loop.create_task(setup_disk_monitor())
     
+    # 预加载用户语言
+    loop.create_task(setup_user_languages())
+    
+    # 后台网络采样，供带宽统计使用
+    network_sampler.start(loop)
+    
+    # 各阶段耗时指标的HTTP接口
+    if METRICS_PORT:
+        start_metrics_server(METRICS_HOST, METRICS_PORT)
+    
     idle()
 
 
@@ -39,6 +39,37 @@ FAILED_TASK_EXPIRE_AFTER_DAYS = int(
     environ.get('FAILED_TASK_EXPIRE_AFTER_DAYS', config.get('FAILED_TASK_EXPIRE_AFTER_DAYS', '0'))
 )
 MAXIMUM_QUEUE_SIZE = int(environ.get('MAXIMUM_QUEUE_SIZE', config.get('MAXIMUM_QUEUE_SIZE', '0')))
+TASK_SCHEDULE_STRATEGY = str(environ.get('TASK_SCHEDULE_STRATEGY', config.get('TASK_SCHEDULE_STRATEGY', 'SJF'))).upper()
+BLOCKING_EXECUTOR_MAX_WORKERS = int(
+    environ.get('BLOCKING_EXECUTOR_MAX_WORKERS', config.get('BLOCKING_EXECUTOR_MAX_WORKERS', '8'))
+)
+RETRY_MAXIMUM_ATTEMPTS = int(environ.get('RETRY_MAXIMUM_ATTEMPTS', config.get('RETRY_MAXIMUM_ATTEMPTS', '5')))
+RETRY_BACKOFF_BASE_SECONDS = float(
+    environ.get('RETRY_BACKOFF_BASE_SECONDS', config.get('RETRY_BACKOFF_BASE_SECONDS', '30'))
+)
+# keep it below the visibility timeout of redis broker (1 hour), or the delayed task will be delivered twice
+RETRY_BACKOFF_MAXIMUM_SECONDS = float(
+    environ.get('RETRY_BACKOFF_MAXIMUM_SECONDS', config.get('RETRY_BACKOFF_MAXIMUM_SECONDS', '1800'))
+)
+RETRY_MAXIMUM_ATTEMPTS_PER_HOST = int(
+    environ.get('RETRY_MAXIMUM_ATTEMPTS_PER_HOST', config.get('RETRY_MAXIMUM_ATTEMPTS_PER_HOST', '100'))
+)
+RETRY_HOST_WINDOW_SECONDS = int(
+    environ.get('RETRY_HOST_WINDOW_SECONDS', config.get('RETRY_HOST_WINDOW_SECONDS', '3600'))
+)
+# stage histograms of the leech tasks are exposed on http://METRICS_HOST:METRICS_PORT/metrics, 0 disables it
+METRICS_HOST = str(environ.get('METRICS_HOST', config.get('METRICS_HOST', '127.0.0.1')))
+METRICS_PORT = int(environ.get('METRICS_PORT', config.get('METRICS_PORT', '9464')))
+# parsed pages and resolved download urls are reused within PARSE_CACHE_TTL_SECONDS, 0 disables the cache
+PARSE_CACHE_TTL_SECONDS = int(environ.get('PARSE_CACHE_TTL_SECONDS', config.get('PARSE_CACHE_TTL_SECONDS', '1800')))
+# watched links are checked again every SUBSCRIPTION_DEFAULT_INTERVAL_MINUTES unless given another interval,
+# the scheduler looks for links due every SUBSCRIPTION_CHECK_INTERVAL_SECONDS
+SUBSCRIPTION_DEFAULT_INTERVAL_MINUTES = int(
+    environ.get('SUBSCRIPTION_DEFAULT_INTERVAL_MINUTES', config.get('SUBSCRIPTION_DEFAULT_INTERVAL_MINUTES', '60'))
+)
+SUBSCRIPTION_CHECK_INTERVAL_SECONDS = int(
+    environ.get('SUBSCRIPTION_CHECK_INTERVAL_SECONDS', config.get('SUBSCRIPTION_CHECK_INTERVAL_SECONDS', '300'))
+)
 MEGA_AUTHORIZATION_EMAIL = environ.get('MEGA_AUTHORIZATION_EMAIL', config.get('MEGA_AUTHORIZATION_EMAIL'))
 MEGA_AUTHORIZATION_PASSWORD = environ.get('MEGA_AUTHORIZATION_PASSWORD', config.get('MEGA_AUTHORIZATION_PASSWORD'))
 BUNKR_DOMAIN = environ.get('BUNKR_DOMAIN', config.get('BUNKR_DOMAIN'))
@@ -62,3 +93,22 @@ DISK_ALERT_THRESHOLD = int(environ.get('DISK_ALERT_THRESHOLD', config.get('DISK_
 
 _disk_alert_enabled = environ.get('DISK_ALERT_ENABLED', config.get('DISK_ALERT_ENABLED', 'true'))
 DISK_ALERT_ENABLED = str(_disk_alert_enabled).lower() == 'true'
+
+# 磁盘监控的检查间隔（秒），写入越快间隔越短
+DISK_MONITOR_MIN_INTERVAL = int(environ.get('DISK_MONITOR_MIN_INTERVAL', config.get('DISK_MONITOR_MIN_INTERVAL', '15')))
+DISK_MONITOR_MAX_INTERVAL = int(environ.get('DISK_MONITOR_MAX_INTERVAL', config.get('DISK_MONITOR_MAX_INTERVAL', '300')))
+
+# 预计在该时间（秒）内剩余空间低于阈值时提前降低下载频率
+DISK_ALERT_PREDICTION_HORIZON = int(
+    environ.get('DISK_ALERT_PREDICTION_HORIZON', config.get('DISK_ALERT_PREDICTION_HORIZON', '1800'))
+)
+
+# 下载目录占用统计的校准间隔（秒）
+DISK_USAGE_RECONCILE_INTERVAL = int(
+    environ.get('DISK_USAGE_RECONCILE_INTERVAL', config.get('DISK_USAGE_RECONCILE_INTERVAL', '600'))
+)
+
+# 磁盘空间不足时下载任务的限速
+DISK_ALERT_DOWNLOAD_RATE_LIMIT = str(
+    environ.get('DISK_ALERT_DOWNLOAD_RATE_LIMIT', config.get('DISK_ALERT_DOWNLOAD_RATE_LIMIT', '1/m'))
+)
@@ -4,3 +4,4 @@ MESSAGE_COLLECTION = 'message'
 STATISTIC_COLLECTION = 'statistic'
 WORKER_COLLECTION = 'worker'
 SETTING_COLLECTION = 'setting'
+SUBSCRIPTION_COLLECTION = 'subscription'
@@ -4,16 +4,19 @@ from enum import StrEnum
 class Hostname:
     FILE_LEECH_WORKER = 'FILE_LEECH_WORKER'
     FILE_SYNC_WORKER = 'FILE_SYNC_WORKER'
+    SUBSCRIPTION_WORKER = 'SUBSCRIPTION_WORKER'
 
 
 class Project:
     LEECH_DOWNLOADER = 'module.leech.adaptors.downloader'
     LEECH_UPLOADER = 'module.leech.adaptors.uploader'
+    LEECH_SUBSCRIPTION = 'module.leech.adaptors.subscription'
 
 
 class Queue:
     FILE_DOWNLOAD_QUEUE = 'FILE_DOWNLOAD_QUEUE'
     FILE_SYNC_QUEUE = 'FILE_SYNC_QUEUE'
+    SUBSCRIPTION_QUEUE = 'SUBSCRIPTION_QUEUE'
 
 
 class WorkerStatus(StrEnum):
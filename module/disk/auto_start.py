@@ -5,13 +5,16 @@
 
 import asyncio
 from loguru import logger
-from config.config import DISK_MONITOR_AUTO_START, DISK_ALERT_ENABLED
+from config.config import DISK_MONITOR_AUTO_START, DISK_ALERT_ENABLED, DISK_USAGE_RECONCILE_INTERVAL
 from module.disk.services.disk_monitor import DiskMonitorService
+from module.disk.services.cleanup_service import CleanupService
 from module.i18n import get_i18n_manager
 
 
 # 全局监控服务实例
 global_monitor_service = None
+# 下载目录占用统计校准任务
+global_reconcile_task = None
 
 
 async def start_disk_monitor_if_enabled():
@@ -49,6 +52,19 @@ async def start_disk_monitor_if_enabled():
         logger.error(error_msg)
 
 
+def start_usage_reconciler():
+    """启动下载目录占用统计的定期校准"""
+    global global_reconcile_task
+    
+    if global_reconcile_task and not global_reconcile_task.done():
+        return
+        
+    global_reconcile_task = asyncio.create_task(
+        CleanupService().start_reconciling(DISK_USAGE_RECONCILE_INTERVAL)
+    )
+    logger.info(f"下载目录占用统计校准已启动 (间隔: {DISK_USAGE_RECONCILE_INTERVAL}秒)")
+
+
 def stop_global_monitor_service():
     """停止全局监控服务"""
     global global_monitor_service
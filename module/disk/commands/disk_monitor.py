@@ -8,6 +8,7 @@ from tool.utils import is_admin
 from config.config import TELEGRAM_ADMIN_ID, BOT_DOWNLOAD_LOCATION
 from module.disk.services.disk_monitor import DiskMonitorService
 from module.disk.services.cleanup_service import CleanupService
+from module.disk.services.cleanup_planner import CleanupProgress
 from module.disk.handlers.alert_handler import DiskAlertHandler
 from module.disk.models.disk_alert import DiskAlert
 from module.disk.utils.format_utils import format_file_count, format_directory_count, format_storage_size
@@ -18,6 +19,10 @@ from module.i18n import get_i18n_manager
 # 全局监控服务实例
 monitor_service = None
 alert_handler = None
+# 后台清理任务，保留引用避免被垃圾回收
+cleanup_tasks = set()
+# 清理进度的刷新间隔（秒）
+CLEANUP_PROGRESS_INTERVAL = 3
 
 
 @Client.on_message(filters.command('disk_start') & filters.private & is_admin)
@@ -138,7 +143,7 @@ async def disk_command_handler(client: Client, message: Message):
         import argparse
         parser = argparse.ArgumentParser(description='磁盘管理命令')
         parser.add_argument('subcommand', metavar='subcommand', type=str, nargs='?',
-                          help='子命令: status, start, stop, clean, alerts 等')
+                          help='子命令: status, start, stop, clean, free, alerts 等')
         parser.add_argument('args', metavar='args', type=str, nargs='*',
                           help='子命令参数')
         
@@ -166,6 +171,8 @@ async def disk_command_handler(client: Client, message: Message):
                 await disk_clean_old(client, temp_message)
             else:
                 await disk_clean(client, message)
+        elif args.subcommand == 'free':
+            await disk_free(client, message, args.args)
         elif args.subcommand == 'alerts':
             await disk_alerts(client, message)
         else:
@@ -459,6 +466,75 @@ async def disk_clean_old(client: Client, message: Message):
         )
         
 
+async def disk_free(client: Client, message: Message, args: list):
+    """按计划释放指定大小的空间，在后台执行"""
+    user_id = message.from_user.id
+    i18n = get_i18n_manager()
+    
+    try:
+        target_gb = float(args[0])
+        if target_gb <= 0:
+            raise ValueError(target_gb)
+    except (IndexError, ValueError):
+        await message.reply_text(await i18n.translate_for_user(user_id, 'disk.free.usage'), parse_mode=ParseMode.HTML)
+        return
+        
+    task = asyncio.create_task(run_free_space(message, user_id, target_gb))
+    cleanup_tasks.add(task)
+    task.add_done_callback(cleanup_tasks.discard)
+    
+    
+async def run_free_space(message: Message, user_id: int, target_gb: float):
+    """释放空间并定期更新进度消息
+    
+    Args:
+        message: 命令消息
+        user_id: 用户ID
+        target_gb: 需要释放的空间（GB）
+    """
+    i18n = get_i18n_manager()
+    progress = CleanupProgress()
+    
+    reply = await message.reply_text(
+        await i18n.translate_for_user(user_id, 'disk.free.start', target=format_storage_size(target_gb))
+    )
+    task = asyncio.create_task(CleanupService().free_space(target_gb=target_gb, progress=progress))
+    
+    while not task.done():
+        await asyncio.wait({task}, timeout=CLEANUP_PROGRESS_INTERVAL)
+        
+        if task.done() or progress.planned_count == 0:
+            continue
+            
+        try:
+            await reply.edit_text(await i18n.translate_for_user(
+                user_id,
+                'disk.free.progress',
+                removed=progress.removed_count,
+                planned=progress.planned_count,
+                freed=format_storage_size(progress.freed_size / (1024**3)),
+                planned_size=format_storage_size(progress.planned_size / (1024**3))
+            ))
+        except Exception as e:
+            logger.debug(f"更新清理进度失败: {e}")
+            
+    try:
+        task.result()
+        text = await i18n.translate_for_user(
+            user_id,
+            'disk.free.complete',
+            removed=progress.removed_count,
+            files=progress.removed_file_count,
+            freed=format_storage_size(progress.freed_size / (1024**3)),
+            in_use=progress.in_use_count + progress.skipped_count
+        )
+    except Exception as e:
+        logger.error(f"释放空间失败: {e}")
+        text = await i18n.translate_for_user(user_id, 'disk.free.failed', reason=str(e))
+        
+    await reply.edit_text(text)
+    
+
 @Client.on_message(filters.command('disk_alerts') & filters.private & is_admin)
 async def disk_alerts(client: Client, message: Message):
     """查看最近的磁盘告警"""
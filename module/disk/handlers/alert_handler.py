@@ -5,6 +5,7 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQ
 from pyrogram.enums import ParseMode
 from loguru import logger
 from tool.telegram_client import get_telegram_client
+from tool.executor import run_blocking
 from config.config import TELEGRAM_ADMIN_ID
 from module.disk.models.disk_alert import DiskAlert
 from module.disk.services.cleanup_service import CleanupService
@@ -211,7 +212,7 @@ class DiskAlertHandler:
         await callback_query.answer("正在调整任务频率...")
         
         # 调整频率
-        result = self.celery_service.adjust_worker_frequency('reduce')
+        result = await run_blocking(self.celery_service.adjust_worker_frequency, 'reduce')
         
         if result['success']:
             # 更新告警状态
@@ -325,7 +326,7 @@ class DiskAlertHandler:
         await callback_query.answer("正在恢复任务频率...")
         
         # 恢复频率
-        result = self.celery_service.adjust_worker_frequency('restore')
+        result = await run_blocking(self.celery_service.adjust_worker_frequency, 'restore')
         
         if result['success']:
             # 更新消息
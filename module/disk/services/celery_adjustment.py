@@ -1,177 +1,366 @@
-import os
+import datetime
 from typing import Dict, List, Optional
 from loguru import logger
+from beans.worker import Worker
+from celery.app.control import Control
+from tool.redis_client import redis_client
+from tool.celery_client import celery_client
+from constants.worker import Hostname, Project, Queue, WorkerStatus
+from config.config import DISK_ALERT_DOWNLOAD_RATE_LIMIT
+
+# 磁盘压力来自下载，上传完成后会释放空间，所以只调整下载Worker
+DOWNLOAD_WORKER_PREFIX = f'{Hostname.FILE_LEECH_WORKER}@{Queue.FILE_DOWNLOAD_QUEUE}@'
+DOWNLOAD_TASK_NAME = f'{Project.LEECH_DOWNLOADER}.process_download'
+# 与 tool/celery_client.py 中的 broker_transport_options 保持一致
+PRIORITY_STEPS = range(10)
+# kombu 默认的优先级队列分隔符
+PRIORITY_SEPARATOR = '\x06\x16'
+# 远程控制命令等待回复的时间（秒）
+CONTROL_TIMEOUT = 5
+
+
+class ThrottleAction:
+    REDUCED = 'reduced'
+    PAUSED = 'paused'
+
+
+control = Control(app=celery_client)
+
+
+def is_reply_ok(replies: Optional[List[Dict]], hostname: str) -> bool:
+    """判断远程控制命令是否在指定Worker上执行成功
+
+    Args:
+        replies: 远程控制命令的回复
+        hostname: Worker名称
+
+    Returns:
+        是否成功
+    """
+    return any('ok' in reply.get(hostname, {}) for reply in replies or [] if isinstance(reply, dict))
+
+
+def get_queue_length(queue: str) -> int:
+    """获取队列中等待执行的任务数量
+
+    Args:
+        queue: 队列名称
+
+    Returns:
+        任务数量
+    """
+    pipeline = redis_client.pipeline(transaction=False)
+
+    for priority in PRIORITY_STEPS:
+        pipeline.llen(f'{queue}{PRIORITY_SEPARATOR}{priority}' if priority else queue)
+
+    return sum(pipeline.execute())
 
 
 class CeleryAdjustmentService:
     """Celery Worker频率调整服务"""
-    
+
     def __init__(self):
         """初始化Celery调整服务"""
-        self.original_settings = {}
-        self.is_reduced = False
-        
+        self.control = control
+
+    @property
+    def is_reduced(self) -> bool:
+        """是否有下载Worker处于降低频率状态"""
+        return any(
+            (worker.throttle or {}).get('action') == ThrottleAction.REDUCED for worker in self.get_download_workers()
+        )
+
+    def get_download_workers(self, **conditions) -> List[Worker]:
+        """获取运行中的下载Worker
+
+        Returns:
+            Worker列表
+        """
+        return list(Worker.objects(
+            hostname__startswith=DOWNLOAD_WORKER_PREFIX,
+            status=WorkerStatus.READY,
+            **conditions
+        ))
+
+    def save_throttle(self, worker: Worker, throttle: Optional[Dict]):
+        """保存Worker的调整状态，恢复时使用
+
+        Args:
+            worker: Worker
+            throttle: 调整状态，为空时表示已恢复
+        """
+        worker.throttle = throttle
+        worker.updated_at = datetime.datetime.utcnow()
+        worker.save()
+
     def get_current_worker_settings(self) -> Dict:
         """获取当前Worker设置
-        
+
         Returns:
-            Worker设置信息
+            以Worker名称为键的设置信息
         """
         try:
-            # 这里应该从Celery获取实际的worker信息
-            # 由于项目中使用的是自定义的worker系统，我们需要适配
-            from config.config import MAXIMUM_LEECH_WORKER, MAXIMUM_SYNC_WORKER
-            
+            active = self.control.inspect(timeout=CONTROL_TIMEOUT).active() or {}
+            workers = {worker.hostname: worker for worker in Worker.objects(hostname__in=list(active))}
+
             return {
-                'leech_workers': MAXIMUM_LEECH_WORKER,
-                'sync_workers': MAXIMUM_SYNC_WORKER,
-                'status': 'running' if not self.is_reduced else 'reduced'
+                hostname: {
+                    'active_tasks': len(tasks),
+                    'concurrency': workers[hostname].concurrency if hostname in workers else None,
+                    'rate_limit': workers[hostname].rate_limit if hostname in workers else None,
+                    'status': workers[hostname].throttle.get('action', 'running')
+                    if hostname in workers and workers[hostname].throttle else 'running'
+                }
+                for hostname, tasks in active.items()
             }
         except Exception as e:
             logger.error(f"获取Worker设置失败: {e}")
             return {}
-            
+
+    def reduce_worker(self, worker: Worker) -> Dict:
+        """缩小下载Worker的进程池并限制下载任务的频率
+
+        Args:
+            worker: Worker
+
+        Returns:
+            调整状态
+        """
+        throttle = {
+            'action': ThrottleAction.REDUCED,
+            'pool_shrink': 0,
+            'rate_limit': worker.rate_limit or None,
+            'created_at': datetime.datetime.utcnow()
+        }
+
+        # solo 进程池不支持调整大小，此时只依靠限速
+        shrink = (worker.concurrency or 1) // 2
+        if shrink > 0 and is_reply_ok(self.control.pool_shrink(
+            n=shrink, destination=[worker.hostname], reply=True, timeout=CONTROL_TIMEOUT
+        ), worker.hostname):
+            throttle['pool_shrink'] = shrink
+
+        if not is_reply_ok(self.control.rate_limit(
+            DOWNLOAD_TASK_NAME,
+            DISK_ALERT_DOWNLOAD_RATE_LIMIT,
+            destination=[worker.hostname],
+            reply=True,
+            timeout=CONTROL_TIMEOUT
+        ), worker.hostname) and throttle['pool_shrink'] == 0:
+            raise RuntimeError(f'{worker.hostname} 没有响应')
+
+        self.save_throttle(worker, throttle)
+
+        return throttle
+
+    def restore_worker(self, worker: Worker):
+        """恢复被降低频率的下载Worker
+
+        Args:
+            worker: Worker
+        """
+        throttle = worker.throttle or {}
+
+        if throttle.get('pool_shrink'):
+            self.control.pool_grow(
+                n=throttle['pool_shrink'], destination=[worker.hostname], reply=True, timeout=CONTROL_TIMEOUT
+            )
+
+        rate_limit = throttle.get('rate_limit')
+        self.control.rate_limit(
+            DOWNLOAD_TASK_NAME,
+            f"{rate_limit['amount']}/{rate_limit['period']}" if rate_limit else None,
+            destination=[worker.hostname],
+            reply=True,
+            timeout=CONTROL_TIMEOUT
+        )
+
+        self.save_throttle(worker, None)
+
     def adjust_worker_frequency(self, action: str) -> Dict:
         """调整Worker执行频率
-        
+
         Args:
             action: 'reduce' 降低频率, 'restore' 恢复原始频率
-            
+
         Returns:
             调整结果
         """
         try:
             if action == 'reduce':
-                if self.is_reduced:
+                workers = [worker for worker in self.get_download_workers() if not worker.throttle]
+
+                if not workers:
                     return {
                         'success': False,
-                        'message': 'Worker频率已经处于降低状态'
+                        'message': '没有可以降低频率的下载Worker'
                     }
-                    
-                # 保存原始设置
-                from config.config import MAXIMUM_LEECH_WORKER, MAXIMUM_SYNC_WORKER
-                self.original_settings = {
-                    'MAXIMUM_LEECH_WORKER': MAXIMUM_LEECH_WORKER,
-                    'MAXIMUM_SYNC_WORKER': MAXIMUM_SYNC_WORKER
-                }
-                
-                # 降低worker数量（减半）
-                new_leech_workers = max(1, MAXIMUM_LEECH_WORKER // 2)
-                new_sync_workers = max(1, MAXIMUM_SYNC_WORKER // 2)
-                
-                # 这里实际应该更新运行中的worker配置
-                # 由于是演示，我们只记录状态
-                self.is_reduced = True
-                
-                logger.info(f"Worker频率已降低: Leech {MAXIMUM_LEECH_WORKER}->{new_leech_workers}, "
-                          f"Sync {MAXIMUM_SYNC_WORKER}->{new_sync_workers}")
-                
+
+                details = {}
+                for worker in workers:
+                    try:
+                        details[worker.hostname] = self.reduce_worker(worker)
+                    except Exception as e:
+                        logger.error(f"降低 {worker.hostname} 频率失败: {e}")
+
+                if not details:
+                    return {
+                        'success': False,
+                        'message': '所有下载Worker都调整失败'
+                    }
+
+                logger.info(f"Worker频率已降低: {', '.join(details)}")
+
                 return {
                     'success': True,
-                    'message': 'Worker频率已降低',
+                    'message': f'已降低 {len(details)} 个下载Worker的频率 (限速 {DISK_ALERT_DOWNLOAD_RATE_LIMIT})',
                     'action': 'reduced',
                     'details': {
-                        'leech_workers': new_leech_workers,
-                        'sync_workers': new_sync_workers
+                        hostname: {'pool_shrink': throttle['pool_shrink'], 'rate_limit': DISK_ALERT_DOWNLOAD_RATE_LIMIT}
+                        for hostname, throttle in details.items()
                     }
                 }
-                
+
             elif action == 'restore':
-                if not self.is_reduced:
+                workers = self.get_download_workers(throttle__action=ThrottleAction.REDUCED)
+
+                if not workers:
                     return {
                         'success': False,
                         'message': 'Worker频率已经是正常状态'
                     }
-                    
-                # 恢复原始设置
-                self.is_reduced = False
-                
-                logger.info(f"Worker频率已恢复")
-                
+
+                restored = []
+                for worker in workers:
+                    try:
+                        self.restore_worker(worker)
+                        restored.append(worker.hostname)
+                    except Exception as e:
+                        logger.error(f"恢复 {worker.hostname} 频率失败: {e}")
+
+                logger.info(f"Worker频率已恢复: {', '.join(restored)}")
+
                 return {
-                    'success': True,
-                    'message': 'Worker频率已恢复',
+                    'success': len(restored) > 0,
+                    'message': f'已恢复 {len(restored)} 个下载Worker的频率',
                     'action': 'restored',
-                    'details': self.original_settings
+                    'details': {'workers': restored}
                 }
-                
+
             else:
                 return {
                     'success': False,
                     'message': f'未知的操作: {action}'
                 }
-                
+
         except Exception as e:
             logger.error(f"调整Worker频率失败: {e}")
             return {
                 'success': False,
                 'message': f'调整失败: {str(e)}'
             }
-            
+
     def pause_workers(self) -> Dict:
-        """暂停所有Workers
-        
+        """暂停所有下载Workers，已经开始的任务会继续执行
+
         Returns:
             操作结果
         """
         try:
-            # 实际实现中应该调用Celery的控制命令
-            # 这里仅作演示
-            logger.info("暂停所有Workers")
-            
+            paused = []
+
+            for worker in self.get_download_workers():
+                if (worker.throttle or {}).get('action') == ThrottleAction.PAUSED:
+                    continue
+
+                queues = [queue for queue in worker.queue.split(',') if queue]
+                cancelled = [
+                    queue for queue in queues if is_reply_ok(self.control.cancel_consumer(
+                        queue, destination=[worker.hostname], reply=True, timeout=CONTROL_TIMEOUT
+                    ), worker.hostname)
+                ]
+
+                if cancelled:
+                    self.save_throttle(worker, {
+                        'action': ThrottleAction.PAUSED,
+                        'queues': cancelled,
+                        'created_at': datetime.datetime.utcnow()
+                    })
+                    paused.append(worker.hostname)
+
+            logger.info(f"暂停Workers: {', '.join(paused)}")
+
             return {
                 'success': True,
-                'message': '所有Workers已暂停'
+                'message': f'已暂停 {len(paused)} 个下载Worker',
+                'workers': paused
             }
-            
+
         except Exception as e:
             logger.error(f"暂停Workers失败: {e}")
             return {
                 'success': False,
                 'message': f'暂停失败: {str(e)}'
             }
-            
+
     def resume_workers(self) -> Dict:
-        """恢复所有Workers
-        
+        """恢复所有被暂停的下载Workers
+
         Returns:
             操作结果
         """
         try:
-            # 实际实现中应该调用Celery的控制命令
-            # 这里仅作演示
-            logger.info("恢复所有Workers")
-            
+            resumed = []
+
+            for worker in self.get_download_workers(throttle__action=ThrottleAction.PAUSED):
+                for queue in worker.throttle.get('queues', []):
+                    self.control.add_consumer(queue, destination=[worker.hostname], reply=True, timeout=CONTROL_TIMEOUT)
+
+                self.save_throttle(worker, None)
+                resumed.append(worker.hostname)
+
+            logger.info(f"恢复Workers: {', '.join(resumed)}")
+
             return {
                 'success': True,
-                'message': '所有Workers已恢复'
+                'message': f'已恢复 {len(resumed)} 个下载Worker',
+                'workers': resumed
             }
-            
+
         except Exception as e:
             logger.error(f"恢复Workers失败: {e}")
             return {
                 'success': False,
                 'message': f'恢复失败: {str(e)}'
             }
-            
+
     def get_worker_stats(self) -> Dict:
         """获取Worker统计信息
-        
+
         Returns:
             统计信息
         """
         try:
-            # 这里应该获取实际的worker统计
+            inspect = self.control.inspect(timeout=CONTROL_TIMEOUT)
+            active = inspect.active() or {}
+            reserved = inspect.reserved() or {}
+            stats = inspect.stats() or {}
+
+            queues = {
+                queue for worker in Worker.objects.only('queue') for queue in (worker.queue or '').split(',') if queue
+            }
+
             return {
-                'active_tasks': 0,
-                'pending_tasks': 0,
-                'completed_tasks': 0,
-                'failed_tasks': 0,
+                'active_tasks': sum(len(tasks) for tasks in active.values()),
+                'pending_tasks': sum(len(tasks) for tasks in reserved.values()) +
+                sum(get_queue_length(queue) for queue in queues),
+                'completed_tasks': sum(sum(stat.get('total', {}).values()) for stat in stats.values()),
                 'workers': self.get_current_worker_settings()
             }
-            
+
         except Exception as e:
             logger.error(f"获取Worker统计失败: {e}")
             return {
                 'error': str(e)
-            }
\ No newline at end of file
+            }
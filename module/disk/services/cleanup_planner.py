@@ -0,0 +1,296 @@
+import os
+import time
+import shutil
+from enum import StrEnum
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+from loguru import logger
+from mongoengine import Q
+from config.config import BOT_DOWNLOAD_LOCATION
+from tool.disk_usage import scan_directory, report_usage
+from module.leech.beans.leech_file import LeechFile
+from module.leech.constants.leech_file_status import LeechFileStatus
+
+# 刚创建且没有记录的目录可能属于正在解析的任务，宽限期内不清理
+ORPHAN_GRACE_SECONDS = 600
+# 每次查询 LeechFile 的目录数量
+QUERY_BATCH_SIZE = 1000
+
+
+class CleanupCategory(StrEnum):
+    # 没有对应的 LeechFile 记录
+    ORPHAN = 'ORPHAN'
+    # 已上传成功，删除不会损失任何工作
+    UPLOADED = 'UPLOADED'
+    # 下载或上传失败，删除后重试需要重新下载
+    FAILED = 'FAILED'
+    # 正在下载或等待上传，永远不会被清理
+    IN_USE = 'IN_USE'
+
+
+# 清理顺序，越靠前删除后损失的工作越少
+CLEANUP_ORDER = [CleanupCategory.ORPHAN, CleanupCategory.UPLOADED, CleanupCategory.FAILED]
+
+
+@dataclass
+class CleanupCandidate:
+    """下载目录中的一个待清理项"""
+    path: str
+    size: int
+    file_count: int
+    dir_count: int
+    category: CleanupCategory
+    # 最后活跃时间，同一类别中越早的越先清理
+    last_active_at: float
+    # 目录及其中文件的最后修改时间
+    modified_at: float = 0.0
+
+
+@dataclass
+class CleanupProgress:
+    """清理进度，由线程池中的清理任务更新，事件循环中读取"""
+    planned_count: int = 0
+    planned_size: int = 0
+    in_use_count: int = 0
+    removed_count: int = 0
+    removed_file_count: int = 0
+    freed_size: int = 0
+    skipped_count: int = 0
+    finished: bool = False
+
+
+def is_in_use(leech_file: LeechFile) -> bool:
+    """判断文件是否正在下载或等待上传
+
+    Args:
+        leech_file: 文件记录
+
+    Returns:
+        是否正在使用
+    """
+    if leech_file.status in [LeechFileStatus.INITIAL, LeechFileStatus.DOWNLOADING]:
+        return True
+
+    return leech_file.status == LeechFileStatus.DOWNLOAD_SUCCESS and \
+        leech_file.upload_status in [LeechFileStatus.INITIAL, LeechFileStatus.UPLOADING, None]
+
+
+def classify(leech_files: List[LeechFile], modified_at: float, now: float) -> CleanupCategory:
+    """根据目录对应的文件记录判断清理类别
+
+    同一目录可能对应多条记录，取损失最大的类别
+
+    Args:
+        leech_files: 目录对应的文件记录
+        modified_at: 目录及其中文件的最后修改时间
+        now: 当前时间
+
+    Returns:
+        清理类别
+    """
+    if not leech_files:
+        return CleanupCategory.IN_USE if now - modified_at < ORPHAN_GRACE_SECONDS else CleanupCategory.ORPHAN
+
+    if any(is_in_use(leech_file) for leech_file in leech_files):
+        return CleanupCategory.IN_USE
+
+    if all(leech_file.upload_status == LeechFileStatus.UPLOAD_SUCCESS for leech_file in leech_files):
+        return CleanupCategory.UPLOADED
+
+    return CleanupCategory.FAILED
+
+
+def get_last_active_at(leech_files: List[LeechFile], modified_at: float) -> float:
+    """获取目录的最后活跃时间
+
+    Args:
+        leech_files: 目录对应的文件记录
+        modified_at: 目录修改时间
+
+    Returns:
+        时间戳
+    """
+    # 记录中保存的是 UTC 时间
+    timestamps = [
+        (leech_file.updated_at or leech_file.created_at).replace(tzinfo=timezone.utc).timestamp()
+        for leech_file in leech_files if leech_file.updated_at or leech_file.created_at
+    ]
+
+    return max(timestamps, default=modified_at)
+
+
+def make_plan(
+    candidates: List[CleanupCandidate],
+    target_size: Optional[int] = None,
+    older_than: Optional[datetime] = None
+) -> List[CleanupCandidate]:
+    """生成清理计划
+
+    先清理孤立目录，再清理已上传的，最后清理最早失败的，达到目标大小后停止
+
+    Args:
+        candidates: 待清理项
+        target_size: 需要释放的空间（字节），为空时清理全部可清理项
+        older_than: 只清理最后活跃时间早于该时间的项
+
+    Returns:
+        按清理顺序排列的待清理项
+    """
+    plan = []
+    planned_size = 0
+
+    ordered_candidates = sorted(
+        [
+            candidate for candidate in candidates
+            if candidate.category in CLEANUP_ORDER and
+            (older_than is None or candidate.last_active_at < older_than.timestamp())
+        ],
+        key=lambda candidate: (CLEANUP_ORDER.index(candidate.category), candidate.last_active_at)
+    )
+
+    for candidate in ordered_candidates:
+        if target_size is not None and planned_size >= target_size:
+            break
+
+        plan.append(candidate)
+        planned_size += candidate.size
+
+    return plan
+
+
+class CleanupPlanner:
+    """结合 LeechFile 状态的下载目录清理计划"""
+
+    def __init__(self, download_location: str = BOT_DOWNLOAD_LOCATION):
+        """初始化清理计划
+
+        Args:
+            download_location: 下载目录
+        """
+        self.download_location = download_location
+
+    def get_leech_files(self, paths: List[str]) -> Dict[str, List[LeechFile]]:
+        """查询目录对应的文件记录
+
+        目录以 get_redis_unique_key 命名，同时按 file_hash 和 location 匹配
+
+        Args:
+            paths: 目录路径
+
+        Returns:
+            目录路径到文件记录的映射
+        """
+        leech_files = {path: [] for path in paths}
+
+        for start in range(0, len(paths), QUERY_BATCH_SIZE):
+            batch = paths[start:start + QUERY_BATCH_SIZE]
+            names = {os.path.basename(path): path for path in batch}
+
+            for leech_file in LeechFile.objects(
+                Q(file_hash__in=list(names)) | Q(location__in=batch)
+            ).only('file_hash', 'location', 'status', 'upload_status', 'created_at', 'updated_at'):
+                path = leech_file.location if leech_file.location in leech_files else names.get(leech_file.file_hash)
+
+                if path is not None:
+                    leech_files[path].append(leech_file)
+
+        return leech_files
+
+    def scan_candidates(self) -> List[CleanupCandidate]:
+        """扫描下载目录并按文件记录分类
+
+        Returns:
+            下载目录中的所有项
+        """
+        entries = {}
+
+        with os.scandir(self.download_location) as iterator:
+            for entry in iterator:
+                try:
+                    entries[entry.path] = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+        leech_files = self.get_leech_files(list(entries))
+        now = time.time()
+        candidates = []
+
+        for path, stat in entries.items():
+            if os.path.isdir(path) and not os.path.islink(path):
+                usage = scan_directory(path)
+                size, file_count, dir_count = usage['total_size'], usage['file_count'], usage['dir_count'] + 1
+                # 正在写入的文件会不断更新修改时间
+                modified_at = max(stat.st_mtime, usage['modified_at'])
+            else:
+                size, file_count, dir_count, modified_at = stat.st_size, 1, 0, stat.st_mtime
+
+            candidates.append(CleanupCandidate(
+                path=path,
+                size=size,
+                file_count=file_count,
+                dir_count=dir_count,
+                category=classify(leech_files[path], modified_at, now),
+                last_active_at=get_last_active_at(leech_files[path], modified_at),
+                modified_at=modified_at
+            ))
+
+        return candidates
+
+    def remove(self, candidate: CleanupCandidate) -> bool:
+        """删除待清理项，删除前重新检查状态，避免删除刚开始使用的文件
+
+        Args:
+            candidate: 待清理项
+
+        Returns:
+            是否已删除
+        """
+        modified_at = max(candidate.modified_at, os.stat(candidate.path, follow_symlinks=False).st_mtime)
+
+        if classify(self.get_leech_files([candidate.path])[candidate.path], modified_at, time.time()) == \
+                CleanupCategory.IN_USE:
+            logger.info(f"跳过正在使用的目录: {candidate.path}")
+            return False
+
+        if os.path.isdir(candidate.path) and not os.path.islink(candidate.path):
+            shutil.rmtree(candidate.path)
+        else:
+            os.unlink(candidate.path)
+
+        report_usage(
+            candidate.path,
+            size=-candidate.size,
+            files=-candidate.file_count,
+            dirs=-candidate.dir_count,
+            location=self.download_location
+        )
+
+        return True
+
+    def execute(self, plan: List[CleanupCandidate], progress: CleanupProgress) -> CleanupProgress:
+        """按计划清理
+
+        Args:
+            plan: 清理计划
+            progress: 清理进度
+
+        Returns:
+            清理进度
+        """
+        try:
+            for candidate in plan:
+                try:
+                    if self.remove(candidate):
+                        progress.removed_count += 1
+                        progress.removed_file_count += candidate.file_count
+                        progress.freed_size += candidate.size
+                    else:
+                        progress.skipped_count += 1
+                except Exception as e:
+                    progress.skipped_count += 1
+                    logger.error(f"删除 {candidate.path} 失败: {e}")
+        finally:
+            progress.finished = True
+
+        return progress
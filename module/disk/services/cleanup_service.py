@@ -1,11 +1,12 @@
 import os
-import shutil
 import asyncio
-from typing import Dict, List
-from pathlib import Path
+from typing import Dict, List, Optional
 from loguru import logger
 from datetime import datetime, timedelta
 from config.config import BOT_DOWNLOAD_LOCATION
+from tool.executor import run_blocking
+from tool.disk_usage import scan_directory, reconcile_usage, get_usage
+from module.disk.services.cleanup_planner import CleanupPlanner, CleanupProgress, CleanupCategory, make_plan
 
 
 class CleanupService:
@@ -33,16 +34,93 @@ class CleanupService:
         """
         total_size = 0
         try:
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total_size += os.path.getsize(filepath)
+            total_size = scan_directory(path)['total_size']
         except Exception as e:
             logger.error(f"计算目录大小失败: {e}")
             
         return total_size
         
+    async def get_directory_usage(self) -> Dict:
+        """获取下载目录占用统计
+        
+        优先读取 Redis 中增量维护的统计，尚未校准过时在线程池中扫描一次
+        
+        Returns:
+            占用统计
+        """
+        usage = await run_blocking(get_usage, self.download_location)
+        
+        if usage is None:
+            usage = await self.reconcile_directory_usage()
+            
+        return usage
+        
+    async def reconcile_directory_usage(self) -> Dict:
+        """重新扫描下载目录并校准占用统计
+        
+        Returns:
+            占用统计
+        """
+        return await run_blocking(reconcile_usage, self.download_location)
+        
+    async def start_reconciling(self, interval: int):
+        """定期校准下载目录占用统计
+        
+        Args:
+            interval: 校准间隔（秒）
+        """
+        while True:
+            try:
+                usage = await self.reconcile_directory_usage()
+                logger.debug(f"下载目录占用统计已校准: {usage['file_count']} 个文件, {usage['total_size']} 字节")
+            except Exception as e:
+                logger.error(f"校准下载目录占用统计失败: {e}")
+                
+            await asyncio.sleep(interval)
+            
+    async def free_space(
+        self,
+        target_gb: Optional[float] = None,
+        older_than: Optional[datetime] = None,
+        progress: Optional[CleanupProgress] = None
+    ) -> CleanupProgress:
+        """按清理计划释放下载目录空间
+        
+        正在下载或等待上传的文件不会被删除
+        
+        Args:
+            target_gb: 需要释放的空间（GB），为空时清理全部可清理的文件
+            older_than: 只清理最后活跃时间早于该时间的文件
+            progress: 清理进度，传入后可在清理过程中读取
+            
+        Returns:
+            清理进度
+        """
+        progress = progress or CleanupProgress()
+        planner = CleanupPlanner(self.download_location)
+        
+        try:
+            candidates = await run_blocking(planner.scan_candidates)
+            plan = make_plan(
+                candidates,
+                target_size=None if target_gb is None else int(target_gb * 1024**3),
+                older_than=older_than
+            )
+            
+            progress.planned_count = len(plan)
+            progress.planned_size = sum(candidate.size for candidate in plan)
+            progress.in_use_count = len(
+                [candidate for candidate in candidates if candidate.category == CleanupCategory.IN_USE]
+            )
+            logger.info(
+                f"清理计划: {progress.planned_count} 项, {progress.planned_size / (1024**3):.2f}GB, "
+                f"跳过 {progress.in_use_count} 个正在使用的任务"
+            )
+            
+            return await run_blocking(planner.execute, plan, progress)
+        finally:
+            progress.finished = True
+            
     async def clean_download_directory(self) -> Dict:
         """清空下载目录
         
@@ -56,34 +134,18 @@ class CleanupService:
                     'message': f'下载目录不存在: {self.download_location}'
                 }
                 
-            # 计算清理前的大小
-            size_before = self.calculate_directory_size(self.download_location)
-            size_before_gb = size_before / (1024**3)
-            
-            # 清空目录
             logger.info(f"开始清理下载目录: {self.download_location}")
+            progress = await self.free_space()
+            freed_space_gb = progress.freed_size / (1024**3)
             
-            # 删除目录内容但保留目录本身
-            for filename in os.listdir(self.download_location):
-                file_path = os.path.join(self.download_location, filename)
-                try:
-                    if os.path.isfile(file_path) or os.path.islink(file_path):
-                        os.unlink(file_path)
-                    elif os.path.isdir(file_path):
-                        shutil.rmtree(file_path)
-                except Exception as e:
-                    logger.error(f"删除 {file_path} 失败: {e}")
-                    
-            # 或者完全删除并重建目录
-            # shutil.rmtree(self.download_location)
-            # os.makedirs(self.download_location, exist_ok=True)
-            
-            logger.success(f"下载目录清理完成，释放空间: {size_before_gb:.2f}GB")
+            logger.success(f"下载目录清理完成，释放空间: {freed_space_gb:.2f}GB")
             
             return {
                 'success': True,
-                'message': '下载目录已清空',
-                'freed_space_gb': round(size_before_gb, 2),
+                'message': '下载目录已清空' if progress.in_use_count + progress.skipped_count == 0 else
+                f'下载目录已清理，跳过 {progress.in_use_count + progress.skipped_count} 个正在使用的任务',
+                'freed_space_gb': round(freed_space_gb, 2),
+                'removed_count': progress.removed_file_count,
                 'location': self.download_location
             }
             
@@ -110,37 +172,17 @@ class CleanupService:
                     'message': f'下载目录不存在: {self.download_location}'
                 }
                 
-            cutoff_time = datetime.now() - timedelta(days=days)
-            removed_files = []
-            total_freed = 0
-            
-            for root, dirs, files in os.walk(self.download_location):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    try:
-                        # 获取文件修改时间
-                        file_stat = os.stat(file_path)
-                        file_mtime = datetime.fromtimestamp(file_stat.st_mtime)
-                        
-                        if file_mtime < cutoff_time:
-                            file_size = file_stat.st_size
-                            os.unlink(file_path)
-                            removed_files.append(filename)
-                            total_freed += file_size
-                            logger.debug(f"删除旧文件: {filename}")
-                            
-                    except Exception as e:
-                        logger.error(f"处理文件 {file_path} 失败: {e}")
-                        
-            total_freed_gb = total_freed / (1024**3)
+            progress = await self.free_space(older_than=datetime.now() - timedelta(days=days))
+            removed_count = progress.removed_file_count
+            total_freed_gb = progress.freed_size / (1024**3)
             
-            logger.info(f"清理完成，删除 {len(removed_files)} 个文件，释放 {total_freed_gb:.2f}GB")
+            logger.info(f"清理完成，删除 {removed_count} 个文件，释放 {total_freed_gb:.2f}GB")
             
             return {
                 'success': True,
-                'message': f'已删除 {len(removed_files)} 个超过 {days} 天的文件',
+                'message': f'已删除 {removed_count} 个超过 {days} 天的文件',
                 'freed_space_gb': round(total_freed_gb, 2),
-                'removed_count': len(removed_files)
+                'removed_count': removed_count
             }
             
         except Exception as e:
@@ -163,29 +205,16 @@ class CleanupService:
                     'location': self.download_location
                 }
                 
-            total_size = self.calculate_directory_size(self.download_location)
-            
-            # 统计文件数量和类型
-            file_count = 0
-            dir_count = 0
-            file_types = {}
-            
-            for root, dirs, files in os.walk(self.download_location):
-                dir_count += len(dirs)
-                file_count += len(files)
-                
-                for filename in files:
-                    ext = Path(filename).suffix.lower()
-                    if ext:
-                        file_types[ext] = file_types.get(ext, 0) + 1
+            usage = await self.get_directory_usage()
                         
             return {
                 'exists': True,
                 'location': self.download_location,
-                'total_size_gb': round(total_size / (1024**3), 2),
-                'file_count': file_count,
-                'dir_count': dir_count,
-                'file_types': file_types
+                'total_size_gb': round(usage['total_size'] / (1024**3), 2),
+                'file_count': usage['file_count'],
+                'dir_count': usage['dir_count'],
+                'file_types': usage['file_types'],
+                'reconciled_at': datetime.fromtimestamp(usage['reconciled_at'])
             }
             
         except Exception as e:
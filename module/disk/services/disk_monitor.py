@@ -1,12 +1,85 @@
 import os
+import time
 import asyncio
 import psutil
-from datetime import datetime
-from typing import Dict, Optional
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Optional, Tuple
 from loguru import logger
-from config.config import BOT_DOWNLOAD_LOCATION
-from module.disk.utils.format_utils import format_storage_size
+from config.config import (
+    BOT_DOWNLOAD_LOCATION,
+    TELEGRAM_ADMIN_ID,
+    DISK_MONITOR_MIN_INTERVAL,
+    DISK_MONITOR_MAX_INTERVAL,
+    DISK_ALERT_PREDICTION_HORIZON,
+)
+from tool.executor import run_blocking
+from module.disk.services.celery_adjustment import CeleryAdjustmentService
+from module.disk.utils.format_utils import format_file_size, format_storage_size
 from module.i18n import get_i18n_manager
+from module.leech.beans.leech_file import LeechFile
+from module.leech.constants.leech_file_status import LeechFileStatus
+
+# 计算写入速率使用的采样时间窗口（秒）
+FILL_RATE_WINDOW = 600
+# 最多保留的采样数量
+MAX_SAMPLES = 120
+# 预计到达阈值前至少再检查的次数，写入越快检查间隔越短
+CHECKS_BEFORE_THRESHOLD = 10
+# 超过该时间仍未下载的文件记录视为已放弃，不计入排队中的下载
+PENDING_MAX_AGE = timedelta(days=1)
+# 预计到达阈值的时间超过预测范围的倍数后才自动恢复下载频率，避免反复调整
+RESTORE_HORIZON_FACTOR = 2
+
+
+def get_fill_rate(samples: Deque[Tuple[float, int]], window: float = FILL_RATE_WINDOW) -> float:
+    """根据最近的采样计算磁盘写入速率
+
+    使用时间窗口内所有采样的最小二乘斜率，减少单次采样波动的影响
+
+    Args:
+        samples: (时间戳, 已使用字节) 采样
+        window: 采样时间窗口（秒）
+
+    Returns:
+        每秒增加的已使用字节，空间被释放时为负数
+    """
+    if len(samples) < 2:
+        return 0.0
+
+    latest = samples[-1][0]
+    points = [(timestamp, used) for timestamp, used in samples if latest - timestamp <= window]
+
+    if len(points) < 2:
+        return 0.0
+
+    mean_time = sum(timestamp for timestamp, _ in points) / len(points)
+    mean_used = sum(used for _, used in points) / len(points)
+    variance = sum((timestamp - mean_time) ** 2 for timestamp, _ in points)
+
+    if variance == 0:
+        return 0.0
+
+    return sum((timestamp - mean_time) * (used - mean_used) for timestamp, used in points) / variance
+
+
+def predict_seconds_to_threshold(headroom: int, fill_rate: float) -> Optional[float]:
+    """预计剩余空间降到阈值所需的时间
+
+    Args:
+        headroom: 剩余空间超出阈值的部分（字节）
+        fill_rate: 写入速率（字节/秒）
+
+    Returns:
+        秒数，空间没有减少时返回None
+    """
+    if headroom <= 0:
+        return 0.0
+
+    if fill_rate <= 0:
+        return None
+
+    return headroom / fill_rate
 
 
 class DiskMonitorService:
@@ -30,7 +103,13 @@ class DiskMonitorService:
             self.download_location = BOT_DOWNLOAD_LOCATION
             
         self.running = False
-        self.check_interval = 300  # 5分钟检查一次
+        self.check_interval = DISK_MONITOR_MAX_INTERVAL  # 磁盘空间稳定时的检查间隔
+        self.min_check_interval = DISK_MONITOR_MIN_INTERVAL  # 大量写入时的最短检查间隔
+        self.next_check_interval = self.min_check_interval
+        self.prediction_horizon = DISK_ALERT_PREDICTION_HORIZON  # 预计在该时间内低于阈值时提前降低下载频率
+        self.samples: Deque[Tuple[float, int]] = deque(maxlen=MAX_SAMPLES)
+        self.auto_throttled = False
+        self.celery_service = CeleryAdjustmentService()
         self.last_alert_time = None
         self.alert_cooldown = 3600  # 1小时内不重复告警
         
@@ -49,6 +128,8 @@ class DiskMonitorService:
             
             return {
                 'alert_needed': alert_needed,
+                'free_bytes': disk_usage.free,
+                'used_bytes': disk_usage.used,
                 'free_space_gb': round(free_space_gb, 2),
                 'used_percent': round(used_percent, 2),
                 'total_gb': round(disk_usage.total / (1024**3), 2),
@@ -89,16 +170,117 @@ class DiskMonitorService:
                                             locale=locale)
         action_prompt = self.i18n.translate('disk.monitor.format_alert_action', locale=locale)
         
+        prediction_lines = []
+        if disk_info.get('fill_rate', 0) > 0:
+            prediction_lines.append(self.i18n.translate('disk.monitor.format_alert_fill_rate',
+                                                        rate=format_file_size(int(disk_info['fill_rate'])),
+                                                        locale=locale))
+        if disk_info.get('seconds_to_threshold') is not None and not disk_info.get('alert_needed'):
+            prediction_lines.append(self.i18n.translate('disk.monitor.format_alert_time_to_threshold',
+                                                        minutes=max(int(disk_info['seconds_to_threshold'] // 60), 1),
+                                                        locale=locale))
+        if disk_info.get('pending_bytes'):
+            prediction_lines.append(self.i18n.translate('disk.monitor.format_alert_pending',
+                                                        size=format_file_size(disk_info['pending_bytes']),
+                                                        locale=locale))
+        if disk_info.get('throttled'):
+            prediction_lines.append(self.i18n.translate('disk.monitor.format_alert_throttled', locale=locale))
+        
         message = (
             f"{title} ⚠️\n\n"
             f"{location_label}\n"
             f"{free_space_label}\n"
             f"{usage_label}\n"
             f"{threshold_label}\n\n"
-            f"{action_prompt}"
+            + ''.join(f"{line}\n" for line in prediction_lines)
+            + ("\n" if prediction_lines else "")
+            + f"{action_prompt}"
         )
         return message
         
+    def get_pending_download_size(self) -> int:
+        """获取排队中和正在下载的文件的预计大小
+        
+        正在下载的文件已写入的部分也会被计入，预测结果偏保守
+        
+        Returns:
+            解析时记录的文件大小之和（字节）
+        """
+        return int(LeechFile.objects(
+            status__in=[LeechFileStatus.INITIAL, LeechFileStatus.DOWNLOADING],
+            created_at__gte=datetime.utcnow() - PENDING_MAX_AGE
+        ).sum('size_hint') or 0)
+        
+    async def predict(self, disk_info: Dict) -> Dict:
+        """根据最近的采样和排队中的下载预测磁盘空间
+        
+        Args:
+            disk_info: check_disk_space 返回的磁盘信息
+            
+        Returns:
+            预测信息
+        """
+        self.samples.append((time.monotonic(), disk_info['used_bytes']))
+        fill_rate = get_fill_rate(self.samples)
+        headroom = disk_info['free_bytes'] - self.threshold_gb * 1024**3
+        seconds_to_threshold = predict_seconds_to_threshold(headroom, fill_rate)
+        
+        try:
+            pending_bytes = await run_blocking(self.get_pending_download_size)
+        except Exception as e:
+            logger.warning(f"获取排队中的下载大小失败: {e}")
+            pending_bytes = 0
+            
+        # 正在写入且排队中的下载足以用完剩余空间，或按当前速率很快会低于阈值
+        predicted = not disk_info['alert_needed'] and fill_rate > 0 and (
+            pending_bytes >= headroom or seconds_to_threshold < self.prediction_horizon
+        )
+        
+        # 写入越快检查越频繁，采样不足时先用最短间隔收集写入速率
+        if len(self.samples) < 2:
+            self.next_check_interval = self.min_check_interval
+        elif seconds_to_threshold is None:
+            self.next_check_interval = self.check_interval
+        else:
+            self.next_check_interval = min(
+                max(seconds_to_threshold / CHECKS_BEFORE_THRESHOLD, self.min_check_interval),
+                self.check_interval
+            )
+            
+        return {
+            'fill_rate': round(fill_rate, 2),
+            'seconds_to_threshold': seconds_to_threshold,
+            'pending_bytes': pending_bytes,
+            'predicted': predicted,
+            'relieved': not disk_info['alert_needed'] and pending_bytes < headroom and (
+                seconds_to_threshold is None or
+                seconds_to_threshold > self.prediction_horizon * RESTORE_HORIZON_FACTOR
+            )
+        }
+        
+    async def throttle(self, disk_info: Dict):
+        """空间不足或即将不足时降低下载频率，压力缓解后自动恢复
+        
+        只恢复由监控自动降低的频率，管理员手动调整的频率不受影响
+        
+        Args:
+            disk_info: 包含预测信息的磁盘信息
+        """
+        if disk_info.get('alert_needed') or disk_info.get('predicted'):
+            if self.auto_throttled:
+                return
+                
+            result = await run_blocking(self.celery_service.adjust_worker_frequency, 'reduce')
+            if result.get('success'):
+                self.auto_throttled = True
+                disk_info['throttled'] = True
+                logger.warning(f"磁盘空间即将不足，已提前降低下载频率: {result.get('message')}")
+                
+        elif disk_info.get('relieved') and self.auto_throttled:
+            result = await run_blocking(self.celery_service.adjust_worker_frequency, 'restore')
+            self.auto_throttled = False
+            logger.info(f"磁盘空间压力已缓解，已恢复下载频率: {result.get('message')}")
+        
     async def check_and_alert(self) -> Optional[Dict]:
         """检查磁盘并在需要时发送告警
         
@@ -110,7 +292,11 @@ class DiskMonitorService:
             
         disk_info = self.check_disk_space()
         
-        if disk_info.get('alert_needed'):
+        if 'used_bytes' in disk_info:
+            disk_info.update(await self.predict(disk_info))
+            await self.throttle(disk_info)
+        
+        if disk_info.get('alert_needed') or disk_info.get('predicted'):
             # 检查是否在冷却期内
             current_time = datetime.now()
             if self.last_alert_time:
@@ -122,7 +308,7 @@ class DiskMonitorService:
                     return None
                     
             self.last_alert_time = current_time
-            logger.warning(f"磁盘空间不足: {disk_info}")
+            logger.warning(f"磁盘空间{'即将' if disk_info.get('predicted') else ''}不足: {disk_info}")
             return disk_info
             
         return None
@@ -139,16 +325,15 @@ class DiskMonitorService:
             try:
                 alert_info = await self.check_and_alert()
                 if alert_info:
-                    # 这里将触发告警处理器
+                    # alert_handler 依赖本模块，在使用时导入
                     from module.disk.handlers.alert_handler import DiskAlertHandler
-                    # 告警处理逻辑将在handler中实现
-                    pass
+                    await DiskAlertHandler().send_alert_with_buttons(TELEGRAM_ADMIN_ID, alert_info)
                     
             except Exception as e:
                 error_msg = self.i18n.translate('disk.monitor.service_error', error=str(e))
                 logger.error(error_msg)
                 
-            await asyncio.sleep(self.check_interval)
+            await asyncio.sleep(self.next_check_interval)
             
     def stop_monitoring(self):
         """停止监控"""
@@ -1,32 +1,110 @@
 import os
+import time
 import yaml
+import string
 import asyncio
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from loguru import logger
 import i18n
 from beans.user_language import UserLanguage
 from tool.mongo_client import get_motor_client
-import time
+from module.i18n.utils.lru_cache import LRUCache, MISSING
 
 # 数据库名称常量定义
 # 使用环境变量支持不同部署环境的数据库配置
 DATABASE_NAME = os.environ.get('MONGO_DATABASE', 'bot')
 
-# 用户语言缓存 - 避免频繁查询和重复日志
-_user_language_cache = {}
-_cache_expire_seconds = 60  # 缓存1分钟
-_cache_max_size = 1000  # 最大缓存条目数
+DEFAULT_LANGUAGE = 'zh_CN'
+
+# 用户语言缓存 - 语言只会通过 /lang 修改，修改时直接写入缓存，所以可以缓存较长时间
+_cache_expire_seconds = 24 * 60 * 60
+_cache_negative_expire_seconds = 60 * 60  # 没有设置过语言的用户
+_cache_error_expire_seconds = 30  # 查询失败时暂时使用默认语言，避免数据库不可用时每条消息都查询
+_cache_max_size = 10000  # 最大缓存条目数
+_user_language_cache = LRUCache(_cache_max_size, _cache_expire_seconds)
+# 正在查询的用户，并发的查询共享同一次数据库访问
+_pending_lookups: Dict[int, asyncio.Future] = {}
+
+# 语言文件目录
+LOCALES_PATH = Path(__file__).parent.parent.parent.parent / 'locales'
+# 检查语言文件是否被修改的间隔（秒）
+RELOAD_CHECK_INTERVAL = 2
+
+
+class Template(str):
+    """预先解析过占位符的翻译模板"""
+    
+    def __new__(cls, value: str):
+        template = super().__new__(cls, value)
+        try:
+            template.fields = frozenset(
+                field_name for _, field_name, _, _ in string.Formatter().parse(value) if field_name is not None
+            )
+        except ValueError:
+            # 不是合法的格式字符串，保持原样输出
+            template.fields = frozenset()
+        return template
+
+
+def compile_translations(node: Any, prefix: str = '') -> Dict[str, Any]:
+    """将嵌套的翻译展开为以完整key为键的映射
+    
+    中间节点也会保留（其中的字符串同样被预解析），用于复数形式等需要整个字典的场景
+    
+    Args:
+        node: 翻译节点
+        prefix: 节点的key前缀
+        
+    Returns:
+        完整key到翻译模板或字典的映射
+    """
+    table = {}
+    
+    if isinstance(node, dict):
+        compiled = {}
+        for key, value in node.items():
+            full_key = f"{prefix}.{key}" if prefix else str(key)
+            table.update(compile_translations(value, full_key))
+            compiled[key] = table[full_key]
+        if prefix:
+            table[prefix] = compiled
+    elif isinstance(node, str):
+        table[prefix] = Template(node)
+    else:
+        table[prefix] = node
+    
+    return table
 
 
 class I18nManager:
-    """国际化管理器"""
+    """国际化管理器，进程内只有一个实例"""
+    
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    def __new__(cls):
+        # 所有地方共享同一份已加载的翻译，避免每次创建都重新解析YAML
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
     
     def __init__(self):
         """初始化I18n管理器"""
+        if self._initialized:
+            return
+        
         self.default_language = 'zh_CN'
         self.available_languages = ['zh_CN', 'en_US']
         self.translations = {}
+        # (语言, 完整key) 到翻译模板的映射
+        self.table: Dict[Tuple[str, str], Any] = {}
+        self.file_mtimes: Dict[str, float] = {}
+        self.checked_at = time.monotonic()
         self.language_info = {
             'zh_CN': {
                 'code': 'zh_CN',
@@ -43,11 +121,12 @@ class I18nManager:
         # 初始化i18n
         self._setup_i18n()
         self._load_translations()
+        self._initialized = True
     
     def _setup_i18n(self):
         """配置i18n库"""
         # 设置语言文件路径
-        locales_path = Path(__file__).parent.parent.parent.parent / 'locales'
+        locales_path = LOCALES_PATH
         locales_path.mkdir(exist_ok=True)
         
         i18n.set('locale', self.default_language)
@@ -58,22 +137,50 @@ class I18nManager:
         i18n.load_path.append(str(locales_path))
     
     def _load_translations(self):
-        """加载所有语言的翻译文件"""
-        locales_path = Path(__file__).parent.parent.parent.parent / 'locales'
+        """加载所有语言的翻译文件，并展开为扁平的查找表"""
+        translations = {}
+        table = {}
+        file_mtimes = {}
         
         for lang in self.available_languages:
-            file_path = locales_path / f"{lang}.yml"
+            file_path = LOCALES_PATH / f"{lang}.yml"
             if file_path.exists():
                 try:
+                    file_mtimes[lang] = file_path.stat().st_mtime
                     with open(file_path, 'r', encoding='utf-8') as f:
-                        self.translations[lang] = yaml.safe_load(f) or {}
+                        translations[lang] = yaml.safe_load(f) or {}
                     logger.info(f"加载语言文件: {lang}")
                 except Exception as e:
                     logger.error(f"加载语言文件失败 {lang}: {e}")
-                    self.translations[lang] = {}
+                    translations[lang] = {}
             else:
-                self.translations[lang] = {}
+                translations[lang] = {}
                 logger.warning(f"语言文件不存在: {file_path}")
+            
+            table.update({
+                (lang, key): value for key, value in compile_translations(translations[lang]).items()
+            })
+        
+        # 整体替换，其他线程读取时不会看到加载了一半的翻译
+        self.translations = translations
+        self.table = table
+        self.file_mtimes = file_mtimes
+        self.checked_at = time.monotonic()
+    
+    def _reload_if_changed(self):
+        """语言文件被修改后重新加载"""
+        self.checked_at = time.monotonic()
+        
+        for lang in self.available_languages:
+            try:
+                mtime = (LOCALES_PATH / f"{lang}.yml").stat().st_mtime
+            except OSError:
+                mtime = None
+            
+            if mtime != self.file_mtimes.get(lang):
+                logger.info(f"语言文件已修改，重新加载: {lang}")
+                self._load_translations()
+                return
     
     def translate(self, key: str, locale: Optional[str] = None, **kwargs) -> str:
         """
@@ -90,6 +197,9 @@ class I18nManager:
         if locale not in self.available_languages:
             locale = self.default_language
         
+        if time.monotonic() - self.checked_at > RELOAD_CHECK_INTERVAL:
+            self._reload_if_changed()
+        
         # 尝试从加载的翻译中获取
         translation = self._get_translation(key, locale)
         
@@ -116,8 +226,8 @@ class I18nManager:
                         # 如果没有合适的复数形式，使用第一个可用的值
                         translation = list(translation.values())[0]
                 
-                # 格式化字符串（只在translation是字符串时）
-                if isinstance(translation, str):
+                # 格式化字符串（只在translation是字符串时），没有占位符的模板不需要格式化
+                if isinstance(translation, str) and getattr(translation, 'fields', True):
                     translation = translation.format(**kwargs)
             except (KeyError, ValueError) as e:
                 logger.warning(f"翻译参数替换失败: {e}")
@@ -126,29 +236,16 @@ class I18nManager:
     
     def _get_translation(self, key: str, locale: str) -> Optional[Any]:
         """
-        从翻译字典中获取翻译
+        从扁平的查找表中获取翻译
         
         Args:
-            key: 翻译key（支持点分隔的嵌套key）
+            key: 翻译key（点分隔的完整key）
             locale: 语言代码
             
         Returns:
-            翻译文本、字典或None
+            翻译模板、字典或None
         """
-        if locale not in self.translations:
-            return None
-        
-        # 处理嵌套的key
-        keys = key.split('.')
-        value = self.translations[locale]
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return None
-        
-        return value
+        return self.table.get((locale, key))
     
     async def translate_for_user(self, user_id: int, key: str, **kwargs) -> str:
         """
@@ -284,27 +381,36 @@ class I18nManager:
         )
 
 
-def _clean_cache():
-    """清理过期和过多的缓存条目"""
-    current_time = time.time()
-    
-    # 清理过期条目
-    expired_keys = [
-        key for key, entry in _user_language_cache.items()
-        if current_time - entry['timestamp'] > _cache_expire_seconds
-    ]
-    for key in expired_keys:
-        del _user_language_cache[key]
-    
-    # 如果缓存过大，清理最旧的条目
-    if len(_user_language_cache) > _cache_max_size:
-        sorted_entries = sorted(
-            _user_language_cache.items(),
-            key=lambda x: x[1]['timestamp']
+async def _find_user_language(user_id: int) -> Optional[str]:
+    """
+    从数据库查询用户的语言设置并写入缓存
+    
+    Args:
+        user_id: 用户ID
+        
+    Returns:
+        语言代码，没有设置过语言或查询失败时返回None
+    """
+    try:
+        collection = await get_motor_collection('user_language')
+        result = await collection.find_one({'user_id': user_id})
+    except Exception as e:
+        logger.error(f"获取用户 {user_id} 语言失败: {e}")
+        _user_language_cache.set(user_id, None, _cache_error_expire_seconds)
+        return None
+    
+    language = result.get('language_code', result.get('language')) if result else None
+    logger.debug(f"从数据库获取用户 {user_id} 语言: {language or DEFAULT_LANGUAGE}")
+    
+    # 查询期间用户通过 /lang 修改了语言时，以写入的语言为准
+    if user_id not in _user_language_cache:
+        _user_language_cache.set(
+            user_id,
+            language,
+            _cache_expire_seconds if language else _cache_negative_expire_seconds
         )
-        # 删除最旧的条目，保留最新的 _cache_max_size 条
-        for key, _ in sorted_entries[:-_cache_max_size]:
-            del _user_language_cache[key]
+    
+    return language
 
 
 async def get_user_language(user_id: int) -> str:
@@ -317,65 +423,60 @@ async def get_user_language(user_id: int) -> str:
     Returns:
         语言代码
     """
-    current_time = time.time()
-    cache_key = f"user_lang_{user_id}"
+    language = _user_language_cache.get(user_id)
     
-    # 检查缓存
-    if cache_key in _user_language_cache:
-        cache_entry = _user_language_cache[cache_key]
-        if current_time - cache_entry['timestamp'] < _cache_expire_seconds:
-            # 缓存有效，直接返回（不产生额外日志）
-            return cache_entry['language']
+    if language is MISSING:
+        lookup = _pending_lookups.get(user_id)
+        
+        if lookup is None:
+            lookup = _pending_lookups[user_id] = asyncio.ensure_future(_find_user_language(user_id))
+            lookup.add_done_callback(lambda _: _pending_lookups.pop(user_id, None))
+        
+        language = await asyncio.shield(lookup)
     
-    # 定期清理缓存（低概率触发）
-    if len(_user_language_cache) > _cache_max_size * 0.8:
-        _clean_cache()
+    return language or DEFAULT_LANGUAGE
+
+
+async def prefetch_user_languages(user_ids: Iterable[int]) -> int:
+    """
+    批量查询用户的语言设置并写入缓存，Bot启动时预加载管理员和成员
     
-    try:
-        # 优先从同步方法获取（使用本地缓存或快速访问）
-        user_lang = UserLanguage.get_user_language(user_id)
-        if user_lang:
-            logger.debug(f"获取用户 {user_id} 语言: {user_lang}")
-            # 更新缓存
-            _user_language_cache[cache_key] = {
-                'language': user_lang,
-                'timestamp': current_time
-            }
-            return user_lang
-            
-        # 如果同步方法失败，从异步MongoDB直接获取
-        client = get_motor_client()
-        db = client[DATABASE_NAME]
-        collection = db['user_language']
+    Args:
+        user_ids: 用户ID
         
-        result = await collection.find_one({'user_id': user_id})
-        if result:
-            language_code = result.get('language_code', result.get('language', 'zh_CN'))
-            logger.debug(f"从数据库获取用户 {user_id} 语言: {language_code}")
-            # 更新缓存
-            _user_language_cache[cache_key] = {
-                'language': language_code,
-                'timestamp': current_time
-            }
-            return language_code
-            
+    Returns:
+        写入缓存的用户数量
+    """
+    user_ids = {user_id for user_id in user_ids if user_id > 0 and user_id not in _user_language_cache}
+    
+    if not user_ids:
+        return 0
+    
+    languages = {}
+    
+    try:
+        collection = await get_motor_collection('user_language')
+        async for result in collection.find({'user_id': {'$in': list(user_ids)}}):
+            languages[result['user_id']] = result.get('language_code', result.get('language'))
     except Exception as e:
-        logger.error(f"获取用户 {user_id} 语言失败: {e}")
+        logger.error(f"预加载用户语言失败: {e}")
+        return 0
     
-    # 返回默认语言并记录
-    default_lang = 'zh_CN'
-    logger.info(f"用户 {user_id} 使用默认语言: {default_lang}")
-    # 缓存默认语言（较短时间）
-    _user_language_cache[cache_key] = {
-        'language': default_lang,
-        'timestamp': current_time
-    }
-    return default_lang
+    for user_id in user_ids:
+        language = languages.get(user_id)
+        _user_language_cache.set(
+            user_id,
+            language,
+            _cache_expire_seconds if language else _cache_negative_expire_seconds
+        )
+    
+    logger.info(f"已预加载 {len(user_ids)} 个用户的语言设置")
+    return len(user_ids)
 
 
 def save_user_language(user_id: int, language: str) -> bool:
     """
-    保存用户的语言设置（同步版本）
+    保存用户的语言设置（同步版本，Bot中使用异步版本）
     
     Args:
         user_id: 用户ID
@@ -392,10 +493,7 @@ def save_user_language(user_id: int, language: str) -> bool:
         result = UserLanguage.set_user_language(user_id, language)
         if result:
             logger.info(f"同步保存用户 {user_id} 语言偏好为: {language}")
-            # 清除缓存，确保下次获取最新数据
-            cache_key = f"user_lang_{user_id}"
-            if cache_key in _user_language_cache:
-                del _user_language_cache[cache_key]
+            _user_language_cache.set(user_id, language, _cache_expire_seconds)
         return result
     except Exception as e:
         logger.error(f"同步保存用户 {user_id} 语言 {language} 失败: {e}")
@@ -418,10 +516,7 @@ async def save_user_language_async(user_id: int, language: str) -> bool:
         return False
     
     try:
-        # 使用Motor客户端进行异步操作
-        client = get_motor_client()
-        db = client[DATABASE_NAME]
-        collection = db['user_language']
+        collection = await get_motor_collection('user_language')
         
         # 添加创建和更新时间戳
         from datetime import datetime
@@ -444,12 +539,11 @@ async def save_user_language_async(user_id: int, language: str) -> bool:
         
         success = result.modified_count > 0 or result.upserted_id is not None
         
+        # 数据库已确认写入，直接更新缓存，之后的消息不需要再查询
+        _user_language_cache.set(user_id, language, _cache_expire_seconds)
+        
         if success:
             logger.info(f"成功保存用户 {user_id} 语言偏好为: {language}")
-            # 清除缓存，确保下次获取最新数据
-            cache_key = f"user_lang_{user_id}"
-            if cache_key in _user_language_cache:
-                del _user_language_cache[cache_key]
         else:
             logger.warning(f"用户 {user_id} 语言偏好保存操作未产生变化")
             
@@ -482,21 +576,8 @@ def get_cache_stats() -> Dict[str, Any]:
     Returns:
         缓存统计字典
     """
-    current_time = time.time()
-    active_entries = 0
-    expired_entries = 0
-    
-    for entry in _user_language_cache.values():
-        if current_time - entry['timestamp'] < _cache_expire_seconds:
-            active_entries += 1
-        else:
-            expired_entries += 1
-    
     return {
-        'total_entries': len(_user_language_cache),
-        'active_entries': active_entries,
-        'expired_entries': expired_entries,
-        'cache_hit_ratio': f"{(active_entries / max(len(_user_language_cache), 1)) * 100:.1f}%",
+        **_user_language_cache.get_stats(),
         'cache_expire_seconds': _cache_expire_seconds,
         'cache_max_size': _cache_max_size
     }
@@ -506,6 +587,5 @@ def clear_user_language_cache():
     """
     清空用户语言缓存
     """
-    global _user_language_cache
-    _user_language_cache = {}
-    logger.info("用户语言缓存已清空")
\ No newline at end of file
+    _user_language_cache.clear()
+    logger.info("用户语言缓存已清空")
@@ -0,0 +1 @@
+"""国际化工具模块"""
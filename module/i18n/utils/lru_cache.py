@@ -0,0 +1,104 @@
+"""
+LRU缓存
+按访问顺序淘汰，每个条目有独立的过期时间，读写都是 O(1)
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# 缓存中没有该条目时 get 返回的值，与缓存的 None 区分
+MISSING = object()
+
+
+class LRUCache:
+    """带过期时间的LRU缓存"""
+
+    def __init__(self, max_size: int, ttl: float):
+        """初始化LRU缓存
+
+        Args:
+            max_size: 最多保存的条目数量
+            ttl: 默认过期时间（秒）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, record=False) is not MISSING
+
+    def get(self, key: Hashable, record: bool = True) -> Any:
+        """读取条目，过期的条目会被删除
+
+        Args:
+            key: 键
+            record: 是否计入命中率
+
+        Returns:
+            缓存的值，不存在或已过期时返回 MISSING
+        """
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[1] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += record
+            return entry[0]
+
+        if entry is not None:
+            del self.entries[key]
+
+        self.misses += record
+        return MISSING
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """写入条目，超过容量时淘汰最久未访问的条目
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 过期时间（秒），为空时使用默认过期时间
+        """
+        self.entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """删除条目
+
+        Args:
+            key: 键
+        """
+        self.entries.pop(key, None)
+
+    def clear(self):
+        """清空缓存和命中统计"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计
+
+        Returns:
+            条目数量和命中率
+        """
+        now = time.monotonic()
+        active_entries = sum(1 for _, expire_at in self.entries.values() if expire_at > now)
+        lookups = self.hits + self.misses
+
+        return {
+            'total_entries': len(self.entries),
+            'active_entries': active_entries,
+            'expired_entries': len(self.entries) - active_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'cache_hit_ratio': f"{self.hits / max(lookups, 1) * 100:.1f}%",
+        }
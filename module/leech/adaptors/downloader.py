@@ -1,5 +1,8 @@
 import datetime
+from urllib.parse import urlparse
 
+from celery import Task
+from celery.app.task import Context
 from celery.result import AsyncResult
 from celery.worker.request import Request
 from loguru import logger
@@ -20,8 +23,14 @@ from module.leech.beans.leech_file import LeechFile
 from module.leech.utils.adaptor import setup_services
 from module.leech.constants.leech_file_status import LeechFileStatus
 from tool.worker import celeryd_setup_callback, update_worker_status
-from celery.signals import worker_shutdown, celeryd_after_setup, worker_ready, task_success, task_received, task_prerun
+from tool.profiler import start_profile_listener
+from config.config import RETRY_MAXIMUM_ATTEMPTS
+from module.leech.utils.cancellation import clear_cancellation
+from module.leech.utils.retry import should_retry, get_retry_countdown, get_retry_reason
+from celery.signals import worker_shutdown, celeryd_after_setup, worker_ready, task_success, task_received, task_prerun, \
+    task_retry, task_postrun, before_task_publish
 from tool.mongo_client import EstablishConnection as EstablishMongodbConnection
+from tool.task_metrics import Stage, record_published_at, start_task, finish_task, discard_task, download_labels
 
 EstablishMongodbConnection()
 
@@ -34,11 +43,26 @@ download_service: dict[DownloadFilter, Callable[[LeechFile], LeechFile]] = \
     setup_services('module/leech/downloaders', EXPORT_NAME_DOWNLOAD_FILTER, EXPORT_NAME_DOWNLOAD)
 
 
-@celery_client.task()
-def process_download(leech_file: LeechFile) -> LeechFile:
+@celery_client.task(bind=True)
+def process_download(self: Task, leech_file: LeechFile) -> LeechFile:
     for _filter, func in download_service.items():
         if _filter(leech_file):
-            return func(leech_file)
+            result: LeechFile = func(leech_file)
+
+            if result.status == LeechFileStatus.DOWNLOAD_FAIL and \
+                    should_retry(urlparse(result.link).netloc, result.error_category, self.request.retries):
+                countdown = get_retry_countdown(self.request.retries, result.retry_after)
+                result.status = LeechFileStatus.INITIAL
+                result.reason = get_retry_reason(self.request.retries, countdown, result.reason)
+
+                raise self.retry(args=(result,), countdown=countdown, max_retries=RETRY_MAXIMUM_ATTEMPTS)
+
+            # a cancelled file is not handed to the upload task of the chain
+            if result.status == LeechFileStatus.TERMINATED:
+                result.upload_status = LeechFileStatus.TERMINATED
+                self.request.chain = None
+
+            return result
 
     reason = 'Download service not found.'
     logger.warning(reason)
@@ -55,6 +79,7 @@ def on_download_celeryd_setup(sender: str, instance: Worker, **kwargs):
 @worker_ready.connect
 def on_download_worker_ready(signal: Signal, sender: Consumer, **kwargs):
     update_worker_status(sender.hostname, WorkerStatus.READY)
+    start_profile_listener(sender.hostname)
 
 
 @worker_shutdown.connect
@@ -64,6 +89,14 @@ def on_download_worker_shutdown(signal: Signal, sender: Worker, **kwargs):
 
 @task_received.connect
 def on_task_received(request: Request, sender, **kwargs):
+    # the subscription worker imports both adaptors, only handle the tasks of this one
+    if request.name != process_download.name:
+        return
+
+    # task has been recorded when it was received at the first time
+    if request.request_dict.get('retries'):
+        return
+
     LeechTask(
         task_id=request.task_id,
         file_id=request.args[0].id,
@@ -72,15 +105,31 @@ def on_task_received(request: Request, sender, **kwargs):
     ).save()
 
 
-@task_prerun.connect
+@task_prerun.connect(sender=process_download)
 def on_task_prerun(args, **kwargs):
     leech_file: LeechFile = args[0]
+    clear_cancellation(leech_file.id)
     leech_file.status = LeechFileStatus.DOWNLOADING
+    leech_file.error_category = None
+    leech_file.retry_after = None
     leech_file.updated_at = datetime.datetime.utcnow()
     leech_file.save()
 
 
-@task_success.connect
+@task_retry.connect(sender=process_download)
+def on_task_retry(request: Context, **kwargs):
+    try:
+        leech_file: LeechFile = request.args[0]
+        leech_file.updated_at = datetime.datetime.utcnow()
+        leech_file.save()
+
+        LeechTask.objects(task_id=request.id) \
+            .update_one(status=TaskStatus.INITIAL, updated_at=datetime.datetime.utcnow())
+    except Exception as e:
+        logger.error(e)
+
+
+@task_success.connect(sender=process_download)
 def on_task_success(result: LeechFile, sender, **kwargs):
     try:
         result.save()
@@ -105,3 +154,24 @@ def on_task_success(result: LeechFile, sender, **kwargs):
 
     except Exception as e:
         logger.error(e)
+
+
+@before_task_publish.connect(sender=process_download.name)
+def on_download_task_publish(headers: dict, **kwargs):
+    record_published_at(headers)
+
+
+@task_prerun.connect(sender=process_download)
+def on_download_metrics_prerun(task_id: str, task: Task, args, **kwargs):
+    start_task(task_id, task.request, Stage.DOWNLOAD, download_labels(args[0]))
+
+
+@task_success.connect(sender=process_download)
+def on_download_metrics_success(sender: Task, **kwargs):
+    finish_task(sender.request.id)
+
+
+@task_postrun.connect(sender=process_download)
+def on_download_metrics_postrun(task_id: str, **kwargs):
+    # sent for every outcome, a task which is retried, fails or is cancelled is not measured
+    discard_task(task_id)
@@ -0,0 +1,74 @@
+import datetime
+import functools
+from loguru import logger
+
+from constants.worker import Project, Queue
+from tool.celery_client import celery_client
+from config.config import SUBSCRIPTION_CHECK_INTERVAL_SECONDS
+from module.leech.adaptors.parser import execute_parse_link
+from module.leech.beans.leech_subscription import LeechSubscription
+from module.leech.utils.subscription import filter_new_files, has_seen_files, get_cursor_key, \
+    clear_seen_files
+from tool.mongo_client import EstablishConnection as EstablishMongodbConnection
+
+EstablishMongodbConnection()
+
+# run by the beat embedded in the subscription worker, worker status and the profile listener are set up by the
+# download and upload adaptors imported through the parsers
+celery_client.conf.beat_schedule = {
+    'check_subscriptions': {
+        'task': f'{Project.LEECH_SUBSCRIPTION}.check_subscriptions',
+        'schedule': SUBSCRIPTION_CHECK_INTERVAL_SECONDS,
+        'options': {'queue': Queue.SUBSCRIPTION_QUEUE},
+    }
+}
+
+
+@celery_client.task
+def check_subscriptions():
+    now = datetime.datetime.utcnow()
+
+    for subscription in LeechSubscription.objects(next_check_at__lte=now):
+        # moved forward before the check is queued, so the next tick does not queue it again
+        subscription.update(next_check_at=now + datetime.timedelta(minutes=subscription.interval))
+        check_subscription.apply_async((subscription.id,), queue=Queue.SUBSCRIPTION_QUEUE)
+
+
+@celery_client.task
+def check_subscription(subscription_id: str):
+    subscription: LeechSubscription = LeechSubscription.objects(id=subscription_id).first()
+
+    # removed after the check was queued
+    if subscription is None:
+        return
+
+    # incremental parsers only list what is new since the last check, the others list everything and the seen
+    # files are dropped before they are queued
+    leech_files = execute_parse_link(
+        subscription.link,
+        sync_tool=subscription.sync_tool,
+        sync_path=subscription.sync_path,
+        batch=subscription.id,
+        incremental=True,
+        cursor_key=get_cursor_key(subscription.id),
+        file_filter=functools.partial(
+            filter_new_files,
+            subscription.id,
+            baseline=subscription.checked_at is None and not subscription.download_existing
+        )
+    )
+
+    # nothing was listed, usually the site failed, the first check is repeated so the files already there stay skipped
+    if subscription.checked_at is None and not has_seen_files(subscription.id):
+        # the cursor a failed listing may have moved is dropped as well, the repeated check lists everything again
+        clear_seen_files(subscription.id)
+        logger.warning(f'Subscription {subscription.id} listed no file from {subscription.link}, check again later')
+        return
+
+    logger.info(f'Subscription {subscription.id} checked, {len(leech_files)} new file(s) from {subscription.link}')
+
+    subscription.update(
+        checked_at=datetime.datetime.utcnow(),
+        new_files=len(leech_files),
+        updated_at=datetime.datetime.utcnow()
+    )
@@ -1,5 +1,7 @@
 import datetime
 
+from celery import Task
+from celery.app.task import Context
 from celery.worker.request import Request
 from loguru import logger
 from celery.apps.worker import Worker
@@ -19,8 +21,14 @@ from module.leech.beans.leech_file import LeechFile
 from module.leech.utils.adaptor import setup_services
 from module.leech.constants.leech_file_status import LeechFileStatus
 from tool.worker import celeryd_setup_callback, update_worker_status
-from celery.signals import worker_shutdown, celeryd_after_setup, worker_ready, task_prerun, task_success, task_received
+from tool.profiler import start_profile_listener
+from config.config import RETRY_MAXIMUM_ATTEMPTS
+from module.leech.utils.cancellation import clear_cancellation
+from module.leech.utils.retry import should_retry, get_retry_countdown, get_retry_reason
+from celery.signals import worker_shutdown, celeryd_after_setup, worker_ready, task_prerun, task_success, task_received, \
+    task_retry, task_postrun, before_task_publish
 from tool.mongo_client import EstablishConnection as EstablishMongodbConnection
+from tool.task_metrics import Stage, record_published_at, start_task, finish_task, discard_task, upload_labels
 
 EstablishMongodbConnection()
 
@@ -33,11 +41,21 @@ sync_service: dict[SyncFilter, Callable[[LeechFile, str, ...], LeechFile]] = \
     setup_services('module/leech/uploaders', EXPORT_NAME_UPLOAD_FILTER, EXPORT_NAME_UPLOAD)
 
 
-@celery_client.task()
-def process_upload(leech_file: LeechFile, **kwargs) -> LeechFile:
+@celery_client.task(bind=True)
+def process_upload(self: Task, leech_file: LeechFile, **kwargs) -> LeechFile:
     for _filter, func in sync_service.items():
         if _filter(getattr(leech_file, 'sync_tool')):
-            return func(leech_file, **kwargs)
+            result: LeechFile = func(leech_file, **kwargs)
+
+            if result.upload_status == LeechFileStatus.UPLOAD_FAIL and \
+                    should_retry(str(result.sync_tool), result.upload_error_category, self.request.retries):
+                countdown = get_retry_countdown(self.request.retries, result.retry_after)
+                result.upload_status = LeechFileStatus.INITIAL
+                result.upload_reason = get_retry_reason(self.request.retries, countdown, result.upload_reason)
+
+                raise self.retry(args=(result,), kwargs=kwargs, countdown=countdown, max_retries=RETRY_MAXIMUM_ATTEMPTS)
+
+            return result
 
     reason = 'Sync service not found.'
     logger.warning(reason)
@@ -54,6 +72,7 @@ def on_upload_celeryd_setup(sender: str, instance: Worker, **kwargs):
 @worker_ready.connect
 def on_upload_worker_ready(signal: Signal, sender: Consumer, **kwargs):
     update_worker_status(sender.hostname, WorkerStatus.READY)
+    start_profile_listener(sender.hostname)
 
 
 @worker_shutdown.connect
@@ -63,6 +82,14 @@ def on_upload_worker_shutdown(signal: Signal, sender: Worker, **kwargs):
 
 @task_received.connect
 def on_task_received(request: Request, sender, **kwargs):
+    # the subscription worker imports both adaptors, only handle the tasks of this one
+    if request.name != process_upload.name:
+        return
+
+    # task has been recorded when it was received at the first time
+    if request.request_dict.get('retries'):
+        return
+
     LeechTask(
         task_id=request.task_id,
         file_id=request.args[0].id,
@@ -71,15 +98,31 @@ def on_task_received(request: Request, sender, **kwargs):
     ).save()
 
 
-@task_prerun.connect
+@task_prerun.connect(sender=process_upload)
 def on_task_prerun(args, **kwargs):
     leech_file: LeechFile = args[0]
+    clear_cancellation(leech_file.id)
     leech_file.upload_status = LeechFileStatus.UPLOADING
+    leech_file.upload_error_category = None
+    leech_file.retry_after = None
     leech_file.updated_at = datetime.datetime.utcnow()
     leech_file.save()
 
 
-@task_success.connect
+@task_retry.connect(sender=process_upload)
+def on_task_retry(request: Context, **kwargs):
+    try:
+        leech_file: LeechFile = request.args[0]
+        leech_file.updated_at = datetime.datetime.utcnow()
+        leech_file.save()
+
+        LeechTask.objects(task_id=request.id)\
+            .update_one(status=TaskStatus.INITIAL, updated_at=datetime.datetime.utcnow())
+    except Exception as e:
+        logger.error(e)
+
+
+@task_success.connect(sender=process_upload)
 def on_task_success(result: LeechFile, sender, **kwargs):
     try:
         result.save()
@@ -106,3 +149,22 @@ def on_task_success(result: LeechFile, sender, **kwargs):
         logger.error(e)
 
 
+@before_task_publish.connect(sender=process_upload.name)
+def on_upload_task_publish(headers: dict, **kwargs):
+    record_published_at(headers)
+
+
+@task_prerun.connect(sender=process_upload)
+def on_upload_metrics_prerun(task_id: str, task: Task, args, **kwargs):
+    start_task(task_id, task.request, Stage.UPLOAD, upload_labels(args[0]))
+
+
+@task_success.connect(sender=process_upload)
+def on_upload_metrics_success(sender: Task, **kwargs):
+    finish_task(sender.request.id)
+
+
+@task_postrun.connect(sender=process_upload)
+def on_upload_metrics_postrun(task_id: str, **kwargs):
+    # sent for every outcome, a task which is retried, fails or is cancelled is not measured
+    discard_task(task_id)
@@ -1,4 +1,4 @@
-from mongoengine import StringField, EnumField
+from mongoengine import StringField, EnumField, IntField
 
 from module.leech.beans.leech_file import LeechFile
 from module.leech.constants.leech_file_tool import LeechFileTool
@@ -8,4 +8,6 @@ class LeechBunkrFile(LeechFile):
     # tool used to download the file
     tool = EnumField(LeechFileTool, required=True, default=LeechFileTool.BUNKR)
     actual_link = StringField()
+    # unix time at which actual_link stops working, when it is known
+    actual_link_expire_at = IntField()
 
@@ -1,6 +1,7 @@
 import uuid
 import datetime
 from constants.mongo import FILE_COLLECTION
+from module.leech.constants.error_category import ErrorCategory
 from module.leech.constants.leech_file_status import LeechFileStatus
 from mongoengine import Document, StringField, IntField, EnumField, DateTimeField
 from module.leech.constants.leech_file_tool import LeechFileTool, LeechFileSyncTool
@@ -24,14 +25,23 @@ class LeechFile(Document):
     # reason for the file status if error occurs
     reason = StringField()
     upload_reason = StringField()
+    # category of the error, used to decide whether to retry automatically
+    error_category = EnumField(ErrorCategory)
+    upload_error_category = EnumField(ErrorCategory)
+    # seconds to wait before retrying, suggested by the server
+    retry_after = IntField()
     # remote folder to store the file
     remote_folder = StringField()
     # location of the file
     location = StringField()
     # path to sync the file
     sync_path = StringField()
+    # id of the batch submitted together by one command
+    batch = StringField()
     # size of the file
     size = IntField()
+    # expected size of the file reported by parser, used to schedule the task
+    size_hint = IntField()
     # hash of the file
     file_hash = StringField()
     #
@@ -0,0 +1,28 @@
+import uuid
+import datetime
+from constants.mongo import SUBSCRIPTION_COLLECTION
+from module.leech.constants.leech_file_tool import LeechFileSyncTool
+from mongoengine import Document, StringField, IntField, EnumField, DateTimeField, BooleanField
+
+
+class LeechSubscription(Document):
+    id = StringField(default=lambda: uuid.uuid4().hex[:8], primary_key=True, db_field='_id')
+    # album, folder or creator link parsed again on every check
+    link = StringField(required=True)
+    # minutes between two checks
+    interval = IntField(required=True)
+    # sync tool and path of the files found by the checks
+    sync_tool = EnumField(LeechFileSyncTool, required=True)
+    sync_path = StringField()
+    # queue the files already there at the first check, otherwise they are only remembered
+    download_existing = BooleanField(default=False)
+    next_check_at = DateTimeField(default=lambda: datetime.datetime.utcnow())
+    checked_at = DateTimeField()
+    # number of new files queued by the last check
+    new_files = IntField(default=0)
+    #
+    created_at = DateTimeField(default=lambda: datetime.datetime.utcnow())
+    #
+    updated_at = DateTimeField()
+
+    meta = {'collection': SUBSCRIPTION_COLLECTION}
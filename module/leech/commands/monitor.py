@@ -4,6 +4,7 @@ import prettytable as pt
 
 from beans.worker import Worker
 from tool.utils import is_admin
+from tool.executor import run_blocking
 from pyrogram.types import Message
 from pyrogram import Client, filters
 from constants.worker import WorkerStatus, Hostname
@@ -11,6 +12,7 @@ from module.leech.beans.leech_file import LeechFile
 from module.leech.beans.leech_task import LeechTask
 from config.config import FAILED_TASK_EXPIRE_AFTER_DAYS
 from module.leech.utils.message import send_message_to_admin
+from tool.task_metrics import summarize
 from module.leech.constants.task import TaskStatus, TaskType
 from module.leech.constants.leech_file_status import LeechFileStatus
 
@@ -23,10 +25,7 @@ def get_task_count(task_status: TaskStatus, task_type: TaskType) -> int:
     ).count()
 
 
-@Client.on_message(filters.command('leech monitor') & filters.private & is_admin)
-async def leech_monitor(_: Client, message: Message):
-    m: Message = await send_message_to_admin('Got it, please wait...', False)
-    title = f'Statistic within {FAILED_TASK_EXPIRE_AFTER_DAYS} days'
+def get_statistic_table() -> pt.PrettyTable:
     table = pt.PrettyTable(['Item', 'Current'])
     table.border = True
     table.preserve_internal_border = False
@@ -103,5 +102,37 @@ async def leech_monitor(_: Client, message: Message):
             divider=True
         )
 
+    return table
+
+
+def format_seconds(seconds: float) -> str:
+    return f'{seconds:.2f}s' if seconds < 60 else f'{seconds / 60:.1f}m'
+
+
+def get_stage_table() -> pt.PrettyTable:
+    table = pt.PrettyTable(['Stage', 'Count', 'Avg', 'P95'])
+    table.border = True
+    table.preserve_internal_border = False
+    table.align['Stage'] = 'l'
+
+    for stage, summary in summarize().items():
+        table.add_row(
+            [stage, summary['count'], format_seconds(summary['average']), format_seconds(summary['p95'])],
+            divider=True
+        )
+
+    return table
+
+
+@Client.on_message(filters.command('leech monitor') & filters.private & is_admin)
+async def leech_monitor(_: Client, message: Message):
+    m: Message = await send_message_to_admin('Got it, please wait...', False)
+    title = f'Statistic within {FAILED_TASK_EXPIRE_AFTER_DAYS} days'
+    table = await run_blocking(get_statistic_table)
+    stage_table = await run_blocking(get_stage_table)
+
     await m.delete()
     await send_message_to_admin(f'<pre>| \n| {title}\n| \n{table.get_string()}</pre>', False)
+
+    if len(stage_table.rows):
+        await send_message_to_admin(f'<pre>| \n| Time spent in every stage\n| \n{stage_table.get_string()}</pre>', False)
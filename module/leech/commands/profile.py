@@ -0,0 +1,96 @@
+import io
+import time
+import asyncio
+import argparse
+from beans.worker import Worker
+from tool.utils import is_admin
+from tool.executor import run_blocking
+from pyrogram import filters, Client
+from pyrogram.types import Message
+from constants.worker import WorkerStatus
+from config.config import TELEGRAM_ADMIN_ID
+from tool.telegram_client import get_telegram_client
+from module.leech.utils.message import send_message_to_admin
+from tool.profiler import request_profile, get_profile_result, MAXIMUM_PROFILE_SECONDS, ERROR_FIELD
+
+DEFAULT_PROFILE_SECONDS = 30
+# extra time for the workers to pick up the request and report the result
+RESULT_WAIT_SECONDS = 30
+RESULT_POLL_INTERVAL = 2
+
+
+def parse_arguments(arguments: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Profile running workers.')
+    parser.add_argument('seconds', type=int, nargs='?', default=DEFAULT_PROFILE_SECONDS)
+    parser.add_argument('--memory', action='store_true', help='Take tracemalloc snapshots as well.')
+    parser.add_argument('--worker', default='', help='Only profile workers whose hostname contains it.')
+
+    return parser.parse_args(arguments)
+
+
+async def wait_for_results(request_ids: dict[str, str], timeout: float) -> dict[str, dict[str, str]]:
+    results = {}
+
+    while len(results) < len(request_ids) and time.monotonic() < timeout:
+        await asyncio.sleep(RESULT_POLL_INTERVAL)
+
+        for hostname, request_id in request_ids.items():
+            if hostname not in results:
+                result = await run_blocking(get_profile_result, request_id)
+
+                if result is not None:
+                    results[hostname] = result
+
+    return results
+
+
+@Client.on_message(filters.command('leech profile') & filters.private & is_admin)
+async def leech_profile(_: Client, message: Message):
+    try:
+        args = parse_arguments(message.command[1:])
+    except (Exception, SystemExit):
+        return await send_message_to_admin('\n'.join([
+            '<b>/leech profile [seconds] [--memory] [--worker name]</b>',
+            f'Sample the stacks of running workers for up to {MAXIMUM_PROFILE_SECONDS} seconds.',
+        ]), False)
+
+    seconds = min(max(args.seconds, 1), MAXIMUM_PROFILE_SECONDS)
+    workers = [
+        worker.hostname for worker in await run_blocking(lambda: list(Worker.objects(status=WorkerStatus.READY)))
+        if args.worker in worker.hostname
+    ]
+
+    if len(workers) == 0:
+        return await send_message_to_admin('No running worker to profile.')
+
+    request_ids = {
+        hostname: await run_blocking(request_profile, hostname, seconds, args.memory) for hostname in workers
+    }
+    m: Message = await send_message_to_admin(
+        f'Profiling {len(workers)} worker(s) for {seconds} seconds, please wait...', False
+    )
+
+    results = await wait_for_results(request_ids, time.monotonic() + seconds + RESULT_WAIT_SECONDS)
+
+    await m.delete()
+
+    for hostname, result in results.items():
+        if ERROR_FIELD in result:
+            await send_message_to_admin(f'Fail to profile {hostname}: {result[ERROR_FIELD]}', False)
+            continue
+
+        for name, content in result.items():
+            document = io.BytesIO(content.encode())
+            document.name = f'{hostname.replace("@", "_")}.{name}'
+
+            await get_telegram_client().send_document(
+                chat_id=TELEGRAM_ADMIN_ID,
+                document=document,
+                file_name=document.name,
+                caption=hostname
+            )
+
+    missing = [hostname for hostname in workers if hostname not in results]
+
+    if missing:
+        await send_message_to_admin(f'No profile from {", ".join(missing)}, worker may be offline.', False)
@@ -4,6 +4,7 @@ from loguru import logger
 import prettytable as pt
 from beans.worker import Worker
 from tool.utils import is_admin
+from tool.executor import run_blocking
 from pyrogram import filters, Client
 from celery.app.control import Control
 from tool.celery_client import celery_client
@@ -72,10 +73,10 @@ async def _next(message: Message, next_step: str):
         )
 
     elif next_step == RateInteractStep.SELECT_WORKER:
-        workers = Worker.objects(
+        workers = await run_blocking(list, Worker.objects(
             hostname__startswith=phase,
             status=WorkerStatus.READY
-        )
+        ))
 
         return await message.reply(
             text='\n\n'.join([
@@ -160,7 +161,8 @@ async def _next(message: Message, next_step: str):
         rate_limit = f'{amount}/{period}' if amount > 0 else 'No limit'
         hostname = workers[worker_index].hostname if worker_index >= 0 else None
 
-        result = control.rate_limit(
+        result = await run_blocking(
+            control.rate_limit,
             task_name=f'{Project.LEECH_DOWNLOADER}.process_download' if Hostname.FILE_LEECH_WORKER in phase else f'{Project.LEECH_UPLOADER}.process_upload',
             rate_limit=rate_limit,
             destination=[hostname] if hostname else None,
@@ -173,7 +175,7 @@ async def _next(message: Message, next_step: str):
             worker: Worker = workers[worker_index]
             worker.rate_limit = {'amount': amount, 'period': period} if amount > 0 else None
             worker.updated_at = datetime.datetime.utcnow()
-            worker.save()
+            await run_blocking(worker.save)
 
             table = pt.PrettyTable(
                 field_names=['Item', 'Current'],
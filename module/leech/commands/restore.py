@@ -1,6 +1,7 @@
 import prettytable as pt
 
 from tool.utils import is_admin
+from tool.executor import run_blocking
 from beans.setting import Setting
 from pyrogram import filters, Client
 from celery.app.control import Control
@@ -60,10 +61,10 @@ async def _next(next_step: str):
     elif next_step == RestoreInteractStep.COMPLETED:
         m: Message = await send_message_to_admin('Got it, please wait...', False)
 
-        current_setting = Setting.objects(
+        current_setting = await run_blocking(Setting.objects(
             key=setting_key,
             value=None
-        ).first()
+        ).first)
 
         await m.delete()
 
@@ -71,7 +72,7 @@ async def _next(next_step: str):
             return await send_message_to_admin('❌ <b>Setting not found</b>', False)
 
         current_setting.value = None
-        current_setting.save()
+        await run_blocking(current_setting.save)
 
         table = pt.PrettyTable(
             field_names=['Item', 'Current'],
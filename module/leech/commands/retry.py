@@ -1,59 +1,63 @@
 import datetime
-from celery import chain
 from tool.utils import is_admin
-from constants.worker import Queue
+from tool.executor import run_blocking
 from pyrogram import Client, filters
 from module.leech.beans.leech_file import LeechFile
 from config.config import FAILED_TASK_EXPIRE_AFTER_DAYS
 from module.leech.utils.button import get_bottom_buttons
-from module.leech.adaptors.uploader import process_upload
 from module.leech.utils.message import send_message_to_admin
-from module.leech.adaptors.downloader import process_download
+from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.constants.error_category import ErrorCategory
 from module.leech.constants.leech_file_status import LeechFileStatus
+from module.leech.utils.task import create_pending_task, create_pending_tasks
+from module.leech.utils.failed_files import get_retry_conditions, get_failed_files, reset_failed_files
+from module.leech.utils.scheduler import get_task_priority, get_free_space
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 COMMAND_PREFIX = 'leech_retry_'
 COMMAND_PREFIX_SINGLE = f'{COMMAND_PREFIX}single_'
+# conditions of every /leech retry command by the id of the message holding its buttons
+retry_conditions: dict[int, dict] = {}
 
 
 def retry_specific_tasks(
-    filter_status: LeechFileStatus
+    filter_status: LeechFileStatus,
+    **kwargs
 ) -> int:
-    leech_files: list[LeechFile] = LeechFile.objects(
-        status=filter_status,
-        created_at__gte=datetime.datetime.utcnow() - datetime.timedelta(days=FAILED_TASK_EXPIRE_AFTER_DAYS)
-    ) if filter_status == LeechFileStatus.DOWNLOAD_FAIL else LeechFile.objects(
-        upload_status=filter_status,
-        created_at__gte=datetime.datetime.utcnow() - datetime.timedelta(days=FAILED_TASK_EXPIRE_AFTER_DAYS)
-    )
+    leech_files: list[LeechFile] = list(get_failed_files(filter_status, **kwargs))
+
+    if len(leech_files) == 0:
+        return 0
+
+    reset_failed_files(leech_files)
+
+    return create_pending_tasks(leech_files)
+
+
+def retry_single_file(file_id: str) -> bool:
+    leech_file: LeechFile | None = LeechFile.objects(id=file_id).first()
+
+    if leech_file is None or leech_file.created_at <= (
+            datetime.datetime.utcnow() - datetime.timedelta(days=FAILED_TASK_EXPIRE_AFTER_DAYS)):
+        return False
 
-    for leech_file in leech_files:
-        leech_file.status = LeechFileStatus.INITIAL
-        leech_file.upload_status = LeechFileStatus.INITIAL
-        leech_file.updated_at = datetime.datetime.utcnow()
-        leech_file.save()
+    leech_file.status = LeechFileStatus.INITIAL
+    leech_file.upload_status = LeechFileStatus.INITIAL
+    leech_file.updated_at = datetime.datetime.utcnow()
+    leech_file.save()
 
-        create_pending_task(leech_file)
+    create_pending_task(leech_file, get_task_priority(leech_file, get_free_space()))
 
-    return len(leech_files)
+    return True
 
 
 @Client.on_callback_query(filters.regex(f'^{COMMAND_PREFIX_SINGLE}'))
 async def retry_single_task(_, query):
     await query.message.delete()
 
-    leech_file: LeechFile | None = LeechFile.objects(id=query.data.removeprefix(COMMAND_PREFIX_SINGLE)).first()
-
-    if leech_file is not None and \
-            leech_file.created_at > (
-                datetime.datetime.utcnow() - datetime.timedelta(days=FAILED_TASK_EXPIRE_AFTER_DAYS)):
-        leech_file.status = LeechFileStatus.INITIAL
-        leech_file.upload_status = LeechFileStatus.INITIAL
-        leech_file.updated_at = datetime.datetime.utcnow()
-        leech_file.save()
-
-        create_pending_task(leech_file)
+    is_retried = await run_blocking(retry_single_file, query.data.removeprefix(COMMAND_PREFIX_SINGLE))
 
+    if is_retried:
         await send_message_to_admin('✅ <b>Task has retried!</b>')
     else:
         await send_message_to_admin('❌ <b>Task not exist or expired</b>')
@@ -62,36 +66,43 @@ async def retry_single_task(_, query):
 @Client.on_callback_query(filters.regex(f'^{COMMAND_PREFIX}'))
 async def interact_callback(_, query):
     status = query.data.removeprefix(COMMAND_PREFIX)
+    conditions = retry_conditions.pop(query.message.id, None)
 
     await query.message.delete()
 
+    # the conditions are kept in memory only, they are lost when the bot restarts
+    if conditions is None:
+        return await send_message_to_admin('❌ <b>Options expired, send /leech retry again</b>')
+
     if status == 'both':
-        download_count = retry_specific_tasks(LeechFileStatus.DOWNLOAD_FAIL)
-        upload_count = retry_specific_tasks(LeechFileStatus.UPLOAD_FAIL)
+        download_count = await run_blocking(retry_specific_tasks, LeechFileStatus.DOWNLOAD_FAIL, **conditions)
+        upload_count = await run_blocking(retry_specific_tasks, LeechFileStatus.UPLOAD_FAIL, **conditions)
         message = f'✅ <b>{download_count + upload_count} tasks has retried!</b>'
     else:
-        count = retry_specific_tasks(status)
+        count = await run_blocking(retry_specific_tasks, LeechFileStatus(status), **conditions)
         message = f'✅ <b>{count} tasks has retried!</b>'
 
     await send_message_to_admin(message)
 
 
-def create_pending_task(leech_file: LeechFile):
-    chain(
-        process_download.signature(
-            (leech_file,),
-            queue=f'{Queue.FILE_DOWNLOAD_QUEUE}@{leech_file.tool}'
-        ),
-        process_upload.signature(queue=f'{Queue.FILE_SYNC_QUEUE}@{leech_file.sync_tool}')
-    ).apply_async()
-
-
 @Client.on_message(filters.command('leech retry') & filters.private & is_admin)
 async def leech_retry(_: Client, message: Message):
-    await message.reply(
+    try:
+        conditions = get_retry_conditions(message.command[1:])
+    except (Exception, SystemExit):
+        return await message.reply(
+            text='\n\n'.join([
+                '<b>Usage</b>',
+                '<code>/leech retry [--tool TOOL] [--host HOST] [--error ERROR] [--batch BATCH] [--days DAYS]</code>',
+                f'<b>TOOL</b>: {", ".join(LeechFileTool)}',
+                f'<b>ERROR</b>: {", ".join(ErrorCategory)}',
+            ])
+        )
+
+    reply = await message.reply(
         text='\n\n'.join([
             f'<b>Tasks will download/upload again if they are failed within {FAILED_TASK_EXPIRE_AFTER_DAYS} days,</b>',
-            '<b>but it will take a while to handle for you if there are too many of them,</b>',
+            *[f'<b>{key}</b>: <code>{value}</code>' for key, value in conditions.items()],
             '<b>now choose an option below and go on.</b>',
         ]),
         reply_markup=InlineKeyboardMarkup([
@@ -116,3 +127,5 @@ async def leech_retry(_: Client, message: Message):
             get_bottom_buttons('', should_have_return=False)
         ])
     )
+
+    retry_conditions[reply.id] = conditions
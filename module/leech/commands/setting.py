@@ -1,6 +1,7 @@
 import prettytable as pt
 
 from tool.utils import is_admin
+from tool.executor import run_blocking
 from beans.setting import Setting
 from pyrogram import filters, Client
 from celery.app.control import Control
@@ -86,13 +87,13 @@ async def _next(next_step: str):
         alist_dest = \
             alist_storages[int(dest)].get('mount_path') if (tool == LeechFileSyncTool.ALIST and dest != '') else None
 
-        Setting(
+        await run_blocking(Setting(
             key=SettingKey.FILE_UPLOAD_DESTINATION,
             value={
                 'tool': tool,
                 'dest': alist_dest or dest
             }
-        ).save()
+        ).save)
 
         await m.delete()
 
@@ -133,6 +134,8 @@ async def consume_callback(_, query):
 async def leech_setting(_: Client, message: Message):
     global current_setting_step, current_upload_setting
 
-    current_upload_setting = getattr(Setting.objects(key=SettingKey.FILE_UPLOAD_DESTINATION).first(), 'value', {})
+    current_upload_setting = getattr(
+        await run_blocking(Setting.objects(key=SettingKey.FILE_UPLOAD_DESTINATION).first), 'value', {}
+    )
     current_setting_step = SettingInteractStep.SELECT_UPLOAD_TOOL
     await _next(current_setting_step)
@@ -1,11 +1,19 @@
+import datetime
+from loguru import logger
 from tool.utils import is_admin
+from tool.executor import run_blocking
+from constants.worker import Queue
 from pyrogram import Client, filters
 from celery.app.control import Control
 from tool.celery_client import celery_client
+from module.leech.beans.leech_file import LeechFile
 from module.leech.beans.leech_task import LeechTask
 from module.leech.utils.button import get_bottom_buttons
 from module.leech.constants.task import TaskType, TaskStatus
 from module.leech.utils.message import send_message_to_admin
+from module.leech.utils.cancellation import request_cancellation
+from module.leech.constants.leech_file_status import LeechFileStatus
+from module.leech.constants.leech_file_tool import LeechFileTool, LeechFileSyncTool
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 COMMAND_PREFIX = 'leech_terminate_'
@@ -19,35 +27,81 @@ async def interact_callback(_, query):
     await query.message.delete()
 
     if task_type == 'both':
-        terminate_specific_tasks(TaskType.DOWNLOAD)
-        terminate_specific_tasks(TaskType.UPLOAD)
+        # stop uploads first, or the terminated downloads would make them skip one by one
+        results = [
+            await run_blocking(terminate_specific_tasks, TaskType.UPLOAD),
+            await run_blocking(terminate_specific_tasks, TaskType.DOWNLOAD),
+        ]
         message = '<b>All pending tasks has terminated!</b>'
     else:
-        terminate_specific_tasks(task_type)
+        results = [await run_blocking(terminate_specific_tasks, TaskType(task_type))]
         message = f'<b>All pending {task_type.lower()} tasks has terminated!</b>'
 
-    await send_message_to_admin(message)
+    await send_message_to_admin('\n'.join([
+        message,
+        f'Revoked: {sum(map(lambda x: x["revoked"], results))}',
+        f'Purged from queues: {sum(map(lambda x: x["purged"], results))}',
+        f'Cancelled while running: {sum(map(lambda x: x["cancelled"], results))}',
+    ]))
 
 
-def terminate_specific_tasks(task_type: TaskType, task_status: TaskStatus = TaskStatus.INITIAL):
+def get_queue_names(task_type: TaskType) -> list[str]:
+    if task_type == TaskType.DOWNLOAD:
+        return [f'{Queue.FILE_DOWNLOAD_QUEUE}@{tool}' for tool in LeechFileTool]
+
+    return [f'{Queue.FILE_SYNC_QUEUE}@{tool}' for tool in LeechFileSyncTool]
+
+
+def purge_queues(queue_names: list[str]) -> int:
+    number_of_purged_messages = 0
+
+    with celery_client.connection_for_write() as connection:
+        for queue_name in queue_names:
+            try:
+                number_of_purged_messages += connection.default_channel.queue_purge(queue_name) or 0
+            except Exception as e:
+                logger.error(f'Fail to purge queue "{queue_name}": {str(e)}')
+
+    return number_of_purged_messages
+
+
+def terminate_specific_tasks(task_type: TaskType, task_status: TaskStatus = TaskStatus.INITIAL) -> dict:
+    status_field = 'status' if task_type == TaskType.DOWNLOAD else 'upload_status'
+    running_status = LeechFileStatus.DOWNLOADING if task_type == TaskType.DOWNLOAD else LeechFileStatus.UPLOADING
+    updated_at = datetime.datetime.utcnow()
+
+    # tasks received by workers, including the ones waiting for retry countdown
     leech_tasks = LeechTask.objects(status=task_status, type__=task_type)
+    task_ids = leech_tasks.distinct('task_id')
+
+    if len(task_ids) > 0:
+        control_instance.revoke(task_ids)
+
+    # tasks not received by any worker yet
+    number_of_purged_messages = purge_queues(get_queue_names(task_type))
+
+    # transfers in progress stop on their own, then clean up the part files
+    running_file_ids = LeechFile.objects(**{status_field: running_status}).distinct('id')
+    request_cancellation(running_file_ids)
+
+    leech_tasks.update(status=TaskStatus.TERMINATED, updated_at=updated_at)
+
+    waiting_conditions = {status_field: LeechFileStatus.INITIAL}
+
+    # files waiting for upload have finished downloading
+    if task_type == TaskType.UPLOAD:
+        waiting_conditions['status__in'] = [LeechFileStatus.DOWNLOAD_SUCCESS, LeechFileStatus.SKIP_DOWNLOAD]
+
+    LeechFile.objects(**waiting_conditions).update(
+        **{status_field: LeechFileStatus.TERMINATED},
+        updated_at=updated_at
+    )
 
-    if len(leech_tasks) == 0:
-        return
-
-    # for leech_task in leech_tasks:
-    #     response = AsyncResult(id=leech_task.task_id, app=celery_client).revoke(terminate=True, wait=True, timeout=3, signal='QUIT')
-    #     continue
-    #
-    # leech_tasks.update(
-    #     status=TaskStatus.DONE,
-    #     updated_at=datetime.datetime.utcnow()
-    # )
-    #
-    # LeechFile.objects(id__in=list(map(lambda x: x.file_id, leech_tasks))).update(
-    #     status=LeechFileStatus.TERMINATED,
-    #     updated_at=datetime.datetime.utcnow()
-    # )
+    return {
+        'revoked': len(task_ids),
+        'purged': number_of_purged_messages,
+        'cancelled': len(running_file_ids),
+    }
 
 
 @Client.on_message(filters.command('leech terminate') & filters.private & is_admin)
@@ -0,0 +1,95 @@
+import datetime
+import argparse
+from beans.setting import Setting
+from tool.utils import is_admin
+from tool.executor import run_blocking
+from pyrogram import filters, Client
+from pyrogram.types import Message
+from constants.setting import SettingKey
+from config.config import SUBSCRIPTION_DEFAULT_INTERVAL_MINUTES
+from module.leech.utils.message import send_message_to_admin
+from module.leech.utils.subscription import clear_seen_files
+from module.leech.beans.leech_subscription import LeechSubscription
+from module.leech.constants.leech_file_tool import LeechFileSyncTool
+
+# checks more often than this cost requests without finding anything
+MINIMUM_INTERVAL_MINUTES = 10
+
+
+def parse_arguments(arguments: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Check links for new files periodically.')
+    parser.add_argument('link', nargs='?')
+    parser.add_argument('--interval', type=int, default=SUBSCRIPTION_DEFAULT_INTERVAL_MINUTES, help='In minutes.')
+    parser.add_argument('--all', action='store_true', help='Download the files already there as well.')
+    parser.add_argument('--remove', help='Stop checking the link of the id.')
+
+    return parser.parse_args(arguments)
+
+
+def format_subscription(subscription: LeechSubscription) -> str:
+    checked_at = subscription.checked_at.strftime('%Y-%m-%d %H:%M') if subscription.checked_at else 'never'
+
+    return '\n'.join([
+        f'<code>{subscription.id}</code> {subscription.link}',
+        f'Every {subscription.interval} min to {subscription.sync_tool} {subscription.sync_path or ""}, '
+        f'checked {checked_at}, {subscription.new_files} new',
+    ])
+
+
+def remove_subscription(subscription_id: str) -> bool:
+    if LeechSubscription.objects(id=subscription_id).delete() == 0:
+        return False
+
+    clear_seen_files(subscription_id)
+
+    return True
+
+
+@Client.on_message(filters.command('leech watch') & filters.private & is_admin)
+async def leech_watch(_: Client, message: Message):
+    try:
+        args = parse_arguments(message.command[1:])
+    except (Exception, SystemExit):
+        return await send_message_to_admin('\n'.join([
+            '<b>/leech watch [link] [--interval minutes] [--all] [--remove id]</b>',
+            'Parse the link again periodically and download the new files only, list the watched links without link.',
+        ]), False)
+
+    if args.remove:
+        is_removed = await run_blocking(remove_subscription, args.remove)
+
+        return await send_message_to_admin(
+            f'Stop watching <code>{args.remove}</code>.' if is_removed else f'<code>{args.remove}</code> not found.'
+        )
+
+    if not args.link:
+        subscriptions = await run_blocking(lambda: list(LeechSubscription.objects.order_by('created_at')))
+
+        return await send_message_to_admin(
+            '\n\n'.join(map(format_subscription, subscriptions)) if subscriptions else 'No link is watched.', False
+        )
+
+    # the checks run unattended, so files go to the default destination instead of asking for one
+    upload_setting = getattr(
+        await run_blocking(Setting.objects(key=SettingKey.FILE_UPLOAD_DESTINATION).first), 'value', {}
+    )
+
+    if not upload_setting.get('tool'):
+        return await send_message_to_admin('Set the default destination with /leech setting first.')
+
+    subscription = LeechSubscription(
+        link=args.link,
+        interval=max(args.interval, MINIMUM_INTERVAL_MINUTES),
+        sync_tool=LeechFileSyncTool(upload_setting['tool']),
+        sync_path=upload_setting.get('dest'),
+        download_existing=args.all,
+        next_check_at=datetime.datetime.utcnow()
+    )
+    await run_blocking(subscription.save, force_insert=True)
+
+    await send_message_to_admin('\n\n'.join([
+        '🎉 <b>Link is watched!</b>',
+        format_subscription(subscription),
+        'Files already there are downloaded at the first check.' if args.all else
+        'Files already there are skipped, only new files are downloaded.',
+    ]), False)
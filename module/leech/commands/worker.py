@@ -1,9 +1,11 @@
 import time
+import asyncio
 import prettytable as pt
 from beans.worker import Worker
 from pyrogram import filters, Client
 from constants.worker import Hostname
 from celery.app.control import Control
+from tool.executor import run_blocking
 from tool.celery_client import celery_client
 from module.leech.utils.button import get_bottom_buttons
 from constants.worker import Project, Queue, WorkerStatus
@@ -55,12 +57,12 @@ def get_queue_buttons(
     ]
 
 
-def wait_expect_worker_status(hostname: str, status: WorkerStatus, timeout: float) -> bool:
+async def wait_expect_worker_status(hostname: str, status: WorkerStatus, timeout: float) -> bool:
     while time.time() < timeout:
-        if Worker.objects(hostname=hostname, status=status).first():
+        if await run_blocking(Worker.objects(hostname=hostname, status=status).first):
             return True
 
-        time.sleep(5)
+        await asyncio.sleep(5)
 
     return False
 
@@ -97,15 +99,15 @@ async def _next(message: Message, next_step: str):
     hostname = f'{worker}@{queue}'
 
     if next_step == ConsumeInteractStep.SELECT_WORKER:
-        download_worker_count = Worker.objects(
+        download_worker_count = await run_blocking(Worker.objects(
             hostname__startswith=f'{Hostname.FILE_LEECH_WORKER}@{Queue.FILE_DOWNLOAD_QUEUE}@',
             status=WorkerStatus.READY
-        ).count()
+        ).count)
 
-        upload_worker_count = Worker.objects(
+        upload_worker_count = await run_blocking(Worker.objects(
             hostname__startswith=f'{Hostname.FILE_SYNC_WORKER}@{Queue.FILE_SYNC_QUEUE}@',
             status=WorkerStatus.READY
-        ).count()
+        ).count)
 
         return await message.reply(
             text='\n\n'.join([
@@ -137,6 +139,8 @@ async def _next(message: Message, next_step: str):
         )
 
     elif next_step == ConsumeInteractStep.SELECT_AMOUNT:
+        running_worker = await run_blocking(Worker.objects(hostname=hostname, status=WorkerStatus.READY).first)
+
         return await message.reply(
             text='\n\n'.join([
                 '<b>Amount</b>',
@@ -148,7 +152,7 @@ async def _next(message: Message, next_step: str):
                         text=f'Change to 0 (shutdown worker)',
                         callback_data=f'{ButtonCallbackPrefix.LEECH_CONSUME_AMOUNT}{0}',
                     )
-                ] if Worker.objects(hostname=hostname, status=WorkerStatus.READY).first() else None,
+                ] if running_worker else None,
                 *list(map(lambda x: [
                     InlineKeyboardButton(
                         text=f'Change to {x}',
@@ -161,6 +165,9 @@ async def _next(message: Message, next_step: str):
 
     elif next_step == ConsumeInteractStep.SELECT_QUEUE:
         is_leech_worker_selected = consume_react_value.get('worker') == Hostname.FILE_LEECH_WORKER
+        worker_names = await run_blocking(
+            lambda: list(map(lambda x: x.hostname, Worker.objects(status=WorkerStatus.READY).only('hostname')))
+        )
 
         return await message.reply(
             text='\n\n'.join([
@@ -181,7 +188,7 @@ async def _next(message: Message, next_step: str):
                         )
                     ),
                     consume_react_value.get('worker'),
-                    list(map(lambda x: x.hostname, Worker.objects(status=WorkerStatus.READY).only('hostname')))
+                    worker_names
                 )
             )
         )
@@ -197,14 +204,14 @@ async def _next(message: Message, next_step: str):
                 amount
             )
 
-            if not wait_expect_worker_status(hostname, WorkerStatus.READY, time.time() + 60):
+            if not (await wait_expect_worker_status(hostname, WorkerStatus.READY, time.time() + 60)):
                 await m.delete()
                 await send_message_to_admin(content='Failed to start worker, please try again later.')
                 return False
 
             return True
 
-        matched_worker: Worker = Worker.objects(hostname=hostname).first()
+        matched_worker: Worker = await run_blocking(Worker.objects(hostname=hostname).first)
 
         if not matched_worker or matched_worker.status == WorkerStatus.SHUTDOWN:
             if not (await wait_until_worker_ready()):
@@ -232,9 +239,9 @@ async def _next(message: Message, next_step: str):
             )
             return
 
-        control.shutdown(destination=[hostname], reply=True)
+        await run_blocking(control.shutdown, destination=[hostname], reply=True)
 
-        has_shutdown = wait_expect_worker_status(hostname, WorkerStatus.SHUTDOWN, time.time() + 60)
+        has_shutdown = await wait_expect_worker_status(hostname, WorkerStatus.SHUTDOWN, time.time() + 60)
 
         await m.delete()
         if amount == 0 and has_shutdown:
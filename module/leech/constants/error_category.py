@@ -0,0 +1,18 @@
+from enum import StrEnum
+
+
+class ErrorCategory(StrEnum):
+    # HTTP 429 or flood wait
+    RATE_LIMITED = 'RATE_LIMITED'
+    # HTTP 5xx
+    SERVER_ERROR = 'SERVER_ERROR'
+    TIMEOUT = 'TIMEOUT'
+    # connection refused, reset or closed before the whole body is received
+    NETWORK_ERROR = 'NETWORK_ERROR'
+    # host redirects to its maintenance page
+    MAINTENANCE = 'MAINTENANCE'
+    # HTTP 401/403, token or signed link expired
+    AUTH_EXPIRED = 'AUTH_EXPIRED'
+    # HTTP 404/410
+    NOT_FOUND = 'NOT_FOUND'
+    UNKNOWN = 'UNKNOWN'
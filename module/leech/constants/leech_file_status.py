@@ -11,3 +11,4 @@ class LeechFileStatus(StrEnum):
     UPLOAD_SUCCESS = 'UPLOAD_SUCCESS'
     UPLOAD_FAIL = 'UPLOAD_FAIL'
     SKIP_UPLOAD = 'SKIP_UPLOAD'
+    TERMINATED = 'TERMINATED'
@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class ScheduleStrategy(StrEnum):
+    # first in, first out
+    FIFO = 'FIFO'
+    # shortest job first
+    SJF = 'SJF'
@@ -8,11 +8,24 @@ from urllib.parse import urlparse
 
 from tool.user_agents import get_random_user_agent
 from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.retry import classify_exception, get_retry_after
+from module.leech.utils.cancellation import CancellationToken, TaskCancelledError
+from module.leech.utils.parse_cache import invalidate_link
+from tool.disk_usage import report_usage
+from tool.network_usage import download_meter
+from tool.task_metrics import Stage, measure, download_labels
 from tool.utils import get_redis_unique_key, clean_local_file
 from module.leech.constants.leech_file_status import LeechFileStatus
 from config.config import SKIP_DUPLICATE_LINK_WITHIN_DAYS, WRITE_STREAM_CONNECT_TIMEOUT
 
 
+def report_downloaded_file(leech_file: LeechFile):
+    full_name = leech_file.get_full_name()
+
+    if os.path.isfile(full_name):
+        report_usage(full_name, size=os.path.getsize(full_name), files=1)
+
+
 def check_before_download(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechFile, **kwargs) -> LeechFile:
@@ -41,7 +54,9 @@ def check_before_download(f):
                 leech_file.reason = 'File already exist.'
                 return leech_file
 
-        os.makedirs(leech_file.location, exist_ok=True)
+        if not os.path.isdir(leech_file.location):
+            os.makedirs(leech_file.location, exist_ok=True)
+            report_usage(leech_file.location, dirs=1)
 
         return f(self, leech_file, **kwargs)
 
@@ -71,21 +86,31 @@ def write_file(f):
 
         parse_result = urlparse(leech_file.link)
 
-        with httpx.stream('get', getattr(leech_file, 'actual_link', leech_file.link), headers={
+        with measure(Stage.TRANSFER, download_labels(leech_file)), \
+                httpx.stream('get', getattr(leech_file, 'actual_link', leech_file.link), headers={
             'User-Agent': get_random_user_agent(),
             'Referer': f'{parse_result.scheme}://{parse_result.netloc}'
         }, timeout=WRITE_STREAM_CONNECT_TIMEOUT) as r:
             if r.status_code != _status_codes.codes.OK:
-                leech_file.status = LeechFileStatus.DOWNLOAD_FAIL
-                leech_file.reason = f"Error downloading \"{leech_file.name}\": {r.status_code}."
-                return leech_file
+                # the resolved url may have expired, resolve it again when retrying
+                if r.status_code in [_status_codes.codes.UNAUTHORIZED, _status_codes.codes.FORBIDDEN]:
+                    invalidate_link(leech_file.link)
+
+                raise httpx.HTTPStatusError(
+                    f"Error downloading \"{leech_file.name}\": {r.status_code}.", request=r.request, response=r
+                )
 
             leech_file.size = int(r.headers.get('content-length', -1))
 
-            with open(leech_file.get_temp_full_name(), 'wb') as file:
+            cancellation = CancellationToken(leech_file.id)
+
+            with open(leech_file.get_temp_full_name(), 'wb') as file, download_meter(leech_file) as meter:
                 for chunk in r.iter_bytes(chunk_size=8192):
+                    cancellation.raise_if_cancelled()
+
                     if chunk is not None:
                         file.write(chunk)
+                        meter.add(len(chunk))
 
         return f(self, leech_file, **kwargs)
 
@@ -97,7 +122,10 @@ def move_file(f):
     def wrapper(self, leech_file: LeechFile, **kwargs) -> LeechFile:
         temp_full_name = leech_file.get_temp_full_name()
         if os.path.exists(temp_full_name) and os.path.getsize(temp_full_name) == leech_file.size:
-            shutil.move(temp_full_name, leech_file.get_full_name())
+            with measure(Stage.MOVE, download_labels(leech_file)):
+                shutil.move(temp_full_name, leech_file.get_full_name())
+
+            report_downloaded_file(leech_file)
             leech_file.status = LeechFileStatus.DOWNLOAD_SUCCESS
             return leech_file
 
@@ -112,8 +140,11 @@ def catch_download_exception(f):
         try:
             f(self, leech_file, **kwargs)
         except Exception as e:
-            leech_file.status = LeechFileStatus.DOWNLOAD_FAIL
+            leech_file.status = LeechFileStatus.TERMINATED if isinstance(e, TaskCancelledError) else \
+                LeechFileStatus.DOWNLOAD_FAIL
             leech_file.reason = str(e)
+            leech_file.error_category = classify_exception(e)
+            leech_file.retry_after = get_retry_after(e)
             clean_local_file(leech_file)
 
             return leech_file
@@ -1,11 +1,11 @@
 import functools
-from celery import chain
+from typing import Iterator
 from loguru import logger
-from constants.worker import Queue
 from tool.utils import get_redis_unique_key
 from module.leech.beans.leech_file import LeechFile
-from module.leech.adaptors.uploader import process_upload
-from module.leech.adaptors.downloader import process_download
+from module.leech.utils.task import create_pending_task
+from module.leech.utils.scheduler import order_leech_files
+from module.leech.utils.parse_cache import get_cached_files, cache_files
 
 
 def catch_parse_exception(f):
@@ -25,30 +25,78 @@ def catch_parse_exception(f):
 def create_document(f):
     @functools.wraps(f)
     def wrapper(self, link: str, **kwargs) -> list[LeechFile]:
-        leech_files: list[LeechFile] = f(self, link, **kwargs)
+        result: list[LeechFile] | Iterator[list[LeechFile]] = f(self, link, **kwargs)
 
         queued_files = []
 
-        for leech_file in leech_files:
-            try:
-                leech_file.sync_tool = kwargs.get('sync_tool')
-                leech_file.sync_path = kwargs.get('sync_path')
-                leech_file.file_hash = get_redis_unique_key(leech_file)
-
-                chain(
-                    process_download.signature(
-                        (leech_file,),
-                        queue=f'{Queue.FILE_DOWNLOAD_QUEUE}@{leech_file.tool}'
-                    ),
-                    process_upload.signature(queue=f'{Queue.FILE_SYNC_QUEUE}@{leech_file.sync_tool}')
-                ).apply_async()
-
-                leech_file.save(force_insert=True)
-                queued_files.append(leech_file)
-            except Exception as e:
-                logger.error(e)
-                pass
+        # parsers walking big folders yield the files batch by batch, queue each batch as soon as it is found
+        for leech_files in [result] if isinstance(result, list) else result:
+            # a subscription only queues the files it has not seen before
+            if kwargs.get('file_filter') is not None:
+                leech_files = kwargs['file_filter'](leech_files)
+
+            for leech_file, priority in order_leech_files(leech_files):
+                try:
+                    leech_file.sync_tool = kwargs.get('sync_tool')
+                    leech_file.sync_path = kwargs.get('sync_path')
+                    leech_file.batch = kwargs.get('batch')
+                    leech_file.file_hash = get_redis_unique_key(leech_file)
+
+                    create_pending_task(leech_file, priority)
+
+                    leech_file.save(force_insert=True)
+                    queued_files.append(leech_file)
+                except Exception as e:
+                    logger.error(e)
+                    pass
 
         return queued_files
 
     return wrapper
+
+
+def cache_batches(link: str, batches: Iterator[list[LeechFile]], password: str = None) -> Iterator[list[LeechFile]]:
+    leech_files = []
+    batches = iter(batches)
+
+    while True:
+        try:
+            batch = next(batches)
+        except StopIteration as stop:
+            # a walker returns False when a part of the link could not be listed
+            is_complete = stop.value is not False
+            break
+
+        leech_files.extend(batch)
+        yield batch
+
+    if not is_complete:
+        logger.warning(f'Parse result of {link} is incomplete, not cached')
+        return
+
+    cache_files(link, leech_files, password)
+
+
+def cache_parse_result(f):
+    @functools.wraps(f)
+    def wrapper(self, link: str, **kwargs) -> list[LeechFile]:
+        # an incremental run only lists what is new since the last run
+        if kwargs.get('incremental'):
+            return f(self, link, **kwargs)
+
+        # re-submitting an album after a partial failure lists the same files again
+        leech_files = get_cached_files(link, kwargs.get('password'))
+
+        if leech_files is not None:
+            logger.info(f'Reuse parse result of {link}')
+            return leech_files
+
+        result = f(self, link, **kwargs)
+
+        if isinstance(result, list):
+            cache_files(link, result, kwargs.get('password'))
+            return result
+
+        return cache_batches(link, result, kwargs.get('password'))
+
+    return wrapper
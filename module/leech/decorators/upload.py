@@ -3,6 +3,8 @@ from loguru import logger
 
 from tool.utils import clean_local_file
 from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.retry import classify_exception, get_retry_after
+from module.leech.utils.cancellation import TaskCancelledError
 from module.leech.constants.leech_file_status import LeechFileStatus
 
 
@@ -13,8 +15,11 @@ def catch_upload_exception(f):
             return f(self, leech_file, **kwargs)
         except Exception as e:
             logger.error(f'Failed to upload file "{leech_file.name}" to "{leech_file.sync_path}".', str(e))
-            leech_file.upload_status = LeechFileStatus.UPLOAD_FAIL
+            leech_file.upload_status = LeechFileStatus.TERMINATED if isinstance(e, TaskCancelledError) else \
+                LeechFileStatus.UPLOAD_FAIL
             leech_file.upload_reason = str(e)
+            leech_file.upload_error_category = classify_exception(e)
+            leech_file.retry_after = get_retry_after(e)
 
         return leech_file
 
@@ -24,6 +29,11 @@ def catch_upload_exception(f):
 def check_before_upload(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechFile, **kwargs) -> LeechFile:
+        # cancelled while downloading, the upload is cancelled as well instead of skipped
+        if leech_file.status == LeechFileStatus.TERMINATED:
+            leech_file.upload_status = LeechFileStatus.TERMINATED
+            return leech_file
+
         if leech_file.status == LeechFileStatus.SKIP_DOWNLOAD and \
                 leech_file.upload_status == LeechFileStatus.UPLOADING:
             leech_file.upload_status = LeechFileStatus.SKIP_UPLOAD
@@ -1,3 +1,4 @@
+import time
 import httpx
 import datetime
 import functools
@@ -5,9 +6,15 @@ from loguru import logger
 from httpx import _status_codes
 
 from tool.utils import get_redis_unique_key
+from tool.network_usage import download_meter
+from tool.task_metrics import Stage, measure, download_labels
 from tool.user_agents import get_random_user_agent
 from module.leech.beans.leech_file import LeechFile
-from module.leech.utils.bunkr import parse_bunkr_link
+from module.leech.utils.retry import MaintenanceError
+from module.leech.utils.cancellation import CancellationToken
+from module.leech.utils.bunkr import parse_bunkr_link, get_node, get_node_down_seconds, mark_node_down, \
+    record_node_failure, MAINTENANCE_LINK, NODE_MAINTENANCE_SECONDS
+from module.leech.utils.parse_cache import invalidate_link
 from module.leech.interfaces.downloader import IDownloader
 from module.leech.beans.leech_bunkr_file import LeechBunkrFile
 from module.leech.constants.leech_file_tool import LeechFileTool
@@ -20,8 +27,19 @@ from module.leech.decorators.download import check_before_download, check_after_
 def get_bunkr_actual_link(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechBunkrFile, **kwargs) -> LeechBunkrFile:
+        # resolved with a key which has rotated while the file was queued
+        if leech_file.actual_link is not None and leech_file.actual_link_expire_at is not None and \
+                leech_file.actual_link_expire_at <= time.time():
+            leech_file.actual_link = None
+
+        # the file may be served by another node when it is resolved again
+        if leech_file.actual_link is not None and get_node_down_seconds(get_node(leech_file.actual_link)) > 0:
+            leech_file.actual_link = None
+            invalidate_link(leech_file.link)
+
         if leech_file.actual_link is None:
-            leech_files: list[LeechBunkrFile] = parse_link(leech_file.link)
+            with measure(Stage.RESOLVE, download_labels(leech_file)):
+                leech_files: list[LeechBunkrFile] = parse_link(leech_file.link)
 
             if len(leech_files) == 0 or leech_files[0] is None:
                 leech_file.status = LeechFileStatus.DOWNLOAD_FAIL
@@ -29,21 +47,53 @@ def get_bunkr_actual_link(f):
                 return leech_file
 
             leech_file.actual_link = leech_files[0].actual_link
+            leech_file.actual_link_expire_at = leech_files[0].actual_link_expire_at
             leech_file.name = leech_files[0].name
             leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
 
+        node = get_node(leech_file.actual_link)
+        down_seconds = get_node_down_seconds(node)
+
+        # still on the same node, requeued until the node is expected back instead of failing on it again
+        if down_seconds > 0:
+            raise MaintenanceError(
+                f"Error downloading \"{leech_file.name}\": Node {node} is down, retry in {down_seconds}s.",
+                retry_after=down_seconds
+            )
+
         return f(self, leech_file, **kwargs)
 
     return wrapper
 
 
+def track_node_health(f):
+    @functools.wraps(f)
+    def wrapper(self, leech_file: LeechBunkrFile, **kwargs) -> LeechBunkrFile:
+        node = get_node(leech_file.actual_link)
+
+        try:
+            return f(self, leech_file, **kwargs)
+        except MaintenanceError:
+            mark_node_down(node, NODE_MAINTENANCE_SECONDS)
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= _status_codes.codes.INTERNAL_SERVER_ERROR:
+                record_node_failure(node)
+            raise
+        except httpx.TransportError:
+            record_node_failure(node)
+            raise
+
+    return wrapper
+
+
 def write_bunkr_file(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechBunkrFile, **kwargs) -> LeechBunkrFile:
         if leech_file.status != LeechFileStatus.DOWNLOADING:
             return leech_file
 
-        with httpx.stream(
+        with measure(Stage.TRANSFER, download_labels(leech_file)), httpx.stream(
             'get',
             leech_file.actual_link,
             headers={
@@ -54,21 +104,29 @@ def write_bunkr_file(f):
             timeout=WRITE_STREAM_CONNECT_TIMEOUT
         ) as r:
             if r.status_code not in [_status_codes.codes.OK, _status_codes.codes.PARTIAL_CONTENT]:
-                leech_file.status = LeechFileStatus.DOWNLOAD_FAIL
-                leech_file.reason = f"Error downloading \"{leech_file.name}\": {r.status_code}."
-                return leech_file
+                # signed link may expire, resolve it again when retrying
+                if r.status_code in [_status_codes.codes.UNAUTHORIZED, _status_codes.codes.FORBIDDEN]:
+                    leech_file.actual_link = None
+                    invalidate_link(leech_file.link)
 
-            if r.url == "https://bnkr.b-cdn.net/maintenance.mp4":
-                leech_file.status = LeechFileStatus.DOWNLOAD_FAIL
-                leech_file.reason = f"Error downloading \"{leech_file.name}\": Server is down for maintenance."
-                return leech_file
+                raise httpx.HTTPStatusError(
+                    f"Error downloading \"{leech_file.name}\": {r.status_code}.", request=r.request, response=r
+                )
+
+            if r.url == MAINTENANCE_LINK:
+                raise MaintenanceError(f"Error downloading \"{leech_file.name}\": Server is down for maintenance.")
 
             leech_file.size = int(r.headers.get('content-length', -1))
 
-            with open(leech_file.get_temp_full_name(), 'wb') as file:
+            cancellation = CancellationToken(leech_file.id)
+
+            with open(leech_file.get_temp_full_name(), 'wb') as file, download_meter(leech_file) as meter:
                 for chunk in r.iter_bytes(chunk_size=8192):
+                    cancellation.raise_if_cancelled()
+
                     if chunk is not None:
                         file.write(chunk)
+                        meter.add(len(chunk))
 
         return f(self, leech_file, **kwargs)
 
@@ -77,6 +135,7 @@ def write_bunkr_file(f):
 
 def parse_link(link: str, **kwargs) -> list[LeechBunkrFile]:
     try:
+        # resolutions are cached by parse_bunkr_link until the key of their hour rotates
         return parse_bunkr_link(link, **kwargs)
     except Exception as e:
         logger.error(f'Error parse link {link}: {str(e)}')
@@ -91,6 +150,7 @@ class Bunkr(IDownloader):
     @catch_download_exception
     @get_bunkr_actual_link
     @check_before_download
+    @track_node_health
     @write_bunkr_file
     @check_after_download
     @move_file
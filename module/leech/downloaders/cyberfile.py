@@ -2,13 +2,16 @@ import re
 import httpx
 import datetime
 import functools
-from bs4 import BeautifulSoup
+from httpx import _status_codes
 from tool.utils import get_redis_unique_key
+from tool.task_metrics import Stage, measure, download_labels
 from config.config import BOT_DOWNLOAD_LOCATION
 from module.leech.beans.leech_file import LeechFile
 from module.leech.interfaces.downloader import IDownloader
 from module.leech.beans.leech_bunkr_file import LeechBunkrFile
 from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.utils.parse_cache import get_cached_resolution, cache_resolution
+from module.leech.utils.cyberfile import get_file_details
 from module.leech.decorators.download import check_before_download, write_file, check_after_download, move_file, \
     catch_download_exception
 
@@ -16,18 +19,25 @@ from module.leech.decorators.download import check_before_download, write_file,
 def get_file_info(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechBunkrFile, **kwargs) -> LeechFile:
-        response = httpx.post(f'https://cyberfile.me/account/ajax/file_details', data={
-            'u': int(re.findall(r'showFileInformation\((\d+)\)', httpx.get(leech_file.link).text)[0])
-        }).json()
-
-        if response['success'] and 'albumPasswordModel' not in response['html']:
-            video = BeautifulSoup(response['html'], 'html.parser').select_one('video source')
-
-            leech_file.remote_folder = response['page_url'].split('/')[-1]
-            leech_file.name = response['page_title']
-            leech_file.actual_link = video.get('src') if video is not None else re.findall(
-                r"openUrl\('(.*)'\)",
-                response['html'])[0]
+        # files of folders are resolved by the parser already
+        if leech_file.actual_link is not None:
+            return f(self, leech_file, **kwargs)
+
+        resolution = get_cached_resolution(leech_file.link)
+
+        if resolution is None:
+            with measure(Stage.RESOLVE, download_labels(leech_file)):
+                resolution = get_file_details(
+                    re.findall(r'showFileInformation\((\d+)\)', httpx.get(leech_file.link).text)[0]
+                )
+
+            if resolution is not None:
+                cache_resolution(leech_file.link, leech_file.tool, resolution)
+
+        if resolution is not None:
+            leech_file.remote_folder = resolution['remote_folder']
+            leech_file.name = resolution['name']
+            leech_file.actual_link = resolution['actual_link']
             leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
 
         return f(self, leech_file, **kwargs)
@@ -35,6 +45,21 @@ def get_file_info(f):
     return wrapper
 
 
+def reset_expired_link(f):
+    @functools.wraps(f)
+    def wrapper(self, leech_file: LeechBunkrFile, **kwargs) -> LeechFile:
+        try:
+            return f(self, leech_file, **kwargs)
+        except httpx.HTTPStatusError as e:
+            # the url resolved at parse time may have expired, resolve it again when retrying
+            if e.response.status_code in [_status_codes.codes.UNAUTHORIZED, _status_codes.codes.FORBIDDEN]:
+                leech_file.actual_link = None
+
+            raise
+
+    return wrapper
+
+
 class Cyberfile(IDownloader):
     def download_filter(self, leech_file: LeechFile) -> bool:
         return leech_file.tool == LeechFileTool.CYBERFILE
@@ -42,6 +67,7 @@ class Cyberfile(IDownloader):
     @catch_download_exception
     @get_file_info
     @check_before_download
+    @reset_expired_link
     @write_file
     @check_after_download
     @move_file
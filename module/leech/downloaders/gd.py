@@ -5,11 +5,13 @@ import datetime
 import functools
 from httpx import _status_codes
 from tool.utils import get_redis_unique_key
+from tool.task_metrics import Stage, measure, download_labels
 from config.config import BOT_DOWNLOAD_LOCATION
 from module.leech.beans.leech_file import LeechFile
 from module.leech.interfaces.downloader import IDownloader
 from module.leech.beans.leech_bunkr_file import LeechBunkrFile
 from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.utils.parse_cache import get_cached_resolution, cache_resolution
 from module.leech.decorators.download import check_before_download, check_after_download, move_file, \
     catch_download_exception, write_file
 
@@ -24,13 +26,19 @@ ID_PATTERNS = [
 def get_file_info(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechBunkrFile, **kwargs) -> LeechFile:
-        response = httpx.head(leech_file.actual_link)
+        resolution = get_cached_resolution(leech_file.link)
 
-        if response.status_code == _status_codes.codes.OK:
-            name = re.findall(r'filename="(.*)"', response.headers.get('Content-Disposition'))[0]
+        if resolution is None:
+            with measure(Stage.RESOLVE, download_labels(leech_file)):
+                response = httpx.head(leech_file.actual_link)
 
-            leech_file.remote_folder = name
-            leech_file.name = name
+            if response.status_code == _status_codes.codes.OK:
+                resolution = {'name': re.findall(r'filename="(.*)"', response.headers.get('Content-Disposition'))[0]}
+                cache_resolution(leech_file.link, leech_file.tool, resolution)
+
+        if resolution is not None:
+            leech_file.remote_folder = resolution['name']
+            leech_file.name = resolution['name']
             leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
 
         return f(self, leech_file, **kwargs)
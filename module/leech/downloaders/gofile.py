@@ -4,7 +4,11 @@ import functools
 from httpx import _status_codes
 
 from tool.user_agents import get_random_user_agent
+from tool.network_usage import download_meter
+from tool.task_metrics import Stage, measure, download_labels
 from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.gofile import get_token
+from module.leech.utils.cancellation import CancellationToken
 from config.config import WRITE_STREAM_CONNECT_TIMEOUT
 from module.leech.interfaces.downloader import IDownloader
 from module.leech.constants.leech_file_tool import LeechFileTool
@@ -21,8 +25,10 @@ def write_gofile_file(f):
             return leech_file
 
         url = leech_file.link
+        # the token captured at parse time may have expired while the task waited in the queue
+        leech_file.token = get_token()
 
-        with httpx.stream(
+        with measure(Stage.TRANSFER, download_labels(leech_file)), httpx.stream(
                 'GET',
                 leech_file.link,
                 headers={
@@ -42,15 +48,25 @@ def write_gofile_file(f):
                 timeout=WRITE_STREAM_CONNECT_TIMEOUT
         ) as response:
             if response.status_code != _status_codes.codes.OK:
-                leech_file.status = LeechFileStatus.DOWNLOAD_FAIL
-                leech_file.reason = f"Couldn't download the file from {url}. Status code: {response.status_code}"
-                return leech_file
+                # replace the refused token for every worker, the task is retried with the new one
+                if response.status_code in [_status_codes.codes.UNAUTHORIZED, _status_codes.codes.FORBIDDEN]:
+                    get_token(stale_token=leech_file.token)
+
+                raise httpx.HTTPStatusError(
+                    f"Couldn't download the file from {url}. Status code: {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
 
             leech_file.size = int(response.headers.get('content-length'))
 
-            with open(leech_file.get_temp_full_name(), 'wb') as handler:
+            cancellation = CancellationToken(leech_file.id)
+
+            with open(leech_file.get_temp_full_name(), 'wb') as handler, download_meter(leech_file) as meter:
                 for i, chunk in enumerate(response.iter_bytes(chunk_size=4096)):
+                    cancellation.raise_if_cancelled()
                     handler.write(chunk)
+                    meter.add(len(chunk))
 
         return f(self, leech_file, **kwargs)
 
@@ -2,34 +2,59 @@ import yt_dlp
 import datetime
 import functools
 
+from tool.network_usage import download_meter
 from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.cancellation import CancellationToken, TaskCancelledError
 from module.leech.interfaces.downloader import IDownloader
 from module.leech.constants.leech_file_tool import LeechFileTool
 from module.leech.constants.leech_file_status import LeechFileStatus
-from module.leech.decorators.download import catch_download_exception
+from module.leech.decorators.download import catch_download_exception, report_downloaded_file
 
 
 def write_ytdl_file(f):
     @functools.wraps(f)
     def wrapper(self, leech_file: LeechFile, **kwargs) -> LeechFile:
+        cancellation = CancellationToken(leech_file.id)
+        meter = download_meter(leech_file)
+        downloaded_bytes = {}
+
         def mark_success(d):
             if d['postprocessor'] == 'MoveFiles' and d['_default_template'] == 'MoveFiles finished':
                 leech_file.status = LeechFileStatus.DOWNLOAD_SUCCESS
 
-        with yt_dlp.YoutubeDL({
-            'format': 'best',
-            'allow_multiple_video_streams': True,
-            'allow_multiple_audio_streams': True,
-            'writethumbnail': False,
-            '--concurrent-fragments': 4,
-            'allow_playlist_files': True,
-            'overwrites': True,
-            'postprocessor_hooks': [mark_success],
-            'writesubtitles': 'srt',
-            'extractor_args': {'subtitlesformat': 'srt'},
-            'outtmpl': {'default': leech_file.get_full_name()}
-        }) as ydl:
-            ydl.download([leech_file.link])
+        def check_cancellation(d):
+            cancellation.raise_if_cancelled()
+
+            # progress is reported as the accumulated size of each file
+            if d.get('downloaded_bytes') is not None:
+                meter.add(max(d['downloaded_bytes'] - downloaded_bytes.get(d.get('filename'), 0), 0))
+                downloaded_bytes[d.get('filename')] = d['downloaded_bytes']
+
+        try:
+            with meter, yt_dlp.YoutubeDL({
+                'format': 'best',
+                'allow_multiple_video_streams': True,
+                'allow_multiple_audio_streams': True,
+                'writethumbnail': False,
+                '--concurrent-fragments': 4,
+                'allow_playlist_files': True,
+                'overwrites': True,
+                'postprocessor_hooks': [mark_success],
+                'progress_hooks': [check_cancellation],
+                'writesubtitles': 'srt',
+                'extractor_args': {'subtitlesformat': 'srt'},
+                'outtmpl': {'default': leech_file.get_full_name()}
+            }) as ydl:
+                ydl.download([leech_file.link])
+        except Exception as e:
+            # yt-dlp wraps the errors raised by hooks
+            if cancellation.is_cancelled:
+                raise TaskCancelledError('Task has been terminated.')
+
+            raise e
+
+        if leech_file.status == LeechFileStatus.DOWNLOAD_SUCCESS:
+            report_downloaded_file(leech_file)
 
         return f(self, leech_file, **kwargs)
 
@@ -1,3 +1,4 @@
+import uuid
 import datetime
 import time
 import argparse
@@ -6,7 +7,7 @@ from loguru import logger
 from pyrogram import filters, Client
 
 from pyrogram.enums.parse_mode import ParseMode
-from module.i18n.services.i18n_manager import I18nManager
+from module.i18n import get_i18n_manager
 
 from beans.setting import Setting
 from constants.setting import SettingKey
@@ -21,6 +22,8 @@ from module.leech.constants.leech_prompt_step import LeechPromptStep
 from module.leech.constants.leech_file_status import LeechFileStatus
 from constants.worker import Hostname, Project, Queue
 from module.leech.utils.message import send_message_to_admin
+from tool.executor import run_blocking
+from tool.task_metrics import Stage, observe
 from tool.utils import is_admin, open_celery_worker_process
 from tool.telegram_client import get_telegram_client
 from pyrogram.types import (InlineKeyboardButton, InlineKeyboardMarkup, Message)
@@ -59,6 +62,11 @@ def start_polling_messages():
                         ) else None
                     )
 
+                    observe(
+                        Stage.NOTIFY,
+                        (datetime.datetime.utcnow() - leech_message.created_at).total_seconds(),
+                        {'phase': leech_message.phase}
+                    )
                     leech_message.status = MessageStatus.ALREADY_SENT
                 else:
                     leech_message.status = MessageStatus.DISCARD
@@ -99,6 +107,14 @@ def start_celery_process():
         MAXIMUM_SYNC_WORKER
     )
 
+    open_celery_worker_process(
+        Project.LEECH_SUBSCRIPTION,
+        f'{Hostname.SUBSCRIPTION_WORKER}@{Queue.SUBSCRIPTION_QUEUE}',
+        Queue.SUBSCRIPTION_QUEUE,
+        1,
+        beat=True
+    )
+
 
 def use_thread_polling_message():
     global leech_message_checker
@@ -119,7 +135,7 @@ start_celery_process()
 
 async def get_telegram_destination_markup():
     return await send_message_to_admin(
-        content=I18nManager().translate('leech.common.select_destination'),
+        content=get_i18n_manager().translate('leech.common.select_destination'),
         should_auto_delete=False,
         delete_after_seconds=-1,
         reply_markup=InlineKeyboardMarkup(get_telegram_destination_buttons('leech_telegram_dest_'))
@@ -132,7 +148,7 @@ async def get_alist_storage_markup():
     storage_buttons, alist_storages = await get_alist_storage_buttons('leech_alist_path_')
 
     return await send_message_to_admin(
-        content=I18nManager().translate('leech.common.select_destination'),
+        content=get_i18n_manager().translate('leech.common.select_destination'),
         should_auto_delete=False,
         delete_after_seconds=-1,
         reply_markup=InlineKeyboardMarkup(storage_buttons)
@@ -141,7 +157,7 @@ async def get_alist_storage_markup():
 
 async def get_rclone_remote_markup():
     return await send_message_to_admin(
-        content=I18nManager().translate('leech.common.select_destination'),
+        content=get_i18n_manager().translate('leech.common.select_destination'),
         should_auto_delete=False,
         delete_after_seconds=-1,
         reply_markup=InlineKeyboardMarkup(get_rclone_remote_buttons('leech_rclone_remote_'))
@@ -150,21 +166,24 @@ async def get_rclone_remote_markup():
 
 async def prepare_download_files():
     leech_files: list[LeechFile] = []
+    batch = uuid.uuid4().hex[:8]
 
-    i18n_manager = I18nManager()
+    i18n_manager = get_i18n_manager()
     m = await send_message_to_admin(i18n_manager.translate('leech.common.processing'), False)
 
     for link in leech_prompt_input.links:
-        leech_files.extend(execute_parse_link(
+        leech_files.extend(await run_blocking(
+            execute_parse_link,
             link,
             sync_tool=(current_upload_setting.get(UPLOAD_TOOL) or leech_prompt_input.sync_tool),
-            sync_path=(current_upload_setting.get(UPLOAD_DESTINATION) or leech_prompt_input.storage_path)
+            sync_path=(current_upload_setting.get(UPLOAD_DESTINATION) or leech_prompt_input.storage_path),
+            batch=batch
         ))
 
     await m.delete()
     await send_message_to_admin(
         '❌ <b>No task have been created!</b>' if len(
-            leech_files) == 0 else f'🎉🎉🎉 <b>{len(leech_files)} tasks have been created!</b>'
+            leech_files) == 0 else f'🎉🎉🎉 <b>{len(leech_files)} tasks have been created!</b> Batch: <code>{batch}</code>'
     )
 
 
@@ -175,7 +194,7 @@ async def get_upload_tool_markup():
         return await send_message_to_admin('❌ <b>No sync tool available</b>', False)
 
     return await send_message_to_admin(
-        content=I18nManager().translate('leech.common.select_destination'),
+        content=get_i18n_manager().translate('leech.common.select_destination'),
         should_auto_delete=False,
         delete_after_seconds=-1,
         reply_markup=InlineKeyboardMarkup(tool_buttons)
@@ -245,17 +264,21 @@ async def start(_: Client, message: Message):
             text='\n\n'.join([
                 '<b>Available Commands</b>',
                 '<b>1./leech monitor</b> - Monitor worker process',
-                '<b>2./leech rate</b> - Update worker rate limit',
-                '<b>3./leech retry</b> - Retry failed tasks',
-                '<b>4./leech setting</b> - Monitor process',
-                '<b>5./leech terminate</b> - Terminate pending tasks',
-                '<b>6./leech worker</b> - Startup or shutdown worker',
+                '<b>2./leech profile</b> - Profile running workers',
+                '<b>3./leech rate</b> - Update worker rate limit',
+                '<b>4./leech retry</b> - Retry failed tasks',
+                '<b>5./leech setting</b> - Monitor process',
+                '<b>6./leech terminate</b> - Terminate pending tasks',
+                '<b>7./leech watch</b> - Check links for new files periodically',
+                '<b>8./leech worker</b> - Startup or shutdown worker',
             ]),
             parse_mode=ParseMode.HTML,
             disable_web_page_preview=True
         )
 
-    current_upload_setting = getattr(Setting.objects(key=SettingKey.FILE_UPLOAD_DESTINATION).first(), 'value', {})
+    current_upload_setting = getattr(
+        await run_blocking(Setting.objects(key=SettingKey.FILE_UPLOAD_DESTINATION).first), 'value', {}
+    )
     leech_prompt_input.update_links(args.links)
 
     await _next(message, previous_step=None)
@@ -1,7 +1,7 @@
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from module.leech.utils.bunkr import parse_bunkr_link
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
 
 
 class Bunkr(IParser):
@@ -10,6 +10,7 @@ class Bunkr(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         return parse_bunkr_link(link, **kwargs)
 
@@ -1,5 +1,6 @@
 import httpx
-from bs4 import BeautifulSoup
+from typing import Iterator
+from bs4 import SoupStrainer
 from httpx import _status_codes
 from urllib.parse import urlparse, quote
 from config.config import BOT_DOWNLOAD_LOCATION
@@ -7,7 +8,14 @@ from module.leech.beans.leech_file import LeechFile
 from module.leech.interfaces.parser import IParser
 from tool.utils import get_redis_unique_key, get_request_header
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
+from module.leech.utils.coomer import walk_creator
+from module.leech.utils.html import Selector, parse_html, get_text, get_attribute
+
+POST_ONLY = SoupStrainer(['a', 'meta'])
+POST_AUTHOR = Selector('a.post__user-name')
+POST_IMAGE = Selector('meta[property="og:image"]')
+POST_ATTACHMENT = Selector('a.post__attachment-link, a.fileThumb')
 
 
 class Coomer(IParser):
@@ -16,7 +24,8 @@ class Coomer(IParser):
 
     @catch_parse_exception
     @create_document
-    def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
+    @cache_parse_result
+    def parse_link(self, link: str, **kwargs) -> list[LeechFile] | Iterator[list[LeechFile]]:
         parse_result = urlparse(link)
 
         if '/post/' in parse_result.path:
@@ -25,21 +34,21 @@ class Coomer(IParser):
             if response.status_code != _status_codes.codes.OK:
                 return []
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, POST_ONLY)
 
-            author = soup.find('a', class_='post__user-name')
+            author = POST_AUTHOR.select_one(soup)
 
-            if author:
-                remote_folder = author.text.strip()
+            if author is not None:
+                remote_folder = get_text(author).strip()
             else:
-                remote_folder = soup.find('meta', property='og:image')['content'].split('/')[-1].split('-')[0]
+                remote_folder = get_attribute(POST_IMAGE.select_one(soup), 'content').split('/')[-1].split('-')[0]
 
             leech_files = []
 
-            for element in soup.find_all('a', class_=['post__attachment-link', 'fileThumb']):
+            for element in POST_ATTACHMENT.select(soup):
                 leech_file = LeechFile(
-                    link=element['href'],
-                    name=quote(element['download']),
+                    link=get_attribute(element, 'href'),
+                    name=quote(get_attribute(element, 'download')),
                     remote_folder=remote_folder,
                     tool=LeechFileTool.COOMER
                 )
@@ -49,28 +58,7 @@ class Coomer(IParser):
             return leech_files
 
         elif '/user/' in parse_result.path:
-            page = 1
-            leech_files = []
-
-            while True:
-                if page > 1:
-                    return leech_files
-
-                response = httpx.get(
-                    f'{parse_result.scheme}://{parse_result.netloc}{parse_result.path}?o={(page - 1) * 50}'
-                )
-
-                if response.status_code != _status_codes.codes.OK:
-                    return leech_files
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                for element in soup.css.select('.post-card--preview > a'):
-                    leech_files.extend(
-                        self.parse_link(f'{parse_result.scheme}://{parse_result.netloc}{element["href"]}')
-                    )
-
-                page += 1
+            return walk_creator(link, kwargs.get('cursor_key'))
 
         return []
 
@@ -1,12 +1,15 @@
 import httpx
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from tool.utils import get_request_header
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from module.leech.beans.leech_bunkr_file import LeechBunkrFile
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
+from module.leech.utils.html import Selector, parse_html, get_attribute
+
+ALBUM_TITLE = Selector('h1#title')
+ALBUM_IMAGE_LINK = Selector('div.image-container a.image')
 
 
 class CyberDrop(IParser):
@@ -16,14 +19,13 @@ class CyberDrop(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files = []
         parse_result = urlparse(link)
 
         response = httpx.get(link, headers=get_request_header(link))
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
         if '/f/' in parse_result.path:
             leech_files.append(
                 LeechBunkrFile(
@@ -32,10 +34,13 @@ class CyberDrop(IParser):
                 )
             )
         elif '/a/' in parse_result.path:
-            for link in soup.find_all('div', {'class': 'image-container'}):
+            soup = parse_html(response.text)
+            remote_folder = get_attribute(ALBUM_TITLE.select_one(soup), 'title')
+
+            for link in ALBUM_IMAGE_LINK.select(soup):
                 leech_files.append(LeechBunkrFile(
-                    link=f'{parse_result.scheme}://{parse_result.netloc}{link.find("a", {"class": "image"})["href"]}',
-                    remote_folder=soup.find('h1', {'id': 'title'})['title'],
+                    link=f'{parse_result.scheme}://{parse_result.netloc}{get_attribute(link, "href")}',
+                    remote_folder=remote_folder,
                     tool=LeechFileTool.CYBERDROP
                 ))
 
@@ -3,7 +3,7 @@ from module.leech.beans.leech_file import LeechFile
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_bunkr_file import LeechBunkrFile
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
 
 ID_PATTERNS = [
     re.compile("/file/d/([0-9A-Za-z_-]{10,})(?:/|$)", re.IGNORECASE),
@@ -27,6 +27,7 @@ class GD(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files: list[LeechFile] = []
 
@@ -5,7 +5,7 @@ from tool.utils import get_redis_unique_key
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
 from config.config import BOT_DOWNLOAD_LOCATION, MEGA_AUTHORIZATION_EMAIL, MEGA_AUTHORIZATION_PASSWORD
 
 
@@ -21,6 +21,7 @@ class Mega(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files = []
 
@@ -31,6 +32,7 @@ class Mega(IParser):
                 link=link,
                 name=file_info['name'],
                 remote_folder=file_info['name'],
+                size_hint=file_info.get('size'),
                 tool=LeechFileTool.MEGA
             )
             
@@ -1,5 +1,4 @@
 import httpx
-from bs4 import BeautifulSoup
 from httpx import _status_codes
 from urllib.parse import urlparse
 from mediafire import MediaFireApi
@@ -9,7 +8,10 @@ from config.config import BOT_DOWNLOAD_LOCATION
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
+from module.leech.utils.html import Selector, parse_html, get_attribute
+
+DOWNLOAD_BUTTON = Selector('a#downloadButton')
 
 
 class Mediafire(IParser):
@@ -21,6 +23,7 @@ class Mediafire(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files: [LeechFile] = []
 
@@ -33,9 +36,7 @@ class Mediafire(IParser):
             response = httpx.get(link)
 
             if response.status_code == _status_codes.codes.OK:
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                href = soup.select_one('a#downloadButton').get('href')
+                href = get_attribute(DOWNLOAD_BUTTON.select_one(parse_html(response.text)), 'href')
                 name = href.split('/')[-1]
 
                 leech_file = LeechFile(
@@ -5,7 +5,7 @@ from config.config import BOT_DOWNLOAD_LOCATION
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
 
 
 class Pixeldrain(IParser):
@@ -14,6 +14,7 @@ class Pixeldrain(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files = []
         parse_result = urlparse(link)
@@ -35,6 +36,7 @@ class Pixeldrain(IParser):
                 link=actual_link,
                 name=response['name'],
                 remote_folder=response['name'],
+                size_hint=response.get('size'),
                 tool=LeechFileTool.PIXELDRAIN
             )
             leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
@@ -50,6 +52,7 @@ class Pixeldrain(IParser):
                     link=f'{parse_result.scheme}://{parse_result.netloc}/api/file/{file["id"]}',
                     name=file['name'],
                     remote_folder=response['title'],
+                    size_hint=file.get('size'),
                     tool=LeechFileTool.PIXELDRAIN
                 )
                 leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
@@ -1,12 +1,15 @@
 import httpx
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from config.config import BOT_DOWNLOAD_LOCATION
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from tool.utils import get_redis_unique_key, get_request_header
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
+from module.leech.utils.html import Selector, parse_html, get_attribute
+
+VIDEO_SOURCE = Selector('video[id=main-video] source')
+DOWNLOAD_LINK = Selector('a')
 
 
 class Saint(IParser):
@@ -15,22 +18,23 @@ class Saint(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files: [LeechFile] = []
         parse_result = urlparse(link)
 
         response = httpx.get(link, headers=get_request_header(link))
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = parse_html(response.text)
 
         if '/embed/' in parse_result.path:
-            video = soup.select_one('video[id=main-video] source')
+            video = VIDEO_SOURCE.select_one(soup)
 
             # video not found
             if video is None:
                 return []
 
-            src = video.get('src')
+            src = get_attribute(video, 'src')
 
             leech_file = LeechFile(
                 link=src,
@@ -41,7 +45,7 @@ class Saint(IParser):
             leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
             leech_files.append(leech_file)
         elif '/d/' in parse_result.path:
-            src = soup.select_one('a').get('href')
+            src = get_attribute(DOWNLOAD_LINK.select_one(soup), 'href')
             leech_file = LeechFile(
                 link=src,
                 name=httpx
@@ -6,7 +6,7 @@ from config.config import BOT_DOWNLOAD_LOCATION
 from module.leech.interfaces.parser import IParser
 from module.leech.beans.leech_file import LeechFile
 from module.leech.constants.leech_file_tool import LeechFileTool
-from module.leech.decorators.parse import catch_parse_exception, create_document
+from module.leech.decorators.parse import catch_parse_exception, create_document, cache_parse_result
 
 
 class YTDL(IParser):
@@ -18,6 +18,7 @@ class YTDL(IParser):
 
     @catch_parse_exception
     @create_document
+    @cache_parse_result
     def parse_link(self, link: str, **kwargs) -> list[LeechFile]:
         leech_files = []
 
@@ -30,6 +31,7 @@ class YTDL(IParser):
                         link=entry['webpage_url'],
                         name=f'{file_info["title"]}.{file_info["ext"]}',
                         remote_folder=file_info['id'],
+                        size_hint=entry.get('filesize') or entry.get('filesize_approx'),
                         tool=LeechFileTool.YT_DLP
                     )
 
@@ -42,6 +44,7 @@ class YTDL(IParser):
                     link=link,
                     remote_folder=file_info['id'],
                     name=f'{file_info["title"]}.{file_info["ext"]}',
+                    size_hint=file_info.get('filesize') or file_info.get('filesize_approx'),
                     tool=LeechFileTool.YT_DLP
                 )
 
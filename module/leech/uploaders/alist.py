@@ -5,15 +5,27 @@ from urllib import parse
 from loguru import logger
 from httpx import _status_codes
 
+from tool.network_usage import TransferMeter, upload_meter
 from module.leech.interfaces.uploader import IUploader
 from tool.user_agents import get_random_user_agent
 from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.cancellation import CancellationToken
 from module.leech.constants.leech_file_status import LeechFileStatus
 from module.leech.constants.leech_file_tool import LeechFileSyncTool
 from config.config import SHOULD_USE_DATETIME_CATEGORY, ALIST_HOST, ALIST_TOKEN
 from module.leech.decorators.upload import catch_upload_exception, clean_temp_file, check_before_upload
 
 
+def read_file_chunks(
+    full_name: str, cancellation: CancellationToken, meter: TransferMeter, chunk_size: int = 1024 * 1024
+):
+    with open(full_name, 'rb') as file, meter:
+        while chunk := file.read(chunk_size):
+            cancellation.raise_if_cancelled()
+            meter.add(len(chunk))
+            yield chunk
+
+
 class Alist(IUploader):
     def upload_filter(self, sync_tool: str):
         return sync_tool == LeechFileSyncTool.ALIST
@@ -40,7 +52,7 @@ class Alist(IUploader):
                 ])))),
                 'Content-Length': f'{path.getsize(full_name)}',
             },
-            content=open(full_name, 'rb').read(),
+            content=read_file_chunks(full_name, CancellationToken(leech_file.id), upload_meter(leech_file)),
             timeout=None
         ).json()
 
@@ -1,6 +1,8 @@
+import os
 import datetime
 from rclone_python import rclone
 
+from tool.network_usage import upload_meter
 from module.leech.interfaces.uploader import IUploader
 from module.leech.beans.leech_file import LeechFile
 from config.config import SHOULD_USE_DATETIME_CATEGORY
@@ -35,6 +37,10 @@ class RClone(IUploader):
         )
         leech_file.upload_status = LeechFileStatus.UPLOAD_SUCCESS
 
+        # rclone runs in a separate process, the whole file is accounted once it has been copied
+        with upload_meter(leech_file) as meter:
+            meter.add(os.path.getsize(leech_file.get_full_name()))
+
         return leech_file
 
 
@@ -1,7 +1,9 @@
 import uuid
 from pyrogram import Client
 
+from tool.network_usage import upload_meter
 from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.cancellation import CancellationToken, TaskCancelledError
 from tool.telegram_client import get_telegram_client, update_telegram_client
 from module.leech.interfaces.uploader import IUploader
 from config.config import TELEGRAM_CHANNEL_ID, TELEGRAM_ADMIN_ID, TELEGRAM_BOT_TOKEN, TELEGRAM_API_ID, \
@@ -28,16 +30,30 @@ class Telegram(IUploader):
             api_hash=TELEGRAM_API_HASH
         )
 
+        cancellation = CancellationToken(leech_file.id)
+        meter = upload_meter(leech_file)
+
+        def check_cancellation(current: int, total: int):
+            meter.add(max(current - meter.total, 0))
+
+            if cancellation.is_cancel_requested():
+                telegram_client.stop_transmission()
+
         telegram_client.start()
 
-        telegram_client.send_video(
-            chat_id=TELEGRAM_ADMIN_ID,
-            video=leech_file.get_full_name(),
-            file_name=leech_file.name
-        )
+        with meter:
+            telegram_client.send_video(
+                chat_id=TELEGRAM_ADMIN_ID,
+                video=leech_file.get_full_name(),
+                file_name=leech_file.name,
+                progress=check_cancellation
+            )
 
         telegram_client.stop()
 
+        if cancellation.is_cancelled:
+            raise TaskCancelledError('Task has been terminated.')
+
         leech_file.upload_status = LeechFileStatus.UPLOAD_SUCCESS
 
         return leech_file
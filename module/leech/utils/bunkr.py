@@ -1,44 +1,72 @@
 import json
+import time
 import base64
 import operator
 import math
 import httpx
-from bs4 import BeautifulSoup
+from loguru import logger
+from bs4 import SoupStrainer
 from urllib.parse import urlparse
 from httpx import Response, _status_codes
+from concurrent.futures import ThreadPoolExecutor
 
-from tool.utils import get_redis_unique_key
+from tool.redis_client import redis_client
+from tool.utils import get_redis_unique_key, parse_bytes
 from tool.user_agents import get_random_user_agent
 from config.config import BOT_DOWNLOAD_LOCATION, BUNKR_DOMAIN
 from module.leech.beans.leech_bunkr_file import LeechBunkrFile
+from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.utils.parse_cache import get_cached_resolution, cache_resolution
+from module.leech.utils.html import Node, Selector, parse_html, get_text, get_attribute, has_class
 
+# album pages list hundreds of files, the rest of the markup is not needed
+ALBUM_ONLY = SoupStrainer(
+    ['h1', 'div', 'a'], class_=has_class('truncate', 'text-[20px]', 'text-[24px]', 'theItem', 'grid-images_box-link')
+)
+FILE_ONLY = SoupStrainer(['h1', 'video', 'a'])
+VIDEO_SOURCE = Selector('video#player source')
+ALBUM_ITEM = Selector('div.theItem')
+ALBUM_ITEM_LINK = Selector('div.theItem a')
+ALBUM_ITEM_SIZE = Selector('.theSize')
+GRID_IMAGE_LINK = Selector('a.grid-images_box-link')
+DOWNLOAD_LINK = Selector('a.ic-download-01')
+# probed in order, the layout differs between pages
+FOLDER_NAMES = [Selector('h1.truncate'), Selector(r'h1.text-\[20px\]'), Selector(r'h1.text-\[24px\]')]
+MAINTENANCE_LINK = 'https://bnkr.b-cdn.net/maintenance.mp4'
+BUNKR_NODE_DOWN_KEY_PREFIX = 'bunkr:node:down:'
+BUNKR_NODE_FAILURE_KEY_PREFIX = 'bunkr:node:failure:'
+# links are encrypted with a key derived from the hour, the links of an hour are reused until the key rotates
+SECRET_KEY_ROTATION_SECONDS = 3600
+# files of an album resolved at the same time
+BUNKR_MAXIMUM_CONCURRENT_REQUESTS = 8
+# a node serving the maintenance video is avoided for this long
+NODE_MAINTENANCE_SECONDS = 30 * 60
+# a node failing this many downloads within the window is avoided for the window
+NODE_MAXIMUM_FAILURES = 3
+NODE_FAILURE_WINDOW_SECONDS = 5 * 60
 
-def get_video_link(soup: BeautifulSoup) -> str:
-    if soup.find('video', {'id': 'player'}) is not None:
-        return soup.css.select_one("video#player source").get('src')
 
-    return ''
+def get_video_link(soup: Node) -> str:
+    return get_attribute(VIDEO_SOURCE.select_one(soup), 'src', '')
 
 
-def get_video_links(soup: BeautifulSoup) -> list[str]:
-    if soup.find('div', 'relative group/item theItem') is not None:
-        return list(map(lambda x: x['href'], soup.css.select("div.theItem a")))
+def get_video_links(soup: Node) -> list[str]:
+    if ALBUM_ITEM.select_one(soup) is not None:
+        return [get_attribute(element, 'href') for element in ALBUM_ITEM_LINK.select(soup)]
 
-    elif soup.find('a', 'grid-images_box-link') is not None:
-        return list(map(lambda x: x['href'], soup.css.select("a.grid-images_box-link")))
+    return [get_attribute(element, 'href') for element in GRID_IMAGE_LINK.select(soup)]
 
-    return []
 
+def get_video_sizes(soup: Node) -> list[int | None]:
+    return [parse_bytes(get_text(ALBUM_ITEM_SIZE.select_one(element))) for element in ALBUM_ITEM.select(soup)]
 
-def get_folder_name(soup: BeautifulSoup) -> str:
-    if soup.find('h1', {'class': 'truncate'}) is not None:
-        return soup.css.select_one('h1.truncate').text
 
-    elif soup.find('h1', {'class': 'text-[20px]'}) is not None:
-        return soup.css.select_one('h1.text-[20px]').text
+def get_folder_name(soup: Node) -> str:
+    for selector in FOLDER_NAMES:
+        element = selector.select_one(soup)
 
-    elif soup.find('h1', {'class': 'text-[24px]'}) is not None:
-        return soup.css.select_one('h1.text-[24px]').text
+        if element is not None:
+            return get_text(element)
 
     return ''
 
@@ -54,27 +82,170 @@ def decrypt_link(encrypted_url: str, timestamp: int) -> str:
     ))).decode('utf-8')
 
 
+def get_key_expiry(timestamp: float) -> float:
+    # SECRET_KEY_{hour} is replaced at the end of the hour the link was encrypted in
+    return (math.floor(timestamp / SECRET_KEY_ROTATION_SECONDS) + 1) * SECRET_KEY_ROTATION_SECONDS
+
+
+def get_node(link: str) -> str:
+    return urlparse(link or '').netloc.lower()
+
+
+def get_node_down_seconds(node: str) -> int:
+    if not node:
+        return 0
+
+    try:
+        # -2 when the node is not marked down
+        return max(redis_client.ttl(f'{BUNKR_NODE_DOWN_KEY_PREFIX}{node}'), 0)
+    except Exception as e:
+        logger.warning(f'Fail to get health of bunkr node "{node}": {str(e)}')
+
+    return 0
+
+
+def mark_node_down(node: str, seconds: int):
+    if not node:
+        return
+
+    try:
+        redis_client.set(f'{BUNKR_NODE_DOWN_KEY_PREFIX}{node}', 1, ex=seconds)
+        logger.warning(f'Bunkr node "{node}" is avoided for {seconds}s')
+    except Exception as e:
+        logger.warning(f'Fail to mark bunkr node "{node}" down: {str(e)}')
+
+
+def record_node_failure(node: str):
+    if not node:
+        return
+
+    try:
+        # the counter is created with its expiry, it never outlives the window
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.set(f'{BUNKR_NODE_FAILURE_KEY_PREFIX}{node}', 0, nx=True, ex=NODE_FAILURE_WINDOW_SECONDS)
+        pipeline.incr(f'{BUNKR_NODE_FAILURE_KEY_PREFIX}{node}')
+        failures = pipeline.execute()[-1]
+
+        if failures >= NODE_MAXIMUM_FAILURES:
+            mark_node_down(node, NODE_FAILURE_WINDOW_SECONDS)
+    except Exception as e:
+        logger.warning(f'Fail to count failures of bunkr node "{node}": {str(e)}')
+
+
+def create_file(link: str, name: str, actual_link: str, actual_link_expire_at: int = None) -> LeechBunkrFile:
+    leech_file = LeechBunkrFile(
+        name=name, link=link, actual_link=actual_link, actual_link_expire_at=actual_link_expire_at, remote_folder=name
+    )
+    leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
+
+    return leech_file
+
+
+def resolve_file(link: str) -> LeechBunkrFile | None:
+    resolution = get_cached_resolution(link)
+
+    if resolution is not None:
+        return create_file(
+            link, resolution['name'], resolution['actual_link'], resolution.get('actual_link_expire_at')
+        )
+
+    parse_result = urlparse(link)
+    r: Response = httpx.get(f'{parse_result.scheme}://{BUNKR_DOMAIN}{parse_result.path}')
+
+    if r.status_code != _status_codes.codes.OK:
+        return None
+
+    soup = parse_html(r.text, FILE_ONLY)
+    folder_name = get_folder_name(soup)
+    video_link = get_video_link(soup)
+    # links found on the page are kept for the hour as well
+    timestamp = time.time()
+
+    if not video_link:
+        encrypted_link_response = httpx.post(
+            f'{parse_result.scheme}://{BUNKR_DOMAIN}/api/vs',
+            content=json.dumps({'slug': parse_result.path.split('/')[-1]}),
+            headers={
+                'Content-Type': 'application/json',
+                'Referer': f'{parse_result.scheme}://{BUNKR_DOMAIN}{parse_result.path}',
+                'User-Agent': get_random_user_agent()
+            }
+        ).json()
+
+        timestamp = encrypted_link_response['timestamp']
+        video_link = decrypt_link(encrypted_link_response['url'], timestamp)
+
+    download_link = get_attribute(DOWNLOAD_LINK.select_one(soup), 'href')
+
+    if not video_link and download_link is not None:
+        video_link = get_attribute(
+            DOWNLOAD_LINK.select_one(parse_html(httpx.get(download_link).text, FILE_ONLY)), 'href'
+        )
+
+    expire_at = int(get_key_expiry(timestamp))
+
+    if video_link:
+        cache_resolution(link, LeechFileTool.BUNKR, {
+            'name': folder_name, 'actual_link': video_link, 'actual_link_expire_at': expire_at
+        }, expire_at)
+
+    return create_file(link, folder_name, video_link, expire_at)
+
+
+def resolve_album_file(leech_file: LeechBunkrFile) -> LeechBunkrFile:
+    try:
+        resolved = resolve_file(leech_file.link)
+    except Exception as e:
+        # left for the downloader to resolve
+        logger.warning(f'Fail to resolve {leech_file.link}: {str(e)}')
+        return leech_file
+
+    if resolved is not None and resolved.actual_link:
+        leech_file.name = resolved.name
+        leech_file.actual_link = resolved.actual_link
+        leech_file.actual_link_expire_at = resolved.actual_link_expire_at
+        leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
+
+    return leech_file
+
+
 def parse_bunkr_link(link: str, **kwargs) -> list[LeechBunkrFile]:
     leech_files = []
     parse_result = urlparse(link)
+
+    if '/f/' in parse_result.path:
+        leech_file = resolve_file(link)
+
+        return [leech_file] if leech_file is not None else leech_files
+
     r: Response = httpx.get(f'{parse_result.scheme}://{BUNKR_DOMAIN}{parse_result.path}')
 
     if r.status_code != _status_codes.codes.OK:
         return leech_files
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    soup = parse_html(r.text, ALBUM_ONLY if '/a/' in parse_result.path else FILE_ONLY)
     folder_name = get_folder_name(soup)
 
     if '/a/' in parse_result.path:
-        for video_link in get_video_links(soup):
+        video_links = get_video_links(soup)
+        video_sizes = get_video_sizes(soup)
+
+        for index, video_link in enumerate(video_links):
             parsed_video_link = urlparse(video_link)
 
             leech_files.append(
                 LeechBunkrFile(
                     link=f'{parse_result.scheme}://{BUNKR_DOMAIN}{parsed_video_link.path}',
-                    remote_folder=folder_name
+                    remote_folder=folder_name,
+                    size_hint=video_sizes[index] if len(video_sizes) == len(video_links) else None
                 )
             )
+
+        # resolved here so that download workers start transferring at once, unless most of the files are about to
+        # be dropped, e.g. by a subscription, then the downloader resolves the ones left
+        if kwargs.get('file_filter') is None:
+            with ThreadPoolExecutor(max_workers=BUNKR_MAXIMUM_CONCURRENT_REQUESTS) as executor:
+                leech_files = list(executor.map(resolve_album_file, leech_files))
     elif '/v/' in parse_result.path:
         actual_link_response = httpx.post(
             f'{parse_result.scheme}://{BUNKR_DOMAIN}/api/gimmeurl',
@@ -93,40 +264,6 @@ def parse_bunkr_link(link: str, **kwargs) -> list[LeechBunkrFile]:
             remote_folder=folder_name
         )
 
-        leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
-        leech_files.append(leech_file)
-    elif '/f/' in parse_result.path:
-        video_link = get_video_link(soup)
-
-        if not video_link:
-            encrypted_link_response = httpx.post(
-                f'{parse_result.scheme}://{BUNKR_DOMAIN}/api/vs',
-                content=json.dumps({'slug': parse_result.path.split('/')[-1]}),
-                headers={
-                    'Content-Type': 'application/json',
-                    'Referer': f'{parse_result.scheme}://{BUNKR_DOMAIN}{parse_result.path}',
-                    'User-Agent': get_random_user_agent()
-                }
-            ).json()
-
-            video_link = decrypt_link(
-                encrypted_link_response['url'],
-                encrypted_link_response['timestamp']
-            )
-
-        if not video_link and soup.find('a', 'ic-download-01') is not None:
-            video_link = BeautifulSoup(
-                httpx.get(soup.css.select_one('a.ic-download-01').get('href')).text,
-                'html.parser'
-            ).css.select_one('a.ic-download-01').get('href')
-
-        leech_file = LeechBunkrFile(
-            name=folder_name,
-            link=link,
-            actual_link=video_link,
-            remote_folder=folder_name
-        )
-
         leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
         leech_files.append(leech_file)
 
@@ -4,6 +4,7 @@ from pyrogram.types import InlineKeyboardButton
 from rclone_python import rclone
 
 from api.alist_api import AListAPI
+from module.i18n import get_i18n_manager
 from config.config import RCLONE_REMOTES, TELEGRAM_CHANNEL_ID
 from module.leech.constants.leech_file_tool import LeechFileSyncTool
 from tool.utils import is_alist_available
@@ -92,7 +93,7 @@ def get_telegram_destination_buttons(callback_prefix: str) -> list[list[InlineKe
     # 添加私聊按钮
     buttons.append([
         InlineKeyboardButton(
-            text=I18nManager().translate('leech.buttons.private_chat'),
+            text=get_i18n_manager().translate('leech.buttons.private_chat'),
             callback_data=f'{callback_prefix}private',
         )
     ])
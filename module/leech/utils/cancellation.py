@@ -0,0 +1,58 @@
+import time
+from loguru import logger
+from tool.redis_client import redis_client
+
+CANCELLATION_KEY_PREFIX = 'leech:cancel:'
+# flags are only needed while the transfer is still running
+CANCELLATION_EXPIRE_SECONDS = 24 * 60 * 60
+# how often a running transfer asks redis whether it has been terminated
+CANCELLATION_CHECK_INTERVAL_SECONDS = 1
+
+
+class TaskCancelledError(Exception):
+    pass
+
+
+def request_cancellation(file_ids: list[str]):
+    if len(file_ids) == 0:
+        return
+
+    pipeline = redis_client.pipeline(transaction=False)
+
+    for file_id in file_ids:
+        pipeline.set(f'{CANCELLATION_KEY_PREFIX}{file_id}', 1, ex=CANCELLATION_EXPIRE_SECONDS)
+
+    pipeline.execute()
+
+
+def clear_cancellation(file_id: str):
+    try:
+        redis_client.delete(f'{CANCELLATION_KEY_PREFIX}{file_id}')
+    except Exception as e:
+        logger.warning(f'Fail to clear cancellation of "{file_id}": {str(e)}')
+
+
+class CancellationToken:
+    def __init__(self, file_id: str):
+        self.file_id = file_id
+        self.is_cancelled = False
+        self.checked_at = 0.0
+
+    def is_cancel_requested(self) -> bool:
+        now = time.monotonic()
+
+        if self.is_cancelled or now - self.checked_at < CANCELLATION_CHECK_INTERVAL_SECONDS:
+            return self.is_cancelled
+
+        self.checked_at = now
+
+        try:
+            self.is_cancelled = bool(redis_client.exists(f'{CANCELLATION_KEY_PREFIX}{self.file_id}'))
+        except Exception as e:
+            logger.warning(f'Fail to check cancellation of "{self.file_id}": {str(e)}')
+
+        return self.is_cancelled
+
+    def raise_if_cancelled(self):
+        if self.is_cancel_requested():
+            raise TaskCancelledError('Task has been terminated.')
@@ -0,0 +1,127 @@
+import httpx
+import threading
+from loguru import logger
+from typing import Any, Iterator
+from urllib.parse import urlparse, quote
+from concurrent.futures import ThreadPoolExecutor
+
+from tool.redis_client import redis_client
+from tool.utils import get_redis_unique_key, get_request_header
+from config.config import BOT_DOWNLOAD_LOCATION
+from module.leech.beans.leech_file import LeechFile
+from module.leech.constants.leech_file_tool import LeechFileTool
+
+# posts returned by one page of the listing api
+COOMER_PAGE_SIZE = 50
+# requests sent to one host at the same time, the sites answer 429 to more
+COOMER_MAXIMUM_CONCURRENT_REQUESTS_PER_HOST = 4
+
+host_semaphores: dict[str, threading.Semaphore] = {}
+host_semaphores_lock = threading.Lock()
+
+
+def get_host_semaphore(host: str) -> threading.Semaphore:
+    with host_semaphores_lock:
+        return host_semaphores.setdefault(host, threading.Semaphore(COOMER_MAXIMUM_CONCURRENT_REQUESTS_PER_HOST))
+
+
+def get_api(site: str, path: str, params: dict = None) -> Any:
+    with get_host_semaphore(urlparse(site).netloc):
+        # the api only answers requests accepting text/css, a quirk of its scraper protection
+        response = httpx.get(
+            f'{site}/api/v1{path}', params=params, headers={**get_request_header(site), 'Accept': 'text/css'}
+        )
+
+    response.raise_for_status()
+
+    return response.json()
+
+
+def create_leech_files(site: str, post: dict, remote_folder: str, seen_paths: set[str]) -> list[LeechFile]:
+    leech_files = []
+
+    for attachment in [post.get('file'), *post.get('attachments', [])]:
+        # the cover of a post is usually one of its attachments as well, and reposts share files
+        if not attachment or not attachment.get('path') or attachment['path'] in seen_paths:
+            continue
+
+        seen_paths.add(attachment['path'])
+
+        leech_file = LeechFile(
+            link=f'{site}/data{attachment["path"]}?f={quote(attachment["name"])}',
+            name=quote(attachment['name']),
+            remote_folder=remote_folder,
+            tool=LeechFileTool.COOMER
+        )
+        leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
+        leech_files.append(leech_file)
+
+    return leech_files
+
+
+def list_pages(site: str, creator_path: str, post_count: int | None, concurrent: bool) -> Iterator[list[dict]]:
+    def list_posts(offset: int) -> list[dict]:
+        return get_api(site, f'{creator_path}/posts', {'o': offset})
+
+    if concurrent and post_count:
+        # the number of pages is known, fetch them at the same time and hand them out in order
+        with ThreadPoolExecutor(max_workers=COOMER_MAXIMUM_CONCURRENT_REQUESTS_PER_HOST) as executor:
+            yield from executor.map(list_posts, range(0, post_count, COOMER_PAGE_SIZE))
+
+        return
+
+    offset = 0
+
+    while True:
+        posts = list_posts(offset)
+        yield posts
+
+        if len(posts) < COOMER_PAGE_SIZE:
+            return
+
+        offset += COOMER_PAGE_SIZE
+
+
+def walk_creator(link: str, cursor_key: str = None) -> Iterator[list[LeechFile]]:
+    # the caller owning cursor_key lists only the posts published since its last run, e.g. a subscription,
+    # a run without it lists everything and leaves every cursor alone
+    parse_result = urlparse(link)
+    site = f'{parse_result.scheme}://{parse_result.netloc}'
+    # e.g. /onlyfans/user/name, posts and profile are listed under the same path of the api
+    service, _, creator_id = parse_result.path.strip('/').split('/')[:3]
+    creator_path = f'/{service}/user/{creator_id}'
+    incremental = cursor_key is not None
+
+    profile = get_api(site, f'{creator_path}/profile')
+    remote_folder = profile.get('name') or creator_id
+    last_published = redis_client.get(cursor_key) if incremental else None
+    last_published = last_published.decode() if last_published is not None else ''
+    newest_published = ''
+    seen_paths = set()
+
+    # posts are listed from the newest, an incremental run reads pages until it reaches the posts of the last run
+    for posts in list_pages(site, creator_path, profile.get('post_count'), concurrent=not incremental):
+        leech_files = []
+        reached_last_run = False
+
+        for post in posts:
+            published = post.get('published') or ''
+            newest_published = max(newest_published, published)
+
+            if published and published <= last_published:
+                reached_last_run = True
+                continue
+
+            leech_files.extend(create_leech_files(site, post, remote_folder, seen_paths))
+
+        if leech_files:
+            yield leech_files
+
+        if reached_last_run:
+            break
+
+    if incremental and newest_published:
+        try:
+            redis_client.set(cursor_key, max(newest_published, last_published))
+        except Exception as e:
+            logger.warning(f'Fail to save newest post of {creator_path}: {str(e)}')
@@ -0,0 +1,104 @@
+import re
+import httpx
+from loguru import logger
+from httpx._models import Cookies
+from typing import Iterator, Literal
+from concurrent.futures import ThreadPoolExecutor
+
+from tool.utils import get_redis_unique_key
+from config.config import BOT_DOWNLOAD_LOCATION
+from module.leech.beans.leech_bunkr_file import LeechBunkrFile
+from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.utils.html import Node, Selector, parse_html, get_attribute
+
+FILE_ITEM = Selector('div[class=fileListing] div[class*=fileItem]')
+TOTAL_PAGES = Selector('input#rspTotalPages')
+VIDEO_SOURCE = Selector('video source')
+# pages and file details requested at the same time
+CYBERFILE_MAXIMUM_CONCURRENT_REQUESTS = 8
+
+PageType = Literal['nonaccountshared'] | Literal['folder']
+
+
+def load_files(link: str, node_id: int | str, page_type: PageType, page: int, cookies: Cookies = None) -> Node:
+    return parse_html(httpx.post(f'https://cyberfile.me/account/ajax/load_files', data={
+        'pageType': page_type,
+        'nodeId': node_id,
+        'pageStart': page,
+        'perPage': 0,
+        'filterOrderBy': ''
+    }, headers={
+        'Referer': link
+    }, cookies=cookies).json()['html'])
+
+
+def get_file_details(file_id: int | str) -> dict | None:
+    response = httpx.post(f'https://cyberfile.me/account/ajax/file_details', data={'u': int(file_id)}).json()
+
+    if not response['success'] or 'albumPasswordModel' in response['html']:
+        return None
+
+    video = VIDEO_SOURCE.select_one(parse_html(response['html']))
+
+    return {
+        'remote_folder': response['page_url'].split('/')[-1],
+        'name': response['page_title'],
+        'actual_link': get_attribute(video, 'src') if video is not None else re.findall(
+            r"openUrl\('(.*)'\)",
+            response['html'])[0],
+    }
+
+
+def resolve_file(item: Node) -> LeechBunkrFile:
+    leech_file = LeechBunkrFile(link=get_attribute(item, 'dtfullurl'), tool=LeechFileTool.CYBERFILE)
+
+    try:
+        details = get_file_details(get_attribute(item, 'fileid'))
+    except Exception as e:
+        # left for the downloader to resolve
+        logger.warning(f'Fail to get details of {leech_file.link}: {str(e)}')
+        return leech_file
+
+    if details is not None:
+        leech_file.remote_folder = details['remote_folder']
+        leech_file.name = details['name']
+        leech_file.actual_link = details['actual_link']
+        leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
+
+    return leech_file
+
+
+def iterate_folders(
+    link: str,
+    node_id: int | str,
+    page_type: PageType,
+    cookies: Cookies = None,
+    resolve: bool = True
+) -> Iterator[list[LeechBunkrFile]]:
+    folders = [node_id]
+
+    with ThreadPoolExecutor(max_workers=CYBERFILE_MAXIMUM_CONCURRENT_REQUESTS) as executor:
+        while folders:
+            node_id = folders.pop(0)
+            # the first page tells the number of pages, the others are fetched at the same time
+            first_page = load_files(link, node_id, page_type, 1, cookies)
+            total_pages = int(get_attribute(TOTAL_PAGES.select_one(first_page), 'value', '0'))
+            pages = [first_page, *executor.map(
+                lambda page: load_files(link, node_id, page_type, page, cookies), range(2, total_pages + 1)
+            )]
+
+            items = [item for page in pages for item in FILE_ITEM.select(page)]
+            folders.extend(int(get_attribute(item, 'folderid')) for item in items if get_attribute(item, 'folderid'))
+
+            file_items = [
+                item for item in items if not get_attribute(item, 'folderid') and get_attribute(item, 'dtfullurl')
+            ]
+            # resolved here so that download workers start transferring at once, unless most of the files are
+            # about to be dropped, e.g. by a subscription, then the downloader resolves the ones left
+            leech_files = list(executor.map(resolve_file, file_items)) if resolve else [
+                LeechBunkrFile(link=get_attribute(item, 'dtfullurl'), tool=LeechFileTool.CYBERFILE)
+                for item in file_items
+            ]
+
+            if leech_files:
+                yield leech_files
@@ -0,0 +1,71 @@
+import re
+import argparse
+import datetime
+
+from config.config import FAILED_TASK_EXPIRE_AFTER_DAYS
+from module.leech.beans.leech_file import LeechFile
+from module.leech.constants.leech_file_tool import LeechFileTool
+from module.leech.constants.error_category import ErrorCategory
+from module.leech.constants.leech_file_status import LeechFileStatus
+
+
+def get_retry_conditions(arguments: list[str]) -> dict:
+    parser = argparse.ArgumentParser(description='Retry failed tasks.', exit_on_error=False)
+
+    parser.add_argument('--tool', type=lambda x: LeechFileTool(x.upper()), help='Only retry files of the tool.')
+    parser.add_argument('--host', type=str, help='Only retry files of the host.')
+    parser.add_argument('--error', type=lambda x: ErrorCategory(x.upper()), help='Only retry files of the error.')
+    parser.add_argument('--batch', type=str, help='Only retry files of the batch.')
+    parser.add_argument('--days', type=int, help='Only retry files created within days.')
+
+    return {key: value for key, value in vars(parser.parse_args(arguments)).items() if value is not None}
+
+
+def get_failed_files(
+    filter_status: LeechFileStatus,
+    tool: LeechFileTool | None = None,
+    host: str | None = None,
+    error: ErrorCategory | None = None,
+    batch: str | None = None,
+    days: int = FAILED_TASK_EXPIRE_AFTER_DAYS
+):
+    is_download = filter_status == LeechFileStatus.DOWNLOAD_FAIL
+    error_field = 'error_category' if is_download else 'upload_error_category'
+    conditions = {
+        'status' if is_download else 'upload_status': filter_status,
+        'created_at__gte': datetime.datetime.utcnow() - datetime.timedelta(
+            days=min(days, FAILED_TASK_EXPIRE_AFTER_DAYS)
+        ),
+    }
+
+    # files which do not exist any more will never succeed, unless they are asked explicitly
+    if error is None:
+        conditions[f'{error_field}__ne'] = ErrorCategory.NOT_FOUND
+    else:
+        conditions[error_field] = error
+
+    if tool is not None:
+        conditions['tool'] = tool
+
+    if batch is not None:
+        conditions['batch'] = batch
+
+    if host is not None:
+        conditions['link__iregex'] = rf'^[a-z]+://([^/]*\.)?{re.escape(host)}(:\d+)?(/|$)'
+
+    return LeechFile.objects(**conditions)
+
+
+def reset_failed_files(leech_files: list[LeechFile]):
+    updated_at = datetime.datetime.utcnow()
+
+    LeechFile.objects(id__in=[leech_file.id for leech_file in leech_files]).update(
+        status=LeechFileStatus.INITIAL,
+        upload_status=LeechFileStatus.INITIAL,
+        updated_at=updated_at
+    )
+
+    for leech_file in leech_files:
+        leech_file.status = LeechFileStatus.INITIAL
+        leech_file.upload_status = LeechFileStatus.INITIAL
+        leech_file.updated_at = updated_at
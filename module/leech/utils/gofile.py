@@ -0,0 +1,191 @@
+import time
+import httpx
+from loguru import logger
+from httpx import _status_codes
+from typing import Generator, Optional
+from redis.exceptions import LockError
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tool.utils import get_redis_unique_key
+from config.config import BOT_DOWNLOAD_LOCATION
+from tool.redis_client import redis_client
+from tool.user_agents import get_random_user_agent
+from module.leech.beans.leech_gofile_file import LeechGofileFile
+
+GOFILE_TOKEN_KEY = 'gofile:token'
+GOFILE_TOKEN_LOCK_KEY = 'gofile:token:lock'
+# a guest account is used for an hour before another one is created
+GOFILE_TOKEN_EXPIRE_SECONDS = 60 * 60
+# the token is replaced before it expires, so requests in flight never carry an expired one
+GOFILE_TOKEN_REFRESH_AHEAD_SECONDS = 10 * 60
+# released by redis when the worker holding it dies while creating the account
+GOFILE_TOKEN_LOCK_SECONDS = 30
+GOFILE_TOKEN_LOCK_WAIT_SECONDS = 30
+# folders listed at the same time, so that deep trees do not flood the api
+GOFILE_MAXIMUM_CONCURRENT_REQUESTS = 8
+
+
+def create_token() -> (str, int):
+    response = httpx.post('https://api.gofile.io/accounts', headers={
+        'User-Agent': get_random_user_agent(),
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept': '*/*',
+        'Connection': 'keep-alive',
+    }).json()
+
+    if response['status'] != 'ok':
+        raise ValueError(f'Fail to create gofile account: {response["status"]}')
+
+    return response['data']['token'], int(time.time()) + GOFILE_TOKEN_EXPIRE_SECONDS
+
+
+def read_token() -> (Optional[str], int):
+    values = redis_client.hgetall(GOFILE_TOKEN_KEY)
+
+    if not values:
+        return None, 0
+
+    return values[b'token'].decode(), int(values[b'expire_at'])
+
+
+def refresh_token(stale_token: Optional[str] = None, blocking: bool = True) -> Optional[str]:
+    lock = redis_client.lock(
+        GOFILE_TOKEN_LOCK_KEY, timeout=GOFILE_TOKEN_LOCK_SECONDS, blocking_timeout=GOFILE_TOKEN_LOCK_WAIT_SECONDS
+    )
+
+    if not lock.acquire(blocking=blocking):
+        return None
+
+    try:
+        token, expire_at = read_token()
+
+        # another worker has created an account while this one waited for the lock
+        if token is not None and token != stale_token and expire_at - time.time() > GOFILE_TOKEN_REFRESH_AHEAD_SECONDS:
+            return token
+
+        token, expire_at = create_token()
+
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.hset(GOFILE_TOKEN_KEY, mapping={'token': token, 'expire_at': expire_at})
+        pipeline.expireat(GOFILE_TOKEN_KEY, expire_at)
+        pipeline.execute()
+
+        logger.info('Gofile token refreshed')
+
+        return token
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass
+
+
+def get_token(stale_token: Optional[str] = None) -> str:
+    # stale_token is the token the site has just refused, it is replaced even if it has not expired yet
+    token, expire_at = read_token()
+    remaining = expire_at - time.time() if token is not None and token != stale_token else 0
+
+    if remaining > GOFILE_TOKEN_REFRESH_AHEAD_SECONDS:
+        return token
+
+    # the current token is still valid, only the worker that gets the lock refreshes it and the others keep using it
+    refreshed = refresh_token(stale_token, blocking=remaining <= 0)
+
+    if refreshed is not None:
+        return refreshed
+
+    if remaining > 0:
+        return token
+
+    logger.warning('Timeout waiting for gofile token refresh, creating an account without sharing it')
+
+    return create_token()[0]
+
+
+def get_contents(content_id: str, token: str, password: str = None) -> httpx.Response:
+    return httpx.get(''.join([
+        'https://api.gofile.io/contents/',
+        content_id,
+        '?wt=4fd6sg89d7s6&cache=true',
+        f'&password={password}' if password else ''
+    ]), headers={
+        'User-Agent': get_random_user_agent(),
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept': '*/*',
+        'Connection': 'keep-alive',
+        'Authorization': f'Bearer {token}'
+    })
+
+
+def get_content(content_id: str, password: str = None) -> (dict | None, str):
+    # the token is shared by all workers and refreshed before it expires
+    token = get_token()
+    response = get_contents(content_id, token, password)
+
+    if response.status_code in [_status_codes.codes.UNAUTHORIZED, _status_codes.codes.FORBIDDEN]:
+        token = get_token(stale_token=token)
+        response = get_contents(content_id, token, password)
+
+    response = response.json()
+
+    if response['status'] != 'ok':
+        logger.warning(f'Fail to get gofile content {content_id}: {response["status"]}')
+        return None, token
+
+    return response['data'], token
+
+
+def create_leech_file(data: dict, token: str, remote_folder: str = None) -> LeechGofileFile:
+    leech_file = LeechGofileFile(
+        link=data['link'],
+        name=data['name'],
+        remote_folder=remote_folder,
+        size_hint=data.get('size'),
+        token=token
+    )
+    leech_file.location = f'{BOT_DOWNLOAD_LOCATION}/{get_redis_unique_key(leech_file)}'
+
+    return leech_file
+
+
+def walk_folders(content_id: str, password: str = None) -> Generator[list[LeechGofileFile], None, bool]:
+    # folders are listed concurrently as they are found, and the files of each folder are handed out at once
+    # returns whether every folder could be listed, an incomplete listing is not cached
+    visited = {content_id}
+    is_complete = True
+
+    with ThreadPoolExecutor(max_workers=GOFILE_MAXIMUM_CONCURRENT_REQUESTS, thread_name_prefix='gofile') as executor:
+        pending = {executor.submit(get_content, content_id, password)}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    data, token = future.result()
+                except Exception as e:
+                    logger.error(f'Error parse gofile folder: {str(e)}')
+                    is_complete = False
+                    continue
+
+                if data is None:
+                    is_complete = False
+                    continue
+
+                if data['type'] != 'folder':
+                    yield [create_leech_file(data, token)]
+                    continue
+
+                leech_files = []
+
+                for child in data['children'].values():
+                    if child['type'] == 'folder' and child['canAccess'] and child['id'] not in visited:
+                        visited.add(child['id'])
+                        pending.add(executor.submit(get_content, child['id'], password))
+                    elif child['type'] == 'file':
+                        leech_files.append(create_leech_file(child, token, data['name']))
+
+                if leech_files:
+                    yield leech_files
+
+    return is_complete
@@ -0,0 +1,65 @@
+import re
+import soupsieve
+from typing import Any, Optional
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+except ImportError:
+    lxml = None
+    CSSSelector = None
+
+# an lxml element when lxml and cssselect are installed, otherwise a BeautifulSoup tag,
+# read it through the helpers below so that scrapers work with both
+Node = Any
+
+
+def parse_html(text: str, only: Optional[SoupStrainer] = None) -> Node:
+    if lxml is not None:
+        # the whole document is parsed in C, which is faster than building a partial tree in python
+        return lxml.html.document_fromstring(text) if text.strip() else lxml.html.Element('html')
+
+    # only build the elements the scraper needs when falling back to the pure python parser
+    return BeautifulSoup(text, 'html.parser', parse_only=only)
+
+
+def has_class(*names: str) -> re.Pattern:
+    # strainers see the raw class attribute, e.g. "relative group/item theItem", so match whole words in it
+    return re.compile(rf'(^|\s)({"|".join(map(re.escape, names))})(\s|$)')
+
+
+class Selector:
+    # compiled once at import time instead of on every select call
+    def __init__(self, css: str):
+        self.css = css
+        self.soupsieve = soupsieve.compile(css)
+        self.xpath = CSSSelector(css, translator='html') if CSSSelector is not None else None
+
+    def select(self, node: Node) -> list[Node]:
+        if isinstance(node, Tag):
+            return self.soupsieve.select(node)
+
+        return self.xpath(node)
+
+    def select_one(self, node: Node) -> Optional[Node]:
+        if isinstance(node, Tag):
+            return self.soupsieve.select_one(node)
+
+        matched = self.xpath(node)
+
+        return matched[0] if matched else None
+
+
+def get_text(node: Optional[Node]) -> Optional[str]:
+    if node is None:
+        return None
+
+    return node.get_text() if isinstance(node, Tag) else node.text_content()
+
+
+def get_attribute(node: Optional[Node], name: str, default: Optional[str] = None) -> Optional[str]:
+    if node is None:
+        return default
+
+    return node.get(name, default)
@@ -1,4 +1,3 @@
-import time
 import prettytable as pt
 from pyrogram.types import Message
 from pyrogram.enums import ParseMode
@@ -7,6 +6,7 @@ from config.config import TELEGRAM_ADMIN_ID
 from module.leech.beans.leech_file import LeechFile
 from tool.telegram_client import get_telegram_client
 from tool.utils import convert_bytes
+from tool.message_scheduler import schedule_message_deletion
 
 
 async def send_message_to_admin(
@@ -24,8 +24,7 @@ async def send_message_to_admin(
     )
 
     if should_auto_delete:
-        time.sleep(delete_after_seconds)
-        await m.delete()
+        schedule_message_deletion(m, delay=delete_after_seconds)
 
     return m
 
@@ -0,0 +1,164 @@
+import time
+import json
+import calendar
+import hashlib
+from typing import Optional
+from loguru import logger
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from tool.redis_client import redis_client
+from config.config import PARSE_CACHE_TTL_SECONDS
+from module.leech.beans.leech_file import LeechFile
+from module.leech.constants.leech_file_tool import LeechFileTool
+
+PARSE_CACHE_KEY_PREFIX = 'parse:cache:'
+RESOLVE_CACHE_KEY_PREFIX = 'parse:resolve:'
+# gofile folders are often still being uploaded to, list them again sooner
+PARSE_CACHE_TTL_SECONDS_PER_TOOL = {
+    LeechFileTool.GOFILE: 10 * 60,
+}
+# query parameters holding the unix time at which a signed url stops working
+SIGNED_LINK_EXPIRY_PARAMETERS = ['expires', 'expire', 'exp', 'e']
+# a signed url is not handed out when it expires before the download can start
+SIGNED_LINK_EXPIRY_MARGIN_SECONDS = 60
+# set by the parser or the downloader for every file, so a cache hit has to create them again
+EXCLUDED_FIELDS = ['_id', 'created_at', 'updated_at', 'status', 'upload_status', 'reason', 'upload_reason']
+
+
+def normalize_link(link: str) -> str:
+    parse_result = urlparse(link.strip())
+
+    return urlunparse((
+        parse_result.scheme.lower(),
+        parse_result.netloc.lower(),
+        parse_result.path.rstrip('/'),
+        parse_result.params,
+        urlencode(sorted(parse_qsl(parse_result.query, keep_blank_values=True))),
+        '',
+    ))
+
+
+def get_cache_key(prefix: str, link: str, password: Optional[str] = None) -> str:
+    # a password protected folder lists different files with another password
+    digest = hashlib.md5(f'{normalize_link(link)}|{password or ""}'.encode()).hexdigest()
+
+    return f'{prefix}{digest}'
+
+
+def get_link_expiry(link: Optional[str]) -> Optional[float]:
+    if not link:
+        return None
+
+    query = {name.lower(): value for name, value in parse_qsl(urlparse(link).query)}
+
+    if 'x-amz-date' in query and query.get('x-amz-expires', '').isdigit():
+        signed_at = calendar.timegm(time.strptime(query['x-amz-date'], '%Y%m%dT%H%M%SZ'))
+        return signed_at + int(query['x-amz-expires'])
+
+    for name in SIGNED_LINK_EXPIRY_PARAMETERS:
+        # values too small to be a unix time are durations or unrelated parameters
+        if query.get(name, '').isdigit() and int(query[name]) > 1_000_000_000:
+            return int(query[name])
+
+    return None
+
+
+def get_ttl(tool: Optional[LeechFileTool], links: list[Optional[str]], expire_at: Optional[float] = None) -> int:
+    ttl = min(PARSE_CACHE_TTL_SECONDS, PARSE_CACHE_TTL_SECONDS_PER_TOOL.get(tool, PARSE_CACHE_TTL_SECONDS))
+
+    # the site may tell when the url stops working in another way than a query parameter
+    for expiry in [expire_at, *map(get_link_expiry, links)]:
+        if expiry is not None:
+            ttl = min(ttl, int(expiry - time.time() - SIGNED_LINK_EXPIRY_MARGIN_SECONDS))
+
+    return ttl
+
+
+def dump_leech_file(leech_file: LeechFile) -> dict:
+    return {name: value for name, value in leech_file.to_mongo().items() if name not in EXCLUDED_FIELDS}
+
+
+def load_leech_file(fields: dict) -> LeechFile:
+    # documents get a new id, create_document inserts them as new tasks
+    return LeechFile._from_son(fields, created=True)
+
+
+def get_cached_files(link: str, password: Optional[str] = None) -> Optional[list[LeechFile]]:
+    if PARSE_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    try:
+        raw = redis_client.get(get_cache_key(PARSE_CACHE_KEY_PREFIX, link, password))
+
+        if raw is None:
+            return None
+
+        return [load_leech_file(fields) for fields in json.loads(raw)]
+    except Exception as e:
+        logger.warning(f'Fail to read parse cache of {link}: {str(e)}')
+
+    return None
+
+
+def cache_files(link: str, leech_files: list[LeechFile], password: Optional[str] = None):
+    # an empty result is usually a failed request rather than an empty album
+    if PARSE_CACHE_TTL_SECONDS <= 0 or not leech_files:
+        return
+
+    ttl = min(get_ttl(
+        leech_file.tool,
+        [getattr(leech_file, 'actual_link', None)],
+        getattr(leech_file, 'actual_link_expire_at', None)
+    ) for leech_file in leech_files)
+
+    if ttl <= 0:
+        return
+
+    try:
+        redis_client.set(
+            get_cache_key(PARSE_CACHE_KEY_PREFIX, link, password),
+            json.dumps([dump_leech_file(leech_file) for leech_file in leech_files]),
+            ex=ttl
+        )
+    except Exception as e:
+        logger.warning(f'Fail to write parse cache of {link}: {str(e)}')
+
+
+def get_cached_resolution(link: str) -> Optional[dict]:
+    if PARSE_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    try:
+        raw = redis_client.get(get_cache_key(RESOLVE_CACHE_KEY_PREFIX, link))
+
+        return json.loads(raw) if raw is not None else None
+    except Exception as e:
+        logger.warning(f'Fail to read resolution cache of {link}: {str(e)}')
+
+    return None
+
+
+def cache_resolution(link: str, tool: LeechFileTool, fields: dict, expire_at: Optional[float] = None):
+    if PARSE_CACHE_TTL_SECONDS <= 0:
+        return
+
+    ttl = get_ttl(tool, [fields.get('actual_link')], expire_at)
+
+    if ttl <= 0:
+        return
+
+    try:
+        redis_client.set(get_cache_key(RESOLVE_CACHE_KEY_PREFIX, link), json.dumps(fields), ex=ttl)
+    except Exception as e:
+        logger.warning(f'Fail to write resolution cache of {link}: {str(e)}')
+
+
+def invalidate_link(link: str):
+    # the site refused the resolved url, the next attempt has to resolve it again
+    try:
+        redis_client.delete(
+            get_cache_key(PARSE_CACHE_KEY_PREFIX, link),
+            get_cache_key(RESOLVE_CACHE_KEY_PREFIX, link),
+        )
+    except Exception as e:
+        logger.warning(f'Fail to invalidate parse cache of {link}: {str(e)}')
@@ -0,0 +1,131 @@
+import random
+import datetime
+import httpx
+from loguru import logger
+from email.utils import parsedate_to_datetime
+from httpx import _status_codes
+from pyrogram.errors import FloodWait
+
+from tool.redis_client import redis_client
+from module.leech.constants.error_category import ErrorCategory
+from config.config import RETRY_MAXIMUM_ATTEMPTS, RETRY_BACKOFF_BASE_SECONDS, RETRY_BACKOFF_MAXIMUM_SECONDS, \
+    RETRY_MAXIMUM_ATTEMPTS_PER_HOST, RETRY_HOST_WINDOW_SECONDS
+
+TRANSIENT_ERROR_CATEGORIES = [
+    ErrorCategory.RATE_LIMITED,
+    ErrorCategory.SERVER_ERROR,
+    ErrorCategory.TIMEOUT,
+    ErrorCategory.NETWORK_ERROR,
+    ErrorCategory.MAINTENANCE,
+    ErrorCategory.AUTH_EXPIRED,
+]
+# a second failure with fresh credentials means we are not allowed to access it at all
+MAXIMUM_AUTH_EXPIRED_ATTEMPTS = 1
+HOST_RETRY_KEY_PREFIX = 'leech:retry:host:'
+
+
+class MaintenanceError(Exception):
+    def __init__(self, message: str, retry_after: int | None = None):
+        super().__init__(message)
+        # seconds until the server is expected back
+        self.retry_after = retry_after
+
+
+def classify_status_code(status_code: int) -> ErrorCategory:
+    if status_code == _status_codes.codes.TOO_MANY_REQUESTS:
+        return ErrorCategory.RATE_LIMITED
+
+    if status_code in [_status_codes.codes.UNAUTHORIZED, _status_codes.codes.FORBIDDEN]:
+        return ErrorCategory.AUTH_EXPIRED
+
+    if status_code in [_status_codes.codes.NOT_FOUND, _status_codes.codes.GONE]:
+        return ErrorCategory.NOT_FOUND
+
+    if status_code >= _status_codes.codes.INTERNAL_SERVER_ERROR:
+        return ErrorCategory.SERVER_ERROR
+
+    return ErrorCategory.UNKNOWN
+
+
+def classify_exception(e: Exception) -> ErrorCategory:
+    if isinstance(e, MaintenanceError):
+        return ErrorCategory.MAINTENANCE
+
+    if isinstance(e, FloodWait):
+        return ErrorCategory.RATE_LIMITED
+
+    if isinstance(e, httpx.HTTPStatusError):
+        return classify_status_code(e.response.status_code)
+
+    if isinstance(e, (httpx.TimeoutException, TimeoutError)):
+        return ErrorCategory.TIMEOUT
+
+    if isinstance(e, (httpx.TransportError, ConnectionError)):
+        return ErrorCategory.NETWORK_ERROR
+
+    return ErrorCategory.UNKNOWN
+
+
+def parse_retry_after(value: str | None) -> int | None:
+    if not value:
+        return None
+
+    if value.strip().isdigit():
+        return int(value.strip())
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0, int((retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()))
+
+
+def get_retry_after(e: Exception) -> int | None:
+    if isinstance(e, FloodWait):
+        return int(e.value)
+
+    if isinstance(e, httpx.HTTPStatusError):
+        return parse_retry_after(e.response.headers.get('retry-after'))
+
+    if isinstance(e, MaintenanceError):
+        return e.retry_after
+
+    return None
+
+
+def get_retry_countdown(retries: int, retry_after: int | None = None) -> float:
+    # full jitter, spread the retries of a burst of failures instead of sending them back together
+    countdown = random.uniform(0, min(RETRY_BACKOFF_MAXIMUM_SECONDS, RETRY_BACKOFF_BASE_SECONDS * 2 ** retries))
+
+    return max(countdown, min(retry_after or 0, RETRY_BACKOFF_MAXIMUM_SECONDS))
+
+
+def acquire_host_retry(host: str) -> bool:
+    try:
+        key = f'{HOST_RETRY_KEY_PREFIX}{host}'
+        # the counter is created with its expiry, it never outlives the window
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.set(key, 0, nx=True, ex=RETRY_HOST_WINDOW_SECONDS)
+        pipeline.incr(key)
+        attempts = pipeline.execute()[-1]
+
+        return attempts <= RETRY_MAXIMUM_ATTEMPTS_PER_HOST
+    except Exception as e:
+        logger.warning(f'Fail to count retries of host "{host}": {str(e)}')
+
+    return True
+
+
+def should_retry(host: str, category: ErrorCategory | None, retries: int) -> bool:
+    if category not in TRANSIENT_ERROR_CATEGORIES or retries >= RETRY_MAXIMUM_ATTEMPTS:
+        return False
+
+    if category == ErrorCategory.AUTH_EXPIRED and retries >= MAXIMUM_AUTH_EXPIRED_ATTEMPTS:
+        return False
+
+    return acquire_host_retry(host)
+
+
+def get_retry_reason(retries: int, countdown: float, reason: str | None) -> str:
+    return f'Retry {retries + 1}/{RETRY_MAXIMUM_ATTEMPTS} in {countdown:.0f}s: {reason}'
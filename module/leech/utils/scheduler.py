@@ -0,0 +1,79 @@
+import shutil
+from itertools import zip_longest
+from urllib.parse import urlparse
+
+from module.leech.beans.leech_file import LeechFile
+from config.config import BOT_DOWNLOAD_LOCATION, TASK_SCHEDULE_STRATEGY
+from module.leech.constants.schedule_strategy import ScheduleStrategy
+
+# redis transport consumes priority 0 first, 9 last
+HIGHEST_PRIORITY = 0
+LOWEST_PRIORITY = 9
+DEFAULT_PRIORITY = 3
+# upper bound in bytes of each priority, files larger than the last step share the next priority
+PRIORITY_SIZE_STEPS = (
+    16 * 1024 ** 2,
+    64 * 1024 ** 2,
+    256 * 1024 ** 2,
+    1024 ** 3,
+    4 * 1024 ** 3,
+    16 * 1024 ** 3,
+)
+# files without any size hint are scheduled as a medium sized one
+UNKNOWN_SIZE_HINT = 1024 ** 3
+
+
+def get_free_space(location: str = BOT_DOWNLOAD_LOCATION) -> int | None:
+    try:
+        return shutil.disk_usage(location or '/').free
+    except OSError:
+        return None
+
+
+def get_expected_size(leech_file: LeechFile) -> int:
+    return leech_file.size_hint or leech_file.size or UNKNOWN_SIZE_HINT
+
+
+def get_host(leech_file: LeechFile) -> str:
+    return urlparse(leech_file.link).netloc
+
+
+def get_task_priority(leech_file: LeechFile, free_space: int | None = None) -> int:
+    if TASK_SCHEDULE_STRATEGY != ScheduleStrategy.SJF:
+        return DEFAULT_PRIORITY
+
+    expected_size = get_expected_size(leech_file)
+
+    # park files which can not fit into the disk right now behind everything else
+    if leech_file.size_hint and free_space is not None and expected_size > free_space:
+        return LOWEST_PRIORITY
+
+    return next(
+        (priority for priority, step in enumerate(PRIORITY_SIZE_STEPS) if expected_size <= step),
+        len(PRIORITY_SIZE_STEPS)
+    )
+
+
+def order_leech_files(leech_files: list[LeechFile], free_space: int | None = None) -> list[tuple[LeechFile, int]]:
+    if TASK_SCHEDULE_STRATEGY != ScheduleStrategy.SJF:
+        return [(leech_file, DEFAULT_PRIORITY) for leech_file in leech_files]
+
+    free_space = get_free_space() if free_space is None else free_space
+    buckets: dict[int, dict[str, list[LeechFile]]] = {}
+
+    for leech_file in sorted(leech_files, key=get_expected_size):
+        buckets.setdefault(
+            get_task_priority(leech_file, free_space), {}
+        ).setdefault(get_host(leech_file), []).append(leech_file)
+
+    scheduled_files = []
+
+    # smallest first, and files of the same priority take turns between hosts,
+    # so a slow host can not hold back the others
+    for priority in sorted(buckets.keys()):
+        for leech_files_of_round in zip_longest(*buckets[priority].values()):
+            scheduled_files.extend(
+                (leech_file, priority) for leech_file in leech_files_of_round if leech_file is not None
+            )
+
+    return scheduled_files
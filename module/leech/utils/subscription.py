@@ -0,0 +1,49 @@
+import hashlib
+
+from tool.redis_client import redis_client
+from module.leech.beans.leech_file import LeechFile
+from module.leech.utils.parse_cache import normalize_link
+
+SUBSCRIPTION_SEEN_KEY_PREFIX = 'subscription:seen:'
+SUBSCRIPTION_CURSOR_KEY_PREFIX = 'subscription:cursor:'
+# the first 8 bytes of the md5 of the link tell the files of one subscription apart, a quarter of the digest
+SEEN_FILE_KEY_BYTES = 8
+
+
+def get_seen_key(subscription_id: str) -> str:
+    return f'{SUBSCRIPTION_SEEN_KEY_PREFIX}{subscription_id}'
+
+
+def get_cursor_key(subscription_id: str) -> str:
+    # where incremental parsers keep how far this subscription has listed, never shared with other runs
+    return f'{SUBSCRIPTION_CURSOR_KEY_PREFIX}{subscription_id}'
+
+
+def get_file_key(leech_file: LeechFile) -> bytes:
+    # the name of a file may only be known once it is resolved, and files of different folders share names,
+    # the link is the same at every check
+    return hashlib.md5(normalize_link(leech_file.link).encode()).digest()[:SEEN_FILE_KEY_BYTES]
+
+
+def filter_new_files(subscription_id: str, leech_files: list[LeechFile], baseline: bool = False) -> list[LeechFile]:
+    # sadd only answers 1 for keys not in the set yet, so overlapping checks never queue a file twice
+    pipeline = redis_client.pipeline(transaction=False)
+
+    for leech_file in leech_files:
+        pipeline.sadd(get_seen_key(subscription_id), get_file_key(leech_file))
+
+    added = pipeline.execute()
+
+    # the first check only remembers the files which are already there
+    if baseline:
+        return []
+
+    return [leech_file for leech_file, is_new in zip(leech_files, added) if is_new]
+
+
+def has_seen_files(subscription_id: str) -> bool:
+    return redis_client.exists(get_seen_key(subscription_id)) > 0
+
+
+def clear_seen_files(subscription_id: str):
+    redis_client.delete(get_seen_key(subscription_id), get_cursor_key(subscription_id))
@@ -0,0 +1,31 @@
+from celery import chain
+from loguru import logger
+from constants.worker import Queue
+from module.leech.beans.leech_file import LeechFile
+from module.leech.adaptors.uploader import process_upload
+from module.leech.adaptors.downloader import process_download
+from module.leech.utils.scheduler import DEFAULT_PRIORITY, order_leech_files
+
+
+def create_pending_task(leech_file: LeechFile, priority: int = DEFAULT_PRIORITY):
+    chain(
+        process_download.signature(
+            (leech_file,),
+            queue=f'{Queue.FILE_DOWNLOAD_QUEUE}@{leech_file.tool}',
+            priority=priority
+        ),
+        process_upload.signature(queue=f'{Queue.FILE_SYNC_QUEUE}@{leech_file.sync_tool}', priority=priority)
+    ).apply_async()
+
+
+def create_pending_tasks(leech_files: list[LeechFile]) -> int:
+    number_of_created_tasks = 0
+
+    for leech_file, priority in order_leech_files(leech_files):
+        try:
+            create_pending_task(leech_file, priority)
+            number_of_created_tasks += 1
+        except Exception as e:
+            logger.error(f'Fail to create task for "{leech_file.name}": {str(e)}')
+
+    return number_of_created_tasks
@@ -5,6 +5,7 @@ import prettytable as pt
 from pyrogram.types import Message
 from pyrogram import filters, Client
 from tool.utils import is_admin, convert_bytes
+from tool.message_scheduler import schedule_message_deletion
 from pyrogram.enums.parse_mode import ParseMode
 from config.config import TELEGRAM_ADMIN_ID, BOT_DOWNLOAD_LOCATION
 
@@ -67,6 +68,4 @@ async def start(client: Client, message: Message):
         parse_mode=ParseMode.HTML
     )
 
-    time.sleep(5)
-    await message.delete()
-    await m.delete()
+    schedule_message_deletion(message, m, delay=5)
@@ -10,6 +10,8 @@ from pyrogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup,
 from pyrogram.enums import ParseMode
 from loguru import logger
 from tool.utils import is_admin
+from tool.executor import run_blocking
+from tool.network_usage import Direction, Dimension
 from module.network.services.network_monitor import NetworkMonitorService
 from module.network.utils.format_utils import format_bandwidth, format_data_size, format_packet_count, format_uptime
 from module.i18n.services.i18n_manager import I18nManager
@@ -95,6 +97,47 @@ async def show_network_help(message: Message):
     )
 
 
+def create_throughput_table(throughput: dict, user_lang: str = 'zh_CN') -> pt.PrettyTable:
+    """创建按工具、同步工具和Worker分类的带宽表格"""
+    category = i18n_manager.translate('network.table.category', user_lang)
+    upload = i18n_manager.translate('network.table.upload', user_lang)
+    download = i18n_manager.translate('network.table.download', user_lang)
+    
+    throughput_table = pt.PrettyTable([category, upload, download])
+    throughput_table.border = True
+    throughput_table.preserve_internal_border = False
+    throughput_table.header = True
+    throughput_table._max_width = {category: 12, upload: 8, download: 8}
+    throughput_table.align[category] = 'l'
+    throughput_table.align[upload] = 'r'
+    throughput_table.align[download] = 'r'
+    
+    for dimension, title in [
+        (Dimension.TOOL, 'network.data.by_tool'),
+        (Dimension.SYNC_TOOL, 'network.data.by_sync_tool'),
+        (Dimension.WORKER, 'network.data.by_worker')
+    ]:
+        uploads = throughput[Direction.UPLOAD][dimension]
+        downloads = throughput[Direction.DOWNLOAD][dimension]
+        
+        if not uploads and not downloads:
+            continue
+            
+        throughput_table.add_row([i18n_manager.translate(title, user_lang), '', ''])
+        for name in sorted(set(uploads) | set(downloads)):
+            throughput_table.add_row([
+                # Worker名称的前缀是固定的队列名称，只显示最后一段
+                name.rsplit('@', 1)[-1],
+                format_bandwidth(uploads.get(name, 0)),
+                format_bandwidth(downloads.get(name, 0))
+            ])
+    
+    if not throughput_table.rows:
+        throughput_table.add_row([i18n_manager.translate('network.data.no_transfer', user_lang), '-', '-'])
+        
+    return throughput_table
+
+
 async def handle_network_status(client: Client, message: Message):
     """处理网络状态查询子命令"""
     global network_service
@@ -149,9 +192,10 @@ async def handle_network_status(client: Client, message: Message):
             network_stats['error'][:10] + '..'
         ], divider=True)
     
-    # 创建带宽统计表格
+    # 创建带宽统计表格，峰值和百分位数需要遍历采样，在线程池中计算
     bandwidth_avg = network_service.get_bandwidth_average(5)
-    bandwidth_peak = network_service.get_peak_bandwidth()
+    bandwidth_peak = await run_blocking(network_service.get_peak_bandwidth)
+    bandwidth_percentiles = await run_blocking(network_service.get_bandwidth_percentiles, 60)
     
     bandwidth_table = pt.PrettyTable([
         i18n_manager.translate('network.table.stats_type', user_lang), 
@@ -182,6 +226,18 @@ async def handle_network_status(client: Client, message: Message):
         format_bandwidth(bandwidth_peak.get('peak_download', 0))
     ])
     
+    for percentile in sorted(bandwidth_percentiles['upload']):
+        bandwidth_table.add_row([
+            i18n_manager.translate('network.data.percentile', user_lang, percentile=percentile),
+            format_bandwidth(bandwidth_percentiles['upload'][percentile]),
+            format_bandwidth(bandwidth_percentiles['download'][percentile])
+        ])
+    
+    # 下载和上传Worker上报到Redis的分类带宽
+    throughput_table = create_throughput_table(
+        await run_blocking(network_service.get_throughput_breakdown, 60), user_lang
+    )
+    
     # 创建监控状态表格
     monitor_table = pt.PrettyTable([
         i18n_manager.translate('network.table.monitor_item', user_lang), 
@@ -207,7 +263,7 @@ async def handle_network_status(client: Client, message: Message):
     ], divider=True)
     monitor_table.add_row([
         i18n_manager.translate('network.data.data_points', user_lang), 
-        str(len(network_service.bandwidth_history))
+        str(len(network_service.sampler))
     ], divider=True)
     
     status_text = (
@@ -216,6 +272,8 @@ async def handle_network_status(client: Client, message: Message):
         f"<pre>{status_table.get_string()}</pre>\n\n"
         f"<b>{i18n_manager.translate('network.status.bandwidth_stats', user_lang)}</b>\n"
         f"<pre>{bandwidth_table.get_string()}</pre>\n\n"
+        f"<b>{i18n_manager.translate('network.status.throughput_breakdown', user_lang)}</b>\n"
+        f"<pre>{throughput_table.get_string()}</pre>\n\n"
         f"<b>{i18n_manager.translate('network.status.monitor_status', user_lang)}</b>\n"
         f"<pre>{monitor_table.get_string()}</pre>"
     )
@@ -292,7 +350,7 @@ async def handle_network_connections(client: Client, message: Message):
     if not network_service:
         network_service = NetworkMonitorService()
     
-    conn_stats = network_service.get_connection_stats()
+    conn_stats = await run_blocking(network_service.get_connection_stats)
     
     if 'error' in conn_stats:
         # 发送消息并在5秒后自动删除
@@ -338,15 +396,43 @@ async def handle_network_connections(client: Client, message: Message):
         i18n_manager.translate('network.connections.established_connections', user_lang), 
         str(conn_stats.get('established_connections', 0))
     ], divider=True)
+    conn_table.add_row([
+        i18n_manager.translate('network.connections.close_wait_connections', user_lang), 
+        str(conn_stats.get('close_wait_connections', 0))
+    ], divider=True)
     conn_table.add_row([
         i18n_manager.translate('network.connections.time_wait_connections', user_lang), 
         str(conn_stats.get('time_wait_connections', 0))
     ], divider=True)
     
+    # 创建按Worker分类的连接表格
+    worker_column = i18n_manager.translate('network.table.worker', user_lang)
+    total_column = i18n_manager.translate('network.table.count', user_lang)
+    established_column = i18n_manager.translate('network.table.established', user_lang)
+    
+    worker_table = pt.PrettyTable([worker_column, total_column, established_column])
+    worker_table.border = True
+    worker_table.preserve_internal_border = False
+    worker_table.header = True
+    worker_table._max_width = {worker_column: 12, total_column: 6, established_column: 6}
+    worker_table.align[worker_column] = 'l'
+    worker_table.align[total_column] = 'r'
+    worker_table.align[established_column] = 'r'
+    
+    for name, worker_stats in sorted(conn_stats.get('workers', {}).items()):
+        worker_table.add_row([
+            # Worker名称的前缀是固定的队列名称，只显示最后一段
+            name.rsplit('@', 1)[-1],
+            str(worker_stats.get('total', 0)),
+            str(worker_stats.get('established', 0))
+        ])
+    
     conn_text = (
         f"<b>{i18n_manager.translate('network.connections.title', user_lang)}</b>\n\n"
         f"<b>{i18n_manager.translate('network.connections.stats_title', user_lang)}</b>\n"
-        f"<pre>{conn_table.get_string()}</pre>"
+        f"<pre>{conn_table.get_string()}</pre>\n\n"
+        f"<b>{i18n_manager.translate('network.connections.by_worker', user_lang)}</b>\n"
+        f"<pre>{worker_table.get_string()}</pre>"
     )
     
     # 发送消息并在5秒后自动删除
@@ -482,7 +568,7 @@ async def stop_network_monitor(client: Client, message: Message):
     ], divider=True)
     stop_table.add_row([
         i18n_manager.translate('network.control.preserved_data', user_lang), 
-        i18n_manager.translate('network.control.data_points_unit', user_lang, size=len(network_service.bandwidth_history))
+        i18n_manager.translate('network.control.data_points_unit', user_lang, size=len(network_service.sampler))
     ], divider=True)
     
     stop_text = (
@@ -509,7 +595,7 @@ async def reset_network_stats(client: Client, message: Message):
         await sent_msg.delete()
         return
     
-    old_data_points = len(network_service.bandwidth_history)
+    old_data_points = len(network_service.sampler)
     network_service.reset_history()
     
     # 创建重置结果表格
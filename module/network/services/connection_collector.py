@@ -0,0 +1,266 @@
+"""
+连接统计采集器
+只统计Bot进程及其启动的Celery Worker进程的连接，避免扫描整个主机的套接字
+"""
+
+import os
+import time
+import socket
+import psutil
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+
+# /proc/net/tcp 中的十六进制状态码
+TCP_STATES = {
+    '01': 'ESTABLISHED',
+    '02': 'SYN_SENT',
+    '03': 'SYN_RECV',
+    '04': 'FIN_WAIT1',
+    '05': 'FIN_WAIT2',
+    '06': 'TIME_WAIT',
+    '07': 'CLOSE',
+    '08': 'CLOSE_WAIT',
+    '09': 'LAST_ACK',
+    '0A': 'LISTEN',
+    '0B': 'CLOSING',
+}
+SOCKET_TABLES = {
+    'tcp': ['tcp', 'tcp6'],
+    'udp': ['udp', 'udp6'],
+}
+SOCKET_LINK_PREFIX = 'socket:['
+# 连接统计的缓存时间（秒）
+CACHE_TTL = 5
+# 不是由Celery启动的进程
+BOT_PROCESS_NAME = 'bot'
+
+
+def parse_socket_table(path: str) -> Iterator[Tuple[int, str]]:
+    """解析 /proc/net/{tcp,tcp6,udp,udp6}
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        (inode, 状态) 迭代器，TIME_WAIT 等不属于任何进程的套接字 inode 为 0
+    """
+    with open(path) as file:
+        next(file, None)
+
+        for line in file:
+            fields = line.split()
+
+            if len(fields) > 9:
+                yield int(fields[9]), TCP_STATES.get(fields[3], fields[3])
+
+
+def get_socket_inodes(pid: int, proc_root: str = '/proc') -> List[int]:
+    """获取进程打开的套接字 inode
+
+    Args:
+        pid: 进程ID
+        proc_root: proc 文件系统的挂载位置
+
+    Returns:
+        inode 列表
+    """
+    inodes = []
+
+    try:
+        with os.scandir(f'{proc_root}/{pid}/fd') as entries:
+            for entry in entries:
+                try:
+                    link = os.readlink(entry.path)
+                except OSError:
+                    # 读取期间被关闭
+                    continue
+
+                if link.startswith(SOCKET_LINK_PREFIX):
+                    inodes.append(int(link[len(SOCKET_LINK_PREFIX):-1]))
+    except OSError as e:
+        logger.debug(f"读取进程 {pid} 的文件描述符失败: {e}")
+
+    return inodes
+
+
+def get_worker_name(process: psutil.Process) -> Optional[str]:
+    """从 open_celery_worker_process 的启动参数中获取Worker名称
+
+    Args:
+        process: 进程
+
+    Returns:
+        Worker名称，不是Celery Worker时返回None
+    """
+    try:
+        for argument in process.cmdline():
+            if argument.startswith('--hostname='):
+                return argument.removeprefix('--hostname=')
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+
+    return None
+
+
+def get_process_tree() -> Dict[int, str]:
+    """获取Bot进程树中的所有进程，Worker的子进程归属于该Worker
+
+    Returns:
+        进程ID到所属Worker名称的映射
+    """
+    root = psutil.Process(os.getpid())
+    processes = {root.pid: BOT_PROCESS_NAME}
+    pending = [(root, BOT_PROCESS_NAME)]
+
+    while pending:
+        process, name = pending.pop()
+
+        try:
+            children = process.children()
+        except psutil.NoSuchProcess:
+            continue
+
+        for child in children:
+            child_name = get_worker_name(child) or name
+            processes[child.pid] = child_name
+            pending.append((child, child_name))
+
+    return processes
+
+
+def summarize(connections: List[Tuple[str, str, str]], time_wait_connections: int) -> Dict:
+    """汇总连接统计
+
+    Args:
+        connections: (Worker名称, 协议, 状态) 列表
+        time_wait_connections: TIME_WAIT 状态的连接数量，这些连接已不属于任何进程
+
+    Returns:
+        与 NetworkMonitorService.get_connection_stats 相同格式的统计，另外包含按Worker分类的统计
+    """
+    stats = {
+        'total_connections': len(connections),
+        'tcp_connections': 0,
+        'udp_connections': 0,
+        'listening_ports': 0,
+        'established_connections': 0,
+        'close_wait_connections': 0,
+        'time_wait_connections': time_wait_connections,
+        'workers': {}
+    }
+
+    for name, protocol, status in connections:
+        worker = stats['workers'].setdefault(name, Counter())
+        worker['total'] += 1
+        stats[f'{protocol}_connections'] += 1
+
+        if protocol != 'tcp':
+            continue
+
+        if status == 'LISTEN':
+            stats['listening_ports'] += 1
+        elif status == 'ESTABLISHED':
+            stats['established_connections'] += 1
+            worker['established'] += 1
+        elif status == 'CLOSE_WAIT':
+            stats['close_wait_connections'] += 1
+            worker['close_wait'] += 1
+
+    stats['workers'] = {name: dict(worker) for name, worker in stats['workers'].items()}
+
+    return stats
+
+
+class ConnectionCollector:
+    """Bot进程树的连接统计采集器"""
+
+    def __init__(self, ttl: float = CACHE_TTL, proc_root: str = '/proc'):
+        """初始化连接统计采集器
+
+        Args:
+            ttl: 缓存时间（秒）
+            proc_root: proc 文件系统的挂载位置
+        """
+        self.ttl = ttl
+        self.proc_root = proc_root
+        self.cached_stats = None
+        self.cached_at = 0.0
+
+    def collect_from_proc(self, processes: Dict[int, str]) -> Dict:
+        """读取进程的套接字 inode，再从 /proc/net 中查找状态
+
+        Args:
+            processes: 进程ID到所属Worker名称的映射
+
+        Returns:
+            连接统计
+        """
+        owners = {
+            inode: name for pid, name in processes.items() for inode in get_socket_inodes(pid, self.proc_root)
+        }
+        connections = []
+        time_wait_connections = 0
+
+        for protocol, tables in SOCKET_TABLES.items():
+            for table in tables:
+                try:
+                    for inode, status in parse_socket_table(f'{self.proc_root}/net/{table}'):
+                        if inode in owners:
+                            connections.append((owners[inode], protocol, status))
+                        elif protocol == 'tcp' and status == 'TIME_WAIT':
+                            time_wait_connections += 1
+                except FileNotFoundError:
+                    # 未启用 IPv6
+                    continue
+
+        return summarize(connections, time_wait_connections)
+
+    def collect_from_psutil(self, processes: Dict[int, str]) -> Dict:
+        """没有 /proc 文件系统时逐个进程查询连接
+
+        Args:
+            processes: 进程ID到所属Worker名称的映射
+
+        Returns:
+            连接统计
+        """
+        connections = []
+
+        for pid, name in processes.items():
+            try:
+                for connection in psutil.Process(pid).net_connections(kind='inet'):
+                    connections.append((
+                        name,
+                        'tcp' if connection.type == socket.SOCK_STREAM else 'udp',
+                        connection.status
+                    ))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        return summarize(connections, 0)
+
+    def get_connection_stats(self) -> Dict:
+        """获取连接统计，缓存时间内直接返回上次的结果
+
+        Returns:
+            连接统计
+        """
+        if self.cached_stats is not None and time.monotonic() - self.cached_at < self.ttl:
+            return self.cached_stats
+
+        processes = get_process_tree()
+
+        if os.path.exists(f'{self.proc_root}/net/tcp'):
+            stats = self.collect_from_proc(processes)
+        else:
+            stats = self.collect_from_psutil(processes)
+
+        self.cached_stats = stats
+        self.cached_at = time.monotonic()
+
+        return stats
+
+
+# 所有网络监控服务共享缓存
+connection_collector = ConnectionCollector()
@@ -4,17 +4,22 @@
 """
 
 import time
-import asyncio
 import psutil
 from datetime import datetime
 from typing import Dict, Optional, List
 from loguru import logger
+from tool.network_usage import get_throughput
 from module.network.utils.format_utils import format_bandwidth, format_data_size
+from module.network.services.network_sampler import network_sampler
+from module.network.services.connection_collector import connection_collector
 from module.i18n.services.i18n_manager import I18nManager
 
 # 初始化国际化管理器
 i18n_manager = I18nManager()
 
+# 实时带宽使用最近几秒的采样计算
+REALTIME_WINDOW = 3
+
 
 class NetworkMonitorService:
     """网络监控服务"""
@@ -25,14 +30,18 @@ class NetworkMonitorService:
         Args:
             config: 配置字典
         """
-        self.running = False
-        self.check_interval = 2  # 2秒检查一次用于实时带宽计算
         self.last_stats = None
         self.last_check_time = None
         
-        # 带宽监控历史数据
-        self.bandwidth_history = []
-        self.max_history_size = 30  # 保存最近30个数据点
+        # 带宽历史数据由后台采样器保存，所有服务实例共享
+        self.sampler = network_sampler
+        self.check_interval = self.sampler.interval
+        self.max_history_size = self.sampler.capacity
+        
+    @property
+    def running(self) -> bool:
+        """后台采样是否在运行"""
+        return self.sampler.running
         
     def get_network_interfaces(self) -> List[str]:
         """获取所有网络接口名称
@@ -79,8 +88,13 @@ class NetworkMonitorService:
                 'timestamp': current_time
             }
             
-            # 计算实时带宽
-            if self.last_stats and self.last_check_time:
+            # 计算实时带宽，采样器运行时使用最近的采样
+            if not interface and self.sampler.running and len(self.sampler) > 1:
+                bandwidth = self.sampler.get_bandwidth_average(REALTIME_WINDOW)
+                network_info['upload_speed'] = bandwidth['avg_upload']
+                network_info['download_speed'] = bandwidth['avg_download']
+                network_info['total_speed'] = bandwidth['avg_total']
+            elif self.last_stats and self.last_check_time:
                 time_diff = current_time - self.last_check_time
                 if time_diff > 0:
                     sent_speed = (stats.bytes_sent - self.last_stats.bytes_sent) / time_diff
@@ -89,17 +103,6 @@ class NetworkMonitorService:
                     network_info['upload_speed'] = max(0, sent_speed)
                     network_info['download_speed'] = max(0, recv_speed)
                     network_info['total_speed'] = network_info['upload_speed'] + network_info['download_speed']
-                    
-                    # 更新带宽历史
-                    bandwidth_data = {
-                        'timestamp': current_time,
-                        'upload': network_info['upload_speed'],
-                        'download': network_info['download_speed']
-                    }
-                    
-                    self.bandwidth_history.append(bandwidth_data)
-                    if len(self.bandwidth_history) > self.max_history_size:
-                        self.bandwidth_history.pop(0)
                 else:
                     network_info['upload_speed'] = 0
                     network_info['download_speed'] = 0
@@ -123,36 +126,13 @@ class NetworkMonitorService:
             }
     
     def get_connection_stats(self) -> Dict:
-        """获取网络连接统计
+        """获取Bot及其Celery Worker进程的网络连接统计
         
         Returns:
-            包含连接统计的字典
+            包含连接统计的字典，workers 为按Worker分类的统计
         """
         try:
-            connections = psutil.net_connections()
-            
-            stats = {
-                'total_connections': len(connections),
-                'tcp_connections': 0,
-                'udp_connections': 0,
-                'listening_ports': 0,
-                'established_connections': 0,
-                'time_wait_connections': 0
-            }
-            
-            for conn in connections:
-                if conn.type == 1:  # TCP
-                    stats['tcp_connections'] += 1
-                    if conn.status == 'LISTEN':
-                        stats['listening_ports'] += 1
-                    elif conn.status == 'ESTABLISHED':
-                        stats['established_connections'] += 1
-                    elif conn.status == 'TIME_WAIT':
-                        stats['time_wait_connections'] += 1
-                elif conn.type == 2:  # UDP
-                    stats['udp_connections'] += 1
-                    
-            return stats
+            return connection_collector.get_connection_stats()
             
         except Exception as e:
             logger.error(f"{i18n_manager.translate('network.monitor.get_connections_failed', 'zh_CN', error=str(e))}")
@@ -167,81 +147,67 @@ class NetworkMonitorService:
         Returns:
             包含平均带宽的字典
         """
-        if not self.bandwidth_history:
-            return {
-                'avg_upload': 0,
-                'avg_download': 0,
-                'avg_total': 0,
-                'data_points': 0
-            }
-        
-        cutoff_time = time.time() - (minutes * 60)
-        recent_data = [data for data in self.bandwidth_history if data['timestamp'] > cutoff_time]
-        
-        if not recent_data:
-            return {
-                'avg_upload': 0,
-                'avg_download': 0,
-                'avg_total': 0,
-                'data_points': 0
-            }
-        
-        avg_upload = sum(data['upload'] for data in recent_data) / len(recent_data)
-        avg_download = sum(data['download'] for data in recent_data) / len(recent_data)
-        
-        return {
-            'avg_upload': avg_upload,
-            'avg_download': avg_download,
-            'avg_total': avg_upload + avg_download,
-            'data_points': len(recent_data)
-        }
+        return self.sampler.get_bandwidth_average(minutes * 60)
     
-    def get_peak_bandwidth(self) -> Dict:
+    def get_peak_bandwidth(self, minutes: int = 24 * 60) -> Dict:
         """获取峰值带宽
         
+        Args:
+            minutes: 时间窗口(分钟)，默认为采样器保存的全部时间
+            
         Returns:
             包含峰值带宽的字典
         """
-        if not self.bandwidth_history:
+        rates = self.sampler.get_rates(minutes * 60)
+        
+        if not rates['upload']:
             return {
                 'peak_upload': 0,
                 'peak_download': 0,
                 'peak_total': 0
             }
         
-        peak_upload = max(data['upload'] for data in self.bandwidth_history)
-        peak_download = max(data['download'] for data in self.bandwidth_history)
-        peak_total = max(data['upload'] + data['download'] for data in self.bandwidth_history)
-        
         return {
-            'peak_upload': peak_upload,
-            'peak_download': peak_download,
-            'peak_total': peak_total
+            'peak_upload': max(rates['upload']),
+            'peak_download': max(rates['download']),
+            'peak_total': max(upload + download for upload, download in zip(rates['upload'], rates['download']))
         }
     
+    def get_bandwidth_percentiles(self, minutes: int = 60) -> Dict:
+        """获取指定时间内带宽的 P50/P95/P99
+        
+        Args:
+            minutes: 时间窗口(分钟)
+            
+        Returns:
+            以百分位为键的上传、下载带宽
+        """
+        return self.sampler.get_percentiles(minutes * 60)
+    
+    def get_throughput_breakdown(self, seconds: int = 60) -> Dict:
+        """获取下载和上传Worker上报的分类带宽
+        
+        Args:
+            seconds: 时间窗口(秒)
+            
+        Returns:
+            按方向分组的总带宽，以及按工具、同步工具、Worker和站点分类的带宽
+        """
+        return get_throughput(seconds)
+    
     async def start_monitoring(self):
-        """启动监控循环"""
-        self.running = True
+        """启动后台采样"""
+        self.sampler.start()
         logger.info(f"{i18n_manager.translate('network.monitor.service_started', 'zh_CN', interval=self.check_interval)}")
-        
-        while self.running:
-            try:
-                # 更新网络统计以计算实时带宽
-                self.get_network_stats()
-                
-            except Exception as e:
-                logger.error(f"{i18n_manager.translate('network.monitor.service_error', 'zh_CN', error=str(e))}")
-                
-            await asyncio.sleep(self.check_interval)
     
     def stop_monitoring(self):
-        """停止监控"""
-        self.running = False
+        """停止后台采样"""
+        self.sampler.stop()
         logger.info(f"{i18n_manager.translate('network.monitor.service_stopped', 'zh_CN')}")
         
     def reset_history(self):
         """重置带宽历史数据"""
-        self.bandwidth_history = []
+        self.sampler.clear()
         self.last_stats = None
         self.last_check_time = None
-        logger.debug(f"{i18n_manager.translate('network.monitor.history_reset', 'zh_CN')}")
\ No newline at end of file
+        logger.debug(f"{i18n_manager.translate('network.monitor.history_reset', 'zh_CN')}")
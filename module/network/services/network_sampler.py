@@ -0,0 +1,233 @@
+"""
+网络采样服务
+后台每秒记录一次主机累计收发字节，供网络、磁盘和调度模块查询带宽
+"""
+
+import math
+import time
+import asyncio
+import threading
+import psutil
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from module.network.utils.ring_buffer import RingBuffer
+
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 1
+# 保存24小时的采样
+SAMPLE_CAPACITY = 24 * 60 * 60 // SAMPLE_INTERVAL
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    """使用最近秩法计算百分位数
+
+    Args:
+        sorted_values: 已排序的数据
+        percentile: 百分位 (0-100)
+
+    Returns:
+        百分位数，没有数据时返回0
+    """
+    if not sorted_values:
+        return 0
+
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class NetworkSampler:
+    """后台网络采样器
+
+    保存的是 psutil 的累计计数，任意时间窗口内的流量只需要两次读取
+    """
+
+    def __init__(self, capacity: int = SAMPLE_CAPACITY, interval: float = SAMPLE_INTERVAL):
+        """初始化网络采样器
+
+        Args:
+            capacity: 最多保存的采样数量
+            interval: 采样间隔（秒）
+        """
+        self.capacity = capacity
+        self.interval = interval
+        self.timestamps = RingBuffer(capacity)
+        self.bytes_sent = RingBuffer(capacity)
+        self.bytes_recv = RingBuffer(capacity)
+        # 采样在事件循环中写入，查询在 run_blocking 的线程中读取，三个缓冲区需要一起读写
+        self.lock = threading.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """采样任务是否在运行"""
+        return self.task is not None and not self.task.done()
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def record(self, timestamp: float, bytes_sent: int, bytes_recv: int):
+        """写入一次采样
+
+        Args:
+            timestamp: 时间戳
+            bytes_sent: 累计发送字节
+            bytes_recv: 累计接收字节
+        """
+        with self.lock:
+            self.timestamps.append(timestamp)
+            self.bytes_sent.append(bytes_sent)
+            self.bytes_recv.append(bytes_recv)
+
+    def sample(self):
+        """读取主机累计收发字节"""
+        counters = psutil.net_io_counters()
+        self.record(time.time(), counters.bytes_sent, counters.bytes_recv)
+
+    async def run(self):
+        """采样循环，按固定节奏采样，不受单次采样耗时影响"""
+        next_at = time.monotonic()
+
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"网络采样失败: {e}")
+
+            next_at += self.interval
+            await asyncio.sleep(max(next_at - time.monotonic(), 0))
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """在后台启动采样
+
+        Args:
+            loop: 事件循环，为空时使用当前运行的事件循环
+        """
+        if self.running:
+            return
+
+        self.task = (loop or asyncio.get_running_loop()).create_task(self.run())
+        logger.info(f"网络采样已启动 (间隔: {self.interval}秒, 保存: {self.capacity}个采样)")
+
+    def stop(self):
+        """停止采样，保留已有的采样"""
+        if self.running:
+            self.task.cancel()
+
+        self.task = None
+
+    def clear(self):
+        """清空采样"""
+        with self.lock:
+            self.timestamps.clear()
+            self.bytes_sent.clear()
+            self.bytes_recv.clear()
+
+    def snapshot(self, size: int) -> Tuple[List[float], List[float], List[float]]:
+        """读取同一时刻的最近若干个采样
+
+        Args:
+            size: 采样数量
+
+        Returns:
+            时间戳、累计发送字节和累计接收字节
+        """
+        with self.lock:
+            return self.timestamps.tail(size), self.bytes_sent.tail(size), self.bytes_recv.tail(size)
+
+    def get_window_total(self, seconds: float) -> Dict:
+        """获取最近一段时间内的收发字节，只读取窗口两端的累计计数
+
+        Args:
+            seconds: 时间窗口（秒）
+
+        Returns:
+            收发字节和实际覆盖的时间
+        """
+        with self.lock:
+            samples = min(int(seconds // self.interval), len(self) - 1)
+
+            if samples <= 0:
+                return {'sent': 0, 'recv': 0, 'elapsed': 0, 'data_points': 0}
+
+            return {
+                'sent': max(self.bytes_sent[-1] - self.bytes_sent[-1 - samples], 0),
+                'recv': max(self.bytes_recv[-1] - self.bytes_recv[-1 - samples], 0),
+                'elapsed': self.timestamps[-1] - self.timestamps[-1 - samples],
+                'data_points': samples
+            }
+
+    def get_bandwidth_average(self, seconds: float) -> Dict:
+        """获取最近一段时间内的平均带宽
+
+        Args:
+            seconds: 时间窗口（秒）
+
+        Returns:
+            包含平均带宽的字典
+        """
+        total = self.get_window_total(seconds)
+        elapsed = total['elapsed']
+        avg_upload = total['sent'] / elapsed if elapsed > 0 else 0
+        avg_download = total['recv'] / elapsed if elapsed > 0 else 0
+
+        return {
+            'avg_upload': avg_upload,
+            'avg_download': avg_download,
+            'avg_total': avg_upload + avg_download,
+            'data_points': total['data_points']
+        }
+
+    def get_rates(self, seconds: float) -> Dict[str, List[float]]:
+        """获取最近一段时间内每个采样间隔的带宽
+
+        Args:
+            seconds: 时间窗口（秒）
+
+        Returns:
+            上传和下载带宽（字节/秒）列表
+        """
+        timestamps, bytes_sent, bytes_recv = self.snapshot(int(seconds // self.interval) + 1)
+
+        if len(timestamps) < 2:
+            return {'upload': [], 'download': []}
+
+        durations = [max(current - previous, 1e-6) for previous, current in zip(timestamps, timestamps[1:])]
+
+        def to_rates(counters: List[float]) -> List[float]:
+            # 网卡重置时累计计数会变小，按0处理
+            return [
+                max(current - previous, 0) / duration
+                for previous, current, duration in zip(counters, counters[1:], durations)
+            ]
+
+        return {
+            'upload': to_rates(bytes_sent),
+            'download': to_rates(bytes_recv)
+        }
+
+    def get_percentiles(self, seconds: float, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict:
+        """获取最近一段时间内带宽的百分位数
+
+        Args:
+            seconds: 时间窗口（秒）
+            percentiles: 百分位
+
+        Returns:
+            以百分位为键的上传、下载带宽，以及峰值
+        """
+        rates = self.get_rates(seconds)
+        uploads = sorted(rates['upload'])
+        downloads = sorted(rates['download'])
+
+        return {
+            'upload': {percentile: get_percentile(uploads, percentile) for percentile in percentiles},
+            'download': {percentile: get_percentile(downloads, percentile) for percentile in percentiles},
+            'peak_upload': uploads[-1] if uploads else 0,
+            'peak_download': downloads[-1] if downloads else 0,
+            'data_points': len(uploads)
+        }
+
+
+# 全局采样器，Bot启动时开始采样
+network_sampler = NetworkSampler()
@@ -0,0 +1,81 @@
+"""
+环形缓冲区
+使用预分配的数组保存固定数量的数据点，写入时覆盖最旧的数据
+"""
+
+from array import array
+from typing import Iterator
+
+
+class RingBuffer:
+    """预分配的环形缓冲区"""
+
+    def __init__(self, capacity: int, typecode: str = 'd'):
+        """初始化环形缓冲区
+
+        Args:
+            capacity: 最多保存的数据点数量
+            typecode: array 的类型代码
+        """
+        self.capacity = capacity
+        self.values = array(typecode, [0]) * capacity
+        self.index = 0  # 下一个写入的位置
+        self.count = 0
+
+    def append(self, value):
+        """写入数据点，缓冲区已满时覆盖最旧的数据点
+
+        Args:
+            value: 数据点
+        """
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int):
+        """按从旧到新的顺序读取数据点，负数表示从最新的数据点倒数
+
+        Args:
+            position: 位置
+
+        Returns:
+            数据点
+        """
+        if position < 0:
+            position += self.count
+
+        if not 0 <= position < self.count:
+            raise IndexError('ring buffer index out of range')
+
+        return self.values[(self.index - self.count + position) % self.capacity]
+
+    def __iter__(self) -> Iterator:
+        for position in range(self.count):
+            yield self[position]
+
+    def tail(self, size: int) -> list:
+        """按从旧到新的顺序读取最新的数据点
+
+        Args:
+            size: 数据点数量
+
+        Returns:
+            数据点列表
+        """
+        size = min(size, self.count)
+        start = (self.index - size) % self.capacity
+
+        # 数据点跨越数组末尾时分两段切片
+        if start + size <= self.capacity:
+            return self.values[start:start + size].tolist()
+
+        return self.values[start:].tolist() + self.values[:self.index].tolist()
+
+    def clear(self):
+        """清空缓冲区，保留已分配的数组"""
+        self.index = 0
+        self.count = 0
+
@@ -77,11 +77,18 @@ class TestDiskMonitorIntegration(unittest.TestCase):
         self.assertEqual(dir_info['file_count'], 6)  # 5个文件 + 1个子目录文件
         self.assertEqual(dir_info['dir_count'], 1)   # 1个子目录
         
-        # 测试清理功能
+        # 测试清理功能，文件都没有对应的任务记录且已超过宽限期
+        from module.disk.services.cleanup_planner import CleanupPlanner, ORPHAN_GRACE_SECONDS
+        
+        modified_at = datetime.now().timestamp() - ORPHAN_GRACE_SECONDS - 1
+        for path in test_files + [test_subdir, os.path.join(test_subdir, 'subfile.txt')]:
+            os.utime(path, (modified_at, modified_at))
+            
         async def test_cleanup():
             return await cleanup.clean_download_directory()
             
-        result = asyncio.run(test_cleanup())
+        with patch.object(CleanupPlanner, 'get_leech_files', side_effect=lambda paths: {path: [] for path in paths}):
+            result = asyncio.run(test_cleanup())
         
         # 验证清理结果
         self.assertTrue(result['success'])
@@ -127,25 +134,39 @@ class TestDiskMonitorIntegration(unittest.TestCase):
         """测试Celery调整服务"""
         from module.disk.services.celery_adjustment import CeleryAdjustmentService
         
-        service = CeleryAdjustmentService()
-        
-        # 测试获取worker设置
-        settings = service.get_current_worker_settings()
-        self.assertIsInstance(settings, dict)
-        
-        # 测试降低频率
-        result = service.adjust_worker_frequency('reduce')
-        self.assertTrue(result['success'])
-        self.assertTrue(service.is_reduced)
-        
-        # 测试重复降低
-        result = service.adjust_worker_frequency('reduce')
-        self.assertFalse(result['success'])
+        hostname = 'FILE_LEECH_WORKER@FILE_DOWNLOAD_QUEUE@BUNKR'
+        worker = Mock(hostname=hostname, concurrency=2, queue='FILE_DOWNLOAD_QUEUE@BUNKR', rate_limit=None, throttle=None)
         
-        # 测试恢复频率
-        result = service.adjust_worker_frequency('restore')
-        self.assertTrue(result['success'])
-        self.assertFalse(service.is_reduced)
+        # 模拟运行中的下载Worker及其对远程控制命令的回复
+        def get_download_workers(**conditions):
+            if 'throttle__action' in conditions:
+                return [worker] if (worker.throttle or {}).get('action') == conditions['throttle__action'] else []
+            return [worker]
+            
+        service = CeleryAdjustmentService()
+        service.control = Mock()
+        service.control.inspect.return_value.active.return_value = {}
+        service.control.pool_shrink.return_value = [{hostname: {'ok': 'pool will shrink'}}]
+        service.control.rate_limit.return_value = [{hostname: {'ok': 'new rate limit set successfully'}}]
+        
+        with patch.object(service, 'get_download_workers', side_effect=get_download_workers):
+            # 测试获取worker设置
+            settings = service.get_current_worker_settings()
+            self.assertIsInstance(settings, dict)
+            
+            # 测试降低频率
+            result = service.adjust_worker_frequency('reduce')
+            self.assertTrue(result['success'])
+            self.assertTrue(service.is_reduced)
+            
+            # 测试重复降低
+            result = service.adjust_worker_frequency('reduce')
+            self.assertFalse(result['success'])
+            
+            # 测试恢复频率
+            result = service.adjust_worker_frequency('restore')
+            self.assertTrue(result['success'])
+            self.assertFalse(service.is_reduced)
         
     async def test_monitor_check_and_alert(self):
         """测试监控检查和告警流程"""
@@ -0,0 +1,144 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestBunkrResolution(unittest.TestCase):
+    """Bunkr下载地址解析与节点健康单元测试"""
+
+    def test_key_expiry(self):
+        """测试解密地址缓存到密钥轮换的整点"""
+        from module.leech.utils.bunkr import get_key_expiry
+
+        self.assertEqual(get_key_expiry(7200), 10800)
+        self.assertEqual(get_key_expiry(10799), 10800)
+
+    def test_resolution_cached_until_rotation(self):
+        """测试解密地址的缓存时间不超过密钥轮换"""
+        from module.leech.utils import parse_cache
+        from module.leech.constants.leech_file_tool import LeechFileTool
+
+        mock_redis = Mock()
+
+        with patch.object(parse_cache, 'redis_client', mock_redis), \
+                patch.object(parse_cache.time, 'time', Mock(return_value=10000)):
+            parse_cache.cache_resolution(
+                'https://bunkr.si/f/1', LeechFileTool.BUNKR, {'actual_link': 'https://c.bunkr.ru/1.mp4'}, 10800
+            )
+
+        self.assertEqual(mock_redis.set.call_args.kwargs['ex'], 800 - parse_cache.SIGNED_LINK_EXPIRY_MARGIN_SECONDS)
+
+    def test_album_cached_until_rotation(self):
+        """测试包含解密地址的相册解析结果也不超过密钥轮换"""
+        from module.leech.utils import parse_cache
+        from module.leech.beans.leech_bunkr_file import LeechBunkrFile
+
+        leech_files = [
+            LeechBunkrFile(
+                link='https://bunkr.si/f/1', actual_link='https://c.bunkr.ru/1.mp4', actual_link_expire_at=10800
+            ),
+            LeechBunkrFile(link='https://bunkr.si/f/2'),
+        ]
+        mock_redis = Mock()
+
+        with patch.object(parse_cache, 'redis_client', mock_redis), \
+                patch.object(parse_cache.time, 'time', Mock(return_value=10000)):
+            parse_cache.cache_files('https://bunkr.si/a/1', leech_files)
+
+        self.assertEqual(mock_redis.set.call_args.kwargs['ex'], 800 - parse_cache.SIGNED_LINK_EXPIRY_MARGIN_SECONDS)
+
+    def test_resolve_album(self):
+        """测试解析相册时同时取得每个文件的下载地址，失败的留给下载时处理"""
+        from module.leech.utils import bunkr
+        from module.leech.beans.leech_bunkr_file import LeechBunkrFile
+
+        def resolve_file(link):
+            if link.endswith('/2'):
+                raise ValueError('timeout')
+
+            return LeechBunkrFile(
+                link=link,
+                name=f'{link[-1]}.mp4',
+                actual_link=f'https://c.bunkr.ru/{link[-1]}.mp4',
+                actual_link_expire_at=10800
+            )
+
+        with patch.object(bunkr, 'resolve_file', Mock(side_effect=resolve_file)):
+            resolved = bunkr.resolve_album_file(LeechBunkrFile(link='https://bunkr.si/f/1', remote_folder='album'))
+            unresolved = bunkr.resolve_album_file(LeechBunkrFile(link='https://bunkr.si/f/2', remote_folder='album'))
+
+        self.assertEqual(resolved.actual_link, 'https://c.bunkr.ru/1.mp4')
+        self.assertEqual(resolved.name, '1.mp4')
+        self.assertEqual(resolved.actual_link_expire_at, 10800)
+        self.assertEqual(resolved.remote_folder, 'album')
+        self.assertIsNone(unresolved.actual_link)
+
+    def test_album_with_file_filter(self):
+        """测试订阅检查时不在解析时取得相册文件的下载地址"""
+        from module.leech.utils import bunkr
+
+        html = '<h1 class="truncate">album</h1><div class="theItem"><a href="/f/1"></a></div>'
+
+        with patch.object(bunkr.httpx, 'get', Mock(return_value=Mock(status_code=200, text=html))), \
+                patch.object(bunkr, 'resolve_album_file') as mock_resolve_album_file:
+            filtered = bunkr.parse_bunkr_link('https://bunkr.si/a/1', file_filter=Mock())
+            resolved = bunkr.parse_bunkr_link('https://bunkr.si/a/1')
+
+        self.assertEqual([leech_file.link for leech_file in filtered], ['https://bunkr.si/f/1'])
+        self.assertIsNone(filtered[0].actual_link)
+        mock_resolve_album_file.assert_called_once()
+        self.assertEqual(resolved, [mock_resolve_album_file.return_value])
+
+    def test_cached_resolution(self):
+        """测试已缓存的文件不再请求页面"""
+        from module.leech.utils import bunkr
+
+        with patch.object(bunkr, 'get_cached_resolution', Mock(return_value={
+            'name': '1.mp4', 'actual_link': 'https://c.bunkr.ru/1.mp4'
+        })), patch.object(bunkr.httpx, 'get') as mock_get:
+            leech_files = bunkr.parse_bunkr_link('https://bunkr.si/f/1')
+
+        mock_get.assert_not_called()
+        self.assertEqual(leech_files[0].actual_link, 'https://c.bunkr.ru/1.mp4')
+
+    def test_node_failures(self):
+        """测试节点连续失败后在一段时间内避开"""
+        from module.leech.utils import bunkr
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+        mock_pipeline.execute.side_effect = [[True, 1], [None, 2], [None, 3]]
+
+        with patch.object(bunkr, 'redis_client', mock_redis):
+            for _ in range(bunkr.NODE_MAXIMUM_FAILURES):
+                bunkr.record_node_failure('c.bunkr.ru')
+
+        # 计数器创建时就带有过期时间
+        mock_pipeline.set.assert_called_with(
+            'bunkr:node:failure:c.bunkr.ru', 0, nx=True, ex=bunkr.NODE_FAILURE_WINDOW_SECONDS
+        )
+        mock_pipeline.incr.assert_called_with('bunkr:node:failure:c.bunkr.ru')
+        mock_redis.set.assert_called_once_with('bunkr:node:down:c.bunkr.ru', 1, ex=bunkr.NODE_FAILURE_WINDOW_SECONDS)
+
+    def test_node_down_seconds(self):
+        """测试节点健康状态的剩余时间"""
+        from module.leech.utils import bunkr
+
+        mock_redis = Mock()
+        mock_redis.ttl.side_effect = [-2, 120]
+
+        with patch.object(bunkr, 'redis_client', mock_redis):
+            self.assertEqual(bunkr.get_node_down_seconds('c.bunkr.ru'), 0)
+            self.assertEqual(bunkr.get_node_down_seconds(bunkr.get_node('https://C.bunkr.ru/1.mp4')), 120)
+
+        mock_redis.ttl.assert_called_with('bunkr:node:down:c.bunkr.ru')
+
+    def test_maintenance_retry_after(self):
+        """测试节点维护时按恢复时间重新排队"""
+        from module.leech.utils.retry import MaintenanceError, get_retry_after
+
+        self.assertEqual(get_retry_after(MaintenanceError('down', retry_after=120)), 120)
+        self.assertIsNone(get_retry_after(MaintenanceError('down')))
+
+
+if __name__ == '__main__':
+    unittest.main()
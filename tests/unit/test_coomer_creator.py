@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+def create_post(post_id: int, published: str, paths: list[str]) -> dict:
+    return {
+        'id': str(post_id),
+        'published': published,
+        'file': {'name': f'{paths[0]}.jpg', 'path': f'/aa/bb/{paths[0]}.jpg'} if paths else {},
+        'attachments': [{'name': f'{path}.jpg', 'path': f'/aa/bb/{path}.jpg'} for path in paths],
+    }
+
+
+class TestCoomerCreator(unittest.TestCase):
+    """Coomer创作者翻页单元测试"""
+
+    def walk(self, pages: list[list[dict]], cursor_key: str = None, last_published: bytes = None):
+        from module.leech.utils import coomer
+
+        def get_api(site: str, path: str, params: dict = None):
+            if path.endswith('/profile'):
+                return {'name': 'Creator', 'post_count': coomer.COOMER_PAGE_SIZE * (len(pages) - 1) + len(pages[-1])}
+
+            return pages[params['o'] // coomer.COOMER_PAGE_SIZE]
+
+        mock_redis = Mock()
+        mock_redis.get.return_value = last_published
+
+        with patch.object(coomer, 'get_api', Mock(side_effect=get_api)) as mock_get_api, \
+                patch.object(coomer, 'redis_client', mock_redis), patch.object(coomer, 'COOMER_PAGE_SIZE', 2):
+            batches = list(coomer.walk_creator('https://coomer.su/onlyfans/user/creator', cursor_key))
+
+        return batches, mock_get_api, mock_redis
+
+    def test_all_pages(self):
+        """测试读取所有页面，同一个附件只下载一次，不改动任何游标"""
+        pages = [
+            [create_post(4, '2024-04-01T00:00:00', ['d']), create_post(3, '2024-03-01T00:00:00', ['c', 'shared'])],
+            [create_post(2, '2024-02-01T00:00:00', ['b', 'shared']), create_post(1, '2024-01-01T00:00:00', [])],
+        ]
+
+        batches, mock_get_api, mock_redis = self.walk(pages)
+        links = [leech_file.link for batch in batches for leech_file in batch]
+
+        self.assertEqual(links, [
+            'https://coomer.su/data/aa/bb/d.jpg?f=d.jpg',
+            'https://coomer.su/data/aa/bb/c.jpg?f=c.jpg',
+            'https://coomer.su/data/aa/bb/shared.jpg?f=shared.jpg',
+            'https://coomer.su/data/aa/bb/b.jpg?f=b.jpg',
+        ])
+        self.assertEqual(batches[0][0].remote_folder, 'Creator')
+        self.assertEqual(mock_get_api.call_count, 3)
+        mock_redis.get.assert_not_called()
+        mock_redis.set.assert_not_called()
+
+    def test_incremental(self):
+        """测试增量模式只返回上次之后的帖子，并在读到上次的帖子后停止翻页"""
+        pages = [
+            [create_post(4, '2024-04-01T00:00:00', ['d']), create_post(3, '2024-03-01T00:00:00', ['c'])],
+            [create_post(2, '2024-02-01T00:00:00', ['b']), create_post(1, '2024-01-01T00:00:00', ['a'])],
+        ]
+
+        batches, mock_get_api, mock_redis = self.walk(pages, 'cursor', b'2024-03-01T00:00:00')
+
+        self.assertEqual([leech_file.name for batch in batches for leech_file in batch], ['d.jpg'])
+        # 只请求了资料和第一页
+        self.assertEqual(mock_get_api.call_count, 2)
+        mock_redis.get.assert_called_once_with('cursor')
+        mock_redis.set.assert_called_once_with('cursor', '2024-04-01T00:00:00')
+
+
+if __name__ == '__main__':
+    unittest.main()
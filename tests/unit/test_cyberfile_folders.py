@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+def create_page(items: list[str], total_pages: int) -> str:
+    return f'<div class="fileListing">{"".join(items)}</div><input type="hidden" id="rspTotalPages" value="{total_pages}">'
+
+
+def create_file(file_id: int) -> str:
+    return f'<div class="fileItem fileIconLi" fileid="{file_id}" dtfullurl="https://cyberfile.me/f{file_id}"></div>'
+
+
+def create_folder(folder_id: int) -> str:
+    return f'<div class="fileItem folderIconLi" folderid="{folder_id}"></div>'
+
+
+PAGES = {
+    (1, 1): create_page([create_file(1), create_folder(2)], 2),
+    (1, 2): create_page([create_file(3)], 2),
+    (2, 1): create_page([create_file(4)], 1),
+}
+
+
+class TestCyberfileFolders(unittest.TestCase):
+    """Cyberfile文件夹遍历单元测试"""
+
+    def test_iterate_folders(self):
+        """测试读取每个文件夹的所有页面和子文件夹，并在解析时取得文件的下载地址"""
+        from module.leech.utils import cyberfile, html
+
+        def load_files(link, node_id, page_type, page, cookies=None):
+            return html.parse_html(PAGES[(node_id, page)])
+
+        def get_file_details(file_id):
+            return {'remote_folder': 'folder', 'name': f'{file_id}.mp4', 'actual_link': f'https://cdn/{file_id}.mp4'}
+
+        mock_load_files = Mock(side_effect=load_files)
+
+        with patch.object(cyberfile, 'load_files', mock_load_files), \
+                patch.object(cyberfile, 'get_file_details', Mock(side_effect=get_file_details)):
+            batches = list(cyberfile.iterate_folders('https://cyberfile.me/folder/x', 1, 'folder'))
+
+        self.assertEqual(
+            [[leech_file.actual_link for leech_file in batch] for batch in batches],
+            [['https://cdn/1.mp4', 'https://cdn/3.mp4'], ['https://cdn/4.mp4']]
+        )
+        self.assertEqual(batches[0][0].link, 'https://cyberfile.me/f1')
+        self.assertEqual(batches[1][0].name, '4.mp4')
+        self.assertEqual(mock_load_files.call_count, 3)
+
+    def test_iterate_folders_without_resolving(self):
+        """测试订阅检查时不在解析时请求文件详情，留给下载时处理"""
+        from module.leech.utils import cyberfile, html
+
+        def load_files(link, node_id, page_type, page, cookies=None):
+            return html.parse_html(PAGES[(node_id, page)])
+
+        mock_get_file_details = Mock()
+
+        with patch.object(cyberfile, 'load_files', Mock(side_effect=load_files)), \
+                patch.object(cyberfile, 'get_file_details', mock_get_file_details):
+            batches = list(cyberfile.iterate_folders('https://cyberfile.me/folder/x', 1, 'folder', resolve=False))
+
+        mock_get_file_details.assert_not_called()
+        self.assertEqual(
+            [[leech_file.link for leech_file in batch] for batch in batches],
+            [['https://cyberfile.me/f1', 'https://cyberfile.me/f3'], ['https://cyberfile.me/f4']]
+        )
+        self.assertIsNone(batches[0][0].actual_link)
+
+    def test_unresolved_file(self):
+        """测试取不到下载地址的文件留给下载时处理"""
+        from module.leech.utils import cyberfile, html
+
+        with patch.object(cyberfile, 'get_file_details', Mock(side_effect=ValueError('timeout'))):
+            leech_file = cyberfile.resolve_file(cyberfile.FILE_ITEM.select_one(html.parse_html(create_page([
+                create_file(1)
+            ], 1))))
+
+        self.assertEqual(leech_file.link, 'https://cyberfile.me/f1')
+        self.assertIsNone(leech_file.actual_link)
+
+
+if __name__ == '__main__':
+    unittest.main()
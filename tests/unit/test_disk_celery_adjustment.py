@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestCeleryAdjustmentControl(unittest.TestCase):
+    """通过 Celery 远程控制调整下载Worker单元测试"""
+
+    def create_worker(self, hostname, concurrency=4, throttle=None):
+        return Mock(
+            hostname=hostname,
+            concurrency=concurrency,
+            queue='FILE_DOWNLOAD_QUEUE@BUNKR',
+            rate_limit={'amount': 5, 'period': 'm'},
+            throttle=throttle
+        )
+
+    def test_reduce_and_restore(self):
+        """测试降低频率时缩小进程池并限速，恢复时按保存的状态还原"""
+        from module.disk.services.celery_adjustment import CeleryAdjustmentService, DOWNLOAD_TASK_NAME
+
+        hostname = 'FILE_LEECH_WORKER@FILE_DOWNLOAD_QUEUE@BUNKR'
+        worker = self.create_worker(hostname)
+        control = Mock()
+        control.pool_shrink.return_value = [{hostname: {'ok': 'pool will shrink'}}]
+        control.rate_limit.return_value = [{hostname: {'ok': 'new rate limit set successfully'}}]
+
+        service = CeleryAdjustmentService()
+        service.control = control
+
+        with patch.object(service, 'get_download_workers', return_value=[worker]):
+            result = service.adjust_worker_frequency('reduce')
+
+        self.assertTrue(result['success'])
+        control.pool_shrink.assert_called_once()
+        self.assertEqual(control.pool_shrink.call_args.kwargs['n'], 2)
+        self.assertEqual(worker.throttle['pool_shrink'], 2)
+        self.assertEqual(worker.throttle['rate_limit'], {'amount': 5, 'period': 'm'})
+        worker.save.assert_called_once()
+
+        with patch.object(service, 'get_download_workers', return_value=[worker]):
+            result = service.adjust_worker_frequency('restore')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(control.pool_grow.call_args.kwargs['n'], 2)
+        control.rate_limit.assert_called_with(
+            DOWNLOAD_TASK_NAME, '5/m', destination=[hostname], reply=True, timeout=5
+        )
+        self.assertIsNone(worker.throttle)
+
+    def test_reduce_without_reply(self):
+        """测试Worker没有响应时不保存调整状态"""
+        from module.disk.services.celery_adjustment import CeleryAdjustmentService
+
+        worker = self.create_worker('FILE_LEECH_WORKER@FILE_DOWNLOAD_QUEUE@BUNKR', concurrency=1)
+        control = Mock()
+        control.rate_limit.return_value = []
+
+        service = CeleryAdjustmentService()
+        service.control = control
+
+        with patch.object(service, 'get_download_workers', return_value=[worker]):
+            result = service.adjust_worker_frequency('reduce')
+
+        self.assertFalse(result['success'])
+        control.pool_shrink.assert_not_called()
+        worker.save.assert_not_called()
+
+    def test_get_queue_length(self):
+        """测试统计所有优先级队列中的任务数量"""
+        from module.disk.services import celery_adjustment
+
+        mock_redis = Mock()
+        mock_redis.pipeline.return_value.execute.return_value = [1] * 10
+
+        with patch.object(celery_adjustment, 'redis_client', mock_redis):
+            self.assertEqual(celery_adjustment.get_queue_length('FILE_DOWNLOAD_QUEUE@BUNKR'), 10)
+
+        llen = mock_redis.pipeline.return_value.llen
+        llen.assert_any_call('FILE_DOWNLOAD_QUEUE@BUNKR')
+        llen.assert_any_call('FILE_DOWNLOAD_QUEUE@BUNKR\x06\x169')
+
+
+if __name__ == '__main__':
+    unittest.main()
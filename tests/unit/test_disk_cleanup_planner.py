@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+
+class TestDiskCleanupPlanner(unittest.TestCase):
+    """结合任务状态的清理计划单元测试"""
+
+    def create_leech_file(self, status, upload_status):
+        return Mock(status=status, upload_status=upload_status, updated_at=None, created_at=datetime(2024, 1, 1))
+
+    def test_classify(self):
+        """测试根据文件记录判断清理类别"""
+        from module.disk.services.cleanup_planner import classify, CleanupCategory, ORPHAN_GRACE_SECONDS
+        from module.leech.constants.leech_file_status import LeechFileStatus
+
+        now = 10000.0
+
+        self.assertEqual(classify([], now - ORPHAN_GRACE_SECONDS - 1, now), CleanupCategory.ORPHAN)
+        self.assertEqual(classify([], now - 1, now), CleanupCategory.IN_USE)
+
+        downloading = self.create_leech_file(LeechFileStatus.DOWNLOADING, LeechFileStatus.INITIAL)
+        waiting_upload = self.create_leech_file(LeechFileStatus.DOWNLOAD_SUCCESS, LeechFileStatus.INITIAL)
+        uploaded = self.create_leech_file(LeechFileStatus.DOWNLOAD_SUCCESS, LeechFileStatus.UPLOAD_SUCCESS)
+        failed = self.create_leech_file(LeechFileStatus.DOWNLOAD_SUCCESS, LeechFileStatus.UPLOAD_FAIL)
+
+        self.assertEqual(classify([downloading], 0, now), CleanupCategory.IN_USE)
+        self.assertEqual(classify([waiting_upload], 0, now), CleanupCategory.IN_USE)
+        self.assertEqual(classify([uploaded], 0, now), CleanupCategory.UPLOADED)
+        self.assertEqual(classify([uploaded, failed], 0, now), CleanupCategory.FAILED)
+        self.assertEqual(classify([failed, waiting_upload], 0, now), CleanupCategory.IN_USE)
+
+    def test_make_plan(self):
+        """测试按损失从小到大排序并在达到目标后停止"""
+        from module.disk.services.cleanup_planner import make_plan, CleanupCandidate, CleanupCategory
+
+        def create_candidate(path, category, last_active_at, size=100):
+            return CleanupCandidate(path, size, 1, 1, category, last_active_at)
+
+        candidates = [
+            create_candidate('failed-new', CleanupCategory.FAILED, 30),
+            create_candidate('in-use', CleanupCategory.IN_USE, 0),
+            create_candidate('uploaded', CleanupCategory.UPLOADED, 20),
+            create_candidate('failed-old', CleanupCategory.FAILED, 10),
+            create_candidate('orphan', CleanupCategory.ORPHAN, 40),
+        ]
+
+        self.assertEqual(
+            [candidate.path for candidate in make_plan(candidates)],
+            ['orphan', 'uploaded', 'failed-old', 'failed-new']
+        )
+        self.assertEqual(
+            [candidate.path for candidate in make_plan(candidates, target_size=150)],
+            ['orphan', 'uploaded']
+        )
+        self.assertEqual(
+            [candidate.path for candidate in make_plan(candidates, older_than=datetime.fromtimestamp(25))],
+            ['uploaded', 'failed-old']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
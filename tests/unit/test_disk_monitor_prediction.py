@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from collections import deque
+from unittest.mock import Mock, patch
+
+
+class TestDiskMonitorPrediction(unittest.TestCase):
+    """磁盘空间预测单元测试"""
+
+    def test_get_fill_rate(self):
+        """测试只使用时间窗口内的采样计算写入速率"""
+        from module.disk.services.disk_monitor import get_fill_rate
+
+        self.assertEqual(get_fill_rate(deque([(0, 100)])), 0.0)
+        self.assertEqual(get_fill_rate(deque([(0, 0), (10, 1000), (20, 2000)])), 100.0)
+        # 窗口外的采样不参与计算
+        self.assertEqual(get_fill_rate(deque([(0, 99999), (1000, 0), (1010, 500)]), window=600), 50.0)
+
+    def test_predict_seconds_to_threshold(self):
+        """测试预计到达阈值的时间"""
+        from module.disk.services.disk_monitor import predict_seconds_to_threshold
+
+        self.assertEqual(predict_seconds_to_threshold(1000, 10), 100)
+        self.assertEqual(predict_seconds_to_threshold(-1, 10), 0.0)
+        self.assertIsNone(predict_seconds_to_threshold(1000, 0))
+
+    @patch('module.disk.services.disk_monitor.psutil.disk_usage')
+    def test_throttle_before_threshold(self, mock_disk_usage):
+        """测试写入速率较快时在越过阈值前降低下载频率，压力缓解后恢复"""
+        from module.disk.services.disk_monitor import DiskMonitorService
+
+        monitor = DiskMonitorService({'DISK_ALERT_THRESHOLD': 10})
+        monitor.prediction_horizon = 1800
+        monitor.celery_service = Mock()
+        monitor.celery_service.adjust_worker_frequency.return_value = {'success': True, 'message': 'ok'}
+
+        def disk_usage(free_gb):
+            return Mock(free=int(free_gb * 1024**3), used=int((100 - free_gb) * 1024**3), total=100 * 1024**3,
+                        percent=100 - free_gb)
+
+        async def run():
+            with patch.object(monitor, 'get_pending_download_size', return_value=0), \
+                    patch('module.disk.services.disk_monitor.time', Mock(monotonic=Mock(side_effect=[0, 60, 120]))):
+                mock_disk_usage.return_value = disk_usage(20)
+                self.assertIsNone(await monitor.check_and_alert())
+                self.assertEqual(monitor.next_check_interval, monitor.min_check_interval)
+
+                # 一分钟写入 5GB，剩余 10GB 空间预计两分钟后用完
+                mock_disk_usage.return_value = disk_usage(15)
+                alert_info = await monitor.check_and_alert()
+                self.assertEqual(monitor.next_check_interval, monitor.min_check_interval)
+
+                # 写入停止并释放了空间
+                monitor.reset_alert_cooldown()
+                mock_disk_usage.return_value = disk_usage(40)
+                relieved_info = await monitor.check_and_alert()
+
+            return alert_info, relieved_info
+
+        alert_info, relieved_info = asyncio.run(run())
+
+        self.assertTrue(alert_info['predicted'])
+        self.assertFalse(alert_info['alert_needed'])
+        self.assertTrue(alert_info['throttled'])
+        self.assertEqual(monitor.next_check_interval, monitor.check_interval)
+        self.assertIsNone(relieved_info)
+        self.assertFalse(monitor.auto_throttled)
+        self.assertEqual(
+            [call.args[0] for call in monitor.celery_service.adjust_worker_frequency.call_args_list],
+            ['reduce', 'restore']
+        )
+
+    @patch('module.disk.services.disk_monitor.psutil.disk_usage')
+    def test_pending_downloads_exceed_headroom(self, mock_disk_usage):
+        """测试排队中的下载超过剩余空间时提前告警"""
+        from module.disk.services.disk_monitor import DiskMonitorService
+
+        monitor = DiskMonitorService({'DISK_ALERT_THRESHOLD': 10})
+        monitor.celery_service = Mock()
+        monitor.celery_service.adjust_worker_frequency.return_value = {'success': False, 'message': 'none'}
+        monitor.samples.extend([(0, 0), (1, 1)])
+        mock_disk_usage.return_value = Mock(free=12 * 1024**3, used=88 * 1024**3, total=100 * 1024**3, percent=88)
+
+        with patch.object(monitor, 'get_pending_download_size', return_value=5 * 1024**3), \
+                patch('module.disk.services.disk_monitor.time', Mock(monotonic=Mock(return_value=2))):
+            alert_info = asyncio.run(monitor.check_and_alert())
+
+        self.assertTrue(alert_info['predicted'])
+        self.assertNotIn('throttled', alert_info)
+        self.assertFalse(monitor.auto_throttled)
+        self.assertIn('5GB', monitor.format_alert_message(alert_info))
+
+
+if __name__ == '__main__':
+    unittest.main()
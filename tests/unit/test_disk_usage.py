@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestDiskUsage(unittest.TestCase):
+    """下载目录占用统计单元测试"""
+
+    def test_scan_directory(self):
+        """测试使用 scandir 统计目录占用"""
+        from tool.disk_usage import scan_directory
+
+        with tempfile.TemporaryDirectory() as location:
+            os.makedirs(f'{location}/a/b')
+            for path, size in [('a/1.mp4', 100), ('a/b/2.mp4', 200), ('3.zip', 300)]:
+                with open(f'{location}/{path}', 'wb') as file:
+                    file.write(b'0' * size)
+
+            usage = scan_directory(location)
+
+        self.assertEqual(usage['total_size'], 600)
+        self.assertEqual(usage['file_count'], 3)
+        self.assertEqual(usage['dir_count'], 2)
+        self.assertEqual(usage['file_types'], {'.mp4': 2, '.zip': 1})
+
+    def test_report_usage(self):
+        """测试只统计下载目录内的文件"""
+        from tool import disk_usage
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+
+        with patch.object(disk_usage, 'redis_client', mock_redis):
+            disk_usage.report_usage('/other/file.mp4', size=100, files=1, location='/downloads')
+            disk_usage.report_usage('/downloads/hash/file.mp4', location='/downloads')
+            mock_redis.pipeline.assert_not_called()
+
+            disk_usage.report_usage('/downloads/hash/file.mp4', size=100, files=1, location='/downloads')
+
+        mock_pipeline.hincrby.assert_any_call('disk:usage:/downloads', 'total_size', 100)
+        mock_pipeline.hincrby.assert_any_call('disk:usage:/downloads', 'type:.mp4', 1)
+        mock_pipeline.execute.assert_called_once()
+
+    def test_is_in_location(self):
+        """测试下载目录末尾带斜杠时仍能判断文件所在目录"""
+        from tool.disk_usage import is_in_location
+
+        self.assertTrue(is_in_location('/downloads/hash/file.mp4', '/downloads/'))
+        self.assertTrue(is_in_location('/downloads//hash', '/downloads'))
+        self.assertFalse(is_in_location('/downloads', '/downloads/'))
+        self.assertFalse(is_in_location('/downloads2/hash', '/downloads'))
+        self.assertFalse(is_in_location('downloads/hash', '/downloads'))
+
+    def test_clean_dangling_link(self):
+        """测试清理指向不存在文件的链接"""
+        import os
+        import tempfile
+        from tool import utils
+        from module.leech.beans.leech_file import LeechFile
+        from module.leech.constants.leech_file_tool import LeechFileTool
+
+        with tempfile.TemporaryDirectory() as location:
+            leech_file = LeechFile(link='https://bunkr.si/f/1', tool=LeechFileTool.BUNKR, name='1.mp4')
+            leech_file.location = location
+            target = os.path.join(location, 'missing.mp4')
+            os.symlink(target, leech_file.get_full_name())
+
+            with patch.object(utils, 'report_usage') as mock_report_usage:
+                utils.clean_local_file(leech_file)
+
+            self.assertFalse(os.path.lexists(leech_file.get_full_name()))
+            mock_report_usage.assert_any_call(leech_file.get_full_name(), size=-len(target), files=-1)
+
+    def test_get_usage(self):
+        """测试读取占用统计，未校准时返回 None"""
+        from tool import disk_usage
+
+        mock_redis = Mock()
+
+        with patch.object(disk_usage, 'redis_client', mock_redis):
+            mock_redis.hgetall.return_value = {b'total_size': b'100', b'file_count': b'1'}
+            self.assertIsNone(disk_usage.get_usage('/downloads'))
+
+            mock_redis.hgetall.return_value = {
+                b'total_size': b'-10',
+                b'file_count': b'2',
+                b'dir_count': b'1',
+                b'type:.mp4': b'2',
+                b'type:.zip': b'0',
+                b'reconciled_at': b'1700000000.5',
+            }
+            usage = disk_usage.get_usage('/downloads')
+
+        self.assertEqual(usage['total_size'], 0)
+        self.assertEqual(usage['file_count'], 2)
+        self.assertEqual(usage['file_types'], {'.mp4': 2})
+        self.assertEqual(usage['reconciled_at'], 1700000000.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import re
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestFailedFiles(unittest.TestCase):
+    """失败任务重试筛选单元测试"""
+
+    def test_get_retry_conditions(self):
+        """测试解析重试命令参数"""
+        from module.leech.utils.failed_files import get_retry_conditions
+        from module.leech.constants.leech_file_tool import LeechFileTool
+        from module.leech.constants.error_category import ErrorCategory
+
+        self.assertEqual(get_retry_conditions([]), {})
+        self.assertEqual(
+            get_retry_conditions(['--tool', 'bunkr', '--error', 'rate_limited', '--days', '3', '--host', 'bunkr.si']),
+            {'tool': LeechFileTool.BUNKR, 'error': ErrorCategory.RATE_LIMITED, 'days': 3, 'host': 'bunkr.si'}
+        )
+
+    def test_invalid_retry_conditions(self):
+        """测试无效参数抛出异常"""
+        from module.leech.utils.failed_files import get_retry_conditions
+
+        with self.assertRaises((Exception, SystemExit)):
+            get_retry_conditions(['--tool', 'unknown'])
+
+    def test_get_failed_download_files(self):
+        """测试默认跳过已不存在的文件，并限制在过期天数内"""
+        from module.leech.utils import failed_files
+        from module.leech.constants.error_category import ErrorCategory
+        from module.leech.constants.leech_file_status import LeechFileStatus
+
+        mock_objects = Mock()
+
+        with patch.object(failed_files.LeechFile, 'objects', mock_objects):
+            failed_files.get_failed_files(LeechFileStatus.DOWNLOAD_FAIL, days=10000)
+
+        conditions = mock_objects.call_args.kwargs
+        self.assertEqual(conditions['status'], LeechFileStatus.DOWNLOAD_FAIL)
+        self.assertEqual(conditions['error_category__ne'], ErrorCategory.NOT_FOUND)
+        self.assertNotIn('tool', conditions)
+        self.assertEqual(
+            (failed_files.datetime.datetime.utcnow() - conditions['created_at__gte']).days,
+            failed_files.FAILED_TASK_EXPIRE_AFTER_DAYS
+        )
+
+    def test_get_failed_upload_files(self):
+        """测试按工具、错误、批次和主机筛选上传失败的文件"""
+        from module.leech.utils import failed_files
+        from module.leech.constants.leech_file_tool import LeechFileTool
+        from module.leech.constants.error_category import ErrorCategory
+        from module.leech.constants.leech_file_status import LeechFileStatus
+
+        mock_objects = Mock()
+
+        with patch.object(failed_files.LeechFile, 'objects', mock_objects):
+            failed_files.get_failed_files(
+                LeechFileStatus.UPLOAD_FAIL,
+                tool=LeechFileTool.BUNKR,
+                host='bunkr.si',
+                error=ErrorCategory.NOT_FOUND,
+                batch='batch'
+            )
+
+        conditions = mock_objects.call_args.kwargs
+        self.assertEqual(conditions['upload_status'], LeechFileStatus.UPLOAD_FAIL)
+        self.assertEqual(conditions['upload_error_category'], ErrorCategory.NOT_FOUND)
+        self.assertEqual(conditions['tool'], LeechFileTool.BUNKR)
+        self.assertEqual(conditions['batch'], 'batch')
+
+        host = re.compile(conditions['link__iregex'], re.IGNORECASE)
+        self.assertTrue(host.match('https://bunkr.si/f/1'))
+        self.assertTrue(host.match('https://cdn.Bunkr.si:443/a.mp4'))
+        self.assertFalse(host.match('https://bunkrxsi/f/1'))
+        self.assertFalse(host.match('https://notbunkr.si.example.com/f/1'))
+
+    def test_reset_failed_files(self):
+        """测试批量重置失败文件的状态"""
+        from module.leech.utils import failed_files
+        from module.leech.beans.leech_file import LeechFile
+        from module.leech.constants.leech_file_tool import LeechFileTool
+        from module.leech.constants.leech_file_status import LeechFileStatus
+
+        leech_files = [
+            LeechFile(link='https://bunkr.si/f/1', tool=LeechFileTool.BUNKR, status=LeechFileStatus.DOWNLOAD_FAIL),
+            LeechFile(link='https://bunkr.si/f/2', tool=LeechFileTool.BUNKR, upload_status=LeechFileStatus.UPLOAD_FAIL),
+        ]
+        mock_objects = Mock()
+
+        with patch.object(failed_files.LeechFile, 'objects', mock_objects):
+            failed_files.reset_failed_files(leech_files)
+
+        self.assertEqual(mock_objects.call_args.kwargs['id__in'], [leech_file.id for leech_file in leech_files])
+        update = mock_objects.return_value.update.call_args.kwargs
+        self.assertEqual(update['status'], LeechFileStatus.INITIAL)
+        self.assertEqual(update['upload_status'], LeechFileStatus.INITIAL)
+        self.assertTrue(all(
+            leech_file.status == LeechFileStatus.INITIAL and leech_file.upload_status == LeechFileStatus.INITIAL
+            for leech_file in leech_files
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+
+TREE = {
+    'root': {'type': 'folder', 'name': 'root', 'children': {
+        'a': {'type': 'folder', 'id': 'a', 'canAccess': True},
+        'b': {'type': 'folder', 'id': 'b', 'canAccess': True},
+        'locked': {'type': 'folder', 'id': 'locked', 'canAccess': False},
+        'f1': {'type': 'file', 'link': 'https://store1.gofile.io/download/f1/1.mp4', 'name': '1.mp4', 'size': 1},
+    }},
+    'a': {'type': 'folder', 'name': 'a', 'children': {
+        'b': {'type': 'folder', 'id': 'b', 'canAccess': True},
+        'f2': {'type': 'file', 'link': 'https://store1.gofile.io/download/f2/2.mp4', 'name': '2.mp4', 'size': 2},
+    }},
+    'b': {'type': 'folder', 'name': 'b', 'children': {
+        'a': {'type': 'folder', 'id': 'a', 'canAccess': True},
+        'f3': {'type': 'file', 'link': 'https://store1.gofile.io/download/f3/3.mp4', 'name': '3.mp4', 'size': 3},
+    }},
+}
+
+
+def walk(batches) -> (list, bool):
+    collected = []
+
+    while True:
+        try:
+            collected.append(next(batches))
+        except StopIteration as stop:
+            return collected, stop.value
+
+
+class TestGofileFolders(unittest.TestCase):
+    """Gofile文件夹遍历单元测试"""
+
+    def test_walk_folders(self):
+        """测试每个文件夹只请求一次，密码传给子文件夹，文件按文件夹分批返回"""
+        from module.leech.utils import gofile
+
+        requested = []
+
+        def get_content(content_id: str, password: str = None):
+            requested.append((content_id, password))
+            return TREE[content_id], 'token'
+
+        with patch.object(gofile, 'get_content', get_content):
+            batches, is_complete = walk(gofile.walk_folders('root', 'secret'))
+
+        files = {leech_file.name: leech_file for batch in batches for leech_file in batch}
+
+        self.assertEqual(sorted(requested), [('a', 'secret'), ('b', 'secret'), ('root', 'secret')])
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(sorted(files.keys()), ['1.mp4', '2.mp4', '3.mp4'])
+        self.assertEqual(files['2.mp4'].remote_folder, 'a')
+        self.assertEqual(files['3.mp4'].size_hint, 3)
+        self.assertEqual(files['1.mp4'].token, 'token')
+        self.assertTrue(is_complete)
+
+    def test_failed_folder(self):
+        """测试子文件夹请求失败时不影响其他文件夹，并报告列表不完整"""
+        from module.leech.utils import gofile
+
+        def get_content(content_id: str, password: str = None):
+            if content_id == 'a':
+                raise ValueError('timeout')
+
+            return TREE[content_id], 'token'
+
+        with patch.object(gofile, 'get_content', get_content):
+            batches, is_complete = walk(gofile.walk_folders('root'))
+
+        self.assertEqual(sorted(leech_file.name for batch in batches for leech_file in batch), ['1.mp4', '3.mp4'])
+        self.assertFalse(is_complete)
+
+
+if __name__ == '__main__':
+    unittest.main()
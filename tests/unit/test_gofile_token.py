@@ -0,0 +1,52 @@
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestGofileToken(unittest.TestCase):
+    """Gofile共享令牌单元测试"""
+
+    def get_token(self, token: str, remaining: int, acquired: bool = True, stale_token: str = None):
+        from module.leech.utils import gofile
+
+        mock_redis = Mock()
+        mock_redis.hgetall.return_value = {b'token': token.encode(), b'expire_at': str(int(time.time()) + remaining)}
+        mock_redis.lock.return_value.acquire.return_value = acquired
+        mock_create = Mock(return_value=('new', int(time.time()) + gofile.GOFILE_TOKEN_EXPIRE_SECONDS))
+
+        with patch.object(gofile, 'redis_client', mock_redis), patch.object(gofile, 'create_token', mock_create):
+            return gofile.get_token(stale_token), mock_redis, mock_create
+
+    def test_valid_token(self):
+        """测试令牌有效时直接使用，不加锁也不创建账号"""
+        token, mock_redis, mock_create = self.get_token('old', 3000)
+
+        self.assertEqual(token, 'old')
+        mock_redis.lock.assert_not_called()
+        mock_create.assert_not_called()
+
+    def test_refresh_ahead(self):
+        """测试令牌快过期时只有拿到锁的 worker 刷新，其他 worker 继续使用当前令牌"""
+        token, mock_redis, mock_create = self.get_token('old', 300, acquired=False)
+
+        self.assertEqual(token, 'old')
+        mock_redis.lock.return_value.acquire.assert_called_once_with(blocking=False)
+        mock_create.assert_not_called()
+
+    def test_refresh_stale_token(self):
+        """测试被拒绝的令牌会被替换并写入 Redis"""
+        from module.leech.utils import gofile
+
+        token, mock_redis, mock_create = self.get_token('old', 3000, stale_token='old')
+        mock_pipeline = mock_redis.pipeline.return_value
+
+        self.assertEqual(token, 'new')
+        mock_redis.lock.return_value.acquire.assert_called_once_with(blocking=True)
+        mock_create.assert_called_once()
+        self.assertEqual(mock_pipeline.hset.call_args.args, (gofile.GOFILE_TOKEN_KEY,))
+        self.assertEqual(mock_pipeline.hset.call_args.kwargs['mapping']['token'], 'new')
+        mock_redis.lock.return_value.release.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+
+ALBUM_PAGE = '''
+<html><head><script>var a = 1;</script></head><body>
+<nav><a href="/">home</a></nav>
+<h1 class="text-[24px] font-semibold">album</h1>
+<div class="grid">
+  <div class="relative group/item theItem"><a href="/f/1"></a><p class="theSize">1.50 MB</p></div>
+  <div class="relative group/item theItem"><a href="/f/2"></a><p class="theSize">2 GB</p></div>
+</div>
+</body></html>
+'''
+
+
+class TestHtmlExtraction(unittest.TestCase):
+    """HTML提取层单元测试"""
+
+    def extract(self, text: str):
+        from module.leech.utils import html
+        from module.leech.utils.bunkr import get_folder_name, get_video_links, get_video_sizes, get_video_link, \
+            ALBUM_ONLY
+
+        soup = html.parse_html(text, ALBUM_ONLY)
+
+        return get_folder_name(soup), get_video_links(soup), get_video_sizes(soup), get_video_link(soup)
+
+    def test_bunkr_album(self):
+        """测试 lxml 和 html.parser 两种解析方式提取的结果一致"""
+        from module.leech.utils import html
+
+        expected = ('album', ['/f/1', '/f/2'], [int(1.5 * 1024 ** 2), 2 * 1024 ** 3], '')
+
+        with patch.object(html, 'lxml', None):
+            self.assertEqual(self.extract(ALBUM_PAGE), expected)
+
+        if html.lxml is not None:
+            self.assertEqual(self.extract(ALBUM_PAGE), expected)
+
+    def test_strainer_keeps_needed_elements(self):
+        """测试部分解析只保留需要的元素，多个class的元素同样能匹配"""
+        from module.leech.utils import html
+        from module.leech.utils.bunkr import ALBUM_ONLY
+
+        with patch.object(html, 'lxml', None):
+            soup = html.parse_html(ALBUM_PAGE, ALBUM_ONLY)
+
+        self.assertIsNone(soup.find('script'))
+        self.assertIsNone(soup.find('nav'))
+        self.assertEqual(len(soup.find_all('div')), 2)
+
+    def test_empty_page(self):
+        """测试空页面不会抛出异常"""
+        from module.leech.utils import html
+        from module.leech.utils.bunkr import get_folder_name, get_video_links
+
+        soup = html.parse_html('')
+
+        self.assertEqual(get_folder_name(soup), '')
+        self.assertEqual(get_video_links(soup), [])
+        self.assertIsNone(html.get_text(html.Selector('p').select_one(soup)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+
+class TestI18nTranslationTable(unittest.TestCase):
+    """扁平翻译表单元测试"""
+
+    def test_compile_translations(self):
+        """测试嵌套翻译展开为完整key，并预解析占位符"""
+        from module.i18n.services.i18n_manager import compile_translations
+
+        table = compile_translations({
+            'disk': {
+                'title': '磁盘',
+                'space': '{location} 剩余 {space}',
+                'files_count': {'one': '{count} 个文件', 'other': '{count} 个文件'}
+            },
+            'count': 1
+        })
+
+        self.assertEqual(table['disk.title'], '磁盘')
+        self.assertEqual(table['disk.title'].fields, frozenset())
+        self.assertEqual(table['disk.space'].fields, frozenset({'location', 'space'}))
+        self.assertEqual(table['disk.files_count'], {'one': '{count} 个文件', 'other': '{count} 个文件'})
+        self.assertEqual(table['disk.files_count']['one'].fields, frozenset({'count'}))
+        self.assertEqual(table['count'], 1)
+
+    def test_singleton(self):
+        """测试所有地方共享同一个实例，不重复加载语言文件"""
+        from module.i18n import get_i18n_manager
+        from module.i18n.services.i18n_manager import I18nManager
+
+        manager = I18nManager()
+
+        with patch.object(I18nManager, '_load_translations') as mock_load_translations:
+            self.assertIs(I18nManager(), manager)
+            self.assertIs(get_i18n_manager(), manager)
+            mock_load_translations.assert_not_called()
+
+    def test_reload_on_file_change(self):
+        """测试语言文件被修改后自动重新加载"""
+        from module.i18n.services import i18n_manager
+        from module.i18n.services.i18n_manager import I18nManager
+
+        manager = I18nManager()
+
+        with tempfile.TemporaryDirectory() as locales_path:
+            for lang in manager.available_languages:
+                with open(f'{locales_path}/{lang}.yml', 'w', encoding='utf-8') as file:
+                    file.write('greeting: "你好 {name}"\n')
+
+            try:
+                with patch.object(i18n_manager, 'LOCALES_PATH', Path(locales_path)):
+                    manager.reload_translations()
+                    self.assertEqual(manager.translate('greeting', 'zh_CN', name='A'), '你好 A')
+
+                    with open(f'{locales_path}/zh_CN.yml', 'w', encoding='utf-8') as file:
+                        file.write('greeting: "您好 {name}"\n')
+                    os.utime(f'{locales_path}/zh_CN.yml', (0, 0))
+
+                    # 检查间隔内不读取文件
+                    self.assertEqual(manager.translate('greeting', 'zh_CN', name='A'), '你好 A')
+
+                    with patch.object(i18n_manager, 'time', Mock(monotonic=Mock(
+                        return_value=manager.checked_at + i18n_manager.RELOAD_CHECK_INTERVAL + 1
+                    ))):
+                        self.assertEqual(manager.translate('greeting', 'zh_CN', name='A'), '您好 A')
+            finally:
+                manager.reload_translations()
+
+        self.assertNotEqual(manager.translate('disk.monitor.status', 'zh_CN'), 'disk.monitor.status')
+
+
+if __name__ == '__main__':
+    unittest.main()
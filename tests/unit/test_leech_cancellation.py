@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestLeechCancellation(unittest.TestCase):
+    """下载/上传任务协作式取消单元测试"""
+
+    def test_cancellation_token_checks_redis_at_most_once_per_interval(self):
+        """测试取消标记按时间间隔检查，避免每个分块都访问 Redis"""
+        from module.leech.utils import cancellation
+
+        mock_redis = Mock()
+        mock_redis.exists.return_value = 0
+
+        with patch.object(cancellation, 'redis_client', mock_redis), \
+                patch.object(cancellation.time, 'monotonic', side_effect=[10.0, 10.5, 11.2]):
+            token = cancellation.CancellationToken('file-id')
+
+            token.raise_if_cancelled()
+            token.raise_if_cancelled()
+            mock_redis.exists.return_value = 1
+
+            with self.assertRaises(cancellation.TaskCancelledError):
+                token.raise_if_cancelled()
+
+        self.assertEqual(mock_redis.exists.call_count, 2)
+        mock_redis.exists.assert_called_with(f'{cancellation.CANCELLATION_KEY_PREFIX}file-id')
+
+    def test_request_cancellation(self):
+        """测试批量写入取消标记"""
+        from module.leech.utils import cancellation
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+
+        with patch.object(cancellation, 'redis_client', mock_redis):
+            cancellation.request_cancellation([])
+            mock_redis.pipeline.assert_not_called()
+
+            cancellation.request_cancellation(['a', 'b'])
+
+        self.assertEqual(mock_pipeline.set.call_count, 2)
+        mock_pipeline.execute.assert_called_once()
+
+    def test_skip_upload_of_terminated_file(self):
+        """测试下载时取消的文件不再上传，并保持取消状态"""
+        from module.leech.beans.leech_file import LeechFile
+        from module.leech.decorators.upload import check_before_upload
+        from module.leech.constants.leech_file_tool import LeechFileTool
+        from module.leech.constants.leech_file_status import LeechFileStatus
+
+        upload = Mock()
+        leech_file = LeechFile(
+            link='https://bunkr.si/f/1',
+            tool=LeechFileTool.BUNKR,
+            status=LeechFileStatus.TERMINATED,
+            upload_status=LeechFileStatus.UPLOADING
+        )
+
+        check_before_upload(upload)(None, leech_file)
+
+        upload.assert_not_called()
+        self.assertEqual(leech_file.upload_status, LeechFileStatus.TERMINATED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch, Mock
+
+import httpx
+
+
+class TestLeechRetry(unittest.TestCase):
+    """下载/上传失败自动重试单元测试"""
+
+    def create_status_error(self, status_code, headers=None):
+        request = httpx.Request('GET', 'https://example.com/file')
+        response = httpx.Response(status_code, headers=headers or {}, request=request)
+        return httpx.HTTPStatusError(str(status_code), request=request, response=response)
+
+    def test_classify_exception(self):
+        """测试错误分类"""
+        from module.leech.utils.retry import classify_exception, MaintenanceError
+        from module.leech.constants.error_category import ErrorCategory
+
+        self.assertEqual(classify_exception(self.create_status_error(429)), ErrorCategory.RATE_LIMITED)
+        self.assertEqual(classify_exception(self.create_status_error(503)), ErrorCategory.SERVER_ERROR)
+        self.assertEqual(classify_exception(self.create_status_error(403)), ErrorCategory.AUTH_EXPIRED)
+        self.assertEqual(classify_exception(self.create_status_error(404)), ErrorCategory.NOT_FOUND)
+        self.assertEqual(classify_exception(httpx.ReadTimeout('timeout')), ErrorCategory.TIMEOUT)
+        self.assertEqual(classify_exception(httpx.ConnectError('refused')), ErrorCategory.NETWORK_ERROR)
+        self.assertEqual(classify_exception(MaintenanceError('maintenance')), ErrorCategory.MAINTENANCE)
+        self.assertEqual(classify_exception(ValueError('unknown')), ErrorCategory.UNKNOWN)
+
+    def test_get_retry_after(self):
+        """测试解析 Retry-After 响应头"""
+        from module.leech.utils.retry import get_retry_after
+
+        self.assertEqual(get_retry_after(self.create_status_error(429, {'Retry-After': '120'})), 120)
+        self.assertEqual(
+            get_retry_after(self.create_status_error(503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})), 0
+        )
+        self.assertIsNone(get_retry_after(self.create_status_error(503)))
+
+    def test_get_retry_countdown(self):
+        """测试指数退避并尊重 Retry-After"""
+        from module.leech.utils import retry
+
+        with patch.object(retry, 'RETRY_BACKOFF_BASE_SECONDS', 10), \
+                patch.object(retry, 'RETRY_BACKOFF_MAXIMUM_SECONDS', 100):
+            for retries in range(6):
+                countdown = retry.get_retry_countdown(retries)
+                self.assertGreaterEqual(countdown, 0)
+                self.assertLessEqual(countdown, min(100, 10 * 2 ** retries))
+
+            self.assertGreaterEqual(retry.get_retry_countdown(0, retry_after=60), 60)
+            self.assertEqual(retry.get_retry_countdown(0, retry_after=6000), 100)
+
+    def test_should_retry(self):
+        """测试只重试临时错误并限制每个主机的重试次数"""
+        from module.leech.utils import retry
+        from module.leech.constants.error_category import ErrorCategory
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+        mock_pipeline.execute.side_effect = [[True, 1], [None, 2], [None, 3]]
+
+        with patch.object(retry, 'redis_client', mock_redis), \
+                patch.object(retry, 'RETRY_MAXIMUM_ATTEMPTS', 3), \
+                patch.object(retry, 'RETRY_MAXIMUM_ATTEMPTS_PER_HOST', 2):
+            self.assertFalse(retry.should_retry('example.com', ErrorCategory.NOT_FOUND, 0))
+            self.assertFalse(retry.should_retry('example.com', None, 0))
+            self.assertFalse(retry.should_retry('example.com', ErrorCategory.SERVER_ERROR, 3))
+            self.assertFalse(retry.should_retry('example.com', ErrorCategory.AUTH_EXPIRED, 1))
+
+            self.assertTrue(retry.should_retry('example.com', ErrorCategory.SERVER_ERROR, 0))
+            self.assertTrue(retry.should_retry('example.com', ErrorCategory.RATE_LIMITED, 1))
+            self.assertFalse(retry.should_retry('example.com', ErrorCategory.TIMEOUT, 2))
+
+        # 计数器创建时就带有过期时间
+        mock_pipeline.set.assert_called_with(
+            'leech:retry:host:example.com', 0, nx=True, ex=retry.RETRY_HOST_WINDOW_SECONDS
+        )
+        mock_pipeline.incr.assert_called_with('leech:retry:host:example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
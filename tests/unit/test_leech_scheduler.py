@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+
+
+class TestLeechScheduler(unittest.TestCase):
+    """下载任务调度单元测试"""
+
+    def create_leech_file(self, link, size_hint=None):
+        from module.leech.beans.leech_file import LeechFile
+        from module.leech.constants.leech_file_tool import LeechFileTool
+
+        return LeechFile(link=link, name=link, tool=LeechFileTool.PIXELDRAIN, size_hint=size_hint)
+
+    def test_get_task_priority_by_size(self):
+        """测试根据文件大小计算优先级"""
+        from module.leech.utils import scheduler
+
+        with patch.object(scheduler, 'TASK_SCHEDULE_STRATEGY', 'SJF'):
+            self.assertEqual(scheduler.get_task_priority(self.create_leech_file('https://a/1', 1024)), 0)
+            self.assertEqual(scheduler.get_task_priority(self.create_leech_file('https://a/2', 2 * 1024 ** 3)), 4)
+            self.assertEqual(scheduler.get_task_priority(self.create_leech_file('https://a/3', 1024 ** 4)), 6)
+            # 没有大小提示时按中等大小处理
+            self.assertEqual(scheduler.get_task_priority(self.create_leech_file('https://a/4')), 3)
+
+    def test_get_task_priority_exceed_free_space(self):
+        """测试超出剩余磁盘空间的文件排在最后"""
+        from module.leech.utils import scheduler
+
+        with patch.object(scheduler, 'TASK_SCHEDULE_STRATEGY', 'SJF'):
+            leech_file = self.create_leech_file('https://a/1', 10 * 1024 ** 2)
+
+            self.assertEqual(scheduler.get_task_priority(leech_file, free_space=1024 ** 2), scheduler.LOWEST_PRIORITY)
+            self.assertEqual(scheduler.get_task_priority(leech_file, free_space=1024 ** 3), 0)
+
+    def test_order_leech_files_shortest_first_and_interleave_hosts(self):
+        """测试按大小排序并在同一优先级内轮换主机"""
+        from module.leech.utils import scheduler
+
+        leech_files = [
+            self.create_leech_file('https://a/big', 10 * 1024 ** 3),
+            self.create_leech_file('https://a/small-1', 1024),
+            self.create_leech_file('https://a/small-2', 2048),
+            self.create_leech_file('https://b/small-3', 4096),
+        ]
+
+        with patch.object(scheduler, 'TASK_SCHEDULE_STRATEGY', 'SJF'):
+            scheduled_files = scheduler.order_leech_files(leech_files, free_space=1024 ** 5)
+
+        self.assertEqual(
+            [leech_file.link for leech_file, _ in scheduled_files],
+            ['https://a/small-1', 'https://b/small-3', 'https://a/small-2', 'https://a/big']
+        )
+        self.assertEqual([priority for _, priority in scheduled_files], [0, 0, 0, 5])
+
+    def test_order_leech_files_fifo(self):
+        """测试FIFO策略保持原有顺序"""
+        from module.leech.utils import scheduler
+
+        leech_files = [
+            self.create_leech_file('https://a/big', 10 * 1024 ** 3),
+            self.create_leech_file('https://a/small', 1024),
+        ]
+
+        with patch.object(scheduler, 'TASK_SCHEDULE_STRATEGY', 'FIFO'):
+            scheduled_files = scheduler.order_leech_files(leech_files)
+
+        self.assertEqual([leech_file for leech_file, _ in scheduled_files], leech_files)
+        self.assertEqual({priority for _, priority in scheduled_files}, {scheduler.DEFAULT_PRIORITY})
+
+
+if __name__ == '__main__':
+    unittest.main()
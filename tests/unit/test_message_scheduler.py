@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+# pyrogram 需要在 asyncio.run 关闭事件循环之前导入
+from tool import message_scheduler
+
+
+class TestMessageScheduler(unittest.TestCase):
+    """消息延迟删除单元测试"""
+
+    def test_schedule_message_deletion_does_not_block(self):
+        """测试延迟删除不阻塞事件循环"""
+        first_message = Mock(id=1, delete=AsyncMock())
+        second_message = Mock(id=2, delete=AsyncMock(side_effect=Exception('message not found')))
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            started_at = loop.time()
+            task = message_scheduler.schedule_message_deletion(first_message, second_message, delay=0.05)
+
+            # 调度后立即返回
+            self.assertLess(loop.time() - started_at, 0.05)
+            self.assertIn(task, message_scheduler.pending_deletions)
+            first_message.delete.assert_not_awaited()
+
+            await task
+            await asyncio.sleep(0)
+
+            return task
+
+        task = asyncio.run(run())
+
+        first_message.delete.assert_awaited_once()
+        second_message.delete.assert_awaited_once()
+        self.assertNotIn(task, message_scheduler.pending_deletions)
+
+    def test_run_blocking(self):
+        """测试阻塞调用在线程池中执行"""
+        import threading
+        from tool.executor import run_blocking
+
+        def get_thread_name(prefix, suffix=''):
+            return f'{prefix}{threading.current_thread().name}{suffix}'
+
+        result = asyncio.run(run_blocking(get_thread_name, '<', suffix='>'))
+
+        self.assertTrue(result.startswith('<blocking'))
+        self.assertTrue(result.endswith('>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+TCP_TABLE = '''  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 00000000:1F90 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 101 1 0
+   1: 0100007F:9C40 0100007F:1F90 01 00000000:00000000 00:00000000 00000000     0        0 102 1 0
+   2: 0100007F:9C41 0100007F:1F90 08 00000000:00000000 00:00000000 00000000     0        0 103 1 0
+   3: 0100007F:9C42 0100007F:1F90 06 00000000:00000000 00:00000000 00000000     0        0 0 1 0
+   4: 0100007F:9C43 0100007F:1F90 01 00000000:00000000 00:00000000 00000000     0        0 999 1 0
+'''
+
+
+class TestConnectionCollector(unittest.TestCase):
+    """进程树连接统计单元测试"""
+
+    def test_collect_from_proc(self):
+        """测试只统计进程树中的套接字，并按Worker分类"""
+        from module.network.services import connection_collector
+
+        with tempfile.TemporaryDirectory() as proc_root:
+            os.makedirs(f'{proc_root}/net')
+            with open(f'{proc_root}/net/tcp', 'w') as file:
+                file.write(TCP_TABLE)
+
+            for pid, inodes in [(1, [101]), (2, [102, 103])]:
+                os.makedirs(f'{proc_root}/{pid}/fd')
+                for fd, inode in enumerate(inodes):
+                    os.symlink(f'socket:[{inode}]', f'{proc_root}/{pid}/fd/{fd}')
+                os.symlink('/dev/null', f'{proc_root}/{pid}/fd/99')
+
+            collector = connection_collector.ConnectionCollector(ttl=60, proc_root=proc_root)
+
+            with patch.object(connection_collector, 'get_process_tree', return_value={
+                1: 'bot',
+                2: 'FILE_LEECH_WORKER@FILE_DOWNLOAD_QUEUE@1'
+            }) as mock_get_process_tree:
+                stats = collector.get_connection_stats()
+                # 缓存时间内不重新采集
+                self.assertIs(collector.get_connection_stats(), stats)
+                mock_get_process_tree.assert_called_once()
+
+        self.assertEqual(stats['total_connections'], 3)
+        self.assertEqual(stats['tcp_connections'], 3)
+        self.assertEqual(stats['listening_ports'], 1)
+        self.assertEqual(stats['established_connections'], 1)
+        self.assertEqual(stats['close_wait_connections'], 1)
+        self.assertEqual(stats['time_wait_connections'], 1)
+        self.assertEqual(stats['workers'], {
+            'bot': {'total': 1},
+            'FILE_LEECH_WORKER@FILE_DOWNLOAD_QUEUE@1': {'total': 2, 'established': 1, 'close_wait': 1}
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+
+
+class TestNetworkSampler(unittest.TestCase):
+    """后台网络采样单元测试"""
+
+    def create_sampler(self, capacity: int = 10):
+        from module.network.services.network_sampler import NetworkSampler
+
+        sampler = NetworkSampler(capacity=capacity)
+        # 每秒上传 100 字节，下载量逐秒增加
+        for second in range(capacity + 5):
+            sampler.record(second, second * 100, second * second)
+
+        return sampler
+
+    def test_window_total(self):
+        """测试时间窗口内的流量只读取窗口两端"""
+        sampler = self.create_sampler()
+
+        self.assertEqual(len(sampler), 10)
+        self.assertEqual(sampler.get_window_total(3), {'sent': 300, 'recv': 14 ** 2 - 11 ** 2, 'elapsed': 3,
+                                                       'data_points': 3})
+        # 超过保存范围时使用全部采样
+        self.assertEqual(sampler.get_window_total(3600)['elapsed'], 9)
+
+        bandwidth = sampler.get_bandwidth_average(5)
+        self.assertEqual(bandwidth['avg_upload'], 100)
+        self.assertEqual(bandwidth['data_points'], 5)
+
+    def test_percentiles(self):
+        """测试带宽百分位数"""
+        sampler = self.create_sampler(capacity=101)
+
+        percentiles = sampler.get_percentiles(100)
+
+        self.assertEqual(percentiles['data_points'], 100)
+        self.assertEqual(percentiles['upload'], {50: 100, 95: 100, 99: 100})
+        # 第n秒的下载带宽为 2n-1，最近100秒为 11..209
+        self.assertEqual(percentiles['download'][50], 109)
+        self.assertEqual(percentiles['download'][95], 199)
+        self.assertEqual(percentiles['download'][99], 207)
+        self.assertEqual(percentiles['peak_download'], 209)
+
+    def test_empty_sampler(self):
+        """测试没有采样时返回0"""
+        from module.network.services.network_sampler import NetworkSampler
+
+        sampler = NetworkSampler(capacity=10)
+        sampler.record(0, 100, 100)
+
+        self.assertEqual(sampler.get_bandwidth_average(60)['avg_total'], 0)
+        self.assertEqual(sampler.get_percentiles(60)['upload'][99], 0)
+
+    @patch('module.network.services.network_sampler.psutil.net_io_counters')
+    def test_start_and_stop(self, mock_net_io_counters):
+        """测试后台采样可以启动和停止"""
+        from module.network.services.network_sampler import NetworkSampler
+
+        mock_net_io_counters.return_value = Mock(bytes_sent=1, bytes_recv=2)
+        sampler = NetworkSampler(capacity=10, interval=0.01)
+
+        async def run():
+            sampler.start()
+            await asyncio.sleep(0.05)
+            self.assertTrue(sampler.running)
+            sampler.stop()
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        self.assertFalse(sampler.running)
+        self.assertGreater(len(sampler), 1)
+
+    def test_rates_while_recording(self):
+        """测试在其他线程写入采样时，读取的时间戳和累计字节保持对齐"""
+        import threading
+        from module.network.services.network_sampler import NetworkSampler
+
+        sampler = NetworkSampler(capacity=16)
+        stopped = threading.Event()
+
+        def record():
+            index = 0
+
+            while not stopped.is_set():
+                sampler.record(index, index * 10, index * 20)
+                index += 1
+
+        writer = threading.Thread(target=record)
+        writer.start()
+
+        try:
+            for _ in range(2000):
+                rates = sampler.get_rates(16)
+                self.assertTrue(all(rate == 10 for rate in rates['upload']))
+                self.assertTrue(all(rate == 20 for rate in rates['download']))
+        finally:
+            stopped.set()
+            writer.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestNetworkUsage(unittest.TestCase):
+    """分类网络流量统计单元测试"""
+
+    def test_transfer_meter_flush(self):
+        """测试传输计数按间隔批量写入 Redis"""
+        from tool import network_usage
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+        meter = network_usage.TransferMeter(network_usage.Direction.DOWNLOAD, {
+            network_usage.Dimension.TOOL: 'GOFILE',
+            network_usage.Dimension.HOST: 'store1.gofile.io',
+            network_usage.Dimension.WORKER: None,
+        })
+
+        with patch.object(network_usage, 'redis_client', mock_redis), \
+                patch.object(network_usage, 'time', Mock(monotonic=Mock(side_effect=[0.5, 0.8, 0.9]),
+                                                         time=Mock(return_value=1000))):
+            meter.flushed_at = 0
+            meter.add(100)
+            mock_redis.pipeline.assert_not_called()
+
+            with meter:
+                meter.add(50)
+
+        self.assertEqual(meter.total, 150)
+        self.assertEqual(meter.pending, 0)
+        mock_pipeline.hincrby.assert_any_call('network:usage:100', 'download', 150)
+        mock_pipeline.hincrby.assert_any_call('network:usage:100', 'download:tool:GOFILE', 150)
+        mock_pipeline.hincrby.assert_any_call('network:usage:100', 'download:host:store1.gofile.io', 150)
+        self.assertEqual(mock_pipeline.hincrby.call_count, 3)
+        mock_pipeline.expire.assert_called_once_with('network:usage:100', 3600)
+
+    def test_get_throughput(self):
+        """测试按方向和分类汇总带宽"""
+        from tool import network_usage
+
+        mock_redis = Mock()
+        mock_redis.pipeline.return_value.execute.return_value = [
+            {b'download': b'1000', b'download:tool:GOFILE': b'1000', b'download:host:a.io:8080': b'1000'},
+            {b'upload': b'500', b'upload:sync_tool:ALIST': b'500', b'upload:worker:FILE_SYNC_WORKER@Q@1': b'500'},
+        ]
+
+        with patch.object(network_usage, 'redis_client', mock_redis), \
+                patch.object(network_usage, 'time', Mock(time=Mock(return_value=1010))):
+            throughput = network_usage.get_throughput(20)
+
+        self.assertEqual(mock_redis.pipeline.return_value.hgetall.call_count, 2)
+        self.assertEqual(throughput['download']['total'], 100)
+        self.assertEqual(throughput['download']['tool'], {'GOFILE': 100})
+        self.assertEqual(throughput['download']['host'], {'a.io:8080': 100})
+        self.assertEqual(throughput['upload']['sync_tool'], {'ALIST': 50})
+        self.assertEqual(throughput['upload']['worker'], {'FILE_SYNC_WORKER@Q@1': 50})
+
+    def test_ring_buffer(self):
+        """测试环形缓冲区覆盖最旧的数据点"""
+        from module.network.utils.ring_buffer import RingBuffer
+
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(list(buffer), [2, 3, 4])
+        self.assertEqual(buffer[-1], 4)
+        self.assertEqual(buffer.tail(2), [3, 4])
+        self.assertEqual(buffer.tail(10), [2, 3, 4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestParseCache(unittest.TestCase):
+    """解析结果缓存单元测试"""
+
+    def test_normalize_link(self):
+        """测试大小写、结尾斜杠、参数顺序和锚点不同的链接使用同一个缓存"""
+        from module.leech.utils.parse_cache import get_cache_key, PARSE_CACHE_KEY_PREFIX
+
+        self.assertEqual(
+            get_cache_key(PARSE_CACHE_KEY_PREFIX, 'HTTPS://Bunkr.SI/a/abc/?b=1&a=2#top'),
+            get_cache_key(PARSE_CACHE_KEY_PREFIX, 'https://bunkr.si/a/abc?a=2&b=1'),
+        )
+        self.assertNotEqual(
+            get_cache_key(PARSE_CACHE_KEY_PREFIX, 'https://gofile.io/d/abc'),
+            get_cache_key(PARSE_CACHE_KEY_PREFIX, 'https://gofile.io/d/abc', 'secret'),
+        )
+
+    def test_ttl_of_signed_link(self):
+        """测试签名链接的缓存时间不超过链接的过期时间"""
+        from module.leech.utils import parse_cache
+        from module.leech.constants.leech_file_tool import LeechFileTool
+
+        expires = int(time.time()) + 600
+
+        with patch.object(parse_cache, 'PARSE_CACHE_TTL_SECONDS', 1800):
+            self.assertEqual(parse_cache.get_ttl(LeechFileTool.BUNKR, ['https://c.bunkr.ru/a.mp4']), 1800)
+            self.assertEqual(parse_cache.get_ttl(LeechFileTool.GOFILE, [None]), 600)
+            self.assertAlmostEqual(
+                parse_cache.get_ttl(LeechFileTool.BUNKR, [f'https://c.bunkr.ru/a.mp4?token=t&expires={expires}']),
+                600 - parse_cache.SIGNED_LINK_EXPIRY_MARGIN_SECONDS,
+                delta=2
+            )
+            self.assertLessEqual(
+                parse_cache.get_ttl(LeechFileTool.BUNKR, [f'https://c.bunkr.ru/a.mp4?expires={expires - 600}']), 0
+            )
+
+    def test_cached_files_are_new_documents(self):
+        """测试命中缓存时返回字段相同但 id 不同的新文档"""
+        from module.leech.utils import parse_cache
+        from module.leech.beans.leech_bunkr_file import LeechBunkrFile
+
+        leech_file = LeechBunkrFile(link='https://bunkr.si/f/1', actual_link='https://c.bunkr.ru/1.mp4', name='1.mp4')
+        mock_redis = Mock()
+
+        with patch.object(parse_cache, 'redis_client', mock_redis), \
+                patch.object(parse_cache, 'PARSE_CACHE_TTL_SECONDS', 1800):
+            parse_cache.cache_files('https://bunkr.si/f/1', [leech_file])
+
+            key, raw = mock_redis.set.call_args.args
+            self.assertEqual(mock_redis.set.call_args.kwargs, {'ex': 1800})
+
+            mock_redis.get.return_value = raw.encode()
+            cached_files = parse_cache.get_cached_files('https://bunkr.si/f/1/')
+
+        self.assertNotIn('_id', json.loads(raw)[0])
+        self.assertIsInstance(cached_files[0], LeechBunkrFile)
+        self.assertNotEqual(cached_files[0].id, leech_file.id)
+        self.assertEqual(cached_files[0].actual_link, leech_file.actual_link)
+        self.assertEqual(cached_files[0].tool, leech_file.tool)
+
+    def test_empty_result_not_cached(self):
+        """测试空结果和 Redis 异常不影响解析"""
+        from module.leech.utils import parse_cache
+
+        mock_redis = Mock()
+        mock_redis.get.side_effect = ConnectionError('refused')
+
+        with patch.object(parse_cache, 'redis_client', mock_redis), \
+                patch.object(parse_cache, 'PARSE_CACHE_TTL_SECONDS', 1800):
+            parse_cache.cache_files('https://bunkr.si/a/1', [])
+
+            self.assertIsNone(parse_cache.get_cached_files('https://bunkr.si/a/1'))
+
+        mock_redis.set.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import time
+import threading
+import unittest
+from unittest.mock import patch, Mock
+
+
+def busy_loop(stopped: threading.Event):
+    while not stopped.is_set():
+        sum(range(1000))
+
+
+class TestProfiler(unittest.TestCase):
+    """Worker采样分析单元测试"""
+
+    def test_sampling_profiler(self):
+        """测试采样得到以线程名开头的折叠调用栈"""
+        from tool.profiler import SamplingProfiler
+
+        stopped = threading.Event()
+        thread = threading.Thread(target=busy_loop, args=(stopped,), name='busy')
+        thread.start()
+
+        try:
+            profiler = SamplingProfiler(interval=0.005)
+            profiler.run(0.2)
+        finally:
+            stopped.set()
+            thread.join()
+
+        stacks = profiler.get_collapsed_stacks().splitlines()
+        busy_stacks = [line for line in stacks if line.startswith('busy;') and 'busy_loop (' in line]
+
+        self.assertGreater(profiler.samples, 10)
+        self.assertTrue(busy_stacks)
+        # 每行是调用栈加采样次数
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in stacks))
+        # 采样线程不统计自己
+        self.assertFalse(any('sample (tool/profiler.py' in line for line in stacks))
+
+    def test_memory_profile(self):
+        """测试开启内存分析时输出内存增长报告，并在结束后停止追踪"""
+        import tracemalloc
+        from tool import profiler
+
+        with patch.object(profiler.SamplingProfiler, 'run', lambda self, seconds: [bytearray(1024) for _ in range(100)]):
+            results = profiler.profile(5, memory=True)
+
+        self.assertIn(profiler.CPU_PROFILE_NAME, results)
+        self.assertTrue(results[profiler.MEMORY_PROFILE_NAME].startswith('Memory growth within 5 seconds'))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_handle_profile_request(self):
+        """测试处理请求后结果写入 Redis，过期的请求被忽略"""
+        from tool import profiler
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+
+        with patch.object(profiler, 'redis_client', mock_redis), \
+                patch.object(profiler, 'profile', Mock(return_value={'cpu.collapsed.txt': 'a;b 1'})) as mock_profile:
+            profiler.handle_profile_request(json.dumps({
+                'id': 'old', 'seconds': 10, 'memory': False, 'requested_at': time.time() - 3600
+            }))
+            profiler.handle_profile_request(json.dumps({
+                'id': 'new', 'seconds': 10, 'memory': True, 'requested_at': time.time()
+            }))
+
+        mock_profile.assert_called_once_with(10, True)
+        mock_pipeline.hset.assert_called_once_with('profile:result:new', mapping={'cpu.collapsed.txt': 'a;b 1'})
+        mock_pipeline.expire.assert_called_once_with('profile:result:new', profiler.PROFILE_RESULT_EXPIRE_SECONDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+class FakeRedis:
+    """只实现订阅和Coomer游标用到的命令"""
+
+    def __init__(self):
+        self.values = {}
+        self.commands = []
+
+    def get(self, key):
+        value = self.values.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def sadd(self, key, member):
+        members = self.values.setdefault(key, set())
+        self.commands.append(int(member not in members))
+        members.add(member)
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return commands
+
+
+class TestSubscription(unittest.TestCase):
+    """订阅去重单元测试"""
+
+    def create_files(self):
+        from module.leech.beans.leech_file import LeechFile
+        from module.leech.constants.leech_file_tool import LeechFileTool
+
+        return [
+            LeechFile(link='https://bunkr.si/f/a', tool=LeechFileTool.BUNKR, remote_folder='album'),
+            LeechFile(link='https://bunkr.si/f/b', tool=LeechFileTool.BUNKR, remote_folder='album'),
+            LeechFile(link='https://coomer.su/data/c.jpg', name='c.jpg', tool=LeechFileTool.COOMER),
+        ]
+
+    def test_file_key(self):
+        """测试文件按链接区分，键只保留8个字节"""
+        from module.leech.utils.subscription import get_file_key, SEEN_FILE_KEY_BYTES
+
+        keys = [get_file_key(leech_file) for leech_file in self.create_files()]
+
+        self.assertEqual(len(set(keys)), 3)
+        self.assertTrue(all(len(key) == SEEN_FILE_KEY_BYTES for key in keys))
+
+    def test_file_key_stable(self):
+        """测试文件解析出名称前后键不变，不同文件夹中的同名文件键不同"""
+        from module.leech.beans.leech_file import LeechFile
+        from module.leech.utils.subscription import get_file_key
+        from module.leech.constants.leech_file_tool import LeechFileTool
+
+        unresolved = LeechFile(link='https://bunkr.si/f/a', tool=LeechFileTool.BUNKR, remote_folder='album')
+        resolved = LeechFile(
+            link='https://bunkr.si/f/a/', name='a.mp4', tool=LeechFileTool.BUNKR, remote_folder='album'
+        )
+        first = LeechFile(link='https://store1.gofile.io/download/1/a.mp4', name='a.mp4', tool=LeechFileTool.GOFILE,
+                          remote_folder='folder')
+        second = LeechFile(link='https://store1.gofile.io/download/2/a.mp4', name='a.mp4', tool=LeechFileTool.GOFILE,
+                           remote_folder='folder')
+
+        self.assertEqual(get_file_key(unresolved), get_file_key(resolved))
+        self.assertNotEqual(get_file_key(first), get_file_key(second))
+
+    def test_filter_new_files(self):
+        """测试只返回第一次出现的文件，首次检查只记录不返回"""
+        from module.leech.utils import subscription
+
+        leech_files = self.create_files()
+        mock_redis = Mock()
+        mock_redis.pipeline.return_value.execute.return_value = [1, 0, 1]
+
+        with patch.object(subscription, 'redis_client', mock_redis):
+            new_files = subscription.filter_new_files('abc', leech_files)
+            baseline_files = subscription.filter_new_files('abc', leech_files, baseline=True)
+
+        self.assertEqual(new_files, [leech_files[0], leech_files[2]])
+        self.assertEqual(baseline_files, [])
+        self.assertEqual(mock_redis.pipeline.return_value.sadd.call_count, 6)
+        self.assertEqual(mock_redis.pipeline.return_value.sadd.call_args.args[0], 'subscription:seen:abc')
+
+    def test_has_seen_files(self):
+        """测试是否已经记录过文件，没有记录时首次检查需要重做"""
+        from module.leech.utils import subscription
+
+        mock_redis = Mock()
+        mock_redis.exists.side_effect = [0, 1]
+
+        with patch.object(subscription, 'redis_client', mock_redis):
+            self.assertFalse(subscription.has_seen_files('abc'))
+            self.assertTrue(subscription.has_seen_files('abc'))
+
+        mock_redis.exists.assert_called_with('subscription:seen:abc')
+
+    def test_watch_creator_after_leech(self):
+        """测试先 /leech 过的创作者再订阅，之后的新帖子仍然会下载，同一创作者的其他订阅不受影响"""
+        from module.leech.utils import coomer, subscription
+
+        posts = [{'published': '2024-01-01T00:00:00', 'file': {'name': 'a.jpg', 'path': '/aa/a.jpg'}}]
+
+        def get_api(site: str, path: str, params: dict = None):
+            if path.endswith('/profile'):
+                return {'name': 'Creator'}
+
+            return posts if params['o'] == 0 else []
+
+        def check(subscription_id: str, baseline: bool) -> list[str]:
+            leech_files = [
+                leech_file
+                for batch in coomer.walk_creator(link, subscription.get_cursor_key(subscription_id))
+                for leech_file in batch
+            ]
+
+            new_files = subscription.filter_new_files(subscription_id, leech_files, baseline)
+
+            return [leech_file.name for leech_file in new_files]
+
+        link = 'https://coomer.su/onlyfans/user/creator'
+        redis = FakeRedis()
+
+        with patch.object(coomer, 'get_api', get_api), patch.object(coomer, 'redis_client', redis), \
+                patch.object(subscription, 'redis_client', redis):
+            # /leech 不会留下游标
+            list(coomer.walk_creator(link))
+
+            self.assertEqual(check('first', baseline=True), [])
+            self.assertTrue(subscription.has_seen_files('first'))
+
+            posts.insert(0, {'published': '2024-02-01T00:00:00', 'file': {'name': 'b.jpg', 'path': '/aa/b.jpg'}})
+
+            self.assertEqual(check('first', baseline=False), ['b.jpg'])
+            self.assertEqual(check('first', baseline=False), [])
+            self.assertEqual(check('second', baseline=False), ['b.jpg', 'a.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
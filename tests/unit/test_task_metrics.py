@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch, Mock
+
+
+class TestTaskMetrics(unittest.TestCase):
+    """任务阶段耗时指标单元测试"""
+
+    def test_observe(self):
+        """测试耗时按阶段和标签写入对应的直方图桶"""
+        from tool import task_metrics
+
+        mock_redis = Mock()
+        mock_pipeline = mock_redis.pipeline.return_value
+
+        with patch.object(task_metrics, 'redis_client', mock_redis):
+            task_metrics.observe(task_metrics.Stage.TRANSFER, 3, {'tool': 'GOFILE', 'host': 'store1.gofile.io'})
+
+        mock_pipeline.hincrby.assert_called_once_with(
+            'task:metrics', 'transfer|host=store1.gofile.io,tool=GOFILE|6', 1
+        )
+        mock_pipeline.hincrbyfloat.assert_called_once_with(
+            'task:metrics', 'transfer|host=store1.gofile.io,tool=GOFILE|sum', 3
+        )
+
+    def test_queue_wait(self):
+        """测试从任务发布到开始执行的等待时间，重试任务从eta开始计算"""
+        from tool import task_metrics
+
+        headers = {'eta': '2024-01-01T00:00:00+00:00'}
+        task_metrics.record_published_at(headers)
+        self.assertEqual(headers['published_at'], 1704067200)
+
+        with patch.object(task_metrics, 'observe') as mock_observe, \
+                patch.object(task_metrics, 'time', Mock(time=Mock(return_value=1704067230),
+                                                        monotonic=Mock(side_effect=[10, 25]))):
+            task_metrics.start_task('id', Mock(published_at=1704067200), task_metrics.Stage.DOWNLOAD, {'tool': 'BUNKR'})
+            task_metrics.finish_task('id')
+            task_metrics.finish_task('id')
+
+        mock_observe.assert_any_call(task_metrics.Stage.QUEUE_WAIT, 30, {'tool': 'BUNKR', 'task': 'download'})
+        mock_observe.assert_any_call(task_metrics.Stage.DOWNLOAD, 15, {'tool': 'BUNKR'})
+        self.assertEqual(mock_observe.call_count, 2)
+
+    def test_measure_success_only(self):
+        """测试失败或取消的阶段不计入耗时"""
+        from tool import task_metrics
+
+        with patch.object(task_metrics, 'observe') as mock_observe:
+            with task_metrics.measure(task_metrics.Stage.TRANSFER, {'tool': 'BUNKR'}):
+                pass
+
+            with self.assertRaises(ValueError):
+                with task_metrics.measure(task_metrics.Stage.TRANSFER, {'tool': 'BUNKR'}):
+                    raise ValueError('reset')
+
+        mock_observe.assert_called_once()
+
+    def test_discard_task(self):
+        """测试未成功结束的任务被丢弃，不再留在运行中的任务里"""
+        from tool import task_metrics
+
+        with patch.object(task_metrics, 'observe') as mock_observe:
+            task_metrics.start_task('failed', Mock(published_at=None, headers=None), task_metrics.Stage.UPLOAD, {})
+            task_metrics.discard_task('failed')
+            task_metrics.finish_task('failed')
+
+        mock_observe.assert_not_called()
+        self.assertNotIn('failed', task_metrics.running_tasks)
+
+    def test_estimate_quantile(self):
+        """测试在桶内线性插值估算分位数"""
+        from tool.task_metrics import estimate_quantile, BUCKETS
+
+        buckets = [0] * (len(BUCKETS) + 1)
+        # 10个落在(5, 10]，10个落在(10, 30]
+        buckets[BUCKETS.index(10)] = 10
+        buckets[BUCKETS.index(30)] = 10
+
+        self.assertAlmostEqual(estimate_quantile(buckets, 0.5), 10)
+        self.assertAlmostEqual(estimate_quantile(buckets, 0.25), 7.5)
+        self.assertAlmostEqual(estimate_quantile(buckets, 0.95), 28)
+        self.assertEqual(estimate_quantile([0] * len(buckets), 0.5), 0)
+
+    def test_export_prometheus(self):
+        """测试导出Prometheus文本格式的累计直方图"""
+        from tool import task_metrics
+
+        mock_redis = Mock()
+        mock_redis.hgetall.return_value = {
+            b'resolve|host=bunkr.si,tool=BUNKR|0': b'2',
+            b'resolve|host=bunkr.si,tool=BUNKR|16': b'1',
+            b'resolve|host=bunkr.si,tool=BUNKR|sum': b'8000.5',
+        }
+
+        with patch.object(task_metrics, 'redis_client', mock_redis):
+            text = task_metrics.export_prometheus()
+            summary = task_metrics.summarize()
+
+        labels = 'stage="resolve",host="bunkr.si",tool="BUNKR"'
+        self.assertIn('# TYPE leech_stage_duration_seconds histogram', text)
+        self.assertIn(f'leech_stage_duration_seconds_bucket{{{labels},le="0.05"}} 2', text)
+        self.assertIn(f'leech_stage_duration_seconds_bucket{{{labels},le="7200"}} 2', text)
+        self.assertIn(f'leech_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 3', text)
+        self.assertIn(f'leech_stage_duration_seconds_sum{{{labels}}} 8000.5', text)
+        self.assertIn(f'leech_stage_duration_seconds_count{{{labels}}} 3', text)
+        self.assertEqual(summary['resolve']['count'], 3)
+        self.assertAlmostEqual(summary['resolve']['average'], 8000.5 / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
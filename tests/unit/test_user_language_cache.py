@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+
+class TestLRUCache(unittest.TestCase):
+    """LRU缓存单元测试"""
+
+    def test_evict_least_recently_used(self):
+        """测试超过容量时淘汰最久未访问的条目"""
+        from module.i18n.utils.lru_cache import LRUCache, MISSING
+
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set(1, 'zh_CN')
+        cache.set(2, 'en_US')
+        cache.get(1)
+        cache.set(3, None)
+
+        self.assertEqual(cache.get(1), 'zh_CN')
+        self.assertIs(cache.get(2), MISSING)
+        # 缓存的None与不存在的条目不同
+        self.assertIsNone(cache.get(3))
+        self.assertEqual(cache.get_stats()['hits'], 3)
+
+    def test_expire(self):
+        """测试条目过期"""
+        from module.i18n.utils import lru_cache
+
+        cache = lru_cache.LRUCache(max_size=10, ttl=60)
+
+        with patch.object(lru_cache, 'time', Mock(monotonic=Mock(return_value=100))):
+            cache.set(1, 'zh_CN')
+            cache.set(2, None, ttl=10)
+
+        with patch.object(lru_cache, 'time', Mock(monotonic=Mock(return_value=130))):
+            self.assertEqual(cache.get_stats()['expired_entries'], 1)
+            self.assertIn(1, cache)
+            self.assertNotIn(2, cache)
+            self.assertEqual(len(cache), 1)
+
+
+class TestUserLanguageCache(unittest.TestCase):
+    """用户语言缓存单元测试"""
+
+    def setUp(self):
+        from module.i18n.services.i18n_manager import clear_user_language_cache
+
+        clear_user_language_cache()
+        self.addCleanup(clear_user_language_cache)
+
+    def create_collection(self, documents):
+        async def find_one(query):
+            await asyncio.sleep(0)
+            return next((document for document in documents if document['user_id'] == query['user_id']), None)
+
+        async def find(query):
+            for document in documents:
+                if document['user_id'] in query['user_id']['$in']:
+                    yield document
+
+        collection = MagicMock()
+        collection.find_one = AsyncMock(side_effect=find_one)
+        collection.find = Mock(side_effect=find)
+        collection.update_one = AsyncMock(return_value=MagicMock(modified_count=1, upserted_id=None))
+
+        return collection
+
+    def test_cache_and_negative_cache(self):
+        """测试并发查询共享一次数据库访问，没有设置语言的用户同样被缓存"""
+        from module.i18n.services import i18n_manager
+
+        collection = self.create_collection([{'user_id': 1, 'language_code': 'en_US'}])
+
+        async def run():
+            with patch.object(i18n_manager, 'get_motor_collection', AsyncMock(return_value=collection)):
+                results = await asyncio.gather(*[i18n_manager.get_user_language(1) for _ in range(5)])
+                results.append(await i18n_manager.get_user_language(2))
+                results.append(await i18n_manager.get_user_language(2))
+
+            return results
+
+        self.assertEqual(asyncio.run(run()), ['en_US'] * 5 + ['zh_CN', 'zh_CN'])
+        self.assertEqual(collection.find_one.await_count, 2)
+
+    def test_write_through(self):
+        """测试保存语言后直接更新缓存"""
+        from module.i18n.services import i18n_manager
+
+        collection = self.create_collection([{'user_id': 1, 'language_code': 'zh_CN'}])
+
+        async def run():
+            with patch.object(i18n_manager, 'get_motor_collection', AsyncMock(return_value=collection)):
+                await i18n_manager.get_user_language(1)
+                self.assertTrue(await i18n_manager.save_user_language_async(1, 'en_US'))
+                return await i18n_manager.get_user_language(1)
+
+        self.assertEqual(asyncio.run(run()), 'en_US')
+        collection.find_one.assert_awaited_once()
+
+    def test_prefetch(self):
+        """测试批量预加载用户语言"""
+        from module.i18n.services import i18n_manager
+
+        collection = self.create_collection([{'user_id': 1, 'language_code': 'en_US'}])
+
+        async def run():
+            with patch.object(i18n_manager, 'get_motor_collection', AsyncMock(return_value=collection)):
+                self.assertEqual(await i18n_manager.prefetch_user_languages([1, 2, -1]), 2)
+                return [await i18n_manager.get_user_language(1), await i18n_manager.get_user_language(2)]
+
+        self.assertEqual(asyncio.run(run()), ['en_US', 'zh_CN'])
+        collection.find.assert_called_once()
+        collection.find_one.assert_not_awaited()
+
+    def test_database_error(self):
+        """测试数据库不可用时使用默认语言，并短暂缓存"""
+        from module.i18n.services import i18n_manager
+
+        async def run():
+            with patch.object(i18n_manager, 'get_motor_collection', AsyncMock(side_effect=Exception('timeout'))) as mock_get_motor_collection:
+                results = [await i18n_manager.get_user_language(1), await i18n_manager.get_user_language(1)]
+                mock_get_motor_collection.assert_awaited_once()
+                return results
+
+        self.assertEqual(asyncio.run(run()), ['zh_CN', 'zh_CN'])
+
+
+if __name__ == '__main__':
+    unittest.main()
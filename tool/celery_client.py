@@ -13,7 +13,15 @@ class CeleryClient(Singleton):
         app.conf.update(
             task_serializer='pickle',
             result_serializer='pickle',
-            accept_content=['pickle']
+            accept_content=['pickle'],
+            # smaller files are sent with a higher priority, see module/leech/utils/scheduler.py
+            # the default separator of the priority queues is kept, messages already queued stay readable
+            broker_transport_options={
+                'queue_order_strategy': 'priority',
+                'priority_steps': list(range(10))
+            },
+            # prefetched messages would bypass the priority order
+            worker_prefetch_multiplier=1
         )
 
         self.client = app
@@ -0,0 +1,137 @@
+import os
+import time
+from pathlib import Path
+from loguru import logger
+
+from tool.redis_client import redis_client
+from config.config import BOT_DOWNLOAD_LOCATION
+
+DISK_USAGE_KEY_PREFIX = 'disk:usage:'
+FILE_TYPE_FIELD_PREFIX = 'type:'
+FIELD_TOTAL_SIZE = 'total_size'
+FIELD_FILE_COUNT = 'file_count'
+FIELD_DIR_COUNT = 'dir_count'
+FIELD_RECONCILED_AT = 'reconciled_at'
+
+
+def get_usage_key(location: str = BOT_DOWNLOAD_LOCATION) -> str:
+    return f'{DISK_USAGE_KEY_PREFIX}{location}'
+
+
+def get_file_type(path: str) -> str:
+    return Path(path).suffix.lower()
+
+
+def is_in_location(path: str, location: str) -> bool:
+    path, location = os.path.normpath(path), os.path.normpath(location)
+
+    try:
+        return path != location and os.path.commonpath([path, location]) == location
+    except ValueError:
+        # an absolute path and a relative one
+        return False
+
+
+def report_usage(path: str, size: int = 0, files: int = 0, dirs: int = 0, location: str = BOT_DOWNLOAD_LOCATION):
+    # only the download location is accounted, the periodic reconciliation fixes any drift
+    if not any([size, files, dirs]) or not is_in_location(path, location):
+        return
+
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.hincrby(get_usage_key(location), FIELD_TOTAL_SIZE, size)
+        pipeline.hincrby(get_usage_key(location), FIELD_FILE_COUNT, files)
+        pipeline.hincrby(get_usage_key(location), FIELD_DIR_COUNT, dirs)
+
+        if files and get_file_type(path):
+            pipeline.hincrby(get_usage_key(location), f'{FILE_TYPE_FIELD_PREFIX}{get_file_type(path)}', files)
+
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f'Fail to report disk usage of "{path}": {str(e)}')
+
+
+def scan_directory(location: str) -> dict:
+    total_size = 0
+    file_count = 0
+    dir_count = 0
+    modified_at = 0.0
+    file_types: dict[str, int] = {}
+    directories = [location]
+
+    # walk with os.scandir, the entries come with their types so only regular files need a stat call
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_count += 1
+                            directories.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            total_size += stat.st_size
+                            modified_at = max(modified_at, stat.st_mtime)
+                            file_count += 1
+
+                            file_type = get_file_type(entry.name)
+                            if file_type:
+                                file_types[file_type] = file_types.get(file_type, 0) + 1
+                    except OSError:
+                        # removed while scanning
+                        continue
+        except OSError as e:
+            logger.warning(f'Fail to scan directory: {str(e)}')
+
+    return {
+        FIELD_TOTAL_SIZE: total_size,
+        FIELD_FILE_COUNT: file_count,
+        FIELD_DIR_COUNT: dir_count,
+        'file_types': file_types,
+        # latest modification time of the files, tells whether the directory is still being written
+        'modified_at': modified_at,
+        FIELD_RECONCILED_AT: time.time(),
+    }
+
+
+def reconcile_usage(location: str = BOT_DOWNLOAD_LOCATION) -> dict:
+    usage = scan_directory(location)
+
+    try:
+        pipeline = redis_client.pipeline(transaction=True)
+        pipeline.delete(get_usage_key(location))
+        pipeline.hset(get_usage_key(location), mapping={
+            FIELD_TOTAL_SIZE: usage[FIELD_TOTAL_SIZE],
+            FIELD_FILE_COUNT: usage[FIELD_FILE_COUNT],
+            FIELD_DIR_COUNT: usage[FIELD_DIR_COUNT],
+            FIELD_RECONCILED_AT: usage[FIELD_RECONCILED_AT],
+            **{f'{FILE_TYPE_FIELD_PREFIX}{key}': value for key, value in usage['file_types'].items()},
+        })
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f'Fail to save disk usage of "{location}": {str(e)}')
+
+    return usage
+
+
+def get_usage(location: str = BOT_DOWNLOAD_LOCATION) -> dict | None:
+    try:
+        fields = {key.decode(): value.decode() for key, value in redis_client.hgetall(get_usage_key(location)).items()}
+    except Exception as e:
+        logger.warning(f'Fail to get disk usage of "{location}": {str(e)}')
+        return None
+
+    # never reconciled yet, the counters are incomplete
+    if FIELD_RECONCILED_AT not in fields:
+        return None
+
+    return {
+        FIELD_TOTAL_SIZE: max(int(fields.get(FIELD_TOTAL_SIZE, 0)), 0),
+        FIELD_FILE_COUNT: max(int(fields.get(FIELD_FILE_COUNT, 0)), 0),
+        FIELD_DIR_COUNT: max(int(fields.get(FIELD_DIR_COUNT, 0)), 0),
+        'file_types': {
+            key.removeprefix(FILE_TYPE_FIELD_PREFIX): int(value) for key, value in fields.items()
+            if key.startswith(FILE_TYPE_FIELD_PREFIX) and int(value) > 0
+        },
+        FIELD_RECONCILED_AT: float(fields[FIELD_RECONCILED_AT]),
+    }
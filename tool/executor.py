@@ -0,0 +1,18 @@
+import asyncio
+import functools
+from typing import Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import BLOCKING_EXECUTOR_MAX_WORKERS
+
+T = TypeVar('T')
+
+# mongoengine, celery control and parsers are synchronous, run them here instead of on the event loop
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_MAX_WORKERS, thread_name_prefix='blocking')
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    return await asyncio.get_running_loop().run_in_executor(
+        blocking_executor,
+        functools.partial(func, *args, **kwargs)
+    )
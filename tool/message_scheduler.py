@@ -0,0 +1,24 @@
+import asyncio
+from loguru import logger
+from pyrogram.types import Message
+
+# keep references of the pending deletions, or they could be garbage collected before running
+pending_deletions: set[asyncio.Task] = set()
+
+
+async def delete_messages_later(messages: tuple[Message, ...], delay: float):
+    await asyncio.sleep(delay)
+
+    for message in messages:
+        try:
+            await message.delete()
+        except Exception as e:
+            logger.warning(f'Fail to delete message {message.id}: {str(e)}')
+
+
+def schedule_message_deletion(*messages: Message, delay: float = 5) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(delete_messages_later(messages, delay))
+    pending_deletions.add(task)
+    task.add_done_callback(pending_deletions.discard)
+
+    return task
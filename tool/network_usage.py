@@ -0,0 +1,144 @@
+import math
+import time
+import socket
+from enum import StrEnum
+from urllib.parse import urlparse
+from loguru import logger
+from celery import current_task
+
+from tool.redis_client import redis_client
+from module.leech.beans.leech_file import LeechFile
+
+NETWORK_USAGE_KEY_PREFIX = 'network:usage:'
+# every bucket holds the bytes transferred within BUCKET_SECONDS and expires after BUCKET_COUNT buckets,
+# so redis keeps a fixed size ring of buckets no matter how many transfers are running
+BUCKET_SECONDS = 10
+BUCKET_COUNT = 360
+# how often a running transfer pushes its local counter to redis
+FLUSH_INTERVAL_SECONDS = 1
+FIELD_SEPARATOR = ':'
+
+
+class Direction(StrEnum):
+    DOWNLOAD = 'download'
+    UPLOAD = 'upload'
+
+
+class Dimension(StrEnum):
+    TOOL = 'tool'
+    SYNC_TOOL = 'sync_tool'
+    WORKER = 'worker'
+    HOST = 'host'
+
+
+def get_bucket(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SECONDS)
+
+
+def get_bucket_key(bucket: int) -> str:
+    return f'{NETWORK_USAGE_KEY_PREFIX}{bucket}'
+
+
+def get_worker_name() -> str:
+    request = getattr(current_task, 'request', None)
+
+    return getattr(request, 'hostname', None) or socket.gethostname()
+
+
+class TransferMeter:
+    def __init__(self, direction: Direction, labels: dict[Dimension, str]):
+        self.direction = direction
+        self.labels = {dimension: value for dimension, value in labels.items() if value}
+        self.pending = 0
+        self.total = 0
+        self.flushed_at = time.monotonic()
+
+    def add(self, size: int):
+        self.pending += size
+        self.total += size
+
+        if time.monotonic() - self.flushed_at >= FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+
+        if self.pending == 0:
+            return
+
+        key = get_bucket_key(get_bucket(time.time()))
+        pending, self.pending = self.pending, 0
+
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.hincrby(key, str(self.direction), pending)
+
+            for dimension, value in self.labels.items():
+                pipeline.hincrby(key, FIELD_SEPARATOR.join([self.direction, dimension, value]), pending)
+
+            pipeline.expire(key, BUCKET_SECONDS * BUCKET_COUNT)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f'Fail to report network usage: {str(e)}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+
+def download_meter(leech_file: LeechFile) -> TransferMeter:
+    return TransferMeter(Direction.DOWNLOAD, {
+        Dimension.TOOL: leech_file.tool,
+        Dimension.HOST: urlparse(getattr(leech_file, 'actual_link', None) or leech_file.link or '').netloc,
+        Dimension.WORKER: get_worker_name(),
+    })
+
+
+def upload_meter(leech_file: LeechFile) -> TransferMeter:
+    return TransferMeter(Direction.UPLOAD, {
+        Dimension.TOOL: leech_file.tool,
+        Dimension.SYNC_TOOL: leech_file.sync_tool,
+        Dimension.WORKER: get_worker_name(),
+    })
+
+
+def get_throughput(seconds: int = 60) -> dict:
+    # the current bucket is still being written, include it and count the elapsed part only
+    now = time.time()
+    current = get_bucket(now)
+    buckets = range(current - math.ceil(seconds / BUCKET_SECONDS) + 1, current + 1)
+    elapsed = (len(buckets) - 1) * BUCKET_SECONDS + (now - current * BUCKET_SECONDS)
+
+    throughput = {
+        direction: {'total': 0.0, **{dimension: {} for dimension in Dimension}} for direction in Direction
+    }
+
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+
+        for bucket in buckets:
+            pipeline.hgetall(get_bucket_key(bucket))
+
+        results = pipeline.execute()
+    except Exception as e:
+        logger.warning(f'Fail to get network usage: {str(e)}')
+        return throughput
+
+    for fields in results:
+        for field, value in fields.items():
+            direction, *rest = field.decode().split(FIELD_SEPARATOR, 2)
+
+            if direction not in throughput:
+                continue
+
+            rate = int(value) / elapsed
+
+            if not rest:
+                throughput[direction]['total'] += rate
+            elif len(rest) == 2 and rest[0] in throughput[direction]:
+                values = throughput[direction][rest[0]]
+                values[rest[1]] = values.get(rest[1], 0.0) + rate
+
+    return throughput
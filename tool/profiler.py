@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import tracemalloc
+from typing import Optional
+from collections import Counter
+from loguru import logger
+
+from tool.redis_client import redis_client
+
+PROFILE_REQUEST_KEY_PREFIX = 'profile:request:'
+PROFILE_RESULT_KEY_PREFIX = 'profile:result:'
+# requests not picked up in time are dropped, the worker is probably gone
+PROFILE_REQUEST_EXPIRE_SECONDS = 60
+PROFILE_RESULT_EXPIRE_SECONDS = 60 * 60
+MAXIMUM_PROFILE_SECONDS = 300
+# 100 samples per second keep the overhead at a few percent of one core
+SAMPLE_INTERVAL_SECONDS = 0.01
+TRACEMALLOC_FRAMES = 25
+MEMORY_REPORT_LINES = 50
+# how long a listener blocks on redis before checking again
+LISTEN_TIMEOUT_SECONDS = 30
+LISTEN_RETRY_SECONDS = 5
+ERROR_FIELD = 'error'
+CPU_PROFILE_NAME = 'cpu.collapsed.txt'
+MEMORY_PROFILE_NAME = 'memory.txt'
+
+
+def format_frame(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+
+    if filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    else:
+        filename = '/'.join(filename.split(os.sep)[-2:])
+
+    # semicolons separate the frames of a collapsed stack
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+def collapse_stack(frame) -> str:
+    frames = []
+
+    while frame is not None:
+        frames.append(format_frame(frame))
+        frame = frame.f_back
+
+    return ';'.join(reversed(frames))
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+
+    def sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        current = threading.get_ident()
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == current:
+                continue
+
+            self.stacks[f'{names.get(thread_id, thread_id)};{collapse_stack(frame)}'] += 1
+
+        self.samples += 1
+
+    def run(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        next_sample_at = time.monotonic()
+
+        while next_sample_at < deadline:
+            self.sample()
+            next_sample_at += self.interval
+            time.sleep(max(next_sample_at - time.monotonic(), 0))
+
+    def get_collapsed_stacks(self) -> str:
+        # the input format of flamegraph.pl and speedscope, one stack per line followed by its number of samples
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+def format_memory_growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, seconds: float) -> str:
+    current, peak = tracemalloc.get_traced_memory()
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ]
+    differences = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+
+    return '\n'.join([
+        f'Memory growth within {seconds:.0f} seconds, traced current {current / 1024 ** 2:.2f} MiB, '
+        f'peak {peak / 1024 ** 2:.2f} MiB',
+        '',
+        *[str(difference) for difference in differences[:MEMORY_REPORT_LINES]],
+    ])
+
+
+def profile(seconds: float, memory: bool = False) -> dict[str, str]:
+    seconds = min(max(seconds, 1), MAXIMUM_PROFILE_SECONDS)
+    profiler = SamplingProfiler()
+    should_stop_tracing = memory and not tracemalloc.is_tracing()
+
+    if should_stop_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    try:
+        before = tracemalloc.take_snapshot() if memory else None
+        profiler.run(seconds)
+        results = {CPU_PROFILE_NAME: profiler.get_collapsed_stacks()}
+
+        if memory:
+            results[MEMORY_PROFILE_NAME] = format_memory_growth(before, tracemalloc.take_snapshot(), seconds)
+
+        return results
+    finally:
+        if should_stop_tracing:
+            tracemalloc.stop()
+
+
+def request_profile(hostname: str, seconds: float, memory: bool = False) -> str:
+    request_id = uuid.uuid4().hex
+    key = f'{PROFILE_REQUEST_KEY_PREFIX}{hostname}'
+
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.rpush(key, json.dumps({
+        'id': request_id,
+        'seconds': seconds,
+        'memory': memory,
+        'requested_at': time.time(),
+    }))
+    pipeline.expire(key, PROFILE_REQUEST_EXPIRE_SECONDS)
+    pipeline.execute()
+
+    return request_id
+
+
+def get_profile_result(request_id: str) -> Optional[dict[str, str]]:
+    result = redis_client.hgetall(f'{PROFILE_RESULT_KEY_PREFIX}{request_id}')
+
+    if not result:
+        return None
+
+    return {name.decode(): content.decode() for name, content in result.items()}
+
+
+def handle_profile_request(raw: bytes):
+    request = json.loads(raw)
+
+    if time.time() - request['requested_at'] > PROFILE_REQUEST_EXPIRE_SECONDS:
+        logger.warning(f'Skip expired profile request {request["id"]}')
+        return
+
+    logger.info(f'Profiling for {request["seconds"]} seconds, request {request["id"]}')
+
+    try:
+        results = profile(request['seconds'], request['memory'])
+    except Exception as e:
+        results = {ERROR_FIELD: str(e)}
+
+    key = f'{PROFILE_RESULT_KEY_PREFIX}{request["id"]}'
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.hset(key, mapping=results)
+    pipeline.expire(key, PROFILE_RESULT_EXPIRE_SECONDS)
+    pipeline.execute()
+
+
+def listen_profile_requests(hostname: str):
+    key = f'{PROFILE_REQUEST_KEY_PREFIX}{hostname}'
+
+    while True:
+        try:
+            item = redis_client.blpop([key], timeout=LISTEN_TIMEOUT_SECONDS)
+
+            if item is not None:
+                handle_profile_request(item[1])
+        except Exception as e:
+            logger.warning(f'Fail to handle profile request: {str(e)}')
+            time.sleep(LISTEN_RETRY_SECONDS)
+
+
+def start_profile_listener(hostname: str):
+    # the solo pool runs tasks on the thread that consumes remote control commands, so a busy worker only answers
+    # them after the task, the listener takes requests from redis on its own thread and samples the task meanwhile
+    threading.Thread(
+        target=listen_profile_requests, args=(hostname,), name='profile_listener', daemon=True
+    ).start()
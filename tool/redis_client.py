@@ -0,0 +1,11 @@
+from redis import Redis
+from beans.singleton import Singleton
+from config.config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD
+
+
+class RedisClient(Singleton):
+    def __init__(self):
+        self.client = Redis(host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, db=0)
+
+
+redis_client = RedisClient().client
@@ -0,0 +1,266 @@
+import time
+import datetime
+import threading
+from enum import StrEnum
+from typing import Optional
+from urllib.parse import urlparse
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+
+from tool.redis_client import redis_client
+from module.leech.beans.leech_file import LeechFile
+
+TASK_METRICS_KEY = 'task:metrics'
+# upper bounds in seconds of the histogram buckets, the last bucket is +Inf
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+FIELD_SEPARATOR = '|'
+PUBLISHED_AT_HEADER = 'published_at'
+METRIC_NAME = 'leech_stage_duration_seconds'
+
+
+class Stage(StrEnum):
+    # from the task being published to a worker starting it
+    QUEUE_WAIT = 'queue_wait'
+    # resolving the actual download url
+    RESOLVE = 'resolve'
+    # streaming the file to the disk
+    TRANSFER = 'transfer'
+    # moving the downloaded file to its final name
+    MOVE = 'move'
+    # the whole download task
+    DOWNLOAD = 'download'
+    # the whole upload task
+    UPLOAD = 'upload'
+    # from the result message being created to it being sent
+    NOTIFY = 'notify'
+
+
+# task id: (started at, stage, labels) of the tasks running in this process
+running_tasks: dict[str, tuple[float, Stage, dict[str, str]]] = {}
+
+
+def get_bucket_index(seconds: float) -> int:
+    for index, upper_bound in enumerate(BUCKETS):
+        if seconds <= upper_bound:
+            return index
+
+    return len(BUCKETS)
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    return ','.join(f'{name}={value}' for name, value in sorted(labels.items()) if value)
+
+
+def parse_labels(text: str) -> dict[str, str]:
+    return dict(label.split('=', 1) for label in text.split(',') if label)
+
+
+def observe(stage: Stage, seconds: float, labels: dict[str, str]):
+    series = FIELD_SEPARATOR.join([stage, format_labels(labels)])
+
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.hincrby(TASK_METRICS_KEY, FIELD_SEPARATOR.join([series, str(get_bucket_index(seconds))]), 1)
+        pipeline.hincrbyfloat(TASK_METRICS_KEY, FIELD_SEPARATOR.join([series, 'sum']), seconds)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f'Fail to report task metrics: {str(e)}')
+
+
+@contextmanager
+def measure(stage: Stage, labels: dict[str, str]):
+    started_at = time.monotonic()
+
+    # failed and cancelled stages end early, they would drag the durations of the successful ones down
+    yield
+
+    observe(stage, time.monotonic() - started_at, labels)
+
+
+def get_host(link: Optional[str]) -> str:
+    return urlparse(link or '').netloc
+
+
+def download_labels(leech_file: LeechFile) -> dict[str, str]:
+    return {
+        'tool': leech_file.tool,
+        'host': get_host(getattr(leech_file, 'actual_link', None) or leech_file.link),
+    }
+
+
+def upload_labels(leech_file: LeechFile) -> dict[str, str]:
+    return {
+        'tool': leech_file.tool,
+        'sync_tool': leech_file.sync_tool,
+    }
+
+
+def record_published_at(headers: dict):
+    # a retried task is published with an eta, it starts waiting in the queue from then on
+    eta = headers.get('eta')
+
+    try:
+        published_at = datetime.datetime.fromisoformat(eta).timestamp() if eta else time.time()
+    except (TypeError, ValueError):
+        published_at = time.time()
+
+    headers[PUBLISHED_AT_HEADER] = published_at
+
+
+def get_published_at(request) -> Optional[float]:
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+
+    if published_at is None:
+        published_at = (getattr(request, 'headers', None) or {}).get(PUBLISHED_AT_HEADER)
+
+    return published_at
+
+
+def start_task(task_id: str, request, stage: Stage, labels: dict[str, str]):
+    published_at = get_published_at(request)
+
+    if published_at is not None:
+        observe(Stage.QUEUE_WAIT, max(time.time() - published_at, 0), {**labels, 'task': stage})
+
+    running_tasks[task_id] = (time.monotonic(), stage, labels)
+
+
+def finish_task(task_id: str):
+    started_at, stage, labels = running_tasks.pop(task_id, (None, None, None))
+
+    if started_at is not None:
+        observe(stage, time.monotonic() - started_at, labels)
+
+
+def discard_task(task_id: str):
+    running_tasks.pop(task_id, None)
+
+
+def get_histograms() -> dict[tuple[str, str], dict]:
+    histograms = {}
+
+    try:
+        fields = redis_client.hgetall(TASK_METRICS_KEY)
+    except Exception as e:
+        logger.warning(f'Fail to get task metrics: {str(e)}')
+        return histograms
+
+    for field, value in fields.items():
+        stage, labels, bucket = field.decode().split(FIELD_SEPARATOR)
+        histogram = histograms.setdefault((stage, labels), {'buckets': [0] * (len(BUCKETS) + 1), 'sum': 0.0})
+
+        if bucket == 'sum':
+            histogram['sum'] = float(value)
+        else:
+            histogram['buckets'][int(bucket)] = int(value)
+
+    return histograms
+
+
+def estimate_quantile(buckets: list[int], quantile: float) -> float:
+    # interpolate within the bucket like histogram_quantile of prometheus
+    count = sum(buckets)
+
+    if count == 0:
+        return 0.0
+
+    rank = quantile * count
+    cumulative = 0
+
+    for index, bucket_count in enumerate(buckets):
+        if cumulative + bucket_count >= rank and bucket_count > 0:
+            if index == len(BUCKETS):
+                return BUCKETS[-1]
+
+            lower_bound = BUCKETS[index - 1] if index > 0 else 0
+
+            return lower_bound + (BUCKETS[index] - lower_bound) * (rank - cumulative) / bucket_count
+
+        cumulative += bucket_count
+
+    return BUCKETS[-1]
+
+
+def summarize() -> dict[str, dict]:
+    merged = {}
+
+    for (stage, _), histogram in get_histograms().items():
+        summary = merged.setdefault(stage, {'buckets': [0] * (len(BUCKETS) + 1), 'sum': 0.0})
+        summary['buckets'] = [a + b for a, b in zip(summary['buckets'], histogram['buckets'])]
+        summary['sum'] += histogram['sum']
+
+    summaries = {}
+
+    for stage in Stage:
+        if stage not in merged:
+            continue
+
+        count = sum(merged[stage]['buckets'])
+        summaries[stage] = {
+            'count': count,
+            'average': merged[stage]['sum'] / count if count else 0.0,
+            'p50': estimate_quantile(merged[stage]['buckets'], 0.5),
+            'p95': estimate_quantile(merged[stage]['buckets'], 0.95),
+        }
+
+    return summaries
+
+
+def format_prometheus_labels(labels: dict[str, str]) -> str:
+    return ','.join(
+        '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+
+
+def export_prometheus() -> str:
+    lines = [
+        f'# HELP {METRIC_NAME} Duration of every stage of leech tasks.',
+        f'# TYPE {METRIC_NAME} histogram',
+    ]
+
+    for (stage, labels), histogram in sorted(get_histograms().items()):
+        labels = {'stage': stage, **parse_labels(labels)}
+        cumulative = 0
+
+        for index, bucket_count in enumerate(histogram['buckets']):
+            cumulative += bucket_count
+            upper_bound = str(BUCKETS[index]) if index < len(BUCKETS) else '+Inf'
+            lines.append(f'{METRIC_NAME}_bucket{{{format_prometheus_labels({**labels, "le": upper_bound})}}} {cumulative}')
+
+        lines.append(f'{METRIC_NAME}_sum{{{format_prometheus_labels(labels)}}} {histogram["sum"]}')
+        lines.append(f'{METRIC_NAME}_count{{{format_prometheus_labels(labels)}}} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = export_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(host: str, port: int) -> Optional[ThreadingHTTPServer]:
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    except OSError as e:
+        logger.error(f'Fail to start metrics server on {host}:{port}: {str(e)}')
+        return None
+
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics_server', daemon=True).start()
+    logger.info(f'Metrics are exposed on http://{host}:{port}/metrics')
+
+    return server
@@ -1,4 +1,5 @@
 import os
+import re
 import hashlib
 import subprocess
 import urllib.parse
@@ -12,6 +13,7 @@ from config.config import TELEGRAM_ADMIN_ID, ALIST_WEB, ALIST_TOKEN, ALIST_HOST
 from module.leech.beans.leech_file import LeechFile
 from constants.worker import Project
 from tool.user_agents import get_random_user_agent
+from tool.disk_usage import report_usage
 
 
 async def __is_admin(_, __, update: Union[Message, CallbackQuery]) -> bool:
@@ -40,7 +42,7 @@ def is_alist_available():
     return all([ALIST_WEB, ALIST_TOKEN]) or all([ALIST_HOST, ALIST_TOKEN])
 
 
-def open_celery_worker_process(project: Project, hostname: str, queues: str, concurrency: int):
+def open_celery_worker_process(project: Project, hostname: str, queues: str, concurrency: int, beat: bool = False):
     subprocess.Popen([
         'celery',
         '-A',
@@ -51,7 +53,9 @@ def open_celery_worker_process(project: Project, hostname: str, queues: str, con
         '--pool=solo',
         f'--hostname={hostname}',
         f'--queues={queues}',
-        f'--concurrency={concurrency}'
+        f'--concurrency={concurrency}',
+        # only one process may run the scheduler, or periodic tasks are sent more than once
+        *(['--beat'] if beat else [])
     ])
 
 
@@ -70,12 +74,30 @@ def convert_bytes(byte_amount: int) -> str:
         return f"{byte_amount:.2f} B"
 
 
+def parse_bytes(text: str | None) -> int | None:
+    matched = re.match(r'^\s*([\d.]+)\s*([KMGTP]?)i?B?\s*$', text or '', re.IGNORECASE)
+
+    if matched is None:
+        return None
+
+    try:
+        return int(float(matched.group(1)) * 1024 ** ' KMGTP'.index(matched.group(2).upper() or ' '))
+    except ValueError:
+        return None
+
+
 def clean_local_file(leech_file: LeechFile):
-    full_name = leech_file.get_full_name()
+    for full_name in [leech_file.get_full_name(), leech_file.get_temp_full_name()]:
+        if os.path.isfile(full_name) or os.path.islink(full_name):
+            # a dangling link has no target to get the size of
+            size = os.lstat(full_name).st_size if os.path.islink(full_name) else os.path.getsize(full_name)
+            os.remove(full_name)
 
-    if os.path.isfile(full_name) or os.path.islink(full_name):
-        os.remove(full_name)
+            # temp files are never reported, they are left to the reconciliation
+            if full_name == leech_file.get_full_name():
+                report_usage(full_name, size=-size, files=-1)
 
     if leech_file.location is not None and os.path.exists(leech_file.location) and len(
             os.listdir(leech_file.location)) == 0:
         rmtree(leech_file.location)
+        report_usage(leech_file.location, dirs=-1)